@@ -0,0 +1,111 @@
+# isort: skip_file
+# Needs to be first to set up django environment
+from .helpers import now  # noqa: F401
+import random
+import zlib
+from datetime import date, timedelta
+
+import orjson
+
+from posthog.caching.cached_response_encoding import decode_cached_response, encode_cached_response
+
+DAYS = [(date(2024, 1, 1) + timedelta(days=offset)).isoformat() for offset in range(365)]
+LABELS = [(date(2024, 1, 1) + timedelta(days=offset)).strftime("%-d-%b-%Y") for offset in range(365)]
+
+
+def trends_response(breakdown_values: int) -> dict:
+    rng = random.Random(0)
+    return {
+        "results": [
+            {
+                "action": {
+                    "days": DAYS,
+                    "id": "$pageview",
+                    "type": "events",
+                    "order": 0,
+                    "name": "$pageview",
+                    "custom_name": None,
+                    "math": "total",
+                    "math_property": None,
+                    "math_hogql": None,
+                    "math_group_type_index": None,
+                    "properties": {},
+                },
+                "label": "$pageview",
+                "count": rng.randint(0, 1_000_000),
+                "data": [rng.randint(0, 10_000) for _ in DAYS],
+                "labels": LABELS,
+                "days": DAYS,
+                "breakdown_value": f"breakdown value {index}",
+                "filter": {},
+            }
+            for index in range(breakdown_values)
+        ],
+        "is_cached": False,
+        "last_refresh": "2024-12-31T00:00:00Z",
+        "next_allowed_client_refresh": "2024-12-31T00:15:00Z",
+        "cache_key": "cache_key",
+        "timezone": "UTC",
+        "hogql": "SELECT 1",
+        "timings": [{"k": "./query", "t": 0.5}],
+    }
+
+
+def funnels_response(breakdown_values: int) -> dict:
+    rng = random.Random(0)
+    return {
+        "results": [
+            [
+                {
+                    "action_id": f"step {order}",
+                    "name": f"step {order}",
+                    "custom_name": None,
+                    "order": order,
+                    "people": [],
+                    "count": rng.randint(0, 1_000),
+                    "type": "events",
+                    "average_conversion_time": rng.random() * 1000,
+                    "median_conversion_time": rng.random() * 1000,
+                    "breakdown": [f"breakdown value {index}"],
+                    "breakdown_value": [f"breakdown value {index}"],
+                }
+                for order in range(5)
+            ]
+            for index in range(breakdown_values)
+        ],
+        "is_cached": False,
+        "last_refresh": "2024-12-31T00:00:00Z",
+        "next_allowed_client_refresh": "2024-12-31T00:15:00Z",
+        "cache_key": "cache_key",
+        "timezone": "UTC",
+        "hogql": "SELECT 1",
+        "timings": [{"k": "./query", "t": 0.5}],
+    }
+
+
+class CachedResponseEncodingSuite:
+    """Size of cached trends and funnels responses and the time to read them, as JSON and in the compact encoding."""
+
+    params = [["trends", "funnels"], ["json", "compact"]]
+    param_names = ["insight", "encoding"]
+
+    def setup(self, insight, encoding):
+        response = trends_response(200) if insight == "trends" else funnels_response(100)
+        self.encoded = orjson.dumps(response) if encoding == "json" else encode_cached_response(response)
+        self.compressed = zlib.compress(self.encoded, 6)
+
+    def track_size(self, insight, encoding):
+        return len(self.encoded)
+
+    track_size.unit = "bytes"  # type: ignore
+
+    def track_compressed_size(self, insight, encoding):
+        return len(self.compressed)
+
+    track_compressed_size.unit = "bytes"  # type: ignore
+
+    def time_decode(self, insight, encoding):
+        decode_cached_response(self.encoded)
+
+    def time_decompress_and_decode(self, insight, encoding):
+        decode_cached_response(zlib.decompress(self.compressed))
@@ -0,0 +1,43 @@
+# isort: skip_file
+# Needs to be first to set up django environment
+from .helpers import now  # noqa: F401
+
+from numpy.random import default_rng
+
+from ee.clickhouse.queries.experiments.funnel_experiment_result import (
+    Variant,
+    calculate_credible_intervals,
+    calculate_expected_loss,
+    calculate_probability_of_winning_for_each,
+)
+from ee.clickhouse.queries.experiments.trend_experiment_result import Variant as CountVariant
+from ee.clickhouse.queries.experiments.trend_experiment_result import (
+    calculate_probability_of_winning_for_each as calculate_probability_of_winning_for_each_count_data,
+)
+
+
+class ExperimentStatsSuite:
+    """CPU time of the Bayesian simulations behind an experiment results page."""
+
+    params = [2, 5, 10]
+    param_names = ["variants"]
+
+    def setup(self, variants):
+        self.variants = [Variant("control", 1000, 9000)] + [
+            Variant(f"test_{index}", 1000 + 10 * index, 9000 - 10 * index) for index in range(1, variants)
+        ]
+        self.count_variants = [CountVariant("control", 1000, 1, 10000)] + [
+            CountVariant(f"test_{index}", 1000 + 10 * index, 1, 10000) for index in range(1, variants)
+        ]
+
+    def time_funnel_probabilities(self, variants):
+        calculate_probability_of_winning_for_each(self.variants, rng=default_rng(0))
+
+    def time_funnel_expected_loss(self, variants):
+        calculate_expected_loss(self.variants[-1], self.variants[:-1], rng=default_rng(0))
+
+    def time_funnel_credible_intervals(self, variants):
+        calculate_credible_intervals(self.variants, rng=default_rng(0))
+
+    def time_trend_probabilities(self, variants):
+        calculate_probability_of_winning_for_each_count_data(self.count_variants, rng=default_rng(0))
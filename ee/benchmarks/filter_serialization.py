@@ -0,0 +1,44 @@
+# isort: skip_file
+# Needs to be first to set up django environment
+from .helpers import now  # noqa: F401
+
+from posthog.models.feature_flag.flag_matching import flag_condition_properties
+from posthog.models.filters import Filter
+
+FILTER_DATA = {
+    "events": [{"id": "$pageview", "properties": [{"key": "$browser", "value": "Chrome", "type": "event"}]}],
+    "breakdown": "$current_url",
+    "breakdown_type": "event",
+    "display": "ActionsLineGraph",
+    "interval": "day",
+    "date_from": "-30d",
+    "properties": [{"key": "email", "value": "@posthog.com", "operator": "not_icontains", "type": "person"}],
+}
+
+FLAG_CONDITION = {
+    "properties": [
+        {"key": "email", "value": "@posthog.com", "operator": "icontains", "type": "person"},
+        {"key": "$browser", "value": ["Chrome", "Safari"], "operator": "exact", "type": "person"},
+    ],
+    "rollout_percentage": 50,
+}
+
+
+class FilterSerializationSuite:
+    """CPU time of turning legacy filters back into dicts and JSON, as done for cache keys and query tags."""
+
+    def setup(self):
+        self.filter = Filter(data=FILTER_DATA)
+        self.filter.to_dict()
+
+    def time_to_dict_new_filter(self):
+        Filter(data=FILTER_DATA).to_dict()
+
+    def time_to_dict_repeated(self):
+        self.filter.to_dict()
+
+    def time_to_json_repeated(self):
+        self.filter.toJSON()
+
+    def time_flag_condition_properties(self):
+        flag_condition_properties(FLAG_CONDITION)
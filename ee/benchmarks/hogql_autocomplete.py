@@ -0,0 +1,78 @@
+# isort: skip_file
+# Needs to be first to set up django environment
+from .helpers import now  # noqa: F401
+from time import perf_counter
+
+from posthog.hogql.autocomplete import get_hogql_autocomplete
+from posthog.models import Organization, PropertyDefinition, Team
+from posthog.schema import HogQLAutocomplete
+
+# The editor asks for suggestions on every keystroke, so they have to come back well before the next one
+AUTOCOMPLETE_P95_TARGET_MS = 50
+PROPERTY_DEFINITIONS = 10_000
+
+QUERY = (
+    "select properties.$browser, person.properties.email, count() from events e where event = '$pageview' group by 1, 2"
+)
+
+
+def keystrokes() -> list[HogQLAutocomplete]:
+    """Autocomplete requests as the query above is typed out, one character at a time."""
+    return [
+        HogQLAutocomplete(kind="HogQLAutocomplete", select=QUERY[:end], startPosition=start, endPosition=end)
+        for end in range(1, len(QUERY) + 1)
+        for start in [QUERY.rfind(" ", 0, end) + 1]
+    ]
+
+
+class HogQLAutocompleteSuite:
+    """Latency of autocomplete while typing a query, against a team with lots of property definitions."""
+
+    timeout = 600.0
+
+    def setup(self):
+        # :TRICKY: Data in benchmark servers has ID=2
+        team = Team.objects.filter(id=2).first()
+        if team is None:
+            organization = Organization.objects.create()
+            team = Team.objects.create(id=2, organization=organization, name="The Bakery")
+        self.team = team
+
+        existing = PropertyDefinition.objects.filter(team=team, name__startswith="benchmark_property_").count()
+        PropertyDefinition.objects.bulk_create(
+            [
+                PropertyDefinition(
+                    team=team,
+                    name=f"benchmark_property_{index}",
+                    property_type="String",
+                    type=PropertyDefinition.Type.EVENT if index % 2 else PropertyDefinition.Type.PERSON,
+                )
+                for index in range(existing, PROPERTY_DEFINITIONS)
+            ]
+        )
+        self.keystrokes = keystrokes()
+
+    def time_typing_a_query(self):
+        for keystroke in self.keystrokes:
+            get_hogql_autocomplete(query=keystroke.model_copy(), team=self.team)
+
+    def track_p95_keystroke_ms(self):
+        # Warm up, like an editor that's been open for a bit
+        for keystroke in self.keystrokes:
+            get_hogql_autocomplete(query=keystroke.model_copy(), team=self.team)
+
+        durations = []
+        for keystroke in self.keystrokes:
+            start_time = perf_counter()
+            get_hogql_autocomplete(query=keystroke.model_copy(), team=self.team)
+            durations.append((perf_counter() - start_time) * 1000)
+        durations.sort()
+        p95 = durations[int(len(durations) * 0.95)]
+
+        if p95 > AUTOCOMPLETE_P95_TARGET_MS:
+            raise AssertionError(
+                f"p95 autocomplete latency is {p95:.1f}ms, the target is {AUTOCOMPLETE_P95_TARGET_MS}ms"
+            )
+        return p95
+
+    track_p95_keystroke_ms.unit = "ms"  # type: ignore
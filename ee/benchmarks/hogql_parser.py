@@ -0,0 +1,43 @@
+# isort: skip_file
+# Needs to be first to set up django environment
+from .helpers import now  # noqa: F401
+
+from posthog.hogql import ast
+from posthog.hogql.parser import parse_select, parse_template
+
+TEMPLATE = """
+    SELECT
+        uniqIf(session_person_id, session_start_timestamp >= {current_date_from} AND session_start_timestamp < {current_date_to}) AS unique_users,
+        uniqIf(session_person_id, session_start_timestamp >= {previous_date_from} AND session_start_timestamp < {previous_date_to}) AS previous_unique_users,
+        sumIf(filtered_pageview_count, session_start_timestamp >= {current_date_from} AND session_start_timestamp < {current_date_to}) AS current_pageviews,
+        avgIf(session_duration, session_start_timestamp >= {current_date_from} AND session_start_timestamp < {current_date_to}) AS avg_duration_s
+    FROM (
+        SELECT
+            any(events.person_id) AS session_person_id,
+            events.`$session_id` AS session_id,
+            min(events.timestamp) AS session_start_timestamp,
+            count() AS filtered_pageview_count
+        FROM events
+        WHERE and(events.`$session_id` IS NOT NULL, equals(events.event, '$pageview'), {event_properties})
+        GROUP BY session_id
+    )
+"""
+
+PLACEHOLDERS: dict[str, ast.Expr] = {
+    "current_date_from": ast.Constant(value="2024-01-08"),
+    "current_date_to": ast.Constant(value="2024-01-15"),
+    "previous_date_from": ast.Constant(value="2024-01-01"),
+    "previous_date_to": ast.Constant(value="2024-01-08"),
+    "event_properties": ast.Constant(value=True),
+}
+
+
+class HogQLParserSuite:
+    """CPU time of parsing the query runners' HogQL templates, which are the same on every request."""
+
+    def time_parse_select_template(self):
+        parse_select(TEMPLATE, placeholders=PLACEHOLDERS)
+
+    def time_parse_select_template_uncached(self):
+        parse_template.cache_clear()
+        parse_select(TEMPLATE, placeholders=PLACEHOLDERS)
@@ -0,0 +1,40 @@
+# isort: skip_file
+# Needs to be first to set up django environment
+from .helpers import now  # noqa: F401
+import random
+import string
+
+from ee.session_recordings.ai.embedding_backends import StubEmbeddingBackend
+from ee.session_recordings.ai.embeddings_runner import SessionEmbeddingsRunner
+from posthog.models import Team
+
+# Stands in for the round trip to the embedding provider
+REQUEST_LATENCY_SECONDS = 0.2
+
+
+def error_inputs(count: int, length: int) -> list[tuple[str, str]]:
+    rng = random.Random(0)
+    return [(f"session_{index}", "".join(rng.choices(string.ascii_letters + " ", k=length))) for index in range(count)]
+
+
+class ReplayEmbeddingsSuite:
+    """Throughput of generating embeddings, with a stub backend that takes as long as a request to the provider."""
+
+    params = [10, 100, 1000]
+    param_names = ["inputs"]
+
+    def setup(self, inputs):
+        # :TRICKY: Data in benchmark servers has ID=2, though embedding only needs the team's ID
+        self.team = Team(id=2)
+        self.prepared = error_inputs(inputs, length=2_000)
+
+    def time_embed(self, inputs):
+        runner = SessionEmbeddingsRunner(self.team, backend=StubEmbeddingBackend(latency=REQUEST_LATENCY_SECONDS))
+        runner.embed(self.prepared, source_type="error")
+
+    def track_requests(self, inputs):
+        backend = StubEmbeddingBackend()
+        SessionEmbeddingsRunner(self.team, backend=backend).embed(self.prepared, source_type="error")
+        return len(backend.requests)
+
+    track_requests.unit = "requests"  # type: ignore
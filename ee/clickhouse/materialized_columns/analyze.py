@@ -1,3 +1,4 @@
+import dataclasses
 import re
 from datetime import timedelta
 from typing import Optional
@@ -7,9 +8,12 @@ import structlog
 
 from ee.clickhouse.materialized_columns.columns import (
     DEFAULT_TABLE_COLUMN,
+    SHORT_TABLE_COLUMN_NAME,
+    _materialized_column_name,
     backfill_materialized_columns,
     get_materialized_columns,
     materialize,
+    minmax_index_name,
 )
 from ee.settings import (
     MATERIALIZE_COLUMNS_ANALYSIS_PERIOD_HOURS,
@@ -179,6 +183,117 @@ LIMIT 100 -- Make sure we don't add 100s of columns in one run
     return [("events", table_column, property_name) for (table_column, property_name) in raw_queries]
 
 
+@dataclasses.dataclass(frozen=True)
+class MaterializationCandidate:
+    """A property read from JSON by HogQL queries, with the cost of those queries from `system.query_log`"""
+
+    table: TableWithProperties
+    table_column: TableColumn
+    property_name: PropertyName
+    query_count: int
+    team_count: int
+    total_duration_ms: int
+    total_read_bytes: int
+    # Read bytes of each query are split evenly between the unmaterialized properties it reads
+    estimated_bytes_saved: int
+
+    @property
+    def suggestion(self) -> Suggestion:
+        return self.table, self.table_column, self.property_name
+
+
+@dataclasses.dataclass(frozen=True)
+class MaterializationSimulation:
+    """What `materialize_properties_task` would do for a single suggestion"""
+
+    table: TableWithProperties
+    table_column: TableColumn
+    property_name: PropertyName
+    column_name: str
+    minmax_index_name: str
+    estimated_bytes_saved: Optional[int] = None
+    team_count: Optional[int] = None
+
+
+def _analyze_property_access_log(since_hours_ago: int, min_query_time: int) -> list[MaterializationCandidate]:
+    """
+    Finds columns that should be materialized, based on the properties the HogQL printer couldn't find a materialized
+    column for. These are tagged on each query as `unmaterialized_properties`, see `posthog/hogql/query.py`.
+    """
+
+    rows = sync_execute(
+        """
+WITH
+    %(min_query_time)s as slow_query_minimum,
+    (
+        159, -- TIMEOUT EXCEEDED
+        160, -- TOO SLOW (estimated query execution time)
+    ) as exception_codes
+SELECT
+    property.1 as table_name,
+    property.2 as table_column,
+    property.3 as property_name,
+    count() as query_count,
+    uniq(JSONExtractInt(log_comment, 'team_id')) as team_count,
+    sum(query_duration_ms) as total_duration_ms,
+    sum(read_bytes) as total_read_bytes,
+    toUInt64(sum(read_bytes / JSONLength(log_comment, 'unmaterialized_properties'))) as estimated_bytes_saved
+FROM
+    clusterAllReplicas(posthog, system, query_log)
+ARRAY JOIN
+    JSONExtract(log_comment, 'unmaterialized_properties', 'Array(Tuple(String, String, String))') as property
+WHERE
+    query_start_time > now() - toIntervalHour(%(since)s)
+    and type > 1
+    and is_initial_query
+    and JSONLength(log_comment, 'unmaterialized_properties') > 0
+    and JSONExtractInt(log_comment, 'team_id') != 0
+    and table_name IN %(tables)s
+    and table_column IN %(table_columns)s
+    and (exception_code IN exception_codes OR query_duration_ms > slow_query_minimum)
+GROUP BY
+    1, 2, 3
+ORDER BY
+    estimated_bytes_saved DESC,
+    team_count DESC
+LIMIT 100 -- Make sure we don't add 100s of columns in one run
+        """,
+        {
+            "since": since_hours_ago,
+            "min_query_time": min_query_time,
+            "tables": ["events", "person"],
+            "table_columns": list(SHORT_TABLE_COLUMN_NAME.keys()),
+        },
+    )
+
+    return [MaterializationCandidate(*row) for row in rows]
+
+
+def simulate_materialization(
+    suggestions: list[Suggestion], candidates: Optional[list[MaterializationCandidate]] = None
+) -> list[MaterializationSimulation]:
+    "Reports the columns and indexes that materializing the suggestions would create, without changing anything"
+
+    candidates_by_suggestion = {candidate.suggestion: candidate for candidate in candidates or []}
+    simulations = []
+    for suggestion in suggestions:
+        table, table_column, property_name = suggestion
+        column_name = _materialized_column_name(table, property_name, table_column)
+        candidate = candidates_by_suggestion.get(suggestion)
+        simulations.append(
+            MaterializationSimulation(
+                table=table,
+                table_column=table_column,
+                property_name=property_name,
+                column_name=column_name,
+                minmax_index_name=minmax_index_name(column_name),
+                estimated_bytes_saved=candidate.estimated_bytes_saved if candidate else None,
+                team_count=candidate.team_count if candidate else None,
+            )
+        )
+    return simulations
+
+
 def materialize_properties_task(
     columns_to_materialize: Optional[list[Suggestion]] = None,
     time_to_analyze_hours: int = MATERIALIZE_COLUMNS_ANALYSIS_PERIOD_HOURS,
@@ -186,13 +301,20 @@ def materialize_properties_task(
     min_query_time: int = MATERIALIZE_COLUMNS_MINIMUM_QUERY_TIME,
     backfill_period_days: int = MATERIALIZE_COLUMNS_BACKFILL_PERIOD_DAYS,
     dry_run: bool = False,
-) -> None:
+) -> list[MaterializationSimulation]:
     """
-    Creates materialized columns for event and person properties based off of slow queries
+    Creates materialized columns for event and person properties based off of slow queries.
+    Returns a report of the columns and indexes created, or that would be created when `dry_run` is set.
     """
 
+    candidates: list[MaterializationCandidate] = []
     if columns_to_materialize is None:
-        columns_to_materialize = _analyze(time_to_analyze_hours, min_query_time)
+        # Properties logged by the HogQL printer come first, ranked by bytes saved and team spread
+        candidates = _analyze_property_access_log(time_to_analyze_hours, min_query_time)
+        columns_to_materialize = [candidate.suggestion for candidate in candidates]
+        for suggestion in _analyze(time_to_analyze_hours, min_query_time):
+            if suggestion not in columns_to_materialize:
+                columns_to_materialize.append(suggestion)
     result = []
     for suggestion in columns_to_materialize:
         table, table_column, property_name = suggestion
@@ -204,6 +326,10 @@ def materialize_properties_task(
     else:
         logger.info("Found no columns to materialize.")
 
+    simulations = simulate_materialization(result[:maximum], candidates)
+    for simulation in simulations:
+        logger.info("Column to materialize", **dataclasses.asdict(simulation))
+
     properties: dict[TableWithProperties, list[tuple[PropertyName, TableColumn]]] = {
         "events": [],
         "person": [],
@@ -219,3 +345,5 @@ def materialize_properties_task(
         logger.info(f"Starting backfill for new materialized columns. period_days={backfill_period_days}")
         backfill_materialized_columns("events", properties["events"], timedelta(days=backfill_period_days))
         backfill_materialized_columns("person", properties["person"], timedelta(days=backfill_period_days))
+
+    return simulations
@@ -115,12 +115,16 @@ def materialize(
         add_minmax_index(table, column_name)
 
 
+def minmax_index_name(column_name: str) -> str:
+    return f"minmax_{column_name}"
+
+
 def add_minmax_index(table: TablesWithMaterializedColumns, column_name: str):
     # Note: This will be populated on backfill
     execute_on_cluster = f"ON CLUSTER '{CLICKHOUSE_CLUSTER}'" if table == "events" else ""
 
     updated_table = "sharded_events" if table == "events" else table
-    index_name = f"minmax_{column_name}"
+    index_name = minmax_index_name(column_name)
 
     try:
         sync_execute(
@@ -1,6 +1,8 @@
+import json
+
 from posthog.test.base import BaseTest, ClickhouseTestMixin
 from posthog.client import sync_execute
-from ee.clickhouse.materialized_columns.analyze import materialize_properties_task
+from ee.clickhouse.materialized_columns.analyze import _analyze_property_access_log, materialize_properties_task
 
 from unittest.mock import patch, call
 
@@ -54,3 +56,76 @@ class TestMaterializedColumnsAnalyze(ClickhouseTestMixin, BaseTest):
                 call("events", "materialize_me3", table_column="properties"),
             ]
         )
+
+    @patch("ee.clickhouse.materialized_columns.analyze.materialize")
+    @patch("ee.clickhouse.materialized_columns.analyze.backfill_materialized_columns")
+    def test_mat_columns_from_property_access_log(self, patch_backfill, patch_materialize):
+        sync_execute("SYSTEM FLUSH LOGS")
+        sync_execute("TRUNCATE TABLE system.query_log")
+
+        logged_queries = [
+            # (team_id, read_bytes, unmaterialized properties)
+            (2, 40000000000, [["events", "properties", "shared_prop"], ["events", "properties", "big_prop"]]),
+            (3, 10000000000, [["events", "properties", "shared_prop"]]),
+            (2, 90000000000, [["events", "properties", "big_prop"]]),
+            (2, 90000000000, [["events", "person_properties", "$browser"]]),
+            (2, 90000000000, [["groups", "group_properties", "not_materializable"]]),
+        ]
+        for team_id, read_bytes, properties in logged_queries:
+            sync_execute(
+                """
+            INSERT INTO system.query_log (
+                query,
+                query_start_time,
+                type,
+                is_initial_query,
+                log_comment,
+                exception_code,
+                query_duration_ms,
+                read_bytes
+            ) VALUES (
+                'SELECT 1',
+                now(),
+                2,
+                1,
+                %(log_comment)s,
+                0,
+                60000,
+                %(read_bytes)s
+            )
+            """,
+                {
+                    "log_comment": json.dumps({"team_id": team_id, "unmaterialized_properties": properties}),
+                    "read_bytes": read_bytes,
+                },
+            )
+
+        candidates = _analyze_property_access_log(since_hours_ago=1, min_query_time=40000)
+        self.assertEqual(
+            [(c.suggestion, c.team_count, c.estimated_bytes_saved) for c in candidates],
+            [
+                (("events", "properties", "big_prop"), 1, 110000000000),
+                (("events", "person_properties", "$browser"), 1, 90000000000),
+                (("events", "properties", "shared_prop"), 2, 30000000000),
+            ],
+        )
+
+        simulations = materialize_properties_task(dry_run=True)
+        patch_materialize.assert_not_called()
+        self.assertEqual(
+            [(s.property_name, s.column_name, s.minmax_index_name) for s in simulations],
+            [
+                ("big_prop", "mat_big_prop", "minmax_mat_big_prop"),
+                ("$browser", "mat_pp_$browser", "minmax_mat_pp_$browser"),
+                ("shared_prop", "mat_shared_prop", "minmax_mat_shared_prop"),
+            ],
+        )
+
+        materialize_properties_task()
+        patch_materialize.assert_has_calls(
+            [
+                call("events", "big_prop", table_column="properties"),
+                call("events", "$browser", table_column="person_properties"),
+                call("events", "shared_prop", table_column="properties"),
+            ]
+        )
@@ -4,7 +4,7 @@ import json
 from typing import Optional
 from zoneinfo import ZoneInfo
 
-from numpy.random import default_rng
+from numpy.random import Generator
 from rest_framework.exceptions import ValidationError
 
 from ee.clickhouse.queries.experiments import (
@@ -12,6 +12,12 @@ from ee.clickhouse.queries.experiments import (
     FF_DISTRIBUTION_THRESHOLD,
     MIN_PROBABILITY_FOR_SIGNIFICANCE,
 )
+from ee.clickhouse.queries.experiments.stats import (
+    credible_intervals,
+    expected_losses,
+    probabilities_of_winning,
+    simulate_conversion_rates,
+)
 from posthog.constants import ExperimentSignificanceCode, ExperimentNoResultsErrorKeys
 from posthog.models.feature_flag import FeatureFlag
 from posthog.models.filters.filter import Filter
@@ -111,6 +117,8 @@ class ClickhouseFunnelExperimentResult:
             }
 
             significance_code, loss = self.are_results_significant(control_variant, test_variants, probabilities)
+
+            intervals = calculate_credible_intervals([control_variant, *test_variants])
         except ValidationError as err:
             if validate:
                 raise err
@@ -123,6 +131,7 @@ class ClickhouseFunnelExperimentResult:
             "significant": significance_code == ExperimentSignificanceCode.SIGNIFICANT,
             "significance_code": significance_code,
             "expected_loss": loss,
+            "credible_intervals": intervals,
             "variants": [asdict(variant) for variant in [control_variant, *test_variants]],
         }
 
@@ -226,7 +235,15 @@ class ClickhouseFunnelExperimentResult:
         return ExperimentSignificanceCode.SIGNIFICANT, expected_loss
 
 
-def calculate_expected_loss(target_variant: Variant, variants: list[Variant]) -> float:
+def simulate_conversion_rates_for_variants(variants: list[Variant], rng: Optional[Generator] = None):
+    return simulate_conversion_rates(
+        [variant.success_count for variant in variants],
+        [variant.failure_count for variant in variants],
+        rng=rng,
+    )
+
+
+def calculate_expected_loss(target_variant: Variant, variants: list[Variant], rng: Optional[Generator] = None) -> float:
     """
     Calculates expected loss in conversion rate for a given variant.
     Loss calculation comes from VWO's SmartStats technical paper:
@@ -238,69 +255,20 @@ def calculate_expected_loss(target_variant: Variant, variants: list[Variant]) ->
     The unit of the return value is conversion rate values
 
     """
-    random_sampler = default_rng()
-    prior_success = 1
-    prior_failure = 1
-    simulations_count = 100_000
-
-    variant_samples = []
-    for variant in variants:
-        # Get `N=simulations` samples from a Beta distribution with alpha = prior_success + variant_sucess,
-        # and beta = prior_failure + variant_failure
-        samples = random_sampler.beta(
-            variant.success_count + prior_success,
-            variant.failure_count + prior_failure,
-            simulations_count,
-        )
-        variant_samples.append(samples)
-
-    target_variant_samples = random_sampler.beta(
-        target_variant.success_count + prior_success,
-        target_variant.failure_count + prior_failure,
-        simulations_count,
-    )
-
-    loss = 0
-    variant_conversions = list(zip(*variant_samples))
-    for i in range(simulations_count):
-        loss += max(0, max(variant_conversions[i]) - target_variant_samples[i])
-
-    return loss / simulations_count
+    samples = simulate_conversion_rates_for_variants([target_variant, *variants], rng)
+    return expected_losses(samples)[0]
 
 
-def simulate_winning_variant_for_conversion(target_variant: Variant, variants: list[Variant]) -> Probability:
-    random_sampler = default_rng()
-    prior_success = 1
-    prior_failure = 1
-    simulations_count = 100_000
+def simulate_winning_variant_for_conversion(
+    target_variant: Variant, variants: list[Variant], rng: Optional[Generator] = None
+) -> Probability:
+    samples = simulate_conversion_rates_for_variants([target_variant, *variants], rng)
+    return probabilities_of_winning(samples)[0]
 
-    variant_samples = []
-    for variant in variants:
-        # Get `N=simulations` samples from a Beta distribution with alpha = prior_success + variant_sucess,
-        # and beta = prior_failure + variant_failure
-        samples = random_sampler.beta(
-            variant.success_count + prior_success,
-            variant.failure_count + prior_failure,
-            simulations_count,
-        )
-        variant_samples.append(samples)
-
-    target_variant_samples = random_sampler.beta(
-        target_variant.success_count + prior_success,
-        target_variant.failure_count + prior_failure,
-        simulations_count,
-    )
-
-    winnings = 0
-    variant_conversions = list(zip(*variant_samples))
-    for i in range(simulations_count):
-        if target_variant_samples[i] > max(variant_conversions[i]):
-            winnings += 1
-
-    return winnings / simulations_count
 
-
-def calculate_probability_of_winning_for_each(variants: list[Variant]) -> list[Probability]:
+def calculate_probability_of_winning_for_each(
+    variants: list[Variant], rng: Optional[Generator] = None
+) -> list[Probability]:
     """
     Calculates the probability of winning for each variant.
     """
@@ -310,16 +278,23 @@ def calculate_probability_of_winning_for_each(variants: list[Variant]) -> list[P
             code="too_much_data",
         )
 
-    probabilities = []
-    # simulate winning for each test variant
-    for index, variant in enumerate(variants):
-        probabilities.append(simulate_winning_variant_for_conversion(variant, variants[:index] + variants[index + 1 :]))
+    probabilities = probabilities_of_winning(simulate_conversion_rates_for_variants(variants, rng))
 
     total_test_probabilities = sum(probabilities[1:])
 
     return [max(0, 1 - total_test_probabilities), *probabilities[1:]]
 
 
+def calculate_credible_intervals(
+    variants: list[Variant], rng: Optional[Generator] = None
+) -> dict[str, tuple[float, float]]:
+    """
+    Calculates the 95% credible interval of the conversion rate of each variant.
+    """
+    intervals = credible_intervals(simulate_conversion_rates_for_variants(variants, rng))
+    return {variant.key: interval for variant, interval in zip(variants, intervals)}
+
+
 def validate_event_variants(funnel_results, variants):
     errors = {
         ExperimentNoResultsErrorKeys.NO_EVENTS: True,
@@ -0,0 +1,79 @@
+from collections.abc import Sequence
+from typing import Optional
+
+import numpy as np
+from numpy.random import Generator, default_rng
+
+Probability = float
+
+SIMULATIONS_COUNT = 100_000
+
+# Share of the posterior covered by a credible interval
+CREDIBLE_INTERVAL_MASS = 0.95
+
+
+def simulate_conversion_rates(
+    success_counts: Sequence[int],
+    failure_counts: Sequence[int],
+    *,
+    priors: tuple[int, int] = (1, 1),
+    simulations_count: int = SIMULATIONS_COUNT,
+    rng: Optional[Generator] = None,
+) -> np.ndarray:
+    """
+    Samples the posterior conversion rate of every variant at once, as a (variants × simulations) matrix.
+
+    Each row is a Beta distribution with alpha = success count + prior success,
+    and beta = failure count + prior failure.
+    """
+    random_sampler = rng or default_rng()
+    alphas = np.asarray(success_counts, dtype=float) + priors[0]
+    betas = np.asarray(failure_counts, dtype=float) + priors[1]
+    return random_sampler.beta(alphas[:, None], betas[:, None], (len(alphas), simulations_count))
+
+
+def simulate_arrival_rates(
+    counts: Sequence[int],
+    exposures: Sequence[float],
+    *,
+    simulations_count: int = SIMULATIONS_COUNT,
+    rng: Optional[Generator] = None,
+) -> np.ndarray:
+    """
+    Samples the posterior arrival rate of every variant at once, as a (variants × simulations) matrix.
+
+    Each row is a Gamma distribution with shape = count + 1, and scale = 1 / relative exposure.
+    """
+    random_sampler = rng or default_rng()
+    shapes = np.asarray(counts, dtype=float) + 1
+    scales = 1 / np.asarray(exposures, dtype=float)
+    return random_sampler.gamma(shapes[:, None], scales[:, None], (len(shapes), simulations_count))
+
+
+def probabilities_of_winning(samples: np.ndarray) -> list[Probability]:
+    """
+    Share of simulations in which each variant beats all the others.
+    """
+    wins = np.bincount(samples.argmax(axis=0), minlength=samples.shape[0])
+    return (wins / samples.shape[1]).tolist()
+
+
+def expected_losses(samples: np.ndarray) -> list[float]:
+    """
+    Expected loss of choosing each variant over the best of the others, in the unit of the samples.
+
+    Loss calculation comes from VWO's SmartStats technical paper:
+    https://cdn2.hubspot.net/hubfs/310840/VWO_SmartStats_technical_whitepaper.pdf (pg 12)
+
+    max(0, max(others) - variant) is the same as max(all) - variant, so one max over the matrix covers every variant.
+    """
+    return (samples.max(axis=0) - samples).mean(axis=1).tolist()
+
+
+def credible_intervals(samples: np.ndarray, mass: float = CREDIBLE_INTERVAL_MASS) -> list[tuple[float, float]]:
+    """
+    Equal-tailed credible interval of each variant.
+    """
+    tail = (1 - mass) / 2
+    lower, upper = np.quantile(samples, [tail, 1 - tail], axis=1)
+    return list(zip(lower.tolist(), upper.tolist()))
@@ -0,0 +1,120 @@
+import unittest
+
+from numpy.random import default_rng
+
+from ee.clickhouse.queries.experiments.funnel_experiment_result import (
+    Variant,
+    calculate_credible_intervals,
+    calculate_expected_loss,
+    calculate_probability_of_winning_for_each,
+)
+from ee.clickhouse.queries.experiments.stats import (
+    credible_intervals,
+    expected_losses,
+    probabilities_of_winning,
+    simulate_arrival_rates,
+    simulate_conversion_rates,
+)
+from ee.clickhouse.queries.experiments.trend_experiment_result import (
+    Variant as CountVariant,
+)
+from ee.clickhouse.queries.experiments.trend_experiment_result import (
+    calculate_probability_of_winning_for_each as calculate_probability_of_winning_for_each_count_data,
+)
+
+# Reference implementations: the per-variant, per-simulation loops the vectorized functions replaced
+
+
+def simulate_winning_variant_loop(target_samples, other_samples) -> float:
+    winnings = 0
+    variant_conversions = list(zip(*other_samples))
+    for i in range(len(target_samples)):
+        if target_samples[i] > max(variant_conversions[i]):
+            winnings += 1
+
+    return winnings / len(target_samples)
+
+
+def calculate_expected_loss_loop(target_samples, other_samples) -> float:
+    loss = 0
+    variant_conversions = list(zip(*other_samples))
+    for i in range(len(target_samples)):
+        loss += max(0, max(variant_conversions[i]) - target_samples[i])
+
+    return loss / len(target_samples)
+
+
+class TestExperimentStats(unittest.TestCase):
+    def test_matches_loops_on_the_same_samples(self):
+        samples = simulate_conversion_rates([100, 120, 90, 130], [900, 880, 910, 870], rng=default_rng(0))
+
+        probabilities = probabilities_of_winning(samples)
+        losses = expected_losses(samples)
+
+        for index in range(len(samples)):
+            others = [row for other_index, row in enumerate(samples) if other_index != index]
+            self.assertAlmostEqual(probabilities[index], simulate_winning_variant_loop(samples[index], others))
+            self.assertAlmostEqual(losses[index], calculate_expected_loss_loop(samples[index], others))
+
+    def test_arrival_rates_match_loops_on_the_same_samples(self):
+        samples = simulate_arrival_rates([20, 30, 25], [1, 1.2, 0.8], rng=default_rng(0))
+
+        probabilities = probabilities_of_winning(samples)
+
+        for index in range(len(samples)):
+            others = [row for other_index, row in enumerate(samples) if other_index != index]
+            self.assertAlmostEqual(probabilities[index], simulate_winning_variant_loop(samples[index], others))
+
+    def test_sampling_is_statistically_equivalent_to_drawing_one_variant_at_a_time(self):
+        rng = default_rng(1)
+        variants = [(100, 900), (120, 880), (90, 910)]
+        # One draw per variant, as before
+        samples_one_at_a_time = [rng.beta(success + 1, failure + 1, 100_000) for success, failure in variants]
+        samples = simulate_conversion_rates(*zip(*variants), rng=rng)
+
+        for one_at_a_time, row in zip(samples_one_at_a_time, samples):
+            self.assertAlmostEqual(one_at_a_time.mean(), row.mean(), places=3)
+            self.assertAlmostEqual(one_at_a_time.std(), row.std(), places=3)
+
+        probabilities = probabilities_of_winning(samples)
+        for index, target in enumerate(samples_one_at_a_time):
+            others = samples_one_at_a_time[:index] + samples_one_at_a_time[index + 1 :]
+            self.assertAlmostEqual(probabilities[index], simulate_winning_variant_loop(target, others), places=2)
+
+    def test_seeded_results_are_reproducible(self):
+        variants = [Variant("control", 100, 900), Variant("test_1", 120, 880), Variant("test_2", 110, 890)]
+
+        self.assertEqual(
+            calculate_probability_of_winning_for_each(variants, rng=default_rng(42)),
+            calculate_probability_of_winning_for_each(variants, rng=default_rng(42)),
+        )
+        self.assertEqual(
+            calculate_expected_loss(variants[1], variants[:1], rng=default_rng(42)),
+            calculate_expected_loss(variants[1], variants[:1], rng=default_rng(42)),
+        )
+
+        count_variants = [CountVariant("control", 20, 1, 200), CountVariant("test", 30, 1, 200)]
+        self.assertEqual(
+            calculate_probability_of_winning_for_each_count_data(count_variants, rng=default_rng(42)),
+            calculate_probability_of_winning_for_each_count_data(count_variants, rng=default_rng(42)),
+        )
+
+    def test_probabilities_sum_to_one(self):
+        variants = [Variant("control", 100, 900), *[Variant(f"test_{i}", 100 + i, 900 - i) for i in range(9)]]
+
+        self.assertAlmostEqual(sum(calculate_probability_of_winning_for_each(variants)), 1)
+
+    def test_credible_intervals(self):
+        samples = simulate_conversion_rates([100, 500], [900, 500], rng=default_rng(0))
+
+        (control_lower, control_upper), (test_lower, test_upper) = credible_intervals(samples)
+
+        self.assertAlmostEqual(control_lower, 0.083, places=2)
+        self.assertAlmostEqual(control_upper, 0.120, places=2)
+        self.assertAlmostEqual(test_lower, 0.469, places=2)
+        self.assertAlmostEqual(test_upper, 0.531, places=2)
+
+        intervals = calculate_credible_intervals(
+            [Variant("control", 100, 900), Variant("test", 500, 500)], rng=default_rng(0)
+        )
+        self.assertEqual(list(intervals.keys()), ["control", "test"])
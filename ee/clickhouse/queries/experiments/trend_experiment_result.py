@@ -6,7 +6,7 @@ from math import exp, lgamma, log
 from typing import Optional
 from zoneinfo import ZoneInfo
 
-from numpy.random import default_rng
+from numpy.random import Generator
 from rest_framework.exceptions import ValidationError
 
 from ee.clickhouse.queries.experiments import (
@@ -14,6 +14,11 @@ from ee.clickhouse.queries.experiments import (
     FF_DISTRIBUTION_THRESHOLD,
     MIN_PROBABILITY_FOR_SIGNIFICANCE,
 )
+from ee.clickhouse.queries.experiments.stats import (
+    credible_intervals,
+    probabilities_of_winning,
+    simulate_arrival_rates,
+)
 from posthog.constants import (
     ACTIONS,
     EVENTS,
@@ -244,6 +249,8 @@ class ClickhouseTrendExperimentResult:
 
             significance_code, p_value = self.are_results_significant(control_variant, test_variants, probabilities)
 
+            intervals = calculate_credible_intervals([control_variant, *test_variants])
+
         except ValidationError as err:
             if validate:
                 raise err
@@ -256,6 +263,7 @@ class ClickhouseTrendExperimentResult:
             "significant": significance_code == ExperimentSignificanceCode.SIGNIFICANT,
             "significance_code": significance_code,
             "p_value": p_value,
+            "credible_intervals": intervals,
             "variants": [asdict(variant) for variant in [control_variant, *test_variants]],
         }
 
@@ -375,31 +383,24 @@ class ClickhouseTrendExperimentResult:
         return ExperimentSignificanceCode.SIGNIFICANT, p_value
 
 
-def simulate_winning_variant_for_arrival_rates(target_variant: Variant, variants: list[Variant]) -> float:
-    random_sampler = default_rng()
-    simulations_count = 100_000
-
-    variant_samples = []
-    for variant in variants:
-        # Get `N=simulations` samples from a Gamma distribution with alpha = variant_sucess + 1,
-        # and exposure = relative exposure of variant
-        samples = random_sampler.gamma(variant.count + 1, 1 / variant.exposure, simulations_count)
-        variant_samples.append(samples)
-
-    target_variant_samples = random_sampler.gamma(
-        target_variant.count + 1, 1 / target_variant.exposure, simulations_count
+def simulate_arrival_rates_for_variants(variants: list[Variant], rng: Optional[Generator] = None):
+    return simulate_arrival_rates(
+        [variant.count for variant in variants],
+        [variant.exposure for variant in variants],
+        rng=rng,
     )
 
-    winnings = 0
-    variant_conversions = list(zip(*variant_samples))
-    for i in range(simulations_count):
-        if target_variant_samples[i] > max(variant_conversions[i]):
-            winnings += 1
 
-    return winnings / simulations_count
+def simulate_winning_variant_for_arrival_rates(
+    target_variant: Variant, variants: list[Variant], rng: Optional[Generator] = None
+) -> float:
+    samples = simulate_arrival_rates_for_variants([target_variant, *variants], rng)
+    return probabilities_of_winning(samples)[0]
 
 
-def calculate_probability_of_winning_for_each(variants: list[Variant]) -> list[Probability]:
+def calculate_probability_of_winning_for_each(
+    variants: list[Variant], rng: Optional[Generator] = None
+) -> list[Probability]:
     """
     Calculates the probability of winning for each variant.
     """
@@ -410,18 +411,23 @@ def calculate_probability_of_winning_for_each(variants: list[Variant]) -> list[P
             code="too_much_data",
         )
 
-    probabilities = []
-    # simulate winning for each test variant
-    for index, variant in enumerate(variants):
-        probabilities.append(
-            simulate_winning_variant_for_arrival_rates(variant, variants[:index] + variants[index + 1 :])
-        )
+    probabilities = probabilities_of_winning(simulate_arrival_rates_for_variants(variants, rng))
 
     total_test_probabilities = sum(probabilities[1:])
 
     return [max(0, 1 - total_test_probabilities), *probabilities[1:]]
 
 
+def calculate_credible_intervals(
+    variants: list[Variant], rng: Optional[Generator] = None
+) -> dict[str, tuple[float, float]]:
+    """
+    Calculates the 95% credible interval of the arrival rate of each variant, relative to control's exposure.
+    """
+    intervals = credible_intervals(simulate_arrival_rates_for_variants(variants, rng))
+    return {variant.key: interval for variant, interval in zip(variants, intervals)}
+
+
 @lru_cache(maxsize=100_000)
 def combinationln(n: int, k: int) -> float:
     """
@@ -1,7 +1,8 @@
 from django.contrib.postgres.fields import ArrayField
 from django.db import models
+from django.db.models.signals import post_delete, post_save
 
-from posthog.models.property_definition import PropertyDefinition
+from posthog.models.property_definition import PropertyDefinition, property_definition_changed
 
 
 class EnterprisePropertyDefinition(PropertyDefinition):
@@ -28,3 +29,8 @@ class EnterprisePropertyDefinition(PropertyDefinition):
         default=None,
         db_column="tags",
     )
+
+
+# Signals are only sent for the concrete model, so the parent's receiver doesn't see enterprise definitions
+post_save.connect(property_definition_changed, sender=EnterprisePropertyDefinition)
+post_delete.connect(property_definition_changed, sender=EnterprisePropertyDefinition)
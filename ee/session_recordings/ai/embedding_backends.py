@@ -0,0 +1,124 @@
+import hashlib
+import threading
+import time
+from abc import ABC, abstractmethod
+from functools import cached_property
+from typing import Optional
+
+import numpy as np
+import tiktoken
+from openai import APIConnectionError, InternalServerError, OpenAI, RateLimitError
+
+
+class RetryableEmbeddingError(Exception):
+    """The embedding request failed in a way that's worth trying again, e.g. it was rate limited."""
+
+    retry_after: Optional[float]
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class EmbeddingBackend(ABC):
+    """Turns inputs into embeddings, many inputs per request, within the provider's limits."""
+
+    max_tokens_per_input: int
+    max_inputs_per_request: int
+    max_tokens_per_request: int
+
+    @abstractmethod
+    def tokenize(self, inputs: list[str]) -> list[list[int]]:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def detokenize(self, tokens: list[int]) -> str:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def embed(self, inputs: list[str]) -> list[list[float]]:
+        """Embeddings in the order of the inputs. Raises RetryableEmbeddingError for transient failures."""
+        raise NotImplementedError()
+
+
+class OpenAIEmbeddingBackend(EmbeddingBackend):
+    model = "text-embedding-3-small"
+    # https://platform.openai.com/docs/api-reference/embeddings/create
+    max_tokens_per_input = 8191
+    max_inputs_per_request = 2048
+    max_tokens_per_request = 300_000
+
+    def __init__(self):
+        # retries are ours, so that backoff is shared across the requests in flight
+        self.client = OpenAI(max_retries=0)
+
+    @cached_property
+    def encoding(self) -> tiktoken.Encoding:
+        # tiktoken.encoding_for_model(model_name) specifies encoder
+        return tiktoken.get_encoding("cl100k_base")
+
+    def tokenize(self, inputs: list[str]) -> list[list[int]]:
+        return self.encoding.encode_batch(inputs)
+
+    def detokenize(self, tokens: list[int]) -> str:
+        return self.encoding.decode(tokens)
+
+    def embed(self, inputs: list[str]) -> list[list[float]]:
+        try:
+            response = self.client.embeddings.create(input=inputs, model=self.model)
+        except RateLimitError as e:
+            retry_after = e.response.headers.get("retry-after")
+            raise RetryableEmbeddingError(str(e), retry_after=float(retry_after) if retry_after else None) from e
+        except (APIConnectionError, InternalServerError) as e:
+            raise RetryableEmbeddingError(str(e)) from e
+
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+
+class StubEmbeddingBackend(EmbeddingBackend):
+    """
+    Deterministic local embeddings for tests and benchmarks: the same input always gets the same unit vector.
+
+    Tokens are the bytes of the input. The first `failures` requests fail as retryable,
+    and every request takes `latency` seconds, to stand in for the round trip to the provider.
+    """
+
+    def __init__(
+        self,
+        dimensions: int = 1536,
+        latency: float = 0,
+        failures: int = 0,
+        max_tokens_per_input: int = OpenAIEmbeddingBackend.max_tokens_per_input,
+        max_inputs_per_request: int = OpenAIEmbeddingBackend.max_inputs_per_request,
+        max_tokens_per_request: int = OpenAIEmbeddingBackend.max_tokens_per_request,
+    ):
+        self.dimensions = dimensions
+        self.latency = latency
+        self.failures = failures
+        self.max_tokens_per_input = max_tokens_per_input
+        self.max_inputs_per_request = max_inputs_per_request
+        self.max_tokens_per_request = max_tokens_per_request
+        self.requests: list[list[str]] = []
+        self._lock = threading.Lock()
+
+    def tokenize(self, inputs: list[str]) -> list[list[int]]:
+        return [list(input.encode()) for input in inputs]
+
+    def detokenize(self, tokens: list[int]) -> str:
+        return bytes(tokens).decode(errors="ignore")
+
+    def embed(self, inputs: list[str]) -> list[list[float]]:
+        with self._lock:
+            self.requests.append(inputs)
+            should_fail = len(self.requests) <= self.failures
+        if self.latency:
+            time.sleep(self.latency)
+        if should_fail:
+            raise RetryableEmbeddingError("stub failure")
+
+        return [self._embedding(input) for input in inputs]
+
+    def _embedding(self, input: str) -> list[float]:
+        seed = int.from_bytes(hashlib.sha256(input.encode()).digest()[:8], "little")
+        vector = np.random.default_rng(seed).normal(size=self.dimensions)
+        return (vector / np.linalg.norm(vector)).tolist()
@@ -0,0 +1,472 @@
+"""
+A per-team approximate nearest neighbour index over the embeddings in session_replay_embeddings.
+
+Vectors are partitioned into lists by a coarse k-means quantizer (an IVF index), so that finding similar recordings
+only compares against the few lists nearest to the target, instead of every embedding of the last 7 days.
+Error embeddings are also clustered incrementally as they're added, so clusters are kept up to date without
+refitting on every embedding each time.
+
+The index is kept in memory for a short while, persisted to object storage, and caught up from ClickHouse
+with whatever was written since it was last saved.
+"""
+
+import threading
+from datetime import datetime, timedelta
+from io import BytesIO
+from time import monotonic
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from django.conf import settings
+from prometheus_client import Counter, Histogram
+from structlog import get_logger
+
+from posthog.clickhouse.client import sync_execute
+from posthog.storage import object_storage
+from posthog.storage.object_storage import ObjectStorageError
+
+logger = get_logger(__name__)
+
+# Bump when the persisted format changes, older indexes are then rebuilt from ClickHouse
+INDEX_VERSION = 1
+# Embeddings are only kept for as long as recordings are looked at for similarity
+INDEX_WINDOW = timedelta(days=7)
+# Below this many vectors a brute-force search is fast enough, and k-means has too little to learn from
+INDEX_MIN_TRAINING_SIZE = 1_000
+INDEX_MAX_LISTS = 1_024
+INDEX_TRAINING_SAMPLE_SIZE = 20_000
+INDEX_TRAINING_ITERATIONS = 10
+# The quantizer is retrained once the index has grown this many times over since it was trained
+INDEX_RETRAIN_GROWTH = 4
+# Rows written within this long before the watermark are read again, in case they were committed out of order
+INDEX_SYNC_OVERLAP = timedelta(minutes=1)
+INDEX_MEMORY_TTL = 60
+CLUSTERING_BATCH_SIZE = 256
+
+EPOCH = datetime(1970, 1, 1, tzinfo=ZoneInfo("UTC"))
+
+EMBEDDINGS_INDEX_SYNC_TIMING = Histogram(
+    "posthog_session_recordings_embeddings_index_sync",
+    "Time spent catching an embeddings index up with ClickHouse",
+    labelnames=["source_type"],
+)
+
+EMBEDDINGS_INDEX_SIZE = Histogram(
+    "posthog_session_recordings_embeddings_index_size",
+    "Number of embeddings in an index when it is saved",
+    buckets=[0, 100, 1_000, 10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000],
+    labelnames=["source_type"],
+)
+
+EMBEDDINGS_INDEX_LOADED = Counter(
+    "posthog_session_recordings_embeddings_index_loaded",
+    "Embeddings indexes loaded, by where they were loaded from",
+    labelnames=["source_type", "source"],
+)
+
+
+def _to_microseconds(timestamp: datetime) -> int:
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=ZoneInfo("UTC"))
+    return (timestamp - EPOCH) // timedelta(microseconds=1)
+
+
+def _from_microseconds(microseconds: int) -> datetime:
+    return EPOCH + timedelta(microseconds=int(microseconds))
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class EmbeddingsIndex:
+    """
+    Embeddings of one source type for one team.
+
+    Vectors are unit length and stored as float16, as they're only compared by cosine distance.
+    Every row also records the IVF list and error cluster it belongs to.
+    """
+
+    team_id: int
+    source_type: str
+    # Microseconds since the epoch of the newest row read from ClickHouse
+    watermark: int
+
+    def __init__(self, team_id: int, source_type: str):
+        self.team_id = team_id
+        self.source_type = source_type
+        self.watermark = _to_microseconds(datetime.now(tz=ZoneInfo("UTC")) - INDEX_WINDOW)
+
+        self.keys = np.empty(0, dtype=str)
+        self.session_ids = np.empty(0, dtype=str)
+        self.inputs = np.empty(0, dtype=str)
+        self.timestamps = np.empty(0, dtype=np.int64)
+        self.vectors = np.empty((0, 0), dtype=np.float16)
+
+        # IVF: the list of each row, and the centroid of each list
+        self.lists = np.empty(0, dtype=np.int32)
+        self.centroids = np.empty((0, 0), dtype=np.float32)
+        self.trained_size = 0
+
+        # Error clusters: the cluster of each row, and the mean and size of each cluster
+        self.clusters = np.empty(0, dtype=np.int32)
+        self.cluster_centroids = np.empty((0, 0), dtype=np.float32)
+        self.cluster_sizes = np.empty(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def keeps_inputs(self) -> bool:
+        # Error messages are shown as cluster samples, whereas session inputs are whole recordings and aren't needed
+        return self.source_type == "error"
+
+    def add(
+        self,
+        session_ids: list[str],
+        inputs: list[str],
+        embeddings: list[list[float]],
+        timestamps: list[datetime],
+    ) -> None:
+        if not session_ids:
+            return
+
+        keys = np.array(
+            [
+                f"{session_id}\x00{input}" if self.keeps_inputs else session_id
+                for session_id, input in zip(session_ids, inputs)
+            ],
+            dtype=str,
+        )
+        # Later rows for the same key replace earlier ones, both within this batch and in the index
+        _, last_occurrence = np.unique(keys[::-1], return_index=True)
+        latest = np.sort(len(keys) - 1 - last_occurrence)
+        if len(self):
+            self._keep(~np.isin(self.keys, keys))
+
+        vectors = _normalize(np.asarray(embeddings, dtype=np.float32)[latest])
+        first_new_row = len(self)
+
+        self.keys = np.concatenate([self.keys, keys[latest]])
+        self.session_ids = np.concatenate([self.session_ids, np.array(session_ids, dtype=str)[latest]])
+        self.inputs = np.concatenate(
+            [self.inputs, np.array(inputs if self.keeps_inputs else [""] * len(inputs), dtype=str)[latest]]
+        )
+        self.timestamps = np.concatenate(
+            [self.timestamps, np.array([_to_microseconds(t) for t in timestamps], dtype=np.int64)[latest]]
+        )
+        self.vectors = (
+            np.concatenate([self.vectors, vectors.astype(np.float16)]) if first_new_row else vectors.astype(np.float16)
+        )
+
+        if self.trained_size and len(self) < INDEX_RETRAIN_GROWTH * self.trained_size:
+            self.lists = np.concatenate([self.lists, self._nearest_lists(vectors)])
+        elif len(self) >= INDEX_MIN_TRAINING_SIZE:
+            self._train()
+        else:
+            self.lists = np.zeros(len(self), dtype=np.int32)
+
+        if self.keeps_inputs:
+            self._cluster(first_new_row)
+
+    def evict(self, older_than: datetime) -> None:
+        if len(self):
+            self._keep(self.timestamps >= _to_microseconds(older_than))
+
+    def _keep(self, mask: np.ndarray) -> None:
+        if mask.all():
+            return
+
+        if self.keeps_inputs and len(self.clusters):
+            self.cluster_sizes -= np.bincount(self.clusters[~mask], minlength=len(self.cluster_sizes))
+            self.clusters = self.clusters[mask]
+            # Drop clusters that are now empty, so that the number of clusters doesn't only ever grow
+            remaining = self.cluster_sizes > 0
+            self.clusters = (np.cumsum(remaining) - 1)[self.clusters].astype(np.int32)
+            self.cluster_centroids = self.cluster_centroids[remaining]
+            self.cluster_sizes = self.cluster_sizes[remaining]
+
+        self.keys = self.keys[mask]
+        self.session_ids = self.session_ids[mask]
+        self.inputs = self.inputs[mask]
+        self.timestamps = self.timestamps[mask]
+        self.vectors = self.vectors[mask]
+        self.lists = self.lists[mask]
+
+    # IVF
+
+    def _train(self) -> None:
+        """Spherical k-means over a sample of the index, then assigns every row to its nearest list."""
+        rng = np.random.default_rng(self.team_id)
+        sample_size = min(len(self), INDEX_TRAINING_SAMPLE_SIZE)
+        sample = self.vectors[rng.choice(len(self), sample_size, replace=False)].astype(np.float32)
+        list_count = int(np.clip(np.sqrt(len(self)), 1, INDEX_MAX_LISTS))
+
+        centroids = sample[rng.choice(sample_size, list_count, replace=False)]
+        for _ in range(INDEX_TRAINING_ITERATIONS):
+            assignments = (sample @ centroids.T).argmax(axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            empty = np.bincount(assignments, minlength=list_count) == 0
+            # Restart lists that lost all their vectors from random ones
+            sums[empty] = sample[rng.choice(sample_size, int(empty.sum()), replace=False)]
+            centroids = _normalize(sums)
+
+        self.centroids = centroids
+        self.trained_size = len(self)
+        self.lists = self._nearest_lists(self.vectors)
+
+    def _nearest_lists(self, vectors: np.ndarray, count: int = 1) -> np.ndarray:
+        if not self.trained_size:
+            return np.zeros(len(vectors), dtype=np.int32)
+
+        lists = np.empty((len(vectors), count), dtype=np.int32)
+        # Chunked, so that assigning the whole index doesn't need a (rows × lists) matrix at once
+        for start in range(0, len(vectors), INDEX_TRAINING_SAMPLE_SIZE):
+            similarities = vectors[start : start + INDEX_TRAINING_SAMPLE_SIZE].astype(np.float32) @ self.centroids.T
+            if count == 1:
+                lists[start : start + INDEX_TRAINING_SAMPLE_SIZE, 0] = similarities.argmax(axis=1)
+            else:
+                lists[start : start + INDEX_TRAINING_SAMPLE_SIZE] = np.argpartition(-similarities, count - 1, axis=1)[
+                    :, :count
+                ]
+        return lists[:, 0] if count == 1 else lists
+
+    def embedding_for(self, session_id: str) -> Optional[np.ndarray]:
+        rows = np.flatnonzero(self.session_ids == session_id)
+        if not len(rows):
+            return None
+        return self.vectors[rows[self.timestamps[rows].argmax()]].astype(np.float32)
+
+    def search(
+        self, embedding: np.ndarray, limit: int, exclude_session_id: Optional[str] = None
+    ) -> list[tuple[str, float]]:
+        """
+        Returns the closest sessions with their cosine distance, searching only the nearest lists once trained.
+        """
+        query = _normalize(np.asarray(embedding, dtype=np.float32)[None, :])
+        if self.trained_size:
+            probes = min(settings.REPLAY_EMBEDDINGS_INDEX_PROBES, len(self.centroids))
+            candidates = np.flatnonzero(np.isin(self.lists, self._nearest_lists(query, probes)[0]))
+        else:
+            candidates = np.arange(len(self))
+        if exclude_session_id is not None:
+            candidates = candidates[self.session_ids[candidates] != exclude_session_id]
+        if not len(candidates):
+            return []
+
+        distances = 1 - self.vectors[candidates].astype(np.float32) @ query[0]
+        closest = np.argpartition(distances, min(limit, len(candidates)) - 1)[:limit]
+        closest = closest[np.argsort(distances[closest])]
+        return [(str(self.session_ids[candidates[i]]), float(distances[i])) for i in closest]
+
+    # Clustering
+
+    def _cluster(self, first_new_row: int) -> None:
+        """
+        Incremental threshold clustering: each new row joins the nearest cluster if its mean is within eps,
+        and starts a new cluster otherwise. Rows are first matched against existing clusters a batch at a time,
+        and only the rows that match none are clustered one by one.
+        """
+        eps = settings.REPLAY_EMBEDDINGS_CLUSTERING_DBSCAN_EPS
+        dimensions = self.vectors.shape[1]
+        if not len(self.cluster_centroids):
+            self.cluster_centroids = np.empty((0, dimensions), dtype=np.float32)
+        self.clusters = np.concatenate([self.clusters, np.full(len(self) - first_new_row, -1, dtype=np.int32)])
+
+        for start in range(first_new_row, len(self), CLUSTERING_BATCH_SIZE):
+            batch = self.vectors[start : start + CLUSTERING_BATCH_SIZE].astype(np.float32)
+            labels = np.full(len(batch), -1, dtype=np.int32)
+
+            if len(self.cluster_centroids):
+                distances = self._distances_to_clusters(batch)
+                nearest = distances.argmin(axis=1)
+                within = distances[np.arange(len(batch)), nearest] <= eps
+                labels[within] = nearest[within]
+                self._update_clusters(labels[within], batch[within])
+
+            for row in np.flatnonzero(labels == -1):
+                vector = batch[row : row + 1]
+                if len(self.cluster_centroids):
+                    distances = self._distances_to_clusters(vector)[0]
+                    nearest = int(distances.argmin())
+                    if distances[nearest] <= eps:
+                        labels[row] = nearest
+                        self._update_clusters(labels[row : row + 1], vector)
+                        continue
+                labels[row] = len(self.cluster_centroids)
+                self.cluster_centroids = np.concatenate([self.cluster_centroids, vector])
+                self.cluster_sizes = np.concatenate([self.cluster_sizes, [1]])
+
+            self.clusters[start : start + len(batch)] = labels
+
+    def _distances_to_clusters(self, vectors: np.ndarray) -> np.ndarray:
+        # Euclidean, like DBSCAN's default metric. Rows are unit length, cluster means aren't
+        squared = (1 + (self.cluster_centroids**2).sum(axis=1)[None, :] - 2 * vectors @ self.cluster_centroids.T).clip(
+            min=0
+        )
+        return np.sqrt(squared)
+
+    def _update_clusters(self, labels: np.ndarray, vectors: np.ndarray) -> None:
+        counts = np.bincount(labels, minlength=len(self.cluster_sizes))
+        sums = np.zeros_like(self.cluster_centroids)
+        np.add.at(sums, labels, vectors)
+        touched = counts > 0
+        self.cluster_centroids[touched] = (
+            self.cluster_centroids[touched] * self.cluster_sizes[touched, None] + sums[touched]
+        ) / (self.cluster_sizes[touched] + counts[touched])[:, None]
+        self.cluster_sizes += counts
+
+    def cluster_labels(self) -> np.ndarray:
+        """Cluster of each row, with rows of clusters smaller than min samples labelled -1 as noise, like DBSCAN."""
+        if not len(self.clusters):
+            return np.full(len(self), -1, dtype=np.int32)
+        large_enough = self.cluster_sizes >= settings.REPLAY_EMBEDDINGS_CLUSTERING_DBSCAN_MIN_SAMPLES
+        return np.where(large_enough[self.clusters], self.clusters, -1)
+
+    # Persistence
+
+    def sync(self) -> "EmbeddingsIndex":
+        """Adds rows written to ClickHouse since the index was last synced, and drops those that aged out."""
+        now = datetime.now(tz=ZoneInfo("UTC"))
+        since = max(_from_microseconds(self.watermark) - INDEX_SYNC_OVERLAP, now - INDEX_WINDOW)
+
+        with EMBEDDINGS_INDEX_SYNC_TIMING.labels(source_type=self.source_type).time():
+            rows = fetch_embeddings_since(self.team_id, self.source_type, since)
+            if rows:
+                session_ids, inputs, embeddings, timestamps = zip(*rows)
+                self.add(list(session_ids), list(inputs), list(embeddings), list(timestamps))
+                self.watermark = max(self.watermark, *(_to_microseconds(t) for t in timestamps))
+            self.evict(now - INDEX_WINDOW)
+
+        return self
+
+    def to_bytes(self) -> bytes:
+        buffer = BytesIO()
+        np.savez(
+            buffer,
+            version=INDEX_VERSION,
+            team_id=self.team_id,
+            source_type=self.source_type,
+            watermark=self.watermark,
+            keys=self.keys,
+            session_ids=self.session_ids,
+            inputs=self.inputs,
+            timestamps=self.timestamps,
+            vectors=self.vectors,
+            lists=self.lists,
+            centroids=self.centroids,
+            trained_size=self.trained_size,
+            clusters=self.clusters,
+            cluster_centroids=self.cluster_centroids,
+            cluster_sizes=self.cluster_sizes,
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, content: bytes) -> Optional["EmbeddingsIndex"]:
+        with np.load(BytesIO(content), allow_pickle=False) as data:
+            if int(data["version"]) != INDEX_VERSION:
+                return None
+
+            index = cls(team_id=int(data["team_id"]), source_type=str(data["source_type"]))
+            index.watermark = int(data["watermark"])
+            index.trained_size = int(data["trained_size"])
+            for name in [
+                "keys",
+                "session_ids",
+                "inputs",
+                "timestamps",
+                "vectors",
+                "lists",
+                "centroids",
+                "clusters",
+                "cluster_centroids",
+                "cluster_sizes",
+            ]:
+                setattr(index, name, data[name])
+            return index
+
+
+def fetch_embeddings_since(team_id: int, source_type: str, since: datetime):
+    query = """
+            SELECT
+                session_id, {input}, embeddings, generation_timestamp
+            FROM
+                session_replay_embeddings
+            WHERE
+                team_id = %(team_id)s
+                AND generation_timestamp > %(since)s
+                AND {source_type_filter}
+            ORDER BY generation_timestamp
+        """.format(
+        # session embeddings written before source_type was added have an empty source type
+        input="input" if source_type == "error" else "''",
+        source_type_filter="source_type = 'error' AND input != ''"
+        if source_type == "error"
+        else "source_type != 'error'",
+    )
+
+    return sync_execute(query, {"team_id": team_id, "since": since})
+
+
+def _object_storage_key(team_id: int, source_type: str) -> str:
+    return f"{settings.OBJECT_STORAGE_REPLAY_EMBEDDINGS_INDEX_FOLDER}/team_id/{team_id}/{source_type}.npz"
+
+
+def load_embeddings_index(team_id: int, source_type: str) -> EmbeddingsIndex:
+    """Loads the persisted index, or starts an empty one that is then filled from ClickHouse by syncing."""
+    try:
+        content = object_storage.read_bytes(_object_storage_key(team_id, source_type))
+    except ObjectStorageError:
+        content = None
+
+    index = EmbeddingsIndex.from_bytes(content) if content else None
+    EMBEDDINGS_INDEX_LOADED.labels(source_type=source_type, source="object_storage" if index else "empty").inc()
+    return index or EmbeddingsIndex(team_id, source_type)
+
+
+def save_embeddings_index(index: EmbeddingsIndex) -> None:
+    EMBEDDINGS_INDEX_SIZE.labels(source_type=index.source_type).observe(len(index))
+    try:
+        object_storage.write(_object_storage_key(index.team_id, index.source_type), index.to_bytes())
+    except ObjectStorageError as e:
+        # The index is caught up from ClickHouse on the next load, so this only costs time
+        logger.error("save embeddings index error", flow="embeddings", error=e, team_id=index.team_id)
+
+
+_embeddings_indexes: dict[tuple[int, str], tuple[EmbeddingsIndex, float]] = {}
+_embeddings_indexes_lock = threading.Lock()
+
+
+def update_embeddings_index(team_id: int, source_type: str) -> EmbeddingsIndex:
+    """Catches the persisted index up with ClickHouse and saves it. Called after embeddings are flushed."""
+    index = load_embeddings_index(team_id, source_type).sync()
+    save_embeddings_index(index)
+    with _embeddings_indexes_lock:
+        _embeddings_indexes[(team_id, source_type)] = (index, monotonic())
+    return index
+
+
+def get_embeddings_index(team_id: int, source_type: str) -> EmbeddingsIndex:
+    """The index to query in-process, kept in memory for a short while between requests."""
+    key = (team_id, source_type)
+    with _embeddings_indexes_lock:
+        cached = _embeddings_indexes.get(key)
+        if cached is not None and monotonic() - cached[1] < INDEX_MEMORY_TTL:
+            EMBEDDINGS_INDEX_LOADED.labels(source_type=source_type, source="memory").inc()
+            return cached[0]
+
+    index = load_embeddings_index(team_id, source_type).sync()
+
+    with _embeddings_indexes_lock:
+        # Drop expired indexes of all teams, they can be large
+        now = monotonic()
+        for expired_key in [
+            k for k, (_, loaded_at) in _embeddings_indexes.items() if now - loaded_at >= INDEX_MEMORY_TTL
+        ]:
+            del _embeddings_indexes[expired_key]
+        _embeddings_indexes[key] = (index, now)
+    return index
@@ -1,19 +1,27 @@
 import json
-import tiktoken
 import datetime
+import random
 import pytz
 
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from time import sleep
+from typing import Any, Optional
 
 from abc import ABC, abstractmethod
 from prometheus_client import Histogram, Counter
 from structlog import get_logger
-from openai import OpenAI
+from django.conf import settings
 
 from posthog.models import Team
 from posthog.clickhouse.client import sync_execute
 
 from posthog.session_recordings.queries.session_replay_events import SessionReplayEvents
+from ee.session_recordings.ai.embedding_backends import (
+    EmbeddingBackend,
+    OpenAIEmbeddingBackend,
+    RetryableEmbeddingError,
+)
+from ee.session_recordings.ai.embeddings_index import update_embeddings_index
 from ee.session_recordings.ai.utils import (
     SessionSummaryPromptData,
     reduce_elements_chain,
@@ -23,11 +31,10 @@ from ee.session_recordings.ai.utils import (
     only_pageview_urls,
 )
 
-# tiktoken.encoding_for_model(model_name) specifies encoder
-# model_name = "text-embedding-3-small" for this usecase
-encoding = tiktoken.get_encoding("cl100k_base")
-
-MAX_TOKENS_FOR_MODEL = 8191
+# embeddings are written to ClickHouse in inserts of up to this many rows
+CLICKHOUSE_INSERT_SIZE = 10_000
+REQUEST_BACKOFF_SECONDS = 1
+REQUEST_MAX_BACKOFF_SECONDS = 30
 
 RECORDING_EMBEDDING_TOKEN_COUNT = Histogram(
     "posthog_session_recordings_recording_embedding_token_count",
@@ -38,11 +45,30 @@ RECORDING_EMBEDDING_TOKEN_COUNT = Histogram(
 
 GENERATE_RECORDING_EMBEDDING_TIMING = Histogram(
     "posthog_session_recordings_generate_recording_embedding",
-    "Time spent generating recording embeddings for a single session",
+    "Time spent on a single embedding request, which can embed many sessions",
     buckets=[0.1, 0.2, 0.3, 0.4, 0.5, 1, 1.5, 2, 2.5, 3, 3.5, 4, 5, 6, 7, 8, 9, 10, 12, 14, 16, 18, 20],
     labelnames=["source_type"],
 )
 
+EMBEDDING_REQUEST_INPUT_COUNT = Histogram(
+    "posthog_session_recordings_embedding_request_input_count",
+    "Number of inputs packed into a single embedding request",
+    buckets=[1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2048],
+    labelnames=["source_type"],
+)
+
+EMBEDDING_REQUESTS_RETRIED = Counter(
+    "posthog_session_recordings_embedding_requests_retried",
+    "Number of embedding requests retried after a transient failure",
+    labelnames=["source_type"],
+)
+
+SESSION_EMBEDDING_INPUTS_TRIMMED = Counter(
+    "posthog_session_recordings_embedding_inputs_trimmed",
+    "Number of embedding inputs trimmed to the max token count for the model",
+    labelnames=["source_type"],
+)
+
 SESSION_EMBEDDINGS_GENERATED = Counter(
     "posthog_session_recordings_embeddings_generated",
     "Number of session embeddings generated",
@@ -94,107 +120,159 @@ class EmbeddingPreparation(ABC):
 
 class SessionEmbeddingsRunner(ABC):
     team: Team
-    openai_client: Any
+    backend: EmbeddingBackend
 
-    def __init__(self, team: Team):
+    def __init__(self, team: Team, backend: Optional[EmbeddingBackend] = None):
         self.team = team
-        self.openai_client = OpenAI()
+        self.backend = backend or OpenAIEmbeddingBackend()
 
     def run(self, items: list[Any], embeddings_preparation: type[EmbeddingPreparation]) -> None:
         source_type = embeddings_preparation.source_type
 
         try:
-            batched_embeddings = []
+            prepared = self._prepare(items, embeddings_preparation)
+            batched_embeddings = self.embed(prepared, source_type=source_type)
 
-            for item in items:
-                try:
-                    logger.info(
-                        f"generating embedding input for item",
-                        flow="embeddings",
-                        item=json.dumps(item),
-                        source_type=source_type,
+            if len(batched_embeddings) > 0:
+                for start in range(0, len(batched_embeddings), CLICKHOUSE_INSERT_SIZE):
+                    self._flush_embeddings_to_clickhouse(
+                        embeddings=batched_embeddings[start : start + CLICKHOUSE_INSERT_SIZE], source_type=source_type
                     )
+                self._update_index(source_type=source_type)
+        except Exception as e:
+            # but we don't swallow errors within the wider task itself
+            # if something is failing here then we're most likely having trouble with ClickHouse
+            SESSION_EMBEDDINGS_FATAL_FAILED.labels(source_type=source_type).inc()
+            logger.error(f"embed items fatal error", flow="embeddings", error=e, source_type=source_type)
+            raise e
 
-                    result = embeddings_preparation.prepare(item, self.team)
-
-                    if result:
-                        session_id, input = result
-
-                        logger.info(
-                            f"generating embedding for item",
-                            flow="embeddings",
-                            session_id=session_id,
-                            source_type=source_type,
-                        )
-
-                        with GENERATE_RECORDING_EMBEDDING_TIMING.labels(source_type=source_type).time():
-                            embeddings = self._embed(input, source_type=source_type)
-
-                        logger.info(
-                            f"generated embedding for item",
-                            flow="embeddings",
-                            session_id=session_id,
-                            source_type=source_type,
-                        )
+    def _prepare(self, items: list[Any], embeddings_preparation: type[EmbeddingPreparation]) -> list[tuple[str, str]]:
+        source_type = embeddings_preparation.source_type
+        prepared = []
+
+        for item in items:
+            try:
+                logger.info(
+                    f"generating embedding input for item",
+                    flow="embeddings",
+                    item=json.dumps(item),
+                    source_type=source_type,
+                )
 
-                        if embeddings:
-                            SESSION_EMBEDDINGS_GENERATED.labels(source_type=source_type).inc()
-                            batched_embeddings.append(
-                                {
-                                    "team_id": self.team.pk,
-                                    "session_id": session_id,
-                                    "embeddings": embeddings,
-                                    "source_type": source_type,
-                                    "input": input,
-                                }
-                            )
-                # we don't want to fail the whole batch if only a single recording fails
+                result = embeddings_preparation.prepare(item, self.team)
+
+                if result:
+                    prepared.append(result)
+            # we don't want to fail the whole batch if only a single recording fails
+            except Exception as e:
+                SESSION_EMBEDDINGS_FAILED.labels(source_type=source_type).inc()
+                logger.error(
+                    f"embed individual item error",
+                    flow="embeddings",
+                    error=e,
+                    source_type=source_type,
+                )
+                # so we swallow errors here
+
+        return prepared
+
+    def embed(self, prepared: list[tuple[str, str]], source_type: str) -> list[dict[str, Any]]:
+        """
+        Embeds (session_id, input) pairs, packing as many inputs into each request as the backend allows,
+        with a bounded number of requests in flight.
+        """
+        batched_embeddings: list[dict[str, Any]] = []
+        if not prepared:
+            return batched_embeddings
+
+        with ThreadPoolExecutor(max_workers=settings.REPLAY_EMBEDDINGS_MAX_CONCURRENT_REQUESTS) as executor:
+            futures = {
+                executor.submit(self._embed_request, [text for _, _, text in request], source_type): request
+                for request in self._pack(prepared, source_type)
+            }
+            for future in as_completed(futures):
+                request = futures[future]
+                try:
+                    embeddings = future.result()
+                # we don't want to fail the whole batch if only a single request fails
                 except Exception as e:
-                    SESSION_EMBEDDINGS_FAILED.labels(source_type=source_type).inc()
+                    SESSION_EMBEDDINGS_FAILED.labels(source_type=source_type).inc(len(request))
                     logger.error(
-                        f"embed individual item error",
+                        f"embedding request error",
                         flow="embeddings",
                         error=e,
                         source_type=source_type,
+                        session_ids=[session_id for session_id, _, _ in request],
                     )
-                    # so we swallow errors here
+                    continue
+
+                SESSION_EMBEDDINGS_GENERATED.labels(source_type=source_type).inc(len(request))
+                batched_embeddings.extend(
+                    {
+                        "team_id": self.team.pk,
+                        "session_id": session_id,
+                        "embeddings": embedding,
+                        "source_type": source_type,
+                        "input": input,
+                    }
+                    for (session_id, input, _), embedding in zip(request, embeddings)
+                )
 
-            if len(batched_embeddings) > 0:
-                self._flush_embeddings_to_clickhouse(embeddings=batched_embeddings, source_type=source_type)
+        return batched_embeddings
+
+    def _pack(self, prepared: list[tuple[str, str]], source_type: str) -> list[list[tuple[str, str, str]]]:
+        """Tokenizes all inputs at once, trims those that are too long, and packs them into requests."""
+        requests: list[list[tuple[str, str, str]]] = [[]]
+        request_tokens = 0
+
+        for (session_id, input), tokens in zip(prepared, self.backend.tokenize([input for _, input in prepared])):
+            RECORDING_EMBEDDING_TOKEN_COUNT.labels(source_type=source_type).observe(len(tokens))
+            text = input
+            if len(tokens) > self.backend.max_tokens_per_input:
+                logger.info(
+                    f"trimming embedding input that exceeds max token count for model",
+                    flow="embeddings",
+                    session_id=session_id,
+                    source_type=source_type,
+                )
+                SESSION_EMBEDDING_INPUTS_TRIMMED.labels(source_type=source_type).inc()
+                tokens = tokens[: self.backend.max_tokens_per_input]
+                text = self.backend.detokenize(tokens)
+
+            if requests[-1] and (
+                len(requests[-1]) >= self.backend.max_inputs_per_request
+                or request_tokens + len(tokens) > self.backend.max_tokens_per_request
+            ):
+                requests.append([])
+                request_tokens = 0
+            requests[-1].append((session_id, input, text))
+            request_tokens += len(tokens)
+
+        return requests
+
+    def _embed_request(self, texts: list[str], source_type: str) -> list[list[float]]:
+        attempt = 0
+        while True:
+            try:
+                with GENERATE_RECORDING_EMBEDDING_TIMING.labels(source_type=source_type).time():
+                    embeddings = self.backend.embed(texts)
+                EMBEDDING_REQUEST_INPUT_COUNT.labels(source_type=source_type).observe(len(texts))
+                return embeddings
+            except RetryableEmbeddingError as e:
+                if attempt >= settings.REPLAY_EMBEDDINGS_REQUEST_MAX_RETRIES:
+                    raise
+                EMBEDDING_REQUESTS_RETRIED.labels(source_type=source_type).inc()
+                # exponential backoff with jitter, so that the requests in flight don't all retry at once
+                backoff = min(REQUEST_MAX_BACKOFF_SECONDS, REQUEST_BACKOFF_SECONDS * 2**attempt)
+                sleep(max(backoff * random.uniform(0.5, 1), e.retry_after or 0))
+                attempt += 1
+
+    def _update_index(self, source_type: str) -> None:
+        try:
+            update_embeddings_index(self.team.pk, source_type)
+        # the embeddings are already in ClickHouse, and the index catches up with them whenever it is next loaded
         except Exception as e:
-            # but we don't swallow errors within the wider task itself
-            # if something is failing here then we're most likely having trouble with ClickHouse
-            SESSION_EMBEDDINGS_FATAL_FAILED.labels(source_type=source_type).inc()
-            logger.error(f"embed items fatal error", flow="embeddings", error=e, source_type=source_type)
-            raise e
-
-    def _embed(self, input: str, source_type: str):
-        token_count = self._num_tokens_for_input(input)
-        RECORDING_EMBEDDING_TOKEN_COUNT.labels(source_type=source_type).observe(token_count)
-        if token_count > MAX_TOKENS_FOR_MODEL:
-            logger.error(
-                f"embedding input exceeds max token count for model",
-                flow="embeddings",
-                input=json.dumps(input),
-                source_type=source_type,
-            )
-            SESSION_SKIPPED_WHEN_GENERATING_EMBEDDINGS.labels(
-                source_type=source_type, reason="token_count_too_high"
-            ).inc()
-            return None
-
-        return (
-            self.openai_client.embeddings.create(
-                input=input,
-                model="text-embedding-3-small",
-            )
-            .data[0]
-            .embedding
-        )
-
-    def _num_tokens_for_input(self, string: str) -> int:
-        """Returns the number of tokens in a text string."""
-        return len(encoding.encode(string))
+            logger.error(f"update embeddings index error", flow="embeddings", error=e, source_type=source_type)
 
     def _flush_embeddings_to_clickhouse(self, embeddings: list[dict[str, Any]], source_type: str) -> None:
         try:
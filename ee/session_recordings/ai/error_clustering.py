@@ -1,8 +1,7 @@
 from prometheus_client import Histogram
 from django.conf import settings
-from posthog.clickhouse.client import sync_execute
+from ee.session_recordings.ai.embeddings_index import get_embeddings_index
 from posthog.models import Team
-from sklearn.cluster import DBSCAN
 import pandas as pd
 import numpy as np
 from posthog.session_recordings.models.session_recording_event import SessionRecordingViewed
@@ -21,52 +20,31 @@ CLUSTER_REPLAY_ERRORS_CLUSTER_COUNT = Histogram(
     labelnames=["team_id"],
 )
 
-DBSCAN_EPS = settings.REPLAY_EMBEDDINGS_CLUSTERING_DBSCAN_EPS
 DBSCAN_MIN_SAMPLES = settings.REPLAY_EMBEDDINGS_CLUSTERING_DBSCAN_MIN_SAMPLES
 
 
 def error_clustering(team: Team):
-    results = fetch_error_embeddings(team.pk)
+    with CLUSTER_REPLAY_ERRORS_TIMING.time():
+        # clusters are kept up to date as embeddings are added to the index, so this only catches up with the latest
+        index = get_embeddings_index(team.pk, "error")
 
-    if not results:
+    if not len(index):
         return []
 
-    df = pd.DataFrame(results, columns=["session_id", "error", "embeddings", "timestamp"])
-
-    df["cluster"] = cluster_embeddings(df["embeddings"].tolist())
+    df = pd.DataFrame(
+        {
+            "session_id": index.session_ids,
+            "error": index.inputs,
+            "timestamp": pd.to_datetime(index.timestamps, unit="us", utc=True),
+            "cluster": index.cluster_labels(),
+        }
+    )
 
     CLUSTER_REPLAY_ERRORS_CLUSTER_COUNT.labels(team_id=team.pk).observe(df["cluster"].nunique())
 
     return construct_response(df, team)
 
 
-def fetch_error_embeddings(team_id: int):
-    query = """
-            SELECT
-                session_id, input, embeddings, generation_timestamp
-            FROM
-                session_replay_embeddings
-            WHERE
-                team_id = %(team_id)s
-                -- don't load all data for all time
-                AND generation_timestamp > now() - INTERVAL 7 DAY
-                AND source_type = 'error'
-                AND input != ''
-        """
-
-    return sync_execute(
-        query,
-        {"team_id": team_id},
-    )
-
-
-def cluster_embeddings(embeddings):
-    dbscan = DBSCAN(eps=DBSCAN_EPS, min_samples=DBSCAN_MIN_SAMPLES)
-    with CLUSTER_REPLAY_ERRORS_TIMING.time():
-        dbscan.fit(embeddings)
-    return dbscan.labels_
-
-
 def construct_response(df: pd.DataFrame, team: Team):
     viewed_session_ids = list(
         SessionRecordingViewed.objects.filter(team=team, session_id__in=df["session_id"].unique())
@@ -1,6 +1,6 @@
 from prometheus_client import Histogram
 
-from posthog.clickhouse.client import sync_execute
+from ee.session_recordings.ai.embeddings_index import get_embeddings_index
 from posthog.models.team import Team
 from posthog.session_recordings.models.session_recording import SessionRecording
 
@@ -19,39 +19,13 @@ def similar_recordings(recording: SessionRecording, team: Team):
     return similar_embeddings
 
 
-def closest_embeddings(session_id: str, team_id: int):
-    query = """
-            WITH (
-                SELECT
-                    argMax(embeddings, generation_timestamp) as target_embeddings
-                FROM
-                    session_replay_embeddings
-                WHERE
-                    team_id = %(team_id)s
-                    -- don't load all data for all time
-                    AND generation_timestamp > now() - INTERVAL 7 DAY
-                    AND session_id = %(session_id)s
-                group by session_id
-                LIMIT 1
-            ) as target_embeddings
-            SELECT
-                session_id,
-                -- distance function choice based on https://help.openai.com/en/articles/6824809-embeddings-frequently-asked-questions
-                -- OpenAI normalizes embeddings so L2 should produce the same score but is slightly slower
-                cosineDistance(embeddings, target_embeddings) AS similarity_score
-            FROM session_replay_embeddings
-            WHERE
-                team_id = %(team_id)s
-                -- don't load all data for all time
-                AND generation_timestamp > now() - INTERVAL 7 DAY
-                -- skip the target recording
-                AND session_id != %(session_id)s
-            ORDER BY similarity_score ASC
-            -- only return a max number of results
-            LIMIT %(limit)s;
-        """
-
-    return sync_execute(
-        query,
-        {"team_id": team_id, "session_id": session_id, "limit": 3},
-    )
+def closest_embeddings(session_id: str, team_id: int, limit: int = 3) -> list[tuple[str, float]]:
+    index = get_embeddings_index(team_id, "session")
+
+    target_embeddings = index.embedding_for(session_id)
+    if target_embeddings is None:
+        return []
+
+    # distance function choice based on https://help.openai.com/en/articles/6824809-embeddings-frequently-asked-questions
+    # OpenAI normalizes embeddings so L2 should produce the same score but is slightly slower
+    return index.search(target_embeddings, limit=limit, exclude_session_id=session_id)
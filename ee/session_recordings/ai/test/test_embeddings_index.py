@@ -0,0 +1,132 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from django.test import override_settings
+
+from ee.session_recordings.ai.embeddings_index import EmbeddingsIndex
+from posthog.test.base import BaseTest
+
+NOW = datetime.now(tz=ZoneInfo("UTC"))
+
+
+def clustered_embeddings(count: int, centers: int, noise: float, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    directions = rng.normal(size=(centers, 64))
+    directions /= np.linalg.norm(directions, axis=1, keepdims=True)
+    return directions[rng.integers(0, centers, count)] + rng.normal(scale=noise, size=(count, 64))
+
+
+class TestEmbeddingsIndex(BaseTest):
+    def _add(self, index: EmbeddingsIndex, embeddings: np.ndarray, prefix: str = "s", timestamp: datetime = NOW):
+        index.add(
+            [f"{prefix}{i}" for i in range(len(embeddings))],
+            [f"error {prefix}{i}" for i in range(len(embeddings))],
+            embeddings.tolist(),
+            [timestamp] * len(embeddings),
+        )
+
+    def test_search_finds_the_nearest_neighbours(self):
+        embeddings = clustered_embeddings(5_000, centers=50, noise=0.1)
+        index = EmbeddingsIndex(self.team.pk, "session")
+        self._add(index, embeddings)
+
+        assert index.trained_size == 5_000
+        assert len(index.centroids) == 70
+
+        normalized = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+        found = 0
+        for target in range(50):
+            distances = 1 - normalized @ normalized[target]
+            distances[target] = np.inf
+            expected = {f"s{i}" for i in np.argsort(distances)[:5]}
+
+            results = index.search(index.embedding_for(f"s{target}"), limit=5, exclude_session_id=f"s{target}")
+
+            assert f"s{target}" not in [session_id for session_id, _ in results]
+            assert [distance for _, distance in results] == sorted(distance for _, distance in results)
+            found += len(expected & {session_id for session_id, _ in results})
+        assert found / 250 > 0.95
+
+    def test_later_embeddings_of_a_session_replace_earlier_ones(self):
+        index = EmbeddingsIndex(self.team.pk, "session")
+        embeddings = np.random.default_rng(0).normal(size=(3, 64))
+        index.add(["a", "b"], ["", ""], embeddings[:2].tolist(), [NOW, NOW])
+        index.add(["a"], [""], embeddings[2:].tolist(), [NOW])
+
+        assert len(index) == 2
+        [(session_id, distance)] = index.search(embeddings[2], limit=1)
+        assert session_id == "a"
+        assert distance < 0.01
+
+    def test_evicts_old_embeddings(self):
+        index = EmbeddingsIndex(self.team.pk, "session")
+        self._add(
+            index, clustered_embeddings(10, centers=2, noise=0.1), prefix="old", timestamp=NOW - timedelta(days=8)
+        )
+        self._add(index, clustered_embeddings(10, centers=2, noise=0.1), prefix="new")
+
+        index.evict(NOW - timedelta(days=7))
+
+        assert len(index) == 10
+        assert all(session_id.startswith("new") for session_id in index.session_ids)
+
+    @override_settings(REPLAY_EMBEDDINGS_CLUSTERING_DBSCAN_EPS=0.2, REPLAY_EMBEDDINGS_CLUSTERING_DBSCAN_MIN_SAMPLES=10)
+    def test_clusters_errors_incrementally(self):
+        index = EmbeddingsIndex(self.team.pk, "error")
+        self._add(index, clustered_embeddings(300, centers=3, noise=0.005), prefix="first")
+        self._add(index, clustered_embeddings(300, centers=3, noise=0.005), prefix="second")
+        self._add(index, np.random.default_rng(1).normal(size=(3, 64)), prefix="noise")
+
+        labels = index.cluster_labels()
+
+        assert sorted(np.unique(labels).tolist()) == [-1, 0, 1, 2]
+        assert (labels[-3:] == -1).all()
+        # the same errors added later join the clusters they were first seen in
+        assert (labels[:300] == labels[300:600]).all()
+
+    def test_clusters_shrink_as_errors_are_evicted(self):
+        index = EmbeddingsIndex(self.team.pk, "error")
+        self._add(
+            index, clustered_embeddings(20, centers=1, noise=0.001), prefix="old", timestamp=NOW - timedelta(days=8)
+        )
+        self._add(index, clustered_embeddings(20, centers=1, noise=0.001, seed=1), prefix="new")
+        assert len(index.cluster_sizes) == 2
+
+        index.evict(NOW - timedelta(days=7))
+
+        assert index.cluster_sizes.tolist() == [20]
+        assert (index.clusters == 0).all()
+
+    def test_round_trips_through_bytes(self):
+        index = EmbeddingsIndex(self.team.pk, "error")
+        self._add(index, clustered_embeddings(2_000, centers=5, noise=0.01))
+
+        loaded = EmbeddingsIndex.from_bytes(index.to_bytes())
+
+        assert loaded is not None
+        assert len(loaded) == len(index)
+        assert loaded.watermark == index.watermark
+        assert (loaded.cluster_labels() == index.cluster_labels()).all()
+        assert loaded.search(loaded.vectors[0], limit=3) == index.search(index.vectors[0], limit=3)
+
+    def test_sync_reads_only_rows_since_the_watermark(self):
+        index = EmbeddingsIndex(self.team.pk, "session")
+        embeddings = np.random.default_rng(0).normal(size=(2, 64))
+        watermark = NOW - timedelta(hours=1)
+
+        with patch(
+            "ee.session_recordings.ai.embeddings_index.fetch_embeddings_since",
+            return_value=[("a", "", embeddings[0].tolist(), watermark)],
+        ) as fetch:
+            index.sync()
+        assert fetch.call_args[0][2] > NOW - timedelta(days=7, minutes=1)
+
+        with patch(
+            "ee.session_recordings.ai.embeddings_index.fetch_embeddings_since",
+            return_value=[("a", "", embeddings[0].tolist(), watermark), ("b", "", embeddings[1].tolist(), NOW)],
+        ) as fetch:
+            index.sync()
+        assert fetch.call_args[0][2] == watermark - timedelta(minutes=1)
+        assert sorted(index.session_ids.tolist()) == ["a", "b"]
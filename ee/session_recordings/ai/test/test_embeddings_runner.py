@@ -0,0 +1,77 @@
+from unittest.mock import patch
+
+from django.test import override_settings
+
+from ee.session_recordings.ai.embedding_backends import StubEmbeddingBackend
+from ee.session_recordings.ai.embeddings_runner import ErrorEmbeddingsPreparation, SessionEmbeddingsRunner
+from posthog.test.base import BaseTest
+
+
+class TestSessionEmbeddingsRunner(BaseTest):
+    def _prepared(self, count: int, length: int = 10) -> list[tuple[str, str]]:
+        return [(f"session_{i}", f"{i:0{length}d}") for i in range(count)]
+
+    def test_packs_inputs_into_requests(self):
+        backend = StubEmbeddingBackend(dimensions=8, max_inputs_per_request=4, max_tokens_per_request=25)
+        runner = SessionEmbeddingsRunner(self.team, backend=backend)
+
+        embedded = runner.embed(self._prepared(10), source_type="error")
+
+        assert len(embedded) == 10
+        # 10 tokens each, so only 2 fit under the token limit before the input limit is reached
+        assert sorted(len(request) for request in backend.requests) == [2, 2, 2, 2, 2]
+        assert sorted(row["session_id"] for row in embedded) == sorted(f"session_{i}" for i in range(10))
+        assert all(row["team_id"] == self.team.pk and row["source_type"] == "error" for row in embedded)
+
+    def test_embeddings_are_deterministic(self):
+        first = SessionEmbeddingsRunner(self.team, backend=StubEmbeddingBackend(dimensions=8)).embed(
+            self._prepared(3), source_type="error"
+        )
+        second = SessionEmbeddingsRunner(self.team, backend=StubEmbeddingBackend(dimensions=8)).embed(
+            self._prepared(3), source_type="error"
+        )
+
+        assert sorted(first, key=lambda row: row["session_id"]) == sorted(second, key=lambda row: row["session_id"])
+
+    def test_trims_inputs_that_are_too_long(self):
+        backend = StubEmbeddingBackend(dimensions=8, max_tokens_per_input=5)
+        runner = SessionEmbeddingsRunner(self.team, backend=backend)
+
+        [row] = runner.embed([("session", "0123456789")], source_type="error")
+
+        assert backend.requests == [["01234"]]
+        # what was embedded is trimmed, but the input is stored as it was
+        assert row["input"] == "0123456789"
+
+    @patch("ee.session_recordings.ai.embeddings_runner.sleep")
+    def test_retries_transient_failures(self, sleep):
+        backend = StubEmbeddingBackend(dimensions=8, failures=2)
+        runner = SessionEmbeddingsRunner(self.team, backend=backend)
+
+        embedded = runner.embed(self._prepared(3), source_type="error")
+
+        assert len(embedded) == 3
+        assert len(backend.requests) == 3
+        assert sleep.call_count == 2
+
+    @override_settings(REPLAY_EMBEDDINGS_REQUEST_MAX_RETRIES=1, REPLAY_EMBEDDINGS_MAX_CONCURRENT_REQUESTS=1)
+    @patch("ee.session_recordings.ai.embeddings_runner.sleep")
+    def test_swallows_requests_that_keep_failing(self, _sleep):
+        backend = StubEmbeddingBackend(dimensions=8, failures=2, max_inputs_per_request=2)
+        runner = SessionEmbeddingsRunner(self.team, backend=backend)
+
+        embedded = runner.embed(self._prepared(4), source_type="error")
+
+        # the first request failed on both attempts, the second succeeded
+        assert len(embedded) == 2
+
+    @patch("ee.session_recordings.ai.embeddings_runner.update_embeddings_index")
+    @patch("ee.session_recordings.ai.embeddings_runner.sync_execute")
+    def test_run_flushes_to_clickhouse_and_updates_the_index(self, sync_execute, update_embeddings_index):
+        runner = SessionEmbeddingsRunner(self.team, backend=StubEmbeddingBackend(dimensions=8))
+
+        runner.run([("session_1", "an error"), ("session_2", "another error")], ErrorEmbeddingsPreparation)
+
+        [insert] = sync_execute.call_args_list
+        assert [row["input"] for row in insert[0][1]] == ["an error", "another error"]
+        update_embeddings_index.assert_called_once_with(self.team.pk, "error")
@@ -195,6 +195,8 @@ export interface HogQLQueryModifiers {
     materializationMode?: 'auto' | 'legacy_null_as_string' | 'legacy_null_as_null' | 'disabled'
     dataWarehouseEventsModifiers?: DataWarehouseEventsModifier[]
     debug?: boolean
+    /** Answer eligible trends queries from the pre-aggregated events rollup instead of the events table */
+    useEventsRollups?: boolean
 }
 
 export interface DataWarehouseEventsModifier {
@@ -217,6 +219,8 @@ export interface HogQLQueryResponse extends AnalyticsQueryResponseBase<any[]> {
     explain?: string[]
     /** Query metadata output */
     metadata?: HogQLMetadataResponse
+    /** Estimated cost of the query, when admission rules apply or in debug mode */
+    cost?: HogQLQueryCost
     hasMore?: boolean
     limit?: integer
     offset?: integer
@@ -255,6 +259,25 @@ export interface HogQLMetadataResponse {
     errors: HogQLNotice[]
     warnings: HogQLNotice[]
     notices: HogQLNotice[]
+    /** Estimated cost of the select query */
+    cost?: HogQLQueryCost
+}
+
+/** How expensive a query is estimated to be, before it runs */
+export interface HogQLQueryCost {
+    /** Rows of events the query is estimated to read */
+    estimatedRows: number
+    /** Days of events the query reads */
+    days: number
+    sampleRate: number
+    /** Tables the query joins events with */
+    joinedTables: string[]
+    /** Number of properties the query groups by */
+    breakdowns: integer
+    /** Estimated rows adjusted for joins and breakdowns, what admission rules compare against */
+    cost: number
+    /** What admission control did with the query */
+    admission?: 'run' | 'queue' | 'sample' | 'reject'
 }
 
 export interface AutocompleteCompletionItem {
@@ -406,6 +429,8 @@ export interface EventsQueryResponse extends AnalyticsQueryResponseBase<any[][]>
     hasMore?: boolean
     limit?: integer
     offset?: integer
+    /** Cursor for the next page, pass it as `cursor` to continue after the last row */
+    next_cursor?: string
 }
 export type CachedEventsQueryResponse = EventsQueryResponse & CachedQueryResponseMixin
 
@@ -440,6 +465,10 @@ export interface EventsQuery extends DataNode<EventsQueryResponse> {
      * Number of rows to skip before returning rows
      */
     offset?: integer
+    /**
+     * Cursor returned as `next_cursor` by the previous page. Continues after its last row instead of skipping `offset` rows
+     */
+    cursor?: string
     /**
      * Show events matching a given action
      */
@@ -967,6 +996,8 @@ export interface ActorsQueryResponse extends AnalyticsQueryResponseBase<any[][]>
     limit: integer
     offset: integer
     missing_actors_count?: integer
+    /** Cursor for the next page, pass it as `cursor` to continue after the last row */
+    next_cursor?: string
 }
 export type CachedActorsQueryResponse = ActorsQueryResponse & CachedQueryResponseMixin
 
@@ -980,6 +1011,8 @@ export interface ActorsQuery extends DataNode<ActorsQueryResponse> {
     orderBy?: string[]
     limit?: integer
     offset?: integer
+    /** Cursor returned as `next_cursor` by the previous page. Continues after its last row instead of skipping `offset` rows */
+    cursor?: string
 }
 
 export interface TimelineEntry {
@@ -1013,6 +1046,8 @@ interface WebAnalyticsQueryBase<R extends Record<string, any>> extends DataNode<
     sampling?: {
         enabled?: boolean
         forceSamplingRate?: SamplingRate
+        /** Pick the coarsest sample rate that keeps the error of the total within the configured bound */
+        adaptive?: boolean
     }
     useSessionsTable?: boolean
 }
@@ -99,6 +99,22 @@ export function Modifiers<Q extends { response?: Record<string, any>; modifiers?
                     value={query.modifiers?.materializationMode ?? response?.modifiers?.materializationMode}
                 />
             </LemonLabel>
+            <LemonLabel className={labelClassName}>
+                <div>Events Rollups:</div>
+                <LemonSelect
+                    options={[
+                        { value: true, label: 'true' },
+                        { value: false, label: 'false' },
+                    ]}
+                    onChange={(value) =>
+                        setQuery({
+                            ...query,
+                            modifiers: { ...query.modifiers, useEventsRollups: value },
+                        })
+                    }
+                    value={query.modifiers?.useEventsRollups ?? response?.modifiers?.useEventsRollups ?? false}
+                />
+            </LemonLabel>
         </div>
     )
 }
@@ -2936,6 +2936,7 @@ interface BaseExperimentResults {
     significance_code: SignificanceCode
     expected_loss?: number
     p_value?: number
+    credible_intervals?: Record<string, [number, number]>
 }
 
 export interface _TrendsExperimentResults extends BaseExperimentResults {
@@ -1,10 +1,13 @@
 import json
+from collections.abc import Iterator
 from typing import Any, Optional, cast
 
 import structlog
 from django.db.models import Prefetch, QuerySet
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils.timezone import now
+from drf_spectacular.utils import OpenApiResponse
 from rest_framework import exceptions, serializers, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import SAFE_METHODS, BasePermission
@@ -12,15 +15,20 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.serializers import BaseSerializer
 from rest_framework.utils.serializer_helpers import ReturnDict
+from sentry_sdk import capture_exception
 
 from posthog.api.dashboards.dashboard_template_json_schema_parser import (
     DashboardTemplateCreationJSONSchemaParser,
 )
+from posthog.api.documentation import extend_schema
 from posthog.api.forbid_destroy_model import ForbidDestroyModel
 from posthog.api.insight import InsightSerializer, InsightViewSet
 from posthog.api.routing import TeamAndOrgViewSetMixin
 from posthog.api.shared import UserBasicSerializer
 from posthog.api.tagged_item import TaggedItemSerializerMixin, TaggedItemViewSetMixin
+from posthog.api.utils import ndjson_line
+from posthog.caching.calculate_results import calculate_for_query_based_insights
+from posthog.caching.fetch_from_cache import InsightResult, prefetch_cached_insight_results
 from posthog.event_usage import report_user_action
 from posthog.helpers import create_dashboard_from_template
 from posthog.helpers.dashboard_templates import create_from_template
@@ -29,6 +37,8 @@ from posthog.models.dashboard_templates import DashboardTemplate
 from posthog.models.tagged_item import TaggedItem
 from posthog.models.user import User
 from posthog.user_permissions import UserPermissionsSerializerMixin
+from posthog.utils import refresh_requested_by_client
+
 
 logger = structlog.get_logger(__name__)
 
@@ -352,30 +362,71 @@ class DashboardSerializer(DashboardBasicSerializer):
         if self.context["view"].action == "list":
             return None
 
+        tiles = self._prepare_tiles(dashboard)
+        self.context["insight_results"] = dict(self._calculate_insight_results(dashboard, tiles))
+
+        return [self._serialize_tile(tile) for tile in tiles]
+
+    def stream_tiles(self, dashboard: Dashboard) -> Iterator[tuple[DashboardTile, ReturnDict | Exception]]:
+        """Serialize the tiles of the dashboard as the results of their insights become available."""
+        tiles = self._prepare_tiles(dashboard)
+
+        query_based_tiles: dict[int, list[DashboardTile]] = {}
+        for tile in tiles:
+            if tile.insight and tile.insight.query:
+                query_based_tiles.setdefault(tile.insight.pk, []).append(tile)
+            else:
+                yield tile, self._try_serialize_tile(tile)
+
+        for insight, result in self._calculate_insight_results(dashboard, tiles):
+            self.context["insight_results"] = {insight.pk: result}
+            for tile in query_based_tiles[insight.pk]:
+                yield tile, self._try_serialize_tile(tile)
+
+    def _prepare_tiles(self, dashboard: Dashboard) -> list[DashboardTile]:
         # used by insight serializer to load insight filters in correct context
         self.context.update({"dashboard": dashboard})
 
-        serialized_tiles = []
-
-        tiles = DashboardTile.dashboard_queryset(dashboard.tiles).prefetch_related(
-            Prefetch(
-                "insight__tagged_items",
-                queryset=TaggedItem.objects.select_related("tag"),
-                to_attr="prefetched_tags",
+        tiles = list(
+            DashboardTile.dashboard_queryset(dashboard.tiles).prefetch_related(
+                Prefetch(
+                    "insight__tagged_items",
+                    queryset=TaggedItem.objects.select_related("tag"),
+                    to_attr="prefetched_tags",
+                )
             )
         )
-        self.user_permissions.set_preloaded_dashboard_tiles(list(tiles))
+        self.user_permissions.set_preloaded_dashboard_tiles(tiles)
+        # Filter-based tiles read their cached results in one round trip too
+        self.context["cached_insight_results"] = prefetch_cached_insight_results(
+            [tile for tile in tiles if tile.insight and not tile.insight.query]
+        )
+        return tiles
+
+    def _calculate_insight_results(
+        self, dashboard: Dashboard, tiles: list[DashboardTile]
+    ) -> Iterator[tuple[Insight, InsightResult | Exception]]:
+        # All query-based tiles are looked up in the cache, and calculated if needed, as one batch
+        insights = {tile.insight.pk: tile.insight for tile in tiles if tile.insight and tile.insight.query}
+        return calculate_for_query_based_insights(
+            list(insights.values()),
+            dashboard=dashboard,
+            refresh_requested=refresh_requested_by_client(self.context["request"]),
+        )
 
-        for tile in tiles:
-            self.context.update({"dashboard_tile": tile})
+    def _serialize_tile(self, tile: DashboardTile) -> ReturnDict:
+        self.context.update({"dashboard_tile": tile})
 
-            if isinstance(tile.layouts, str):
-                tile.layouts = json.loads(tile.layouts)
+        if isinstance(tile.layouts, str):
+            tile.layouts = json.loads(tile.layouts)
 
-            tile_data = DashboardTileSerializer(tile, many=False, context=self.context).data
-            serialized_tiles.append(tile_data)
+        return DashboardTileSerializer(tile, many=False, context=self.context).data
 
-        return serialized_tiles
+    def _try_serialize_tile(self, tile: DashboardTile) -> ReturnDict | Exception:
+        try:
+            return self._serialize_tile(tile)
+        except Exception as e:
+            return e
 
     def validate(self, data):
         if data.get("use_dashboard", None) and data.get("use_template", None):
@@ -398,6 +449,7 @@ class DashboardsViewSet(
     viewsets.ModelViewSet,
 ):
     scope_object = "dashboard"
+    scope_object_read_actions = ["list", "retrieve", "stream_tiles"]
     queryset = Dashboard.objects_including_soft_deleted.order_by("name")
     permission_classes = [CanEditDashboard]
 
@@ -460,6 +512,36 @@ class DashboardsViewSet(
         serializer = DashboardSerializer(dashboard, context={"view": self, "request": request})
         return Response(serializer.data)
 
+    @extend_schema(
+        description="Streams the tiles of a dashboard as newline delimited JSON, each tile as soon as its results are "
+        "available. A tile that fails is sent as its id with an error.",
+        responses={
+            200: OpenApiResponse(description="Newline delimited JSON"),
+        },
+    )
+    @action(methods=["GET"], detail=True)
+    def stream_tiles(self, request: Request, *args: Any, **kwargs: Any) -> StreamingHttpResponse:
+        dashboard = self.get_object()
+        dashboard.last_accessed_at = now()
+        dashboard.save(update_fields=["last_accessed_at"])
+        serializer = DashboardSerializer(dashboard, context={"view": self, "request": request})
+
+        response = StreamingHttpResponse(
+            self._stream_tile_lines(serializer, dashboard), content_type="application/x-ndjson"
+        )
+        # Don't let proxies hold back tiles until the whole dashboard is done
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    def _stream_tile_lines(self, serializer: "DashboardSerializer", dashboard: Dashboard) -> Iterator[bytes]:
+        for tile, tile_data in serializer.stream_tiles(dashboard):
+            if isinstance(tile_data, Exception):
+                if not isinstance(tile_data, exceptions.APIException):
+                    capture_exception(tile_data)
+                yield ndjson_line({"id": tile.pk, "error": str(tile_data)})
+            else:
+                yield ndjson_line(tile_data)
+
     @action(methods=["PATCH"], detail=True)
     def move_tile(self, request: Request, *args: Any, **kwargs: Any) -> Response:
         # TODO could things be rearranged so this is  PATCH call on a resource and not a custom endpoint?
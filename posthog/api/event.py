@@ -2,13 +2,14 @@ import json
 import urllib
 from datetime import datetime
 from typing import Any, List, Optional, Union  # noqa: UP035
+from uuid import UUID
 
 from django.db.models.query import Prefetch
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiParameter
 from rest_framework import mixins, request, response, serializers, viewsets
 from rest_framework.decorators import action
-from rest_framework.exceptions import NotFound
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.settings import api_settings
 from rest_framework_csv import renderers as csvrenderers
@@ -18,6 +19,8 @@ from posthog.api.documentation import PropertiesSerializer, extend_schema
 from posthog.api.routing import TeamAndOrgViewSetMixin
 from posthog.client import query_with_columns, sync_execute
 from posthog.hogql.constants import DEFAULT_RETURNED_ROWS, MAX_SELECT_RETURNED_ROWS
+from posthog.hogql.errors import QueryError
+from posthog.hogql_queries.insights.paginators import decode_cursor, encode_cursor
 from posthog.models import Element, Filter, Person
 from posthog.models.event.query_event_list import query_events_list
 from posthog.models.event.sql import GET_CUSTOM_EVENTS, SELECT_ONE_EVENT_SQL
@@ -93,16 +96,21 @@ class EventViewSet(
     def _build_next_url(
         self,
         request: request.Request,
-        last_event_timestamp: datetime,
+        last_event: dict,
+        next_event: dict,
         order_by: list[str],
     ) -> str:
         params = request.GET.dict()
+        params.pop("cursor", None)
         reverse = "-timestamp" in order_by
-        timestamp = last_event_timestamp.astimezone().isoformat()
+        timestamp = last_event["timestamp"].astimezone().isoformat()
         if reverse:
             params["before"] = timestamp
         else:
             params["after"] = timestamp
+        if next_event["timestamp"] == last_event["timestamp"]:
+            # `before` and `after` are exclusive, so continue from the exact event to not skip others at the same time
+            params["cursor"] = encode_cursor([last_event["timestamp"], last_event["uuid"]])
         return request.build_absolute_uri(f"{request.path}?{urllib.parse.urlencode(params)}")
 
     @extend_schema(
@@ -152,6 +160,11 @@ class EventViewSet(
                 OpenApiTypes.INT,
                 description="The maximum number of results to return",
             ),
+            OpenApiParameter(
+                "cursor",
+                OpenApiTypes.STR,
+                description="Continue after the event this cursor points to. Set in the `next` URL where needed.",
+            ),
             PropertiesSerializer(required=False),
         ],
     )
@@ -173,6 +186,16 @@ class EventViewSet(
             except ValueError:
                 offset = 0
 
+            cursor: Optional[tuple[datetime, UUID]] = None
+            if request.GET.get("cursor"):
+                try:
+                    cursor_timestamp, cursor_uuid = decode_cursor(request.GET["cursor"], 2)
+                except QueryError as e:
+                    raise ValidationError({"cursor": [str(e)]}, code="invalid")
+                if not isinstance(cursor_timestamp, datetime) or not isinstance(cursor_uuid, UUID):
+                    raise ValidationError({"cursor": ["Invalid cursor"]}, code="invalid")
+                cursor = (cursor_timestamp, cursor_uuid)
+
             team = self.team
             filter = Filter(request=request, team=self.team)
             order_by: list[str] = (
@@ -187,6 +210,7 @@ class EventViewSet(
                 request_get_query_dict=request.GET.dict(),
                 order_by=order_by,
                 action_id=request.GET.get("action_id"),
+                cursor=cursor,
             )
 
             # Retry the query without the 1 day optimization
@@ -200,6 +224,7 @@ class EventViewSet(
                     request_get_query_dict=request.GET.dict(),
                     order_by=order_by,
                     action_id=request.GET.get("action_id"),
+                    cursor=cursor,
                 )
 
             result = ClickhouseEventSerializer(
@@ -210,7 +235,7 @@ class EventViewSet(
 
             next_url: Optional[str] = None
             if not is_csv_request and len(query_result) > limit:
-                next_url = self._build_next_url(request, query_result[limit - 1]["timestamp"], order_by)
+                next_url = self._build_next_url(request, query_result[limit - 1], query_result[limit], order_by)
             return response.Response({"next": next_url, "results": result})
 
         except Exception as ex:
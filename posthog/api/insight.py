@@ -5,7 +5,7 @@ from typing import Any, Optional, Union, cast
 from sentry_sdk import capture_exception, set_tag
 import structlog
 from django.db import transaction
-from django.db.models import Count, Prefetch, QuerySet
+from django.db.models import Count, Manager, Prefetch, QuerySet
 from django.db.models.query_utils import Q
 from django.http import HttpResponse
 from django.utils.text import slugify
@@ -36,7 +36,12 @@ from posthog.api.shared import UserBasicSerializer
 from posthog.api.tagged_item import TaggedItemSerializerMixin, TaggedItemViewSetMixin
 from posthog.api.utils import format_paginated_url
 from posthog.auth import SharingAccessTokenAuthentication
-from posthog.caching.fetch_from_cache import InsightResult, fetch_cached_insight_result, synchronously_update_cache
+from posthog.caching.fetch_from_cache import (
+    InsightResult,
+    fetch_cached_insight_result,
+    prefetch_cached_insight_results,
+    synchronously_update_cache,
+)
 from posthog.caching.insights_api import should_refresh_insight
 from posthog.constants import (
     INSIGHT,
@@ -228,6 +233,33 @@ class InsightBasicSerializer(TaggedItemSerializerMixin, serializers.ModelSeriali
         return [tile.dashboard_id for tile in instance.dashboard_tiles.all()]
 
 
+class InsightListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        insights = list(data.all() if isinstance(data, Manager) else data)
+        prefetch_insight_results(self.context, insights)
+        return super().to_representation(insights)
+
+
+def prefetch_insight_results(context: dict[str, Any], insights: list[Insight]) -> None:
+    """
+    Look up the results of all insights at once, instead of one by one while serializing them. Query-based insights
+    are also calculated if a refresh is requested.
+    """
+    from posthog.caching.calculate_results import calculate_for_query_based_insights
+
+    dashboard: Optional[Dashboard] = context.get("dashboard")
+    context["cached_insight_results"] = prefetch_cached_insight_results(
+        [insight for insight in insights if not insight.query]
+    )
+    context["insight_results"] = dict(
+        calculate_for_query_based_insights(
+            [insight for insight in insights if insight.query],
+            dashboard=dashboard,
+            refresh_requested=refresh_requested_by_client(context["request"]),
+        )
+    )
+
+
 class InsightSerializer(InsightBasicSerializer, UserPermissionsSerializerMixin):
     result = serializers.SerializerMethodField()
     columns = serializers.SerializerMethodField()
@@ -317,6 +349,7 @@ class InsightSerializer(InsightBasicSerializer, UserPermissionsSerializerMixin):
             "refreshing",
             "is_cached",
         )
+        list_serializer_class = InsightListSerializer
 
     def create(self, validated_data: dict, *args: Any, **kwargs: Any) -> Insight:
         request = self.context["request"]
@@ -550,6 +583,12 @@ class InsightSerializer(InsightBasicSerializer, UserPermissionsSerializerMixin):
 
         if insight.query:
             try:
+                # Dashboards calculate the results of all their query-based tiles at once
+                prefetched_result = self.context.get("insight_results", {}).get(insight.pk)
+                if isinstance(prefetched_result, Exception):
+                    raise prefetched_result
+                if prefetched_result is not None:
+                    return prefetched_result
                 return calculate_for_query_based_insight(
                     insight, dashboard=dashboard, refresh_requested=refresh_requested_by_client(self.context["request"])
                 )
@@ -591,7 +630,9 @@ class InsightSerializer(InsightBasicSerializer, UserPermissionsSerializerMixin):
             INSIGHT_REFRESH_INITIATED_COUNTER.labels(is_shared=is_shared).inc()
             return synchronously_update_cache(insight, dashboard, refresh_frequency=refresh_frequency)
 
-        return fetch_cached_insight_result(dashboard_tile or insight, refresh_frequency)
+        return fetch_cached_insight_result(
+            dashboard_tile or insight, refresh_frequency, self.context.get("cached_insight_results")
+        )
 
     @lru_cache(maxsize=1)  # each serializer instance should only deal with one insight/tile combo
     def dashboard_tile_from_context(self, insight: Insight, dashboard: Optional[Dashboard]) -> Optional[DashboardTile]:
@@ -68,6 +68,11 @@ from posthog.queries.funnels.funnel_unordered_persons import (
 )
 from posthog.queries.insight import insight_sync_execute
 from posthog.queries.paths import PathsActors
+from posthog.queries.person_activity_summary import (
+    build_person_activity_summary,
+    load_person_activity_summary,
+    properties_timeline_from_activity_summary,
+)
 from posthog.queries.person_query import PersonQuery
 from posthog.queries.properties_timeline import PropertiesTimeline
 from posthog.queries.property_values import get_person_property_values_for_key
@@ -593,7 +598,10 @@ class PersonViewSet(TeamAndOrgViewSetMixin, viewsets.ModelViewSet):
             )
 
         person = get_pk_or_uuid(self.get_queryset(), request.GET["person_id"]).get()
-        cohort_ids = get_all_cohort_ids_by_person_uuid(person.uuid, team.pk)
+        activity_summary = load_person_activity_summary(team.pk, person.uuid)
+        cohort_ids = (
+            activity_summary.cohort_ids if activity_summary else get_all_cohort_ids_by_person_uuid(person.uuid, team.pk)
+        )
 
         cohorts = Cohort.objects.filter(pk__in=cohort_ids, deleted=False)
 
@@ -798,10 +806,35 @@ class PersonViewSet(TeamAndOrgViewSetMixin, viewsets.ModelViewSet):
         person = self.get_object()
         filter = PropertiesTimelineFilter(request=request, team=self.team)
 
-        properties_timeline = PropertiesTimeline().run(filter, self.team, person)
+        properties_timeline = properties_timeline_from_activity_summary(filter, self.team, person.uuid)
+        if properties_timeline is None:
+            properties_timeline = PropertiesTimeline().run(filter, self.team, person)
 
         return response.Response(data=properties_timeline)
 
+    @action(methods=["GET"], detail=True)
+    def activity_summary(self, request: request.Request, *args: Any, **kwargs: Any) -> Response:
+        person = self.get_object()
+        summary = load_person_activity_summary(self.team.pk, person.uuid) or build_person_activity_summary(
+            self.team.pk, person.uuid
+        )
+        summary = summary.with_recent_activity(self.team.pk, str(person.uuid))
+
+        return response.Response(
+            {
+                "first_seen": summary.first_seen,
+                "last_seen": summary.last_seen,
+                "event_count": summary.event_count,
+                "effective_date_from": summary.covered_from,
+                "cohort_ids": summary.cohort_ids,
+                "property_changes": [
+                    {"timestamp": segment.first_timestamp, "changed": segment.changed, "removed": segment.removed}
+                    for segment in summary.segments[1:]
+                    if segment.changed or segment.removed
+                ],
+            }
+        )
+
     @action(methods=["GET"], detail=False)
     def lifecycle(self, request: request.Request) -> response.Response:
         team = cast(User, request.user).team
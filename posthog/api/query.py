@@ -1,7 +1,8 @@
 import re
 import uuid
+from collections.abc import Iterator
 
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from drf_spectacular.utils import OpenApiResponse
 from posthog.hogql_queries.query_runner import ExecutionMode
 from rest_framework import viewsets
@@ -16,6 +17,7 @@ from posthog.api.documentation import extend_schema
 from posthog.api.mixins import PydanticModelMixin
 from posthog.api.routing import TeamAndOrgViewSetMixin
 from posthog.api.services.query import process_query_model
+from posthog.api.utils import ndjson_line
 from posthog.clickhouse.client.execute_async import (
     cancel_query,
     enqueue_process_query_task,
@@ -24,14 +26,16 @@ from posthog.clickhouse.client.execute_async import (
 from posthog.clickhouse.query_tagging import tag_queries
 from posthog.errors import ExposedCHQueryError
 from posthog.hogql.ai import PromptUnclear, write_sql_from_prompt
+from posthog.hogql import ast
 from posthog.hogql.errors import ExposedHogQLError
+from posthog.hogql.query import HogQLQueryStream, stream_hogql_query
 from posthog.models.user import User
 from posthog.rate_limit import (
     AIBurstRateThrottle,
     AISustainedRateThrottle,
     TeamRateThrottle,
 )
-from posthog.schema import QueryRequest, QueryResponseAlternative
+from posthog.schema import HogQLQuery, QueryRequest, QueryResponseAlternative
 
 
 class QueryThrottle(TeamRateThrottle):
@@ -43,7 +47,7 @@ class QueryViewSet(TeamAndOrgViewSetMixin, PydanticModelMixin, viewsets.ViewSet)
     # NOTE: Do we need to override the scopes for the "create"
     scope_object = "query"
     # Special case for query - these are all essentially read actions
-    scope_object_read_actions = ["retrieve", "create", "list", "destroy"]
+    scope_object_read_actions = ["retrieve", "create", "list", "destroy", "stream"]
     scope_object_write_actions: list[str] = []
 
     def get_throttles(self):
@@ -121,6 +125,79 @@ class QueryViewSet(TeamAndOrgViewSetMixin, PydanticModelMixin, viewsets.ViewSet)
         cancel_query(self.team.pk, pk)
         return Response(status=204)
 
+    @extend_schema(
+        description="(Experimental) Streams the results of a HogQL query as newline delimited JSON. "
+        "The first line holds the columns and types, every following line holds a chunk of results, "
+        "and the last line holds the timings and row count, or an error if the query failed while streaming.",
+        request=QueryRequest,
+        responses={
+            200: OpenApiResponse(description="Newline delimited JSON"),
+        },
+    )
+    @action(methods=["POST"], detail=False)
+    def stream(self, request: Request, *args, **kwargs) -> StreamingHttpResponse:
+        data = self.get_model(request.data, QueryRequest)
+        if not isinstance(data.query, HogQLQuery):
+            raise ValidationError("Only HogQLQuery can be streamed")
+        self._tag_client_query_id(data.client_query_id or uuid.uuid4().hex)
+        tag_queries(query=request.data["query"])
+
+        query = data.query
+        try:
+            query_stream = stream_hogql_query(
+                query.query,
+                self.team,
+                query_type="HogQLQueryStream",
+                filters=query.filters,
+                placeholders={key: ast.Constant(value=value) for key, value in query.values.items()}
+                if query.values
+                else None,
+                modifiers=query.modifiers,
+            )
+        except (ExposedHogQLError, ExposedCHQueryError) as e:
+            raise ValidationError(str(e), getattr(e, "code_name", None))
+        except Exception as e:
+            self.handle_column_ch_error(e)
+            capture_exception(e)
+            raise e
+
+        response = StreamingHttpResponse(self._stream_lines(query_stream), content_type="application/x-ndjson")
+        # Don't let proxies hold back chunks until the whole response is done
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    def _stream_lines(self, query_stream: HogQLQueryStream) -> Iterator[bytes]:
+        yield ndjson_line(
+            {
+                "columns": query_stream.columns,
+                "types": query_stream.types,
+                "hogql": query_stream.prepared.hogql,
+                "clickhouse": query_stream.prepared.clickhouse,
+            }
+        )
+        try:
+            for chunk in query_stream.chunks():
+                yield ndjson_line({"results": chunk})
+        except Exception as e:
+            # The status code has already been sent, so errors can only be reported in the body
+            if not isinstance(e, ExposedHogQLError | ExposedCHQueryError):
+                capture_exception(e)
+            yield ndjson_line(
+                {
+                    "error": str(e) if isinstance(e, ExposedHogQLError | ExposedCHQueryError) else "Unknown error",
+                    "row_count": query_stream.row_count,
+                }
+            )
+            return
+        finally:
+            query_stream.close()
+        yield ndjson_line(
+            {
+                "timings": [timing.model_dump() for timing in query_stream.timings.to_list()],
+                "row_count": query_stream.row_count,
+            }
+        )
+
     @action(methods=["GET"], detail=False)
     def draft_sql(self, request: Request, *args, **kwargs) -> Response:
         if not isinstance(request.user, User):
@@ -3,6 +3,7 @@ from unittest import mock
 from unittest.mock import ANY, MagicMock, patch
 
 from dateutil import parser
+from django.core.cache import cache
 from django.test import override_settings
 from django.utils import timezone
 from django.utils.timezone import now
@@ -1336,3 +1337,39 @@ class TestDashboard(APIBaseTest, QueryMatchingTest):
         }
 
         assert response.json() == error_message
+
+    def test_query_based_tiles_are_read_from_cache_at_once(self) -> None:
+        dashboard_id, _ = self.dashboard_api.create_dashboard({"name": "dashboard"})
+        for event in ["$pageview", "$pageleave"]:
+            self.dashboard_api.create_insight(
+                {
+                    "query": {"kind": "TrendsQuery", "series": [{"kind": "EventsNode", "event": event}]},
+                    "dashboards": [dashboard_id],
+                }
+            )
+
+        with patch.object(cache, "get_many", wraps=cache.get_many) as get_many:
+            response = self.dashboard_api.get_dashboard(dashboard_id)
+
+        get_many.assert_called_once()
+        assert len(get_many.call_args.args[0]) == 2
+        assert [tile["insight"]["result"] for tile in response["tiles"]] == [None, None]
+
+    def test_stream_tiles(self) -> None:
+        dashboard_id, _ = self.dashboard_api.create_dashboard({"name": "dashboard"})
+        insight_id, _ = self.dashboard_api.create_insight(
+            {
+                "query": {"kind": "TrendsQuery", "series": [{"kind": "EventsNode", "event": "$pageview"}]},
+                "dashboards": [dashboard_id],
+            }
+        )
+        self.dashboard_api.create_text_tile(dashboard_id)
+
+        response = self.client.get(f"/api/projects/{self.team.id}/dashboards/{dashboard_id}/stream_tiles/")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "application/x-ndjson"
+        tiles = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        # Text tiles don't wait for any results
+        assert tiles[0]["text"]["body"] == "I AM TEXT!"
+        assert tiles[1]["insight"]["id"] == insight_id
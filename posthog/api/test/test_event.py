@@ -566,6 +566,29 @@ class TestEvents(ClickhouseTestMixin, APIBaseTest):
         )
         assert "before=" in response["next"]
 
+    def test_pagination_does_not_skip_events_with_the_same_timestamp(self):
+        timestamp = timezone.now() - relativedelta(days=1)
+        for idx in range(5):
+            _create_event(
+                team=self.team,
+                event=f"event {idx}",
+                distinct_id="1",
+                timestamp=timestamp,
+            )
+
+        response = self.client.get(f"/api/projects/{self.team.id}/events/?distinct_id=1&limit=2").json()
+        events = [event["event"] for event in response["results"]]
+        self.assertIn("cursor=", response["next"])
+        while response["next"]:
+            response = self.client.get(response["next"]).json()
+            events.extend(event["event"] for event in response["results"])
+
+        self.assertEqual(sorted(events), [f"event {idx}" for idx in range(5)])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(f"/api/projects/{self.team.id}/events/?cursor=invalid")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_action_no_steps(self):
         action = Action.objects.create(team=self.team)
 
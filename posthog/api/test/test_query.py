@@ -870,6 +870,53 @@ class TestQuery(ClickhouseTestMixin, APIBaseTest):
 
         self.assertEqual(response.get("results", [])[0][0], 20)
 
+    @patch("posthog.hogql.constants.MAX_SELECT_RETURNED_ROWS", 15)
+    def test_stream_hogql_query(self, MAX_SELECT_RETURNED_ROWS=15):
+        random_uuid = f"RANDOM_TEST_ID::{UUIDT()}"
+        with freeze_time("2020-01-10 12:00:00"):
+            for index in range(20):
+                _create_event(
+                    team=self.team,
+                    event="sign up",
+                    distinct_id=random_uuid,
+                    properties={"index": index},
+                )
+        flush_persons_and_events()
+
+        response = self.client.post(
+            f"/api/projects/{self.team.id}/query/stream/",
+            {
+                "query": {
+                    "kind": "HogQLQuery",
+                    "query": "select toInt(properties.index) as index from events where distinct_id = {random_uuid} order by index",
+                    "values": {"random_uuid": random_uuid},
+                }
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+        self.assertEqual(lines[0]["columns"], ["index"])
+        # Streamed results aren't capped by MAX_SELECT_RETURNED_ROWS
+        self.assertEqual([row[0] for line in lines[1:-1] for row in line["results"]], list(range(20)))
+        self.assertEqual(lines[-1]["row_count"], 20)
+        self.assertTrue(lines[-1]["timings"])
+
+    def test_stream_only_supports_hogql_queries(self):
+        response = self.client.post(
+            f"/api/projects/{self.team.id}/query/stream/",
+            {"query": {"kind": "EventsQuery", "select": ["event"]}},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_stream_invalid_hogql_query(self):
+        response = self.client.post(
+            f"/api/projects/{self.team.id}/query/stream/",
+            {"query": {"kind": "HogQLQuery", "query": "select not_a_field from events"}},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
 
 class TestQueryRetrieve(APIBaseTest):
     def setUp(self):
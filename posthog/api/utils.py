@@ -9,12 +9,14 @@ from typing import Literal, Optional, Union
 from urllib3 import HTTPSConnectionPool, HTTPConnectionPool, PoolManager
 from uuid import UUID
 
+import orjson
 import structlog
 from django.core.exceptions import RequestDataTooBig
 from django.db.models import QuerySet
 from prometheus_client import Counter
 from rest_framework import request, status
 from rest_framework.exceptions import ValidationError
+from rest_framework.utils.encoders import JSONEncoder
 from statshog.defaults.django import statsd
 
 from posthog.constants import EventDefinitionType
@@ -374,3 +376,8 @@ class PublicIPOnlyHttpAdapter(HTTPAdapter):
             "http": PublicIPOnlyHTTPConnectionPool,
             "https": PublicIPOnlyHTTPSConnectionPool,
         }
+
+
+def ndjson_line(data: dict) -> bytes:
+    """One line of a newline delimited JSON response."""
+    return orjson.dumps(data, default=JSONEncoder().default, option=orjson.OPT_UTC_Z) + b"\n"
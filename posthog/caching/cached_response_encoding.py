@@ -0,0 +1,150 @@
+"""
+A compact encoding for cached query responses.
+
+Insight responses are mostly lists of dicts with the same keys, e.g. one dict per trends series, and the series of a
+trend share the same `days` and `labels`. Plain JSON repeats all of that for every item. Here a long enough list of
+dicts with the same keys is stored as a table instead: the keys once, followed by one list of values per key. A
+column with the same list of scalars in every row, like `days`, is stored only once. Columns are encoded the same way
+recursively, so nested dicts like a series' `action` become tables too.
+
+The result is still JSON, written with orjson after a header that JSON can't start with. Rebuilding tables happens in
+Python, so decoding only walks the parts of a response that were encoded, anything else is used as orjson parsed it.
+Values without the header are plain JSON, so responses cached before this encoding can still be read.
+"""
+
+from typing import Any
+
+import orjson
+from rest_framework.utils.encoders import JSONEncoder
+
+HEADER = b"\x00phc1"
+
+# Shorter lists of dicts, like the steps of a funnel, are faster to decode as they are than to rebuild from a table
+TABLE_MIN_ROWS = 10
+
+# Markers are dict keys that can't appear in query responses unescaped, see `_pack_dict`
+_TABLE = "\x00t"
+_LIST = "\x00l"
+_SAME = "\x00s"
+_LENGTH = "\x00n"
+_ESCAPED = "\x00e"
+_RAW = "\x00r"
+
+_json_default = JSONEncoder().default
+
+
+def encode_cached_response(response: Any) -> bytes:
+    packed = _pack(response)
+    if packed is response:
+        packed = _raw(response)
+    return HEADER + orjson.dumps(packed, default=_json_default, option=orjson.OPT_UTC_Z)
+
+
+def decode_cached_response(data: bytes) -> Any:
+    if data[: len(HEADER)] == HEADER:
+        return _unpack(orjson.loads(memoryview(data)[len(HEADER) :]))
+    return orjson.loads(data)
+
+
+def _pack(value: Any) -> Any:
+    """Encode the value, returning the value itself when nothing in it needs encoding."""
+    if isinstance(value, dict):
+        return _pack_dict(value)
+    if isinstance(value, list | tuple):
+        return _pack_list(value)
+    return value
+
+
+def _raw(value: Any) -> Any:
+    # Decoding walks dicts looking for markers, unless they are marked as raw. Lists are only walked when encoded.
+    return {_RAW: value} if isinstance(value, dict) else value
+
+
+def _pack_children(items: Any, packed_items: Any) -> Any:
+    return [packed if packed is not item else _raw(item) for item, packed in zip(items, packed_items)]
+
+
+def _pack_dict(value: dict) -> Any:
+    packed = {key: _pack(item) for key, item in value.items()}
+    if any(isinstance(key, str) and key.startswith("\x00") for key in value):
+        return {_ESCAPED: dict(zip(value, _pack_children(value.values(), packed.values())))}
+    if all(packed[key] is item for key, item in value.items()):
+        return value
+    return dict(zip(value, _pack_children(value.values(), packed.values())))
+
+
+def _pack_list(value: list | tuple) -> Any:
+    if not _has_containers(value):
+        # Lists of scalars are the bulk of the data, they are left as they are
+        return value
+
+    if len(value) >= TABLE_MIN_ROWS and all(isinstance(item, dict) for item in value):
+        keys = list(value[0])
+        if all(isinstance(key, str) for key in keys) and all(list(item) == keys for item in value):
+            return {
+                _TABLE: keys,
+                _LENGTH: len(value),
+                _LIST: [_pack_column([item[key] for item in value]) for key in keys],
+            }
+
+    packed = [_pack(item) for item in value]
+    if all(packed_item is item for packed_item, item in zip(packed, value)):
+        return value
+    return {_LIST: _pack_children(value, packed)}
+
+
+def _pack_column(column: list) -> Any:
+    first = column[0]
+    if isinstance(first, list | tuple):
+        if not _has_containers(first):
+            # Comparing the JSON also tells apart values that are equal in Python, like 1, 1.0 and True
+            first_json = orjson.dumps(first, default=_json_default)
+            if all(
+                isinstance(item, list | tuple) and orjson.dumps(item, default=_json_default) == first_json
+                for item in column
+            ):
+                return {_SAME: first}
+    elif not isinstance(first, dict) and all(type(item) is type(first) and item == first for item in column):
+        return {_SAME: first}
+    return _pack_list(column)
+
+
+def _has_containers(items: list | tuple) -> bool:
+    # Looking at the distinct types only is much faster than looking at every item of a long list
+    return any(issubclass(item_type, dict | list | tuple) for item_type in set(map(type, items)))
+
+
+def _unpack(value: Any) -> Any:
+    if isinstance(value, dict):
+        if _RAW in value:
+            return value[_RAW]
+        if _LIST in value:
+            if _TABLE in value:
+                return _unpack_table(value[_TABLE], value[_LENGTH], value[_LIST])
+            return [_unpack(item) for item in value[_LIST]]
+        if _ESCAPED in value:
+            value = value[_ESCAPED]
+        return {key: _unpack(item) for key, item in value.items()}
+    return value
+
+
+def _unpack_table(keys: list[str], length: int, packed_columns: list) -> list[dict]:
+    rows: list[dict] = [{} for _ in range(length)]
+    for key, packed_column in zip(keys, packed_columns):
+        if isinstance(packed_column, dict) and _SAME in packed_column:
+            same = packed_column[_SAME]
+            if isinstance(same, list):
+                # Every row gets its own copy, so changing one doesn't change the others
+                for row in rows:
+                    row[key] = same.copy()
+            else:
+                for row in rows:
+                    row[key] = same
+        elif isinstance(packed_column, list):
+            # A column that didn't need encoding
+            for row, item in zip(rows, packed_column):
+                row[key] = item
+        else:
+            for row, item in zip(rows, _unpack(packed_column)):
+                row[key] = item
+    return rows
@@ -1,3 +1,4 @@
+from collections.abc import Iterator, Sequence
 from typing import TYPE_CHECKING, Any, Optional, Union
 
 import structlog
@@ -39,6 +40,7 @@ from posthog.types import FilterType
 
 if TYPE_CHECKING:
     from posthog.caching.fetch_from_cache import InsightResult
+    from posthog.hogql_queries.query_runner import QueryRunner
 
 CACHE_TYPE_TO_INSIGHT_CLASS = {
     CacheType.TRENDS: Trends,
@@ -110,7 +112,6 @@ def calculate_for_query_based_insight(
     insight: Insight, *, dashboard: Optional[Dashboard] = None, refresh_requested: bool
 ) -> "InsightResult":
     from posthog.api.services.query import process_query, ExecutionMode
-    from posthog.caching.fetch_from_cache import InsightResult, NothingInCacheResult
 
     tag_queries(team_id=insight.team_id, insight_id=insight.pk)
     if dashboard:
@@ -127,6 +128,69 @@ def calculate_for_query_based_insight(
         else ExecutionMode.CACHE_ONLY_NEVER_CALCULATE,
     )
 
+    return _insight_result_from_response(response)
+
+
+def calculate_for_query_based_insights(
+    insights: Sequence[Insight], *, dashboard: Optional[Dashboard] = None, refresh_requested: bool
+) -> Iterator[tuple[Insight, Union["InsightResult", Exception]]]:
+    """
+    Calculate the results of many query-based insights, e.g. all tiles of a dashboard, yielding each insight with its
+    result as soon as it's available. Cached results come first, and insights that fail yield their exception.
+
+    Queries are run as one batch, see `run_query_runners`. Queries that don't run via a query runner are calculated
+    one by one with `calculate_for_query_based_insight`.
+    """
+    from posthog.hogql_queries.query_runner import ExecutionMode, get_query_runner
+    from posthog.hogql_queries.query_runner_batch import run_query_runners
+    from posthog.schema import QuerySchemaRoot
+
+    batched_insights: list[Insight] = []
+    query_runners: list[QueryRunner] = []
+    query_tags: list[dict[str, Any]] = []
+    for insight in insights:
+        effective_query = insight.get_effective_query(dashboard=dashboard)
+        assert effective_query is not None
+        try:
+            query_runner = get_query_runner(QuerySchemaRoot.model_validate(effective_query).root, insight.team)
+        except ValueError:  # This query doesn't run via query runner, or is invalid
+            try:
+                yield (
+                    insight,
+                    calculate_for_query_based_insight(
+                        insight, dashboard=dashboard, refresh_requested=refresh_requested
+                    ),
+                )
+            except Exception as e:
+                yield insight, e
+            continue
+        batched_insights.append(insight)
+        query_runners.append(query_runner)
+        query_tags.append(
+            {
+                "team_id": insight.team_id,
+                "insight_id": insight.pk,
+                "dashboard_id": dashboard.pk if dashboard else None,
+                "query": effective_query,
+            }
+        )
+
+    for index, response in run_query_runners(
+        query_runners,
+        execution_mode=ExecutionMode.CALCULATION_ALWAYS
+        if refresh_requested
+        else ExecutionMode.CACHE_ONLY_NEVER_CALCULATE,
+        query_tags=query_tags,
+    ):
+        if isinstance(response, Exception):
+            yield batched_insights[index], response
+        else:
+            yield batched_insights[index], _insight_result_from_response(response.model_dump())
+
+
+def _insight_result_from_response(response: dict) -> "InsightResult":
+    from posthog.caching.fetch_from_cache import InsightResult, NothingInCacheResult
+
     if "results" not in response:
         # Translating `CacheMissResponse` to legacy insights shape
         return NothingInCacheResult(cache_key=response.get("cache_key"))
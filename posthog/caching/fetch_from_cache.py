@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from datetime import datetime, timedelta
+from collections.abc import Sequence
 from typing import Any, Optional, Union
 
 from django.utils.timezone import now
@@ -7,10 +8,10 @@ from prometheus_client import Counter
 
 from posthog.caching.calculate_results import calculate_cache_key, calculate_for_filter_based_insight
 from posthog.caching.insight_cache import update_cached_state
+from posthog.caching.results_cache import get_cached_result, get_cached_results
 from posthog.models import DashboardTile, Insight
 from posthog.models.dashboard import Dashboard
 from posthog.schema import QueryTiming
-from posthog.utils import get_safe_cache
 
 insight_cache_read_counter = Counter(
     "posthog_cloud_insight_cache_read",
@@ -42,7 +43,21 @@ class NothingInCacheResult(InsightResult):
     columns: Optional[list] = None
 
 
-def fetch_cached_insight_result(target: Union[Insight, DashboardTile], refresh_frequency: timedelta) -> InsightResult:
+def prefetch_cached_insight_results(targets: Sequence[Union[Insight, DashboardTile]]) -> dict[str, Any]:
+    """
+    Reads the cached values of all these insights in one round trip, to be passed to `fetch_cached_insight_result`.
+    """
+    cache_keys = [cache_key for cache_key in map(calculate_cache_key, targets) if cache_key is not None]
+    if not cache_keys:
+        return {}
+    return get_cached_results(cache_keys)
+
+
+def fetch_cached_insight_result(
+    target: Union[Insight, DashboardTile],
+    refresh_frequency: timedelta,
+    prefetched_results: Optional[dict[str, Any]] = None,
+) -> InsightResult:
     """
     Returns cached value for this insight.
 
@@ -54,7 +69,10 @@ def fetch_cached_insight_result(target: Union[Insight, DashboardTile], refresh_f
     if cache_key is None:
         return NothingInCacheResult(cache_key=None)
 
-    cached_result = get_safe_cache(cache_key)
+    if prefetched_results is not None and cache_key in prefetched_results:
+        cached_result = prefetched_results[cache_key]
+    else:
+        cached_result = get_cached_result(cache_key)
 
     if cached_result is None:
         insight_cache_read_counter.labels("cache_miss").inc()
@@ -4,8 +4,6 @@ from typing import Any, Optional, cast
 from uuid import UUID
 
 import structlog
-from django.conf import settings
-from django.core.cache import cache
 from django.db import connection
 from django.utils.timezone import now
 from prometheus_client import Counter
@@ -13,6 +11,7 @@ from sentry_sdk.api import capture_exception
 from statshog.defaults.django import statsd
 
 from posthog.caching.calculate_results import calculate_for_filter_based_insight
+from posthog.caching.results_cache import set_cached_result
 from posthog.models import Dashboard, Insight, InsightCachingState
 from posthog.models.instance_setting import get_instance_setting
 from posthog.tasks.tasks import update_cache_task
@@ -152,7 +151,7 @@ def update_cached_state(
     result: Any,
     ttl: Optional[int] = None,
 ):
-    cache.set(cache_key, result, ttl if ttl is not None else settings.CACHED_RESULTS_TTL)
+    set_cached_result(cache_key, result, ttl)
     insight_cache_write_counter.inc()
 
     # :TRICKY: We update _all_ states with same cache_key to avoid needless re-calculations and
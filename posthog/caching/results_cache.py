@@ -0,0 +1,111 @@
+"""
+Reading and writing the cached results of insights and queries.
+
+Results are read and written in batches where possible, so a dashboard makes one round trip to Redis for all its
+tiles instead of one per tile. Recently used results can also be kept in process for a few seconds, which saves the
+round trip and the decompression when the same results are requested again, e.g. by everyone opening a dashboard
+at once. That's off unless `RESULTS_CACHE_LOCAL_TTL` is set.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Any, Optional
+
+import structlog
+from django.conf import settings
+from django.core.cache import cache
+from prometheus_client import Counter
+
+from posthog.utils import get_safe_cache
+
+logger = structlog.get_logger(__name__)
+
+RESULTS_CACHE_LOCAL_HIT_COUNTER = Counter(
+    "posthog_results_cache_local_hit_total",
+    "Cached results read from process memory instead of Redis.",
+)
+
+_local_results: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+_local_results_lock = threading.Lock()
+
+
+def get_cached_results(keys: Iterable[str]) -> dict[str, Any]:
+    """Return the cached value of every key, None if it's not in the cache, reading from Redis in one round trip."""
+    results: dict[str, Any] = {}
+    remote_keys: list[str] = []
+    for key in dict.fromkeys(keys):
+        found, value = _get_local(key)
+        if found:
+            RESULTS_CACHE_LOCAL_HIT_COUNTER.inc()
+            results[key] = value
+        else:
+            remote_keys.append(key)
+
+    if remote_keys:
+        try:
+            remote_results = cache.get_many(remote_keys)
+        except Exception as e:
+            # One of the values is probably corrupted, read them one by one so that `get_safe_cache` removes it
+            logger.warn("results_cache_get_many_failed", error=e)
+            remote_results = {key: get_safe_cache(key) for key in remote_keys}
+
+        for key in remote_keys:
+            value = remote_results.get(key)
+            results[key] = value
+            if value is not None:
+                _set_local(key, value)
+
+    return results
+
+
+def get_cached_result(key: str) -> Any:
+    return get_cached_results([key])[key]
+
+
+def set_cached_results(values: dict[str, Any], timeout: Optional[int] = None) -> None:
+    """Write all values to Redis in one round trip."""
+    if not values:
+        return
+    cache.set_many(values, timeout if timeout is not None else settings.CACHED_RESULTS_TTL)
+    for key, value in values.items():
+        _set_local(key, value)
+
+
+def set_cached_result(key: str, value: Any, timeout: Optional[int] = None) -> None:
+    set_cached_results({key: value}, timeout)
+
+
+def clear_local_results() -> None:
+    with _local_results_lock:
+        _local_results.clear()
+
+
+def _get_local(key: str) -> tuple[bool, Any]:
+    if not settings.RESULTS_CACHE_LOCAL_TTL:
+        return False, None
+    with _local_results_lock:
+        entry = _local_results.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del _local_results[key]
+            return False, None
+        _local_results.move_to_end(key)
+    # Bytes can't be changed by the caller, anything else is copied like Redis would
+    return True, value if isinstance(value, bytes) else copy.deepcopy(value)
+
+
+def _set_local(key: str, value: Any) -> None:
+    if not settings.RESULTS_CACHE_LOCAL_TTL:
+        return
+    if not isinstance(value, bytes):
+        value = copy.deepcopy(value)
+    with _local_results_lock:
+        _local_results[key] = (time.monotonic() + settings.RESULTS_CACHE_LOCAL_TTL, value)
+        _local_results.move_to_end(key)
+        while len(_local_results) > settings.RESULTS_CACHE_LOCAL_MAX_ENTRIES:
+            _local_results.popitem(last=False)
@@ -0,0 +1,77 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import orjson
+from django.test import SimpleTestCase
+from parameterized import parameterized
+
+from posthog.caching.cached_response_encoding import decode_cached_response, encode_cached_response
+
+DAYS = ["2024-01-01", "2024-01-02", "2024-01-03"]
+
+
+def trends_series(breakdown_value: str, data: list[int]) -> dict:
+    return {
+        "data": data,
+        "days": DAYS,
+        "labels": ["1-Jan-2024", "2-Jan-2024", "3-Jan-2024"],
+        "count": sum(data),
+        "label": "$pageview",
+        "action": {"id": "$pageview", "type": "events", "order": 0, "math": None, "properties": {}},
+        "breakdown_value": breakdown_value,
+    }
+
+
+class TestCachedResponseEncoding(SimpleTestCase):
+    @parameterized.expand(
+        [
+            ("trends", {"results": [trends_series("Chrome", [1, 2, 3]), trends_series("Safari", [0, 0, 1])]}),
+            ("trends_table", {"results": [trends_series(f"value {i}", [i, 0, i]) for i in range(12)]}),
+            ("funnels", {"results": [[{"order": 0, "count": 10}, {"order": 1, "count": 5}]] * 3}),
+            ("rows", {"results": [[1, "a", None], [2, "b", 1.5]], "columns": ["id", "name", "value"]}),
+            ("empty", {"results": [], "hasMore": False}),
+            ("mixed_list", {"results": [{"a": 1}, {"b": 2}, [3], 4]}),
+            (
+                "equal_but_different_types",
+                {"results": [{"a": 1, "b": [1]}, {"a": True, "b": [True]}, {"a": 1.0, "b": [1.0]}]},
+            ),
+            ("reserved_keys", {"results": [{"\x00t": ["a"], "\x00l": [1], "\x00n": 1}], "\x00e": {"\x00s": 1}}),
+            ("same_nested_lists", {"results": [{"a": [[1]]}, {"a": [[1]]}]}),
+            ("tuples", {"results": [(1, 2), (1, 2)]}),
+            (
+                "table_of_mixed_columns",
+                {"results": [{"a": [{"b": i}], "c": {"\x00r": i}, "d": (1,)} for i in range(10)]},
+            ),
+        ]
+    )
+    def test_round_trip(self, _, response: dict) -> None:
+        # Comparing JSON, as Python considers 1, 1.0 and True equal
+        assert orjson.dumps(decode_cached_response(encode_cached_response(response))) == orjson.dumps(response)
+
+    def test_encodes_tables_compactly(self) -> None:
+        response = {"results": [trends_series(f"value {i}", [i, i, i]) for i in range(100)]}
+
+        encoded = encode_cached_response(response)
+
+        assert len(encoded) < len(orjson.dumps(response)) / 4
+        assert encoded.count(b"2024-01-01") == 1
+
+    def test_rows_do_not_share_lists(self) -> None:
+        results = decode_cached_response(
+            encode_cached_response({"results": [trends_series(f"value {i}", [i]) for i in range(10)]})
+        )["results"]
+
+        results[0]["days"].append("2024-01-04")
+
+        assert results[1]["days"] == DAYS
+
+    def test_encodes_values_like_the_json_serializer(self) -> None:
+        response = {"last_refresh": datetime(2024, 1, 1, tzinfo=ZoneInfo("UTC"))}
+
+        assert decode_cached_response(encode_cached_response(response)) == {"last_refresh": "2024-01-01T00:00:00Z"}
+
+    def test_decodes_plain_json(self) -> None:
+        assert decode_cached_response(orjson.dumps({"results": [1, 2], "is_cached": True})) == {
+            "results": [1, 2],
+            "is_cached": True,
+        }
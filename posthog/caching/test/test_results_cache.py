@@ -0,0 +1,63 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from posthog.caching.results_cache import (
+    clear_local_results,
+    get_cached_result,
+    get_cached_results,
+    set_cached_result,
+    set_cached_results,
+)
+
+
+class TestResultsCache(TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        clear_local_results()
+        self.addCleanup(clear_local_results)
+
+    def test_reads_and_writes_many_at_once(self):
+        with patch.object(cache, "set_many", wraps=cache.set_many) as set_many:
+            set_cached_results({"a": {"result": 1}, "b": b"bytes"})
+        set_many.assert_called_once()
+
+        with patch.object(cache, "get_many", wraps=cache.get_many) as get_many:
+            assert get_cached_results(["a", "b", "c", "a"]) == {"a": {"result": 1}, "b": b"bytes", "c": None}
+        get_many.assert_called_once_with(["a", "b", "c"])
+
+    def test_local_results_are_off_by_default(self):
+        set_cached_result("a", {"result": 1})
+
+        with patch.object(cache, "get_many", wraps=cache.get_many) as get_many:
+            assert get_cached_result("a") == {"result": 1}
+            assert get_cached_result("a") == {"result": 1}
+        assert get_many.call_count == 2
+
+    def test_local_results(self):
+        with self.settings(RESULTS_CACHE_LOCAL_TTL=5, RESULTS_CACHE_LOCAL_MAX_ENTRIES=2):
+            set_cached_results({"a": {"result": 1}, "b": {"result": 2}})
+
+            with patch.object(cache, "get_many", wraps=cache.get_many) as get_many:
+                result = get_cached_result("a")
+                # Callers can't change what other callers get
+                result["result"] = 3
+                assert get_cached_result("a") == {"result": 1}
+            get_many.assert_not_called()
+
+            set_cached_result("c", {"result": 3})
+            with patch.object(cache, "get_many", wraps=cache.get_many) as get_many:
+                # "b" was least recently used
+                assert get_cached_results(["a", "b", "c"]) == {
+                    "a": {"result": 1},
+                    "b": {"result": 2},
+                    "c": {"result": 3},
+                }
+            get_many.assert_called_once_with(["b"])
+
+            with patch("posthog.caching.results_cache.time.monotonic", return_value=10**12):
+                with patch.object(cache, "get_many", wraps=cache.get_many) as get_many:
+                    assert get_cached_result("c") == {"result": 3}
+                get_many.assert_called_once_with(["c"])
@@ -1,3 +1,5 @@
+import random
+
 from django.test import TestCase
 from parameterized import parameterized
 
@@ -65,3 +67,16 @@ class TestTolerantZlibCompressor(TestCase):
     def test_the_zlib_compressor_decompression(self, _, setting: bool, input: bytes, output: bytes) -> None:
         with self.settings(USE_REDIS_COMPRESSION=setting):
             assert self.compressor.decompress(input) == output
+
+    def test_does_not_compress_values_that_do_not_get_smaller(self) -> None:
+        incompressible_bytes = random.Random(0).randbytes(2048)
+        with self.settings(USE_REDIS_COMPRESSION=True):
+            assert self.compressor.compress(incompressible_bytes) == incompressible_bytes
+
+    def test_compression_threshold_and_level_are_configurable(self) -> None:
+        with self.settings(USE_REDIS_COMPRESSION=True, REDIS_COMPRESSION_MIN_LENGTH=10_000):
+            assert self.compressor.compress(self.uncompressed_bytes) == self.uncompressed_bytes
+        with self.settings(USE_REDIS_COMPRESSION=True, REDIS_COMPRESSION_LEVEL=1):
+            assert (
+                self.compressor.decompress(self.compressor.compress(self.uncompressed_bytes)) == self.uncompressed_bytes
+            )
@@ -29,13 +29,13 @@ class TolerantZlibCompressor(BaseCompressor):
     This compressor is a tolerant reader and will return the original value if it can't be decompressed.
     """
 
-    # we don't want to compress all values, e.g. feature flag cache in decide is already small
-    min_length = 1024
-    preset = 6
-
     def compress(self, value: bytes) -> bytes:
-        if settings.USE_REDIS_COMPRESSION and len(value) > self.min_length:
-            return zlib.compress(value, self.preset)
+        # we don't want to compress all values, e.g. feature flag cache in decide is already small
+        if settings.USE_REDIS_COMPRESSION and len(value) > settings.REDIS_COMPRESSION_MIN_LENGTH:
+            compressed = zlib.compress(value, settings.REDIS_COMPRESSION_LEVEL)
+            # values that don't compress well are cheaper to store as they are, the reader copes with both
+            if len(compressed) < len(value):
+                return compressed
         return value
 
     def decompress(self, value: bytes) -> bytes:
@@ -1,10 +1,42 @@
-from contextlib import contextmanager
+import threading
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext
 from enum import Enum
 from functools import cache
+from time import perf_counter
+from typing import TYPE_CHECKING, Optional
 
 from clickhouse_driver import Client as SyncClient
 from clickhouse_pool import ChPool
+from clickhouse_pool.pool import TooManyConnections
 from django.conf import settings
+from prometheus_client import Counter, Gauge, Histogram
+
+if TYPE_CHECKING:
+    from posthog.hogql.timings import HogQLTimings
+
+CLICKHOUSE_POOL_CONNECTIONS_IN_USE = Gauge(
+    "clickhouse_pool_connections_in_use",
+    "Number of ClickHouse connections checked out of the pool.",
+    labelnames=["pool"],
+)
+CLICKHOUSE_POOL_WAITING = Gauge(
+    "clickhouse_pool_waiting",
+    "Number of queries waiting for a free ClickHouse connection.",
+    labelnames=["pool"],
+)
+CLICKHOUSE_POOL_WAIT_SECONDS = Histogram(
+    "clickhouse_pool_wait_seconds",
+    "Time spent waiting for a free ClickHouse connection.",
+    labelnames=["pool"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, float("inf")),
+)
+CLICKHOUSE_POOL_TIMEOUTS = Counter(
+    "clickhouse_pool_timeouts_total",
+    "Queries that gave up waiting for a free ClickHouse connection.",
+    labelnames=["pool"],
+)
 
 
 class Workload(Enum):
@@ -19,11 +51,12 @@ class Workload(Enum):
 _default_workload = Workload.ONLINE
 
 
-def get_pool(workload: Workload, team_id=None, readonly=False):
+def get_pool(workload: Workload, team_id=None, readonly=False) -> "BoundedChPool":
     """
     Returns the right connection pool given a workload.
 
-    Note that the same pool should be returned every call.
+    Note that the same pool should be returned every call, so that all callers for a (workload, readonly) pair share
+    the same connection limit.
     """
     if team_id is not None and str(team_id) in settings.CLICKHOUSE_PER_TEAM_SETTINGS:
         return make_ch_pool(**settings.CLICKHOUSE_PER_TEAM_SETTINGS[str(team_id)])
@@ -65,8 +98,97 @@ def default_client():
     )
 
 
+class FairSemaphore:
+    """
+    A semaphore that hands freed slots to waiters in arrival order, so that a burst of new queries can't starve
+    queries that have been waiting longer.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.in_use = 0
+        self._waiters: deque[threading.Event] = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        with self._lock:
+            if self.in_use < self.size and not self._waiters:
+                self.in_use += 1
+                return True
+            event = threading.Event()
+            self._waiters.append(event)
+
+        if event.wait(timeout):
+            return True
+
+        with self._lock:
+            # The slot may have been handed over right as we timed out
+            if event.is_set():
+                return True
+            self._waiters.remove(event)
+            return False
+
+    def release(self) -> None:
+        with self._lock:
+            if self._waiters:
+                # Hand the slot over directly, `in_use` stays the same
+                self._waiters.popleft().set()
+            else:
+                self.in_use -= 1
+
+
+class BoundedChPool(ChPool):
+    """
+    ChPool that waits for a free connection instead of failing straight away once `connections_max` is reached.
+    Shared by the sync and asyncio entry points in `posthog.clickhouse.client.execute`.
+    """
+
+    def __init__(self, *, acquire_timeout: Optional[float] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.acquire_timeout = acquire_timeout
+        self.name = f"{self.connection_args.get('user', 'default')}@{self.connection_args['host']}"
+        self._slots = FairSemaphore(self.connections_max)
+
+    @property
+    def connections_in_use(self) -> int:
+        return self._slots.in_use
+
+    @property
+    def connections_waiting(self) -> int:
+        return self._slots.waiting
+
+    @contextmanager
+    def get_client(self, timings: Optional["HogQLTimings"] = None) -> Iterator[SyncClient]:  # type: ignore[override]
+        start_time = perf_counter()
+        CLICKHOUSE_POOL_WAITING.labels(pool=self.name).inc()
+        try:
+            with timings.measure("connection_wait") if timings is not None else nullcontext():
+                acquired = self._slots.acquire(timeout=self.acquire_timeout)
+        finally:
+            CLICKHOUSE_POOL_WAITING.labels(pool=self.name).dec()
+        CLICKHOUSE_POOL_WAIT_SECONDS.labels(pool=self.name).observe(perf_counter() - start_time)
+
+        if not acquired:
+            CLICKHOUSE_POOL_TIMEOUTS.labels(pool=self.name).inc()
+            raise TooManyConnections(
+                f"Timed out after {self.acquire_timeout}s waiting for one of {self.connections_max} connections"
+            )
+
+        CLICKHOUSE_POOL_CONNECTIONS_IN_USE.labels(pool=self.name).inc()
+        try:
+            with super().get_client() as client:
+                yield client
+        finally:
+            CLICKHOUSE_POOL_CONNECTIONS_IN_USE.labels(pool=self.name).dec()
+            self._slots.release()
+
+
 @cache
-def make_ch_pool(**overrides) -> ChPool:
+def make_ch_pool(**overrides) -> BoundedChPool:
     kwargs = {
         "host": settings.CLICKHOUSE_HOST,
         "database": settings.CLICKHOUSE_DATABASE,
@@ -80,10 +202,11 @@ def make_ch_pool(**overrides) -> ChPool:
         "settings": {"mutations_sync": "1"} if settings.TEST else {},
         # Without this, OPTIMIZE table and other queries will regularly run into timeouts
         "send_receive_timeout": 30 if settings.TEST else 999_999_999,
+        "acquire_timeout": settings.CLICKHOUSE_CONN_POOL_ACQUIRE_TIMEOUT,
         **overrides,
     }
 
-    return ChPool(**kwargs)
+    return BoundedChPool(**kwargs)
 
 
 @contextmanager
@@ -1,11 +1,12 @@
+import asyncio
 import json
 import threading
 import types
 from contextlib import contextmanager
 from functools import lru_cache
 from time import perf_counter
-from typing import Any, Optional, Union
-from collections.abc import Sequence
+from typing import TYPE_CHECKING, Any, Optional, Union
+from collections.abc import Iterator, Sequence
 
 import sqlparse
 from clickhouse_driver import Client as SyncClient
@@ -14,11 +15,14 @@ from statshog.defaults.django import statsd
 
 from posthog.clickhouse.client.connection import Workload, get_pool
 from posthog.clickhouse.client.escape import substitute_params
-from posthog.clickhouse.query_tagging import get_query_tag_value, get_query_tags
+from posthog.clickhouse.query_tagging import get_query_tag_value, get_query_tags, reset_query_tags, tag_queries
 from posthog.errors import wrap_query_error
 from posthog.settings import TEST
 from posthog.utils import generate_short_id, patchable
 
+if TYPE_CHECKING:
+    from posthog.hogql.timings import HogQLTimings
+
 InsertParams = Union[list, tuple, types.GeneratorType]
 NonInsertParams = dict[str, Any]
 QueryArgs = Optional[Union[InsertParams, NonInsertParams]]
@@ -79,6 +83,7 @@ def sync_execute(
     workload: Workload = Workload.DEFAULT,
     team_id: Optional[int] = None,
     readonly=False,
+    timings: Optional["HogQLTimings"] = None,
 ):
     if TEST and flush:
         try:
@@ -88,7 +93,7 @@ def sync_execute(
         except ModuleNotFoundError:  # when we run plugin server tests it tries to run above, ignore
             pass
 
-    with get_pool(workload, team_id, readonly).get_client() as client:
+    with get_pool(workload, team_id, readonly).get_client(timings=timings) as client:
         start_time = perf_counter()
 
         prepared_sql, prepared_args, tags = _prepare_query(client=client, query=query, args=args, workload=workload)
@@ -128,6 +133,115 @@ def sync_execute(
     return result
 
 
+def sync_execute_iter(
+    query,
+    args=None,
+    settings=None,
+    *,
+    chunk_size: int = 10_000,
+    workload: Workload = Workload.DEFAULT,
+    team_id: Optional[int] = None,
+    readonly=False,
+    timings: Optional["HogQLTimings"] = None,
+) -> Iterator[Any]:
+    """
+    Streams query results instead of loading them all into memory, like `clickhouse_driver.Client.execute_iter`.
+    Yields the column types first, then lists of up to `chunk_size` rows.
+
+    The connection stays checked out of the pool until the generator is exhausted or closed.
+    """
+    if TEST:
+        try:
+            from posthog.test.base import flush_persons_and_events
+
+            flush_persons_and_events()
+        except ModuleNotFoundError:  # when we run plugin server tests it tries to run above, ignore
+            pass
+
+    with get_pool(workload, team_id, readonly).get_client(timings=timings) as client:
+        start_time = perf_counter()
+
+        prepared_sql, prepared_args, tags = _prepare_query(client=client, query=query, args=args, workload=workload)
+        query_id = validated_client_query_id()
+        core_settings = {**default_settings(), "max_block_size": chunk_size, **(settings or {})}
+        tags["query_settings"] = core_settings
+        settings = {
+            **core_settings,
+            "log_comment": json.dumps(tags, separators=(",", ":")),
+        }
+        try:
+            rows = client.execute_iter(
+                prepared_sql,
+                params=prepared_args,
+                settings=settings,
+                with_column_types=True,
+                query_id=query_id,
+            )
+            yield next(rows)
+
+            chunk: list = []
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+        except GeneratorExit:
+            # The rest of the result is still on the wire, so this connection can't be reused
+            client.disconnect()
+            raise
+        except Exception as e:
+            err = wrap_query_error(e)
+            statsd.incr(
+                "clickhouse_sync_execution_failure",
+                tags={"failed": True, "reason": type(err).__name__},
+            )
+
+            raise err from e
+        finally:
+            statsd.timing("clickhouse_sync_execution_iter_time", (perf_counter() - start_time) * 1000.0)
+
+
+async def async_execute(
+    query,
+    args=None,
+    settings=None,
+    with_column_types=False,
+    flush=True,
+    *,
+    workload: Workload = Workload.DEFAULT,
+    team_id: Optional[int] = None,
+    readonly=False,
+    timings: Optional["HogQLTimings"] = None,
+):
+    """
+    asyncio entry point for `sync_execute`. The query runs in a worker thread, sharing the same bounded connection
+    pool as synchronous callers, so it never blocks the event loop while waiting for a connection or for ClickHouse.
+    """
+    query_tags = get_query_tags().copy()
+
+    def execute_with_tags():
+        # Query tags are thread-local, carry them over to the worker thread
+        tag_queries(**query_tags)
+        try:
+            return sync_execute(
+                query,
+                args,
+                settings,
+                with_column_types,
+                flush,
+                workload=workload,
+                team_id=team_id,
+                readonly=readonly,
+                timings=timings,
+            )
+        finally:
+            reset_query_tags()
+
+    return await asyncio.to_thread(execute_with_tags)
+
+
 def query_with_columns(
     query: str,
     args: Optional[QueryArgs] = None,
@@ -1,11 +1,20 @@
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
 import pytest
+from clickhouse_pool.pool import TooManyConnections
 
 from posthog.clickhouse.client.connection import (
+    BoundedChPool,
     Workload,
     get_pool,
     make_ch_pool,
     set_default_clickhouse_workload_type,
 )
+from posthog.clickhouse.client.execute import async_execute, sync_execute_iter
+from posthog.hogql.timings import HogQLTimings
 
 
 def test_connection_pool_creation_without_offline_cluster(settings):
@@ -51,6 +60,174 @@ def test_connection_pool_creation_with_team_id(settings):
     assert team_pool.connection_args["host"] == "clicky"
 
 
+class FakeClickHouseServer:
+    """Stands in for ClickHouse: clients block on `execute` until the server is released."""
+
+    def __init__(self):
+        self.released = threading.Event()
+        self.released.set()
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak_running = 0
+        self.executed: list[str] = []
+        self.streamed_rows = 0
+        self.clients: list = []
+
+    def client_class(self):
+        server = self
+
+        class FakeClient:
+            def __init__(self, **kwargs):
+                self.connection = type("FakeConnection", (), {"connected": True})()
+                server.clients.append(self)
+
+            def execute(self, query, *args, **kwargs):
+                with server.lock:
+                    server.running += 1
+                    server.peak_running = max(server.peak_running, server.running)
+                server.released.wait()
+                with server.lock:
+                    server.running -= 1
+                    server.executed.append(query)
+                return [(1,)]
+
+            def execute_iter(self, query, *args, **kwargs):
+                server.executed.append(query)
+                yield [("number", "UInt64")]
+                yield from ((number,) for number in range(server.streamed_rows))
+
+            def disconnect(self):
+                self.connection.connected = False
+
+        return FakeClient
+
+
+@pytest.fixture
+def fake_clickhouse():
+    server = FakeClickHouseServer()
+    with patch("clickhouse_pool.pool.Client", server.client_class()):
+        yield server
+
+
+def test_bounded_pool_waits_for_free_connection(fake_clickhouse):
+    pool = BoundedChPool(host="fake", connections_min=0, connections_max=2, acquire_timeout=5)
+    acquired = threading.Event()
+
+    def use_third_connection():
+        with pool.get_client():
+            acquired.set()
+
+    with pool.get_client(), pool.get_client():
+        assert pool.connections_in_use == 2
+        thread = threading.Thread(target=use_third_connection)
+        thread.start()
+        _wait_until(lambda: pool.connections_waiting == 1)
+        assert not acquired.is_set()
+
+    thread.join(timeout=5)
+    assert acquired.is_set()
+    assert pool.connections_in_use == 0
+
+
+def test_bounded_pool_times_out(fake_clickhouse):
+    pool = BoundedChPool(host="fake", connections_min=0, connections_max=1, acquire_timeout=0.05)
+
+    with pool.get_client():
+        with pytest.raises(TooManyConnections):
+            with pool.get_client():
+                pass
+
+    assert pool.connections_waiting == 0
+    with pool.get_client():
+        assert pool.connections_in_use == 1
+
+
+def test_bounded_pool_is_fair(fake_clickhouse):
+    pool = BoundedChPool(host="fake", connections_min=0, connections_max=1, acquire_timeout=5)
+    order: list[int] = []
+
+    def wait_for_connection(index: int):
+        with pool.get_client():
+            order.append(index)
+
+    threads = []
+    with pool.get_client():
+        for index in range(5):
+            thread = threading.Thread(target=wait_for_connection, args=(index,))
+            thread.start()
+            threads.append(thread)
+            _wait_until(lambda expected=index + 1: pool.connections_waiting == expected)
+
+    for thread in threads:
+        thread.join(timeout=5)
+    assert order == [0, 1, 2, 3, 4]
+
+
+def test_bounded_pool_measures_wait_time(fake_clickhouse):
+    pool = BoundedChPool(host="fake", connections_min=0, connections_max=1, acquire_timeout=5)
+    timings = HogQLTimings()
+
+    with pool.get_client(timings=timings):
+        pass
+
+    assert "./connection_wait" in timings.to_dict()
+
+
+def test_async_execute_shares_pool_limit(fake_clickhouse):
+    pool = BoundedChPool(host="fake", connections_min=0, connections_max=2, acquire_timeout=5)
+    fake_clickhouse.released.clear()
+
+    async def run_queries():
+        tasks = [asyncio.create_task(async_execute(f"SELECT {i}", flush=False)) for i in range(6)]
+        await asyncio.sleep(0.1)
+        # The event loop isn't blocked while queries wait for a connection
+        assert pool.connections_in_use == 2
+        fake_clickhouse.released.set()
+        return await asyncio.gather(*tasks)
+
+    with patch("posthog.clickhouse.client.execute.get_pool", return_value=pool):
+        results = asyncio.run(run_queries())
+
+    assert results == [[(1,)]] * 6
+    assert fake_clickhouse.peak_running == 2
+    assert len(fake_clickhouse.executed) == 6
+
+
+def test_sync_execute_iter_streams_chunks(fake_clickhouse):
+    pool = BoundedChPool(host="fake", connections_min=0, connections_max=1, acquire_timeout=5)
+    fake_clickhouse.streamed_rows = 25
+
+    with patch("posthog.clickhouse.client.execute.get_pool", return_value=pool):
+        rows = sync_execute_iter("SELECT number FROM numbers(25)", chunk_size=10)
+        assert next(rows) == [("number", "UInt64")]
+        assert pool.connections_in_use == 1
+        assert [len(chunk) for chunk in rows] == [10, 10, 5]
+
+    assert pool.connections_in_use == 0
+
+
+def test_sync_execute_iter_disconnects_when_closed_early(fake_clickhouse):
+    pool = BoundedChPool(host="fake", connections_min=0, connections_max=1, acquire_timeout=5)
+    fake_clickhouse.streamed_rows = 25
+
+    with patch("posthog.clickhouse.client.execute.get_pool", return_value=pool):
+        rows = sync_execute_iter("SELECT number FROM numbers(25)", chunk_size=10)
+        next(rows)
+        next(rows)
+        rows.close()
+
+    # The rest of the result is still on the wire, so the connection can't be reused
+    assert not fake_clickhouse.clients[-1].connection.connected
+    assert pool.connections_in_use == 0
+
+
+def _wait_until(condition, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.001)
+
+
 @pytest.fixture(autouse=True)
 def reset_state():
     make_ch_pool.cache_clear()
@@ -0,0 +1,14 @@
+from posthog.clickhouse.client.migration_tools import run_sql_with_exceptions
+from posthog.models.events_rollup.sql import (
+    DISTRIBUTED_EVENTS_ROLLUP_TABLE_SQL,
+    EVENTS_ROLLUP_TABLE_MV_SQL,
+    EVENTS_ROLLUP_TABLE_SQL,
+    WRITABLE_EVENTS_ROLLUP_TABLE_SQL,
+)
+
+operations = [
+    run_sql_with_exceptions(WRITABLE_EVENTS_ROLLUP_TABLE_SQL),
+    run_sql_with_exceptions(DISTRIBUTED_EVENTS_ROLLUP_TABLE_SQL),
+    run_sql_with_exceptions(EVENTS_ROLLUP_TABLE_SQL),
+    run_sql_with_exceptions(EVENTS_ROLLUP_TABLE_MV_SQL),
+]
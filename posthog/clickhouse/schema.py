@@ -84,6 +84,12 @@ from posthog.models.person_overrides.sql import (
     PERSON_OVERRIDES_CREATE_MATERIALIZED_VIEW_SQL,
     KAFKA_PERSON_OVERRIDES_TABLE_SQL,
 )
+from posthog.models.events_rollup.sql import (
+    EVENTS_ROLLUP_TABLE_SQL,
+    EVENTS_ROLLUP_TABLE_MV_SQL,
+    WRITABLE_EVENTS_ROLLUP_TABLE_SQL,
+    DISTRIBUTED_EVENTS_ROLLUP_TABLE_SQL,
+)
 from posthog.models.sessions.sql import (
     SESSIONS_TABLE_SQL,
     SESSIONS_TABLE_MV_SQL,
@@ -126,6 +132,7 @@ CREATE_MERGETREE_TABLE_QUERIES = (
     CHANNEL_DEFINITION_TABLE_SQL,
     SESSIONS_TABLE_SQL,
     HEATMAPS_TABLE_SQL,
+    EVENTS_ROLLUP_TABLE_SQL,
 )
 CREATE_DISTRIBUTED_TABLE_QUERIES = (
     WRITABLE_EVENTS_TABLE_SQL,
@@ -141,6 +148,8 @@ CREATE_DISTRIBUTED_TABLE_QUERIES = (
     DISTRIBUTED_SESSIONS_TABLE_SQL,
     WRITABLE_HEATMAPS_TABLE_SQL,
     DISTRIBUTED_HEATMAPS_TABLE_SQL,
+    WRITABLE_EVENTS_ROLLUP_TABLE_SQL,
+    DISTRIBUTED_EVENTS_ROLLUP_TABLE_SQL,
 )
 CREATE_KAFKA_TABLE_QUERIES = (
     KAFKA_LOG_ENTRIES_TABLE_SQL,
@@ -178,6 +187,7 @@ CREATE_MV_TABLE_QUERIES = (
     SESSION_REPLAY_EVENTS_TABLE_MV_SQL,
     SESSIONS_TABLE_MV_SQL,
     HEATMAPS_TABLE_MV_SQL,
+    EVENTS_ROLLUP_TABLE_MV_SQL,
 )
 
 CREATE_TABLE_QUERIES = (
@@ -142,7 +142,9 @@ class HeatmapViewSet(TeamAndOrgViewSetMixin, viewsets.GenericViewSet):
 
         stmt = parse_select(raw_query, {"aggregation_count": aggregation_count, "predicates": ast.And(exprs=exprs)})
         context = HogQLContext(team_id=self.team.pk, limit_top_select=False)
-        results = execute_hogql_query(query=stmt, team=self.team, limit_context=LimitContext.HEATMAPS, context=context)
+        results = execute_hogql_query(
+            query=stmt, team=self.team, limit_context=LimitContext.HEATMAPS, context=context, include_hogql=False
+        )
 
         if is_scrolldepth_query:
             return self._return_scroll_depth_response(results)
@@ -1,4 +1,8 @@
+import threading
+from collections import OrderedDict
 from copy import copy, deepcopy
+from functools import cached_property, lru_cache
+from time import monotonic
 from typing import Optional, cast
 from collections.abc import Callable
 from posthog.hogql.context import HogQLContext
@@ -20,13 +24,14 @@ from posthog.hogql.database.models import (
 )
 from posthog.hogql.filters import replace_filters
 from posthog.hogql.functions.mapping import ALL_EXPOSED_FUNCTION_NAMES
+from posthog.hogql.modifiers import create_default_modifiers_for_team
 from posthog.hogql.parser import parse_select
 from posthog.hogql import ast
 from posthog.hogql.base import AST, CTE, ConstantType
 from posthog.hogql.resolver import resolve_types
 from posthog.hogql.timings import HogQLTimings
-from posthog.hogql.visitor import TraversingVisitor
-from posthog.models.property_definition import PropertyDefinition
+from posthog.hogql.visitor import TraversingVisitor, clone_expr
+from posthog.models.property_definition import PropertyDefinition, get_property_type_map
 from posthog.models.team.team import Team
 from posthog.schema import (
     HogQLAutocomplete,
@@ -107,6 +112,16 @@ def convert_field_or_table_to_type_string(field_or_table: FieldOrTable) -> str |
     return None
 
 
+class SelectedFieldsTable(Table):
+    """The fields a subquery or CTE selects from a table"""
+
+    table_name: str
+
+    def to_printed_hogql(self):
+        # Use the base table name for resolving property definitions later
+        return self.table_name
+
+
 def get_table(context: HogQLContext, join_expr: ast.JoinExpr, ctes: Optional[dict[str, CTE]]) -> None | Table:
     assert context.database is not None
 
@@ -142,17 +157,8 @@ def get_table(context: HogQLContext, join_expr: ast.JoinExpr, ctes: Optional[dic
 
                 new_fields[name] = table.fields[underlying_field_name]
 
-            table_name = table.to_printed_hogql()
-
             # Return a new table with a reduced field set
-            class AnonTable(Table):
-                fields: dict[str, FieldOrTable] = new_fields
-
-                def to_printed_hogql(self):
-                    # Use the base table name for resolving property definitions later
-                    return table_name
-
-            return AnonTable()
+            return SelectedFieldsTable(fields=new_fields, table_name=table.to_printed_hogql())
         except Exception:
             return None
 
@@ -248,14 +254,19 @@ def append_table_field_to_response(table: Table, suggestions: list[AutocompleteC
         details.append(convert_field_or_table_to_type_string(field_or_table))
 
     extend_responses(keys=keys, suggestions=suggestions, details=details)
+    suggestions.extend(get_function_suggestions())
 
-    available_functions = ALL_EXPOSED_FUNCTION_NAMES
+
+@lru_cache(maxsize=1)
+def get_function_suggestions() -> list[AutocompleteCompletionItem]:
+    suggestions: list[AutocompleteCompletionItem] = []
     extend_responses(
-        available_functions,
+        ALL_EXPOSED_FUNCTION_NAMES,
         suggestions,
         Kind.Function,
         insert_text=lambda key: f"{key}()",
     )
+    return suggestions
 
 
 def extend_responses(
@@ -280,6 +291,109 @@ def extend_responses(
 
 MATCH_ANY_CHARACTER = "$$_POSTHOG_ANY_$$"
 PROPERTY_DEFINITION_LIMIT = 220
+# How long the schema of a team is reused across keystrokes. Warehouse tables or group types added in the meantime show
+# up once it expires. Property definitions are cached separately, and show up right away.
+AUTOCOMPLETE_SCHEMA_TTL = 60
+# Parsed queries kept per team, as the same text is parsed again whenever only the cursor moves
+AUTOCOMPLETE_PARSE_CACHE_SIZE = 32
+# Tables resolved per team before starting over, as subqueries and CTEs resolve to new tables on every keystroke
+AUTOCOMPLETE_TABLE_CACHE_SIZE = 500
+
+
+class AutocompleteSchema:
+    """
+    The database of a team, with what autocomplete suggests for it worked out once and reused across keystrokes.
+
+    Creating the database queries Postgres, resolving field traversers copies whole tables, and the suggestions for a
+    table include hundreds of functions. None of that changes between keystrokes, unlike the query being typed.
+    """
+
+    def __init__(self, database: Database, context: HogQLContext):
+        self.database = database
+        self.context = context
+        self.created_at = monotonic()
+        # Keyed by id(), holding on to the key's object so that the id can't be reused
+        self._resolved_tables: dict[int, tuple[Table, Table]] = {}
+        self._field_suggestions: dict[int, tuple[Table, list[AutocompleteCompletionItem]]] = {}
+        self._parsed_queries: OrderedDict[str, ast.SelectQuery | ast.SelectUnionQuery | Exception] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @cached_property
+    def table_suggestions(self) -> list[AutocompleteCompletionItem]:
+        table_names = self.database.get_all_tables()
+        suggestions: list[AutocompleteCompletionItem] = []
+        extend_responses(
+            keys=table_names, suggestions=suggestions, kind=Kind.Folder, details=["Table"] * len(table_names)
+        )
+        return suggestions
+
+    def parse_select(self, query: str) -> ast.SelectQuery | ast.SelectUnionQuery:
+        """Parses the query, or copies the parse from last time, as resolving types changes the AST in place."""
+        with self._lock:
+            parsed = self._parsed_queries.get(query)
+            if parsed is not None:
+                self._parsed_queries.move_to_end(query)
+        if parsed is None:
+            try:
+                parsed = parse_select(query)
+            except Exception as e:
+                # Queries being typed mostly don't parse, so remember that too
+                parsed = e
+            with self._lock:
+                self._parsed_queries[query] = parsed
+                if len(self._parsed_queries) > AUTOCOMPLETE_PARSE_CACHE_SIZE:
+                    self._parsed_queries.popitem(last=False)
+        if isinstance(parsed, Exception):
+            raise parsed.with_traceback(None)
+        return clone_expr(parsed)
+
+    def resolve_table_field_traversers(self, table: Table) -> Table:
+        cached = self._resolved_tables.get(id(table))
+        if cached is not None and cached[0] is table:
+            return cached[1]
+        resolved_table = resolve_table_field_traversers(table, self.context)
+        self._cache(self._resolved_tables, table, resolved_table)
+        return resolved_table
+
+    def field_suggestions(self, table: Table) -> list[AutocompleteCompletionItem]:
+        cached = self._field_suggestions.get(id(table))
+        if cached is not None and cached[0] is table:
+            return cached[1]
+        suggestions: list[AutocompleteCompletionItem] = []
+        append_table_field_to_response(table=table, suggestions=suggestions)
+        self._cache(self._field_suggestions, table, suggestions)
+        return suggestions
+
+    def _cache(self, cache: dict, table: Table, value) -> None:
+        with self._lock:
+            if len(cache) >= AUTOCOMPLETE_TABLE_CACHE_SIZE:
+                cache.clear()
+            cache[id(table)] = (table, value)
+
+
+_autocomplete_schemas: dict[tuple[int, str], AutocompleteSchema] = {}
+_autocomplete_schemas_lock = threading.Lock()
+
+
+def get_autocomplete_schema(team: Team) -> AutocompleteSchema:
+    modifiers = create_default_modifiers_for_team(team)
+    key = (team.pk, modifiers.model_dump_json())
+    with _autocomplete_schemas_lock:
+        schema = _autocomplete_schemas.get(key)
+        if schema is not None and monotonic() - schema.created_at < AUTOCOMPLETE_SCHEMA_TTL:
+            return schema
+
+    database = create_hogql_database(team_id=team.pk, modifiers=modifiers, team_arg=team)
+    schema = AutocompleteSchema(database, HogQLContext(team_id=team.pk, team=team, database=database))
+    with _autocomplete_schemas_lock:
+        # Drop expired schemas of all teams, so that teams no longer typing don't keep theirs around
+        now = monotonic()
+        for expired_key in [
+            k for k, s in _autocomplete_schemas.items() if now - s.created_at >= AUTOCOMPLETE_SCHEMA_TTL
+        ]:
+            del _autocomplete_schemas[expired_key]
+        _autocomplete_schemas[key] = schema
+    return schema
 
 
 # TODO: Support ast.SelectUnionQuery nodes
@@ -290,11 +404,11 @@ def get_hogql_autocomplete(
     timings = HogQLTimings()
 
     if database_arg is not None:
-        database = database_arg
+        schema = AutocompleteSchema(database_arg, HogQLContext(team_id=team.pk, team=team, database=database_arg))
     else:
-        database = create_hogql_database(team_id=team.pk, team_arg=team)
-
-    context = HogQLContext(team_id=team.pk, team=team, database=database)
+        with timings.measure("schema"):
+            schema = get_autocomplete_schema(team)
+    context = schema.context
 
     original_query_select = copy(query.select)
     original_end_position = copy(query.endPosition)
@@ -314,7 +428,7 @@ def get_hogql_autocomplete(
             query.endPosition = original_end_position + length_to_add
 
             with timings.measure("parse_select"):
-                select_ast = parse_select(query.select)
+                select_ast = schema.parse_select(query.select)
                 if query.filters:
                     try:
                         select_ast = cast(ast.SelectQuery, replace_filters(select_ast, query.filters, team))
@@ -379,11 +493,11 @@ def get_hogql_autocomplete(
                         is_last_part = index >= (chain_len - 2)
 
                         # Replaces all ast.FieldTraverser with the underlying node
-                        last_table = resolve_table_field_traversers(last_table, context)
+                        last_table = schema.resolve_table_field_traversers(last_table)
 
                         if is_last_part:
                             if last_table.fields.get(str(chain_part)) is None:
-                                append_table_field_to_response(table=last_table, suggestions=response.suggestions)
+                                response.suggestions.extend(schema.field_suggestions(last_table))
                                 break
 
                             field = last_table.fields[str(chain_part)]
@@ -403,27 +517,24 @@ def get_hogql_autocomplete(
                                     if match_term == MATCH_ANY_CHARACTER:
                                         match_term = ""
 
-                                    with timings.measure("property_filter"):
-                                        property_query = PropertyDefinition.objects.filter(
-                                            name__contains=match_term,
-                                            team_id=team.pk,
-                                            type=property_type,
-                                        )
-
-                                    with timings.measure("property_count"):
-                                        total_property_count = property_query.count()
+                                    with timings.measure("property_type_map"):
+                                        property_type_map = get_property_type_map(team.pk)
 
-                                    with timings.measure("property_get_values"):
-                                        properties = property_query[:PROPERTY_DEFINITION_LIMIT].values(
-                                            "name", "property_type"
+                                    with timings.measure("property_filter"):
+                                        # One more than the limit, to know whether the list is complete
+                                        properties = property_type_map.search(
+                                            property_type, match_term, limit=PROPERTY_DEFINITION_LIMIT + 1
                                         )
 
                                     extend_responses(
-                                        keys=[prop["name"] for prop in properties],
+                                        keys=[name for name, _ in properties[:PROPERTY_DEFINITION_LIMIT]],
                                         suggestions=response.suggestions,
-                                        details=[prop["property_type"] for prop in properties],
+                                        details=[
+                                            definition_type
+                                            for _, definition_type in properties[:PROPERTY_DEFINITION_LIMIT]
+                                        ],
                                     )
-                                    response.incomplete_list = total_property_count > PROPERTY_DEFINITION_LIMIT
+                                    response.incomplete_list = len(properties) > PROPERTY_DEFINITION_LIMIT
                             elif isinstance(field, VirtualTable) or isinstance(field, LazyTable):
                                 fields = list(last_table.fields.items())
                                 extend_responses(
@@ -450,13 +561,7 @@ def get_hogql_autocomplete(
                 # Handle table names
                 with timings.measure("table_name"):
                     if len(node.chain) == 1:
-                        table_names = database.get_all_tables()
-                        extend_responses(
-                            keys=table_names,
-                            suggestions=response.suggestions,
-                            kind=Kind.Folder,
-                            details=["Table"] * len(table_names),
-                        )
+                        response.suggestions.extend(schema.table_suggestions)
         except Exception:
             pass
 
@@ -35,6 +35,8 @@ MAX_SELECT_RETURNED_ROWS = 10000  # sync with CSV_EXPORT_LIMIT
 MAX_SELECT_HEATMAPS_LIMIT = 1000000  # 1m datapoints
 # Max limit for all cohort calculations
 MAX_SELECT_COHORT_CALCULATION_LIMIT = 1000000000  # 1b persons
+# Max limit for queries streamed to the client in chunks
+MAX_SELECT_STREAMING_LIMIT = 1000000  # 1m rows
 
 CSV_EXPORT_LIMIT = 10000
 CSV_EXPORT_BREAKDOWN_LIMIT_INITIAL = 512
@@ -50,6 +52,7 @@ class LimitContext(str, Enum):
     EXPORT = "export"
     COHORT_CALCULATION = "cohort_calculation"
     HEATMAPS = "heatmaps"
+    QUERY_STREAMING = "query_streaming"
 
 
 def get_max_limit_for_context(limit_context: LimitContext) -> int:
@@ -61,13 +64,15 @@ def get_max_limit_for_context(limit_context: LimitContext) -> int:
         return MAX_SELECT_HEATMAPS_LIMIT  # 1M
     elif limit_context == LimitContext.COHORT_CALCULATION:
         return MAX_SELECT_COHORT_CALCULATION_LIMIT  # 1b
+    elif limit_context == LimitContext.QUERY_STREAMING:
+        return MAX_SELECT_STREAMING_LIMIT  # 1m
     else:
         raise ValueError(f"Unexpected LimitContext value: {limit_context}")
 
 
 def get_default_limit_for_context(limit_context: LimitContext) -> int:
     """Limit used if no limit is provided"""
-    if limit_context == LimitContext.EXPORT:
+    if limit_context in (LimitContext.EXPORT, LimitContext.QUERY_STREAMING):
         return MAX_SELECT_RETURNED_ROWS  # 10k
     elif limit_context in (LimitContext.QUERY, LimitContext.QUERY_ASYNC):
         return DEFAULT_RETURNED_ROWS  # 100
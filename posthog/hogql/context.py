@@ -51,6 +51,8 @@ class HogQLContext:
     modifiers: HogQLQueryModifiers = field(default_factory=HogQLQueryModifiers)
     # Enables more verbose output for debugging
     debug: bool = False
+    # Properties read from a JSON column because no materialized column exists, as (table, table column, property)
+    unmaterialized_properties: set[tuple[str, str, str]] = field(default_factory=set)
 
     def add_value(self, value: Any) -> str:
         key = f"hogql_val_{len(self.values)}"
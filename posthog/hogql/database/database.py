@@ -1,3 +1,6 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import TYPE_CHECKING, Any, ClassVar, Optional, TypedDict
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from pydantic import ConfigDict, BaseModel
@@ -30,6 +33,7 @@ from posthog.hogql.database.schema.log_entries import (
 )
 from posthog.hogql.database.schema.cohort_people import CohortPeople, RawCohortPeople
 from posthog.hogql.database.schema.events import EventsTable
+from posthog.hogql.database.schema.events_rollup import RawEventsRollupTable
 from posthog.hogql.database.schema.groups import GroupsTable, RawGroupsTable
 from posthog.hogql.database.schema.numbers import NumbersTable
 from posthog.hogql.database.schema.person_distinct_id_overrides import (
@@ -91,6 +95,7 @@ class Database(BaseModel):
     raw_person_distinct_id_overrides: RawPersonDistinctIdOverridesTable = RawPersonDistinctIdOverridesTable()
     raw_person_overrides: RawPersonOverridesTable = RawPersonOverridesTable()
     raw_sessions: RawSessionsTable = RawSessionsTable()
+    raw_events_rollup: RawEventsRollupTable = RawEventsRollupTable()
 
     # system tables
     numbers: NumbersTable = NumbersTable()
@@ -182,6 +187,26 @@ def _use_person_id_from_person_overrides(database: Database, use_distinct_id_ove
         )
 
 
+# Databases created within a `shared_hogql_databases()` block, keyed by team and modifiers
+_shared_databases: ContextVar[Optional[dict[tuple[int, str], "Database"]]] = ContextVar(
+    "shared_hogql_databases", default=None
+)
+
+
+@contextmanager
+def shared_hogql_databases() -> Iterator[None]:
+    """
+    Create the database of a team only once for all queries compiled within this block, e.g. the tiles of a
+    dashboard. The databases are not modified once created, so they can be shared between threads that copied the
+    context of the block.
+    """
+    token = _shared_databases.set({})
+    try:
+        yield
+    finally:
+        _shared_databases.reset(token)
+
+
 def create_hogql_database(
     team_id: int, modifiers: Optional[HogQLQueryModifiers] = None, team_arg: Optional["Team"] = None
 ) -> Database:
@@ -195,6 +220,12 @@ def create_hogql_database(
 
     team = team_arg or Team.objects.get(pk=team_id)
     modifiers = create_default_modifiers_for_team(team, modifiers)
+
+    shared_databases = _shared_databases.get()
+    shared_database_key = (team.pk, modifiers.model_dump_json())
+    if shared_databases is not None and shared_database_key in shared_databases:
+        return shared_databases[shared_database_key]
+
     database = Database(timezone=team.timezone, week_start_day=team.week_start_day)
 
     if modifiers.personsOnEventsMode == PersonsOnEventsMode.disabled:
@@ -345,6 +376,8 @@ def create_hogql_database(
         except Exception as e:
             capture_exception(e)
 
+    if shared_databases is not None:
+        shared_databases[shared_database_key] = database
     return database
 
 
@@ -0,0 +1,30 @@
+from posthog.hogql.database.models import (
+    DatabaseField,
+    DateTimeDatabaseField,
+    FieldOrTable,
+    IntegerDatabaseField,
+    StringDatabaseField,
+    Table,
+)
+
+
+class RawEventsRollupTable(Table):
+    fields: dict[str, FieldOrTable] = {
+        "team_id": IntegerDatabaseField(name="team_id"),
+        "event": StringDatabaseField(name="event"),
+        "hour": DateTimeDatabaseField(name="hour"),
+        "property_name": StringDatabaseField(name="property_name"),
+        "property_value": StringDatabaseField(name="property_value"),
+        "count": IntegerDatabaseField(name="count"),
+        "person_ids": DatabaseField(name="person_ids"),
+    }
+
+    def to_printed_clickhouse(self, context):
+        return "events_rollup"
+
+    def to_printed_hogql(self):
+        return "raw_events_rollup"
+
+    def avoid_asterisk_fields(self) -> list[str]:
+        # our clickhouse driver can't return aggregate states
+        return ["person_ids"]
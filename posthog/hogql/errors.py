@@ -58,6 +58,12 @@ class QueryError(ExposedHogQLError):
     pass
 
 
+class QueryRejectedError(ExposedHogQLError):
+    """The query is valid, but estimated to be too expensive to run now."""
+
+    pass
+
+
 class NotImplementedError(InternalHogQLError):
     """This feature isn't implemented in HogQL (yet)."""
 
@@ -674,6 +674,7 @@ HOGQL_AGGREGATIONS: dict[str, HogQLFunctionMeta] = {
     "uniqIf": HogQLFunctionMeta("uniqIf", 2, None, aggregate=True),
     "uniqExact": HogQLFunctionMeta("uniqExact", 1, None, aggregate=True),
     "uniqExactIf": HogQLFunctionMeta("uniqExactIf", 2, None, aggregate=True),
+    "uniqExactMerge": HogQLFunctionMeta("uniqExactMerge", 1, 1, aggregate=True),
     # "uniqCombined": HogQLFunctionMeta("uniqCombined", 1, 1, aggregate=True),
     # "uniqCombinedIf": HogQLFunctionMeta("uniqCombinedIf", 2, 2, aggregate=True),
     # "uniqCombined64": HogQLFunctionMeta("uniqCombined64", 1, 1, aggregate=True),
@@ -1,11 +1,13 @@
 from django.conf import settings
+from sentry_sdk import capture_exception
 from posthog.hogql.context import HogQLContext
 from posthog.hogql.errors import ExposedHogQLError
 from posthog.hogql.filters import replace_filters
 from posthog.hogql.hogql import translate_hogql
 from posthog.hogql.parser import parse_select
-from posthog.hogql.printer import print_ast
+from posthog.hogql.printer import prepare_ast_for_printing, print_prepared_ast
 from posthog.hogql.query import create_default_modifiers_for_team
+from posthog.hogql.query_cost import estimate_query_cost
 from posthog.hogql_queries.query_runner import get_query_runner
 from posthog.models import Team
 from posthog.schema import HogQLMetadataResponse, HogQLMetadata, HogQLNotice
@@ -49,11 +51,12 @@ def get_hogql_metadata(
                 select_ast = replace_filters(select_ast, query.filters, team)
             _is_valid_view = is_valid_view(select_ast)
             response.isValidView = _is_valid_view
-            print_ast(
-                select_ast,
-                context=context,
-                dialect="clickhouse",
-            )
+            clickhouse_ast = prepare_ast_for_printing(select_ast, context=context, dialect="clickhouse")
+            print_prepared_ast(clickhouse_ast, context=context, dialect="clickhouse")
+            try:
+                response.cost = estimate_query_cost(clickhouse_ast, context, team).to_schema()
+            except Exception as e:
+                capture_exception(e)
         else:
             raise ValueError("Either expr or select must be provided")
         response.warnings = context.warnings
@@ -1,9 +1,14 @@
-from typing import Literal, Optional, cast
-from collections.abc import Callable
+import pickle
+import threading
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from time import perf_counter
+from typing import Any, Literal, Optional, Union, cast
+from collections.abc import Callable, Iterator
 
 from antlr4 import CommonTokenStream, InputStream, ParseTreeVisitor, ParserRuleContext
 from antlr4.error.ErrorListener import ErrorListener
-from prometheus_client import Histogram
+from prometheus_client import Counter, Histogram
 
 from posthog.hogql import ast
 from posthog.hogql.base import AST
@@ -12,7 +17,7 @@ from posthog.hogql.errors import BaseHogQLError, NotImplementedError, SyntaxErro
 from posthog.hogql.grammar.HogQLLexer import HogQLLexer
 from posthog.hogql.grammar.HogQLParser import HogQLParser
 from posthog.hogql.parse_string import parse_string, parse_string_literal
-from posthog.hogql.placeholders import replace_placeholders
+from posthog.hogql.placeholders import ReplacePlaceholders
 from posthog.hogql.timings import HogQLTimings
 from hogql_parser import (
     parse_expr as _parse_expr_cpp,
@@ -43,6 +48,112 @@ RULE_TO_HISTOGRAM: dict[Literal["expr", "order_expr", "select"], Histogram] = {
 }
 
 
+PARSE_CACHE_REQUESTS = Counter(
+    "hogql_parse_cache_requests_total",
+    "Strings parsed, by whether their AST was already in the parse cache",
+    labelnames=["rule", "result"],
+)
+PARSE_CACHE_SECONDS_SAVED = Counter(
+    "hogql_parse_cache_seconds_saved_total",
+    "Time it originally took to parse the strings that were found in the parse cache",
+    labelnames=["rule"],
+)
+
+# Most strings parsed are the query runners' templates, which are the same on every request bar a few values
+PARSE_CACHE_SIZE = 1024
+
+
+# A step from a node to one of its children: an attribute name, a list index, or a dict key
+PathStep = Union[str, int]
+
+
+@dataclass(frozen=True)
+class ParsedTemplate:
+    """
+    A parsed string, shared by everyone who parses it again. Kept pickled, as unpickling is the cheapest way
+    to hand out a fresh copy of the AST, which callers are then free to change.
+    """
+
+    pickled_node: bytes
+    # Where the placeholders are, as paths from the root, so they can be replaced without walking the whole AST
+    placeholder_paths: tuple[tuple[PathStep, ...], ...]
+    parse_seconds: float
+
+    def to_ast(self, placeholders: Optional[dict[str, ast.Expr]] = None) -> ast.Expr:
+        node = pickle.loads(self.pickled_node)
+        if not placeholders:
+            return node
+
+        replacer = ReplacePlaceholders(placeholders)
+        for path in self.placeholder_paths:
+            if not path:
+                return replacer.visit(node)
+            parent = node
+            for step in path[:-1]:
+                parent = getattr(parent, cast(str, step)) if isinstance(parent, AST) else parent[step]
+            if isinstance(parent, AST):
+                setattr(parent, cast(str, path[-1]), replacer.visit(getattr(parent, cast(str, path[-1]))))
+            else:
+                parent[path[-1]] = replacer.visit(parent[path[-1]])
+        return node
+
+
+def _placeholder_paths(node: Any, path: tuple[PathStep, ...] = ()) -> Iterator[tuple[PathStep, ...]]:
+    if isinstance(node, ast.Placeholder):
+        yield path
+    elif isinstance(node, AST):
+        for field in fields(node):
+            if field.name not in ("start", "end", "type"):
+                yield from _placeholder_paths(getattr(node, field.name), (*path, field.name))
+    elif isinstance(node, list):
+        for index, item in enumerate(node):
+            yield from _placeholder_paths(item, (*path, index))
+    elif isinstance(node, dict):
+        for key, value in node.items():
+            yield from _placeholder_paths(value, (*path, key))
+
+
+_parse_cache_state = threading.local()
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_template(
+    backend: Literal["python", "cpp"], rule: Literal["expr", "order_expr", "select"], string: str, start: Optional[int]
+) -> ParsedTemplate:
+    _parse_cache_state.missed = True
+    started_at = perf_counter()
+    with RULE_TO_HISTOGRAM[rule].labels(backend=backend).time():
+        if rule == "expr":
+            node = RULE_TO_PARSE_FUNCTION[backend][rule](string, start)
+        else:
+            node = RULE_TO_PARSE_FUNCTION[backend][rule](string)
+    return ParsedTemplate(
+        pickled_node=pickle.dumps(node, protocol=pickle.HIGHEST_PROTOCOL),
+        placeholder_paths=tuple(_placeholder_paths(node)),
+        parse_seconds=perf_counter() - started_at,
+    )
+
+
+def _parse(
+    backend: Literal["python", "cpp"],
+    rule: Literal["expr", "order_expr", "select"],
+    string: str,
+    start: Optional[int],
+    placeholders: Optional[dict[str, ast.Expr]],
+    timings: HogQLTimings,
+) -> ast.Expr:
+    _parse_cache_state.missed = False
+    template = parse_template(backend, rule, string, start)
+    if _parse_cache_state.missed:
+        PARSE_CACHE_REQUESTS.labels(rule=rule, result="miss").inc()
+    else:
+        PARSE_CACHE_REQUESTS.labels(rule=rule, result="hit").inc()
+        PARSE_CACHE_SECONDS_SAVED.labels(rule=rule).inc(template.parse_seconds)
+
+    with timings.measure("replace_placeholders" if placeholders else "copy"):
+        return template.to_ast(placeholders)
+
+
 def parse_expr(
     expr: str,
     placeholders: Optional[dict[str, ast.Expr]] = None,
@@ -56,12 +167,7 @@ def parse_expr(
     if timings is None:
         timings = HogQLTimings()
     with timings.measure(f"parse_expr_{backend}"):
-        with RULE_TO_HISTOGRAM["expr"].labels(backend=backend).time():
-            node = RULE_TO_PARSE_FUNCTION[backend]["expr"](expr, start)
-        if placeholders:
-            with timings.measure("replace_placeholders"):
-                node = replace_placeholders(node, placeholders)
-    return node
+        return _parse(backend, "expr", expr, start, placeholders, timings)
 
 
 def parse_order_expr(
@@ -76,12 +182,7 @@ def parse_order_expr(
     if timings is None:
         timings = HogQLTimings()
     with timings.measure(f"parse_order_expr_{backend}"):
-        with RULE_TO_HISTOGRAM["order_expr"].labels(backend=backend).time():
-            node = RULE_TO_PARSE_FUNCTION[backend]["order_expr"](order_expr)
-        if placeholders:
-            with timings.measure("replace_placeholders"):
-                node = replace_placeholders(node, placeholders)
-    return node
+        return cast(ast.OrderExpr, _parse(backend, "order_expr", order_expr, None, placeholders, timings))
 
 
 def parse_select(
@@ -96,12 +197,9 @@ def parse_select(
     if timings is None:
         timings = HogQLTimings()
     with timings.measure(f"parse_select_{backend}"):
-        with RULE_TO_HISTOGRAM["select"].labels(backend=backend).time():
-            node = RULE_TO_PARSE_FUNCTION[backend]["select"](statement)
-        if placeholders:
-            with timings.measure("replace_placeholders"):
-                node = replace_placeholders(node, placeholders)
-    return node
+        return cast(
+            ast.SelectQuery | ast.SelectUnionQuery, _parse(backend, "select", statement, None, placeholders, timings)
+        )
 
 
 def get_parser(query: str) -> HogQLParser:
@@ -1024,6 +1024,8 @@ class _Printer(Visitor):
                     property_sql = self._print_identifier(materialized_column)
                     property_sql = f"{self.visit(field_type.table_type)}.{property_sql}"
                     materialized_property_sql = property_sql
+                else:
+                    self._log_unmaterialized_property(table_name, field_name, str(type.chain[0]))
             elif (
                 self.context.within_non_hogql_query
                 and (isinstance(table, ast.SelectQueryAliasType) and table.alias == "events__pdi__person")
@@ -1031,13 +1033,14 @@ class _Printer(Visitor):
             ):
                 # :KLUDGE: Legacy person properties handling. Only used within non-HogQL queries, such as insights.
                 if self.context.modifiers.personsOnEventsMode != PersonsOnEventsMode.disabled:
-                    materialized_column = self._get_materialized_column(
-                        "events", str(type.chain[0]), "person_properties"
-                    )
+                    table_name, field_name = "events", "person_properties"
                 else:
-                    materialized_column = self._get_materialized_column("person", str(type.chain[0]), "properties")
+                    table_name, field_name = "person", "properties"
+                materialized_column = self._get_materialized_column(table_name, str(type.chain[0]), field_name)
                 if materialized_column:
                     materialized_property_sql = self._print_identifier(materialized_column)
+                else:
+                    self._log_unmaterialized_property(table_name, field_name, str(type.chain[0]))
 
             if materialized_property_sql is not None:
                 # TODO: rematerialize all columns to properly support empty strings and "null" string values.
@@ -1193,6 +1196,11 @@ class _Printer(Visitor):
         except ModuleNotFoundError:
             return None
 
+    def _log_unmaterialized_property(self, table_name: str, field_name: str, property_name: str) -> None:
+        # Feeds the materialized column advisor via query tags, see ee/clickhouse/materialized_columns/analyze.py
+        if self.dialect == "clickhouse":
+            self.context.unmaterialized_properties.add((table_name, field_name, property_name))
+
     def _get_timezone(self) -> str:
         return self.context.database.get_timezone() if self.context.database else "UTC"
 
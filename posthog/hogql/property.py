@@ -23,10 +23,12 @@ from posthog.models import (
     PropertyDefinition,
     Team,
 )
+from posthog.models.action.action import ActionStepJSON
+from posthog.models.action.matching import get_action_matcher
 from posthog.models.event import Selector
 from posthog.models.property import PropertyGroup
 from posthog.models.property.util import build_selector_regex
-from posthog.models.property_definition import PropertyType
+from posthog.models.property_definition import PropertyType, get_property_type_map
 from posthog.schema import (
     EmptyPropertyFilter,
     FilterLogicalOperator,
@@ -287,17 +289,10 @@ def property_to_expr(
             and (value == "true" or value == "false")
         ):
             if property.type == "person":
-                property_types = PropertyDefinition.objects.filter(
-                    team=team,
-                    name=property.key,
-                    type=PropertyDefinition.Type.PERSON,
-                )
+                property_type = get_property_type_map(team.pk).get(PropertyDefinition.Type.PERSON, property.key)
             elif property.type == "group":
-                property_types = PropertyDefinition.objects.filter(
-                    team=team,
-                    name=property.key,
-                    type=PropertyDefinition.Type.GROUP,
-                    group_type_index=property.group_type_index,
+                property_type = get_property_type_map(team.pk).get(
+                    PropertyDefinition.Type.GROUP, property.key, group_type_index=property.group_type_index
                 )
             elif property.type == "data_warehouse_person_property":
                 key = chain[-1]
@@ -346,12 +341,7 @@ def property_to_expr(
                 return ast.CompareOperation(op=op, left=field, right=ast.Constant(value=value))
 
             else:
-                property_types = PropertyDefinition.objects.filter(
-                    team=team,
-                    name=property.key,
-                    type=PropertyDefinition.Type.EVENT,
-                )
-            property_type = property_types[0].property_type if len(property_types) > 0 else None
+                property_type = get_property_type_map(team.pk).get(PropertyDefinition.Type.EVENT, property.key)
 
             if property_type == PropertyType.Boolean:
                 if value == "true":
@@ -432,71 +422,75 @@ def action_to_expr(action: Action) -> ast.Expr:
     if len(steps) == 0:
         return ast.Constant(value=True)
 
-    or_queries = []
-    for step in steps:
-        exprs: list[ast.Expr] = []
-        if step.event:
-            exprs.append(parse_expr("event = {event}", {"event": ast.Constant(value=step.event)}))
-
-        if step.event == AUTOCAPTURE_EVENT:
-            if step.selector:
-                exprs.append(selector_to_expr(step.selector))
-            if step.tag_name is not None:
-                exprs.append(tag_name_to_expr(step.tag_name))
-            if step.href is not None:
-                if step.href_matching == "regex":
-                    operator = PropertyOperator.regex
-                elif step.href_matching == "contains":
-                    operator = PropertyOperator.icontains
-                else:
-                    operator = PropertyOperator.exact
-                exprs.append(element_chain_key_filter("href", step.href, operator))
-            if step.text is not None:
-                if step.text_matching == "regex":
-                    operator = PropertyOperator.regex
-                elif step.text_matching == "contains":
-                    operator = PropertyOperator.icontains
-                else:
-                    operator = PropertyOperator.exact
-                exprs.append(element_chain_key_filter("text", step.text, operator))
-
-        if step.url:
-            if step.url_matching == "exact":
-                expr = parse_expr(
-                    "properties.$current_url = {url}",
-                    {"url": ast.Constant(value=step.url)},
-                )
-            elif step.url_matching == "regex":
-                expr = parse_expr(
-                    "properties.$current_url =~ {regex}",
-                    {"regex": ast.Constant(value=step.url)},
-                )
-            else:
-                expr = parse_expr(
-                    "properties.$current_url like {url}",
-                    {"url": ast.Constant(value=f"%{step.url}%")},
-                )
-            exprs.append(expr)
+    or_queries = [action_step_to_expr(step, action.team) for step in steps]
+    if len(or_queries) == 1:
+        return or_queries[0]
+    else:
+        return ast.Or(exprs=or_queries)
 
-        if step.properties:
-            exprs.append(property_to_expr(step.properties, action.team))
 
-        if len(exprs) == 1:
-            or_queries.append(exprs[0])
-        elif len(exprs) > 1:
-            or_queries.append(ast.And(exprs=exprs))
+def action_step_to_expr(step: ActionStepJSON, team: Team) -> ast.Expr:
+    exprs: list[ast.Expr] = []
+    if step.event:
+        exprs.append(parse_expr("event = {event}", {"event": ast.Constant(value=step.event)}))
+
+    if step.event == AUTOCAPTURE_EVENT:
+        if step.selector:
+            exprs.append(selector_to_expr(step.selector))
+        if step.tag_name is not None:
+            exprs.append(tag_name_to_expr(step.tag_name))
+        if step.href is not None:
+            if step.href_matching == "regex":
+                operator = PropertyOperator.regex
+            elif step.href_matching == "contains":
+                operator = PropertyOperator.icontains
+            else:
+                operator = PropertyOperator.exact
+            exprs.append(element_chain_key_filter("href", step.href, operator))
+        if step.text is not None:
+            if step.text_matching == "regex":
+                operator = PropertyOperator.regex
+            elif step.text_matching == "contains":
+                operator = PropertyOperator.icontains
+            else:
+                operator = PropertyOperator.exact
+            exprs.append(element_chain_key_filter("text", step.text, operator))
+
+    if step.url:
+        if step.url_matching == "exact":
+            expr = parse_expr(
+                "properties.$current_url = {url}",
+                {"url": ast.Constant(value=step.url)},
+            )
+        elif step.url_matching == "regex":
+            expr = parse_expr(
+                "properties.$current_url =~ {regex}",
+                {"regex": ast.Constant(value=step.url)},
+            )
         else:
-            or_queries.append(ast.Constant(value=True))
+            expr = parse_expr(
+                "properties.$current_url like {url}",
+                {"url": ast.Constant(value=f"%{step.url}%")},
+            )
+        exprs.append(expr)
 
-    if len(or_queries) == 1:
-        return or_queries[0]
+    if step.properties:
+        exprs.append(property_to_expr(step.properties, team))
+
+    if len(exprs) == 1:
+        return exprs[0]
+    elif len(exprs) > 1:
+        return ast.And(exprs=exprs)
     else:
-        return ast.Or(exprs=or_queries)
+        return ast.Constant(value=True)
 
 
-def entity_to_expr(entity: RetentionEntity, default_event=PAGEVIEW_EVENT) -> ast.Expr:
+def entity_to_expr(entity: RetentionEntity, default_event=PAGEVIEW_EVENT, team: Optional[Team] = None) -> ast.Expr:
     if entity.type == TREND_FILTER_TYPE_ACTIONS and entity.id is not None:
-        action = Action.objects.get(pk=entity.id)
+        if team is not None:
+            action = get_action_matcher(team).get_action(int(entity.id))
+        else:
+            action = Action.objects.get(pk=entity.id)
         return action_to_expr(action)
     elif entity.type == TREND_FILTER_TYPE_EVENTS:
         if entity.id is None:
@@ -1,10 +1,20 @@
 import dataclasses
+from collections.abc import Callable, Iterator
+from functools import cached_property
+from time import perf_counter
 from typing import Optional, Union, cast
 
+from sentry_sdk import capture_exception
+
 from posthog.clickhouse.client.connection import Workload
 from posthog.errors import ExposedCHQueryError
 from posthog.hogql import ast
-from posthog.hogql.constants import HogQLGlobalSettings, LimitContext, get_default_limit_for_context
+from posthog.hogql.constants import (
+    HogQLGlobalSettings,
+    LimitContext,
+    get_default_limit_for_context,
+    get_max_limit_for_context,
+)
 from posthog.hogql.errors import ExposedHogQLError
 from posthog.hogql.hogql import HogQLContext
 from posthog.hogql.modifiers import create_default_modifiers_for_team
@@ -12,48 +22,73 @@ from posthog.hogql.parser import parse_select
 from posthog.hogql.placeholders import replace_placeholders, find_placeholders
 from posthog.hogql.printer import (
     prepare_ast_for_printing,
-    print_ast,
     print_prepared_ast,
 )
+from posthog.hogql.query_cost import (
+    DownsampleQuery,
+    QueryCost,
+    admission_enabled,
+    admit_query,
+    estimate_query_cost,
+)
 from posthog.hogql.filters import replace_filters
 from posthog.hogql.timings import HogQLTimings
 from posthog.hogql.visitor import clone_expr
 from posthog.models.team import Team
 from posthog.clickhouse.query_tagging import tag_queries
 from posthog.client import sync_execute
+from posthog.clickhouse.client.execute import sync_execute_iter
 from posthog.schema import HogQLQueryResponse, HogQLFilters, HogQLQueryModifiers, HogQLMetadata, HogQLMetadataResponse
 
 INCREASED_MAX_EXECUTION_TIME = 600
+# Keeps log_comment in system.query_log small for queries touching lots of properties
+MAX_TAGGED_UNMATERIALIZED_PROPERTIES = 50
+# Rows per chunk when streaming results
+STREAMING_CHUNK_SIZE = 10_000
 
 
-def execute_hogql_query(
+@dataclasses.dataclass
+class PreparedHogQLQuery:
+    """A HogQL query printed for ClickHouse, ready to be sent there. The HogQL text is only printed if asked for."""
+
+    # The query as passed in, if it was a string
+    query: Optional[str]
+    # None if printing failed in debug mode, see `error`
+    clickhouse: Optional[str]
+    columns: list[str]
+    # Holds the values for the placeholders in the printed ClickHouse SQL
+    context: HogQLContext
+    modifiers: HogQLQueryModifiers
+    error: Optional[str] = None
+    # Estimated when admission rules apply, or in debug mode
+    cost: Optional[QueryCost] = None
+    # Prints the query in the HogQL dialect
+    print_hogql: Callable[[], str] = dataclasses.field(default=lambda: "", repr=False)
+
+    @cached_property
+    def hogql(self) -> str:
+        return self.print_hogql()
+
+
+def prepare_hogql_query(
     query: Union[str, ast.SelectQuery, ast.SelectUnionQuery],
     team: Team,
     *,
-    query_type: str = "hogql_query",
     filters: Optional[HogQLFilters] = None,
     placeholders: Optional[dict[str, ast.Expr]] = None,
-    workload: Workload = Workload.ONLINE,
     settings: Optional[HogQLGlobalSettings] = None,
     modifiers: Optional[HogQLQueryModifiers] = None,
     limit_context: Optional[LimitContext] = LimitContext.QUERY,
-    timings: Optional[HogQLTimings] = None,
+    timings: HogQLTimings,
     pretty: Optional[bool] = True,
     context: Optional[HogQLContext] = None,
-) -> HogQLQueryResponse:
-    if timings is None:
-        timings = HogQLTimings()
-
+) -> PreparedHogQLQuery:
     if context is None:
         context = HogQLContext(team_id=team.pk)
 
     query_modifiers = create_default_modifiers_for_team(team, modifiers)
     debug = modifiers is not None and modifiers.debug
     error: Optional[str] = None
-    explain: Optional[list[str]] = None
-    results = None
-    types = None
-    metadata: Optional[HogQLMetadataResponse] = None
 
     with timings.measure("query"):
         if isinstance(query, ast.SelectQuery) or isinstance(query, ast.SelectUnionQuery):
@@ -88,55 +123,60 @@ def execute_hogql_query(
         for one_query in select_queries:
             if one_query.limit is None:
                 one_query.limit = ast.Constant(value=get_default_limit_for_context(limit_context))
+            if limit_context == LimitContext.QUERY_STREAMING:
+                # Streamed results aren't held in memory, so they're not capped by MAX_SELECT_RETURNED_ROWS
+                one_query.limit = ast.Call(
+                    name="min2",
+                    args=[ast.Constant(value=get_max_limit_for_context(limit_context)), one_query.limit],
+                )
+        if limit_context == LimitContext.QUERY_STREAMING:
+            context = dataclasses.replace(context, limit_top_select=False)
 
-    # Get printed HogQL query, and returned columns. Using a cloned query.
+    # Get returned columns, and what's needed to print the HogQL query later. Using a cloned query.
     with timings.measure("hogql"):
-        with timings.measure("prepare_ast"):
-            hogql_query_context = dataclasses.replace(
-                context,
-                # set the team.pk here so someone can't pass a context for a different team 🤷‍️
-                team_id=team.pk,
-                team=team,
-                enable_select_queries=True,
-                timings=timings,
-                modifiers=query_modifiers,
-            )
+        hogql_query_context = dataclasses.replace(
+            context,
+            # set the team.pk here so someone can't pass a context for a different team 🤷‍️
+            team_id=team.pk,
+            team=team,
+            enable_select_queries=True,
+            timings=timings,
+            modifiers=query_modifiers,
+        )
 
-            with timings.measure("clone"):
-                cloned_query = clone_expr(select_query, True)
-            select_query_hogql = cast(
-                ast.SelectQuery,
-                prepare_ast_for_printing(node=cloned_query, context=hogql_query_context, dialect="hogql"),
-            )
+        with timings.measure("clone"):
+            cloned_query = clone_expr(select_query, True)
 
-        with timings.measure("print_ast"):
-            hogql = print_prepared_ast(
-                select_query_hogql, hogql_query_context, "hogql", pretty=pretty if pretty is not None else True
-            )
-            print_columns = []
-            columns_query = (
-                select_query_hogql.select_queries[0]
-                if isinstance(select_query_hogql, ast.SelectUnionQuery)
-                else select_query_hogql
-            )
-            for node in columns_query.select:
-                if isinstance(node, ast.Alias):
-                    print_columns.append(node.alias)
-                else:
-                    print_columns.append(
-                        print_prepared_ast(
-                            node=node,
-                            context=hogql_query_context,
-                            dialect="hogql",
-                            stack=[select_query_hogql],
-                        )
+        print_columns = _aliased_columns(cloned_query)
+        select_query_hogql: Optional[ast.Expr] = None
+        if print_columns is None:
+            # Some columns are named after their expressions, which are only known once the query is resolved
+            with timings.measure("prepare_ast"):
+                select_query_hogql = prepare_ast_for_printing(
+                    node=cloned_query, context=hogql_query_context, dialect="hogql"
+                )
+            with timings.measure("print_ast"):
+                print_columns = _printed_columns(select_query_hogql, hogql_query_context)
+
+    def print_hogql() -> str:
+        nonlocal select_query_hogql
+        with timings.measure("hogql"):
+            if select_query_hogql is None:
+                with timings.measure("prepare_ast"):
+                    select_query_hogql = prepare_ast_for_printing(
+                        node=cloned_query, context=hogql_query_context, dialect="hogql"
                     )
+            with timings.measure("print_ast"):
+                return print_prepared_ast(
+                    select_query_hogql, hogql_query_context, "hogql", pretty=pretty if pretty is not None else True
+                )
 
     settings = settings or HogQLGlobalSettings()
     if limit_context in (LimitContext.EXPORT, LimitContext.COHORT_CALCULATION, LimitContext.QUERY_ASYNC):
         settings.max_execution_time = INCREASED_MAX_EXECUTION_TIME
 
     # Print the ClickHouse SQL query
+    cost: Optional[QueryCost] = None
     with timings.measure("print_ast"):
         try:
             clickhouse_context = dataclasses.replace(
@@ -147,9 +187,20 @@ def execute_hogql_query(
                 enable_select_queries=True,
                 timings=timings,
                 modifiers=query_modifiers,
+                unmaterialized_properties=set(),
+            )
+            clickhouse_query = prepare_ast_for_printing(
+                select_query, context=clickhouse_context, dialect="clickhouse", settings=settings
             )
-            clickhouse_sql = print_ast(
-                select_query,
+            if debug or admission_enabled():
+                with timings.measure("estimate_cost"):
+                    try:
+                        cost = estimate_query_cost(clickhouse_query, clickhouse_context, team)
+                    except Exception as e:
+                        # Better to run the query without an estimate than not at all
+                        capture_exception(e)
+            clickhouse_sql = print_prepared_ast(
+                clickhouse_query,
                 context=clickhouse_context,
                 dialect="clickhouse",
                 settings=settings,
@@ -165,6 +216,89 @@ def execute_hogql_query(
             else:
                 raise e
 
+    return PreparedHogQLQuery(
+        query=query,
+        clickhouse=clickhouse_sql,
+        columns=print_columns,
+        context=clickhouse_context,
+        modifiers=query_modifiers,
+        error=error,
+        cost=cost,
+        print_hogql=print_hogql,
+    )
+
+
+def _aliased_columns(query: ast.SelectQuery | ast.SelectUnionQuery) -> Optional[list[str]]:
+    """Names of the returned columns, if they're all aliased, as then they're known without resolving the query."""
+    columns_query = query.select_queries[0] if isinstance(query, ast.SelectUnionQuery) else query
+    if all(isinstance(node, ast.Alias) for node in columns_query.select):
+        return [cast(ast.Alias, node).alias for node in columns_query.select]
+    return None
+
+
+def _printed_columns(prepared_query: ast.Expr, context: HogQLContext) -> list[str]:
+    columns_query = cast(
+        ast.SelectQuery,
+        prepared_query.select_queries[0] if isinstance(prepared_query, ast.SelectUnionQuery) else prepared_query,
+    )
+    return [
+        node.alias
+        if isinstance(node, ast.Alias)
+        else print_prepared_ast(
+            node=node, context=context, dialect="hogql", stack=[cast(ast.SelectQuery, prepared_query)]
+        )
+        for node in columns_query.select
+    ]
+
+
+def execute_hogql_query(
+    query: Union[str, ast.SelectQuery, ast.SelectUnionQuery],
+    team: Team,
+    *,
+    query_type: str = "hogql_query",
+    filters: Optional[HogQLFilters] = None,
+    placeholders: Optional[dict[str, ast.Expr]] = None,
+    workload: Workload = Workload.ONLINE,
+    settings: Optional[HogQLGlobalSettings] = None,
+    modifiers: Optional[HogQLQueryModifiers] = None,
+    limit_context: Optional[LimitContext] = LimitContext.QUERY,
+    timings: Optional[HogQLTimings] = None,
+    pretty: Optional[bool] = True,
+    context: Optional[HogQLContext] = None,
+    include_hogql: bool = True,
+) -> HogQLQueryResponse:
+    """
+    Runs a HogQL query. Printing the query as HogQL for the response is a pass of its own,
+    so callers that don't return `hogql` to anyone can skip it with `include_hogql=False`.
+    """
+    if timings is None:
+        timings = HogQLTimings()
+
+    debug = modifiers is not None and modifiers.debug
+    explain: Optional[list[str]] = None
+    results = None
+    types = None
+    metadata: Optional[HogQLMetadataResponse] = None
+
+    prepared = prepare_hogql_query(
+        query,
+        team,
+        filters=filters,
+        placeholders=placeholders,
+        settings=settings,
+        modifiers=modifiers,
+        limit_context=limit_context,
+        timings=timings,
+        pretty=pretty,
+        context=context,
+    )
+    clickhouse_sql, clickhouse_context, error = (
+        prepared.clickhouse,
+        prepared.context,
+        prepared.error,
+    )
+    hogql = prepared.hogql if include_hogql or debug else None
+
     if clickhouse_sql is not None:
         timings_dict = timings.to_dict()
         with timings.measure("clickhouse_execute"):
@@ -175,17 +309,25 @@ def execute_hogql_query(
                 has_json_operations="JSONExtract" in clickhouse_sql or "JSONHas" in clickhouse_sql,
                 timings=timings_dict,
                 modifiers={k: v for k, v in modifiers.model_dump().items() if v is not None} if modifiers else {},
+                unmaterialized_properties=sorted(clickhouse_context.unmaterialized_properties)[
+                    :MAX_TAGGED_UNMATERIALIZED_PROPERTIES
+                ],
+                **_cost_tags(prepared.cost),
             )
 
             try:
-                results, types = sync_execute(
-                    clickhouse_sql,
-                    clickhouse_context.values,
-                    with_column_types=True,
-                    workload=workload,
-                    team_id=team.pk,
-                    readonly=True,
-                )
+                with admit_query(prepared.cost, team.pk, workload):
+                    results, types = sync_execute(
+                        clickhouse_sql,
+                        clickhouse_context.values,
+                        with_column_types=True,
+                        workload=workload,
+                        team_id=team.pk,
+                        readonly=True,
+                        timings=timings,
+                    )
+            except DownsampleQuery:
+                raise
             except Exception as e:
                 if debug:
                     results = []
@@ -210,18 +352,116 @@ def execute_hogql_query(
             with timings.measure("metadata"):
                 from posthog.hogql.metadata import get_hogql_metadata
 
-                metadata = get_hogql_metadata(HogQLMetadata(select=hogql, debug=True), team)
+                metadata = get_hogql_metadata(HogQLMetadata(select=prepared.hogql, debug=True), team)
 
     return HogQLQueryResponse(
-        query=query,
+        query=prepared.query,
         hogql=hogql,
         clickhouse=clickhouse_sql,
         error=error,
         timings=timings.to_list(),
         results=results,
-        columns=print_columns,
+        columns=prepared.columns,
         types=types,
-        modifiers=query_modifiers,
+        modifiers=prepared.modifiers,
         explain=explain,
         metadata=metadata,
+        cost=prepared.cost.to_schema() if prepared.cost is not None else None,
     )
+
+
+def _cost_tags(cost: Optional[QueryCost]) -> dict:
+    # Lets estimates be compared with what the query actually read, in query_log
+    if cost is None:
+        return {}
+    return {"estimated_rows": round(cost.estimated_rows), "estimated_cost": round(cost.cost)}
+
+
+@dataclasses.dataclass
+class HogQLQueryStream:
+    """A HogQL query whose results are fetched from ClickHouse in chunks, see `stream_hogql_query`"""
+
+    prepared: PreparedHogQLQuery
+    types: list[tuple[str, str]]
+    timings: HogQLTimings
+    _rows: Iterator[list]
+    row_count: int = 0
+
+    @property
+    def columns(self) -> list[str]:
+        return self.prepared.columns
+
+    def chunks(self) -> Iterator[list]:
+        start_time = perf_counter()
+        try:
+            for chunk in self._rows:
+                self.row_count += len(chunk)
+                yield chunk
+        finally:
+            # Can't use timings.measure() across yields, as other timings may be measured in between
+            self.timings.timings["./clickhouse_stream"] = perf_counter() - start_time
+
+    def close(self) -> None:
+        self._rows.close()
+
+
+def stream_hogql_query(
+    query: Union[str, ast.SelectQuery, ast.SelectUnionQuery],
+    team: Team,
+    *,
+    query_type: str = "hogql_query_stream",
+    filters: Optional[HogQLFilters] = None,
+    placeholders: Optional[dict[str, ast.Expr]] = None,
+    workload: Workload = Workload.ONLINE,
+    settings: Optional[HogQLGlobalSettings] = None,
+    modifiers: Optional[HogQLQueryModifiers] = None,
+    chunk_size: int = STREAMING_CHUNK_SIZE,
+    timings: Optional[HogQLTimings] = None,
+) -> HogQLQueryStream:
+    """
+    Like `execute_hogql_query`, but rows are only fetched from ClickHouse as `chunks()` is iterated, so large results
+    never have to be held in memory. The query is started before returning, so that errors surface here.
+    """
+    if timings is None:
+        timings = HogQLTimings()
+
+    prepared = prepare_hogql_query(
+        query,
+        team,
+        filters=filters,
+        placeholders=placeholders,
+        settings=settings,
+        modifiers=modifiers,
+        limit_context=LimitContext.QUERY_STREAMING,
+        timings=timings,
+    )
+    if prepared.clickhouse is None:
+        raise ExposedHogQLError(prepared.error or "Could not print the query")
+
+    with timings.measure("clickhouse_execute"):
+        tag_queries(
+            team_id=team.pk,
+            query_type=query_type,
+            has_joins="JOIN" in prepared.clickhouse,
+            has_json_operations="JSONExtract" in prepared.clickhouse or "JSONHas" in prepared.clickhouse,
+            timings=timings.to_dict(),
+            modifiers={k: v for k, v in modifiers.model_dump().items() if v is not None} if modifiers else {},
+            unmaterialized_properties=sorted(prepared.context.unmaterialized_properties)[
+                :MAX_TAGGED_UNMATERIALIZED_PROPERTIES
+            ],
+            **_cost_tags(prepared.cost),
+        )
+        # Only covers starting the query, streams are read at the pace of whoever consumes them
+        with admit_query(prepared.cost, team.pk, workload):
+            rows = sync_execute_iter(
+                prepared.clickhouse,
+                prepared.context.values,
+                chunk_size=chunk_size,
+                workload=workload,
+                team_id=team.pk,
+                readonly=True,
+                timings=timings,
+            )
+            types = next(rows)
+
+    return HogQLQueryStream(prepared=prepared, types=types, timings=timings, _rows=rows)
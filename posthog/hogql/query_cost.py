@@ -0,0 +1,438 @@
+"""
+Estimates how expensive a HogQL query is before it's sent to ClickHouse, and decides whether to send it.
+
+The estimate starts from the rows of events the query reads: the team's daily event volume, times the days between
+the bounds the query puts on `timestamp`, times the rate it samples at. That's scaled up for each table joined in,
+like persons or sessions, and for each property grouped by, as breakdowns make ClickHouse hold more state.
+
+Admission rules, see `HOGQL_ADMISSION_RULES` in settings, then compare the estimate against thresholds. The first rule
+that matches the query's team and workload decides: "reject" fails the query right away, "queue" only runs it once one
+of a few slots for expensive queries is free, and "sample" reruns insights with a sampling factor. Decisions are
+counted, and the estimate is added to the query's log_comment, so it can be compared with `read_rows` in query_log.
+"""
+
+import dataclasses
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime, timedelta
+from math import floor, log10
+from time import perf_counter
+from typing import Literal, Optional
+from zoneinfo import ZoneInfo
+
+from dateutil import parser as date_parser
+from django.conf import settings
+from django.core.cache import cache
+from prometheus_client import Counter, Histogram
+
+from posthog.clickhouse.client.connection import FairSemaphore, Workload
+from posthog.hogql import ast
+from posthog.hogql.context import HogQLContext
+from posthog.hogql.database.schema.events import EventsTable
+from posthog.hogql.errors import QueryRejectedError
+from posthog.hogql.visitor import TraversingVisitor
+from posthog.models.team import Team
+from posthog.schema import HogQLQueryCost
+
+# How much more expensive reading events gets for every table joined in, by the table's name in ClickHouse
+JOINED_TABLE_WEIGHTS: dict[str, float] = {
+    "person": 0.5,
+    "person_distinct_id2": 0.5,
+    "person_distinct_id_overrides": 0.1,
+    "sessions": 0.3,
+    "raw_sessions": 0.3,
+    "cohortpeople": 0.3,
+    "person_static_cohort": 0.1,
+    "groups": 0.2,
+}
+DEFAULT_JOINED_TABLE_WEIGHT = 0.2
+# How much more expensive the query gets for every property it groups by
+BREAKDOWN_WEIGHT = 0.5
+# Queries without a lower bound on `timestamp` read everything since the team was created, up to this many days
+MAX_UNBOUNDED_DAYS = 365 * 2
+
+DAILY_EVENTS_CACHE_TIMEOUT = 60 * 60 * 24
+DAILY_EVENTS_SAMPLE_RATE = 10
+
+INTERVAL_FUNCTIONS: dict[str, timedelta] = {
+    "toIntervalSecond": timedelta(seconds=1),
+    "toIntervalMinute": timedelta(minutes=1),
+    "toIntervalHour": timedelta(hours=1),
+    "toIntervalDay": timedelta(days=1),
+    "toIntervalWeek": timedelta(weeks=1),
+    "toIntervalMonth": timedelta(days=31),
+    "toIntervalQuarter": timedelta(days=92),
+    "toIntervalYear": timedelta(days=366),
+}
+
+HOGQL_ADMISSION_DECISIONS = Counter(
+    "posthog_hogql_admission_decisions_total",
+    "What admission control did with HogQL queries estimated to be expensive.",
+    labelnames=["action", "workload"],
+)
+HOGQL_ADMISSION_QUEUE_WAIT_SECONDS = Histogram(
+    "posthog_hogql_admission_queue_wait_seconds",
+    "How long queued HogQL queries waited to run.",
+    buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 120, float("inf")),
+)
+HOGQL_QUERY_DURATION_BY_ESTIMATED_COST = Histogram(
+    "posthog_hogql_query_duration_by_estimated_cost_seconds",
+    "How long HogQL queries took in ClickHouse, by the order of magnitude of their estimated cost.",
+    labelnames=["estimated_cost"],
+    buckets=(0.05, 0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600, float("inf")),
+)
+
+# Set while running insights that can be rerun with a sampling factor, see `allow_downsampling`
+_downsampling_allowed: ContextVar[bool] = ContextVar("downsampling_allowed", default=False)
+_expensive_query_slots: Optional[FairSemaphore] = None
+
+
+@dataclasses.dataclass
+class QueryCost:
+    estimated_rows: float
+    days: float
+    sample_rate: float
+    joined_tables: list[str]
+    breakdowns: int
+    admission: Optional[Literal["run", "queue", "sample", "reject"]] = None
+
+    @property
+    def cost(self) -> float:
+        join_factor = 1 + sum(
+            JOINED_TABLE_WEIGHTS.get(table, DEFAULT_JOINED_TABLE_WEIGHT) for table in self.joined_tables
+        )
+        return self.estimated_rows * join_factor * (1 + BREAKDOWN_WEIGHT * self.breakdowns)
+
+    def to_schema(self) -> HogQLQueryCost:
+        return HogQLQueryCost(
+            estimatedRows=self.estimated_rows,
+            days=self.days,
+            sampleRate=self.sample_rate,
+            joinedTables=self.joined_tables,
+            breakdowns=self.breakdowns,
+            cost=self.cost,
+            admission=self.admission,
+        )
+
+
+@dataclasses.dataclass(frozen=True)
+class AdmissionRule:
+    action: Literal["reject", "queue", "sample"]
+    min_cost: float
+    sample_rate: float = 0.1
+    workloads: Optional[tuple[str, ...]] = None
+    team_ids: Optional[tuple[int, ...]] = None
+
+    def matches(self, cost: QueryCost, team_id: int, workload: Workload) -> bool:
+        return (
+            cost.cost >= self.min_cost
+            and (self.workloads is None or workload.value in self.workloads)
+            and (self.team_ids is None or team_id in self.team_ids)
+        )
+
+
+class DownsampleQuery(Exception):
+    """Raised for queries that admission rules want to run sampled, for the insight running them to retry."""
+
+    def __init__(self, sample_rate: float):
+        super().__init__(f"Query should be sampled at {sample_rate}")
+        self.sample_rate = sample_rate
+
+
+def get_admission_rules() -> list[AdmissionRule]:
+    return [
+        AdmissionRule(
+            action=rule["action"],
+            min_cost=float(rule["min_cost"]),
+            sample_rate=float(rule.get("sample_rate", 0.1)),
+            workloads=tuple(rule["workloads"]) if rule.get("workloads") is not None else None,
+            team_ids=tuple(rule["team_ids"]) if rule.get("team_ids") is not None else None,
+        )
+        for rule in settings.HOGQL_ADMISSION_RULES
+    ]
+
+
+def get_team_daily_events(team_id: int) -> float:
+    """The team's average number of events per day over the last week, counted on a sample and cached for a day."""
+    from posthog.client import sync_execute
+
+    cache_key = f"hogql_query_cost_daily_events_{team_id}"
+    daily_events = cache.get(cache_key)
+    if daily_events is None:
+        rows = sync_execute(
+            f"""
+            SELECT count() * {DAILY_EVENTS_SAMPLE_RATE} / 7
+            FROM events SAMPLE 1/{DAILY_EVENTS_SAMPLE_RATE}
+            WHERE team_id = %(team_id)s AND timestamp >= now() - INTERVAL 7 DAY AND timestamp < now()
+            """,
+            {"team_id": team_id},
+            team_id=team_id,
+            readonly=True,
+        )
+        daily_events = float(rows[0][0])
+        cache.set(cache_key, daily_events, DAILY_EVENTS_CACHE_TIMEOUT)
+    return daily_events
+
+
+def estimate_query_cost(
+    node: ast.Expr,
+    context: HogQLContext,
+    team: Team,
+    *,
+    daily_events: Optional[float] = None,
+    now: Optional[datetime] = None,
+) -> QueryCost:
+    """Estimates the cost of a query prepared for printing as ClickHouse SQL, see `prepare_ast_for_printing`."""
+    now = now or datetime.now(tz=ZoneInfo("UTC"))
+    visitor = _QueryCostVisitor(context, now)
+    visitor.visit(node)
+
+    earliest = now - timedelta(days=MAX_UNBOUNDED_DAYS)
+    if team.created_at is not None:
+        earliest = max(earliest, team.created_at)
+    date_from = max(min(visitor.lower_bounds), earliest) if visitor.lower_bounds else earliest
+    date_to = min(max(visitor.upper_bounds), now) if visitor.upper_bounds else now
+    days = max((date_to - date_from) / timedelta(days=1), 1 / 24)
+
+    if not visitor.events_sample_rates:
+        return QueryCost(
+            estimated_rows=0,
+            days=days,
+            sample_rate=1,
+            joined_tables=visitor.joined_tables,
+            breakdowns=visitor.breakdowns,
+        )
+
+    if daily_events is None:
+        daily_events = get_team_daily_events(team.pk)
+    rows_per_read = daily_events * days
+    sample_rates = [_sample_rate(sample, rows_per_read) for sample in visitor.events_sample_rates]
+    return QueryCost(
+        estimated_rows=sum(rows_per_read * rate for rate in sample_rates),
+        days=days,
+        sample_rate=max(sample_rates),
+        joined_tables=visitor.joined_tables,
+        breakdowns=visitor.breakdowns,
+    )
+
+
+def admission_enabled() -> bool:
+    return len(settings.HOGQL_ADMISSION_RULES) > 0
+
+
+def get_admission_rule(cost: QueryCost, team_id: int, workload: Workload) -> Optional[AdmissionRule]:
+    return next((rule for rule in get_admission_rules() if rule.matches(cost, team_id, workload)), None)
+
+
+@contextmanager
+def allow_downsampling() -> Iterator[None]:
+    """Lets queries run in this context be downsampled, by raising `DownsampleQuery` for the caller to retry."""
+    token = _downsampling_allowed.set(True)
+    try:
+        yield
+    finally:
+        _downsampling_allowed.reset(token)
+
+
+@contextmanager
+def admit_query(cost: Optional[QueryCost], team_id: int, workload: Workload) -> Iterator[None]:
+    """Applies the first admission rule that matches the query, around running it."""
+    if cost is None:
+        yield
+        return
+
+    rule = get_admission_rule(cost, team_id, workload)
+    action = rule.action if rule is not None else "run"
+    if action == "sample":
+        assert rule is not None
+        if cost.sample_rate <= rule.sample_rate:
+            action = "run"
+        elif _downsampling_allowed.get():
+            HOGQL_ADMISSION_DECISIONS.labels(action="sample", workload=workload.value).inc()
+            cost.admission = "sample"
+            raise DownsampleQuery(rule.sample_rate)
+        else:
+            # Only insights know how to rerun themselves sampled, everything else waits for its turn instead
+            action = "queue"
+    cost.admission = action
+    HOGQL_ADMISSION_DECISIONS.labels(action=action, workload=workload.value).inc()
+
+    if action == "reject":
+        raise QueryRejectedError(
+            "This query would read too much data to run right now. Try a shorter date range or sampling."
+        )
+
+    slots = _get_expensive_query_slots() if action == "queue" else None
+    if slots is not None:
+        start_time = perf_counter()
+        acquired = slots.acquire(timeout=settings.HOGQL_ADMISSION_QUEUE_TIMEOUT)
+        HOGQL_ADMISSION_QUEUE_WAIT_SECONDS.observe(perf_counter() - start_time)
+        if not acquired:
+            cost.admission = "reject"
+            HOGQL_ADMISSION_DECISIONS.labels(action="queue_timeout", workload=workload.value).inc()
+            raise QueryRejectedError("Too many expensive queries are running right now. Try again in a bit.")
+
+    start_time = perf_counter()
+    try:
+        yield
+    finally:
+        HOGQL_QUERY_DURATION_BY_ESTIMATED_COST.labels(estimated_cost=_order_of_magnitude(cost.cost)).observe(
+            perf_counter() - start_time
+        )
+        if slots is not None:
+            slots.release()
+
+
+def _get_expensive_query_slots() -> FairSemaphore:
+    global _expensive_query_slots
+    if _expensive_query_slots is None or _expensive_query_slots.size != settings.HOGQL_ADMISSION_QUEUE_SIZE:
+        _expensive_query_slots = FairSemaphore(settings.HOGQL_ADMISSION_QUEUE_SIZE)
+    return _expensive_query_slots
+
+
+def _order_of_magnitude(value: float) -> str:
+    return f"1e{floor(log10(value))}" if value >= 1 else "0"
+
+
+def _sample_rate(sample: Optional[ast.SampleExpr], rows: float) -> float:
+    if sample is None:
+        return 1
+    ratio = sample.sample_value
+    value = float(ratio.left.value) / (float(ratio.right.value) if ratio.right is not None else 1)
+    if value > 1:
+        # `SAMPLE n` reads about n rows
+        return min(value / rows, 1) if rows > 0 else 1
+    return value
+
+
+class _QueryCostVisitor(TraversingVisitor):
+    def __init__(self, context: HogQLContext, now: datetime):
+        super().__init__()
+        self.context = context
+        self.now = now
+        self.events_sample_rates: list[Optional[ast.SampleExpr]] = []
+        self.joined_tables: list[str] = []
+        self.lower_bounds: list[datetime] = []
+        self.upper_bounds: list[datetime] = []
+        self.breakdowns = 0
+
+    def visit_join_expr(self, node: ast.JoinExpr):
+        table_type = node.table.type if node.table is not None else None
+        while isinstance(table_type, ast.TableAliasType):
+            table_type = table_type.table_type
+        if isinstance(table_type, ast.TableType):
+            if isinstance(table_type.table, EventsTable):
+                self.events_sample_rates.append(node.sample)
+            else:
+                self.joined_tables.append(table_type.table.to_printed_clickhouse(self.context))
+        super().visit_join_expr(node)
+
+    def visit_select_query(self, node: ast.SelectQuery):
+        for expr in node.group_by or []:
+            if _has_properties(expr):
+                self.breakdowns += 1
+        super().visit_select_query(node)
+
+    def visit_compare_operation(self, node: ast.CompareOperation):
+        op = node.op
+        if _is_events_timestamp(node.right):
+            bound, op = node.left, _FLIPPED_OPS.get(op, op)
+        elif _is_events_timestamp(node.left):
+            bound = node.right
+        else:
+            return super().visit_compare_operation(node)
+
+        value = _evaluate_datetime(bound, self.now)
+        if value is not None:
+            if op in (ast.CompareOperationOp.Gt, ast.CompareOperationOp.GtEq, ast.CompareOperationOp.Eq):
+                self.lower_bounds.append(value)
+            if op in (ast.CompareOperationOp.Lt, ast.CompareOperationOp.LtEq, ast.CompareOperationOp.Eq):
+                self.upper_bounds.append(value)
+        super().visit_compare_operation(node)
+
+
+_FLIPPED_OPS = {
+    ast.CompareOperationOp.Gt: ast.CompareOperationOp.Lt,
+    ast.CompareOperationOp.GtEq: ast.CompareOperationOp.LtEq,
+    ast.CompareOperationOp.Lt: ast.CompareOperationOp.Gt,
+    ast.CompareOperationOp.LtEq: ast.CompareOperationOp.GtEq,
+}
+
+
+class _PropertyFinder(TraversingVisitor):
+    found = False
+
+    def visit_field(self, node: ast.Field):
+        if isinstance(node.type, ast.PropertyType) or "properties" in node.chain:
+            self.found = True
+
+    def visit_property_type(self, node: ast.PropertyType):
+        self.found = True
+
+
+def _has_properties(node: ast.Expr) -> bool:
+    finder = _PropertyFinder()
+    finder.visit(node)
+    return finder.found
+
+
+def _is_events_timestamp(node: ast.Expr) -> bool:
+    field_type = node.type
+    if isinstance(field_type, ast.FieldAliasType):
+        field_type = field_type.type
+    if not isinstance(field_type, ast.FieldType) or field_type.name != "timestamp":
+        return False
+    table_type = field_type.table_type
+    while isinstance(table_type, ast.TableAliasType):
+        table_type = table_type.table_type
+    return isinstance(table_type, ast.TableType) and isinstance(table_type.table, EventsTable)
+
+
+def _evaluate_datetime(node: ast.Expr, now: datetime) -> Optional[datetime]:
+    """Evaluates the constant date expressions queries usually bound `timestamp` with, ignoring time zones."""
+    if isinstance(node, ast.Constant):
+        value = node.value
+        if isinstance(value, str):
+            try:
+                value = date_parser.isoparse(value)
+            except ValueError:
+                return None
+        if isinstance(value, datetime):
+            return value if value.tzinfo is not None else value.replace(tzinfo=ZoneInfo("UTC"))
+        if isinstance(value, date):
+            return datetime(value.year, value.month, value.day, tzinfo=ZoneInfo("UTC"))
+        return None
+    if isinstance(node, ast.ArithmeticOperation) and node.op in (
+        ast.ArithmeticOperationOp.Add,
+        ast.ArithmeticOperationOp.Sub,
+    ):
+        return _shift_datetime(node.left, node.right, node.op == ast.ArithmeticOperationOp.Sub, now)
+    if isinstance(node, ast.Call):
+        if node.name in ("now", "now64"):
+            return now
+        if node.name == "today":
+            return now.replace(hour=0, minute=0, second=0, microsecond=0)
+        if node.name in ("plus", "minus") and len(node.args) == 2:
+            return _shift_datetime(node.args[0], node.args[1], node.name == "minus", now)
+        if len(node.args) > 0 and (
+            node.name.startswith("to") or node.name in ("assumeNotNull", "parseDateTime64BestEffort")
+        ):
+            # Conversions and the likes of `toStartOfDay`, which move the date by less than a bucket
+            return _evaluate_datetime(node.args[0], now)
+    return None
+
+
+def _shift_datetime(left: ast.Expr, right: ast.Expr, subtract: bool, now: datetime) -> Optional[datetime]:
+    value = _evaluate_datetime(left, now)
+    if (
+        value is None
+        or not isinstance(right, ast.Call)
+        or right.name not in INTERVAL_FUNCTIONS
+        or len(right.args) != 1
+        or not isinstance(right.args[0], ast.Constant)
+        or not isinstance(right.args[0].value, int | float)
+    ):
+        return None
+    delta = INTERVAL_FUNCTIONS[right.name] * right.args[0].value
+    return value - delta if subtract else value + delta
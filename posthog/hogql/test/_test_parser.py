@@ -4,7 +4,7 @@ import math
 
 from posthog.hogql import ast
 from posthog.hogql.errors import ExposedHogQLError, SyntaxError
-from posthog.hogql.parser import parse_expr, parse_order_expr, parse_select
+from posthog.hogql.parser import parse_expr, parse_order_expr, parse_select, parse_template
 from posthog.hogql.visitor import clear_locations
 from posthog.test.base import BaseTest, MemoryLeakTestMixin
 
@@ -26,6 +26,14 @@ def parser_test_factory(backend: Literal["python", "cpp"]):
         def _select(self, query: str, placeholders: Optional[dict[str, ast.Expr]] = None) -> ast.Expr:
             return clear_locations(parse_select(query, placeholders=placeholders, backend=backend))
 
+        def _callTestMethod(self, method):
+            def uncached_method():
+                # Every run has to actually parse, for the memory leak checks to mean anything
+                parse_template.cache_clear()
+                method()
+
+            super()._callTestMethod(uncached_method)
+
         def test_numbers(self):
             self.assertEqual(self._expr("1"), ast.Constant(value=1))
             self.assertEqual(self._expr("1.2"), ast.Constant(value=1.2))
@@ -1159,6 +1167,53 @@ def parser_test_factory(backend: Literal["python", "cpp"]):
                 ),
             )
 
+        def test_parse_cache_hands_out_copies(self):
+            query = "select event, {count} from events where timestamp > {date_from}"
+            misses = parse_template.cache_info().misses
+
+            first = cast(
+                ast.SelectQuery,
+                parse_select(
+                    query,
+                    {"count": ast.Call(name="count", args=[]), "date_from": ast.Constant(value="2024-01-01")},
+                    backend=backend,
+                ),
+            )
+            first.select.append(ast.Constant(value=1))
+            cast(ast.Field, first.select[0]).chain.append("changed")
+            second = cast(
+                ast.SelectQuery,
+                parse_select(
+                    query, {"count": ast.Constant(value=2), "date_from": ast.Constant(value=3)}, backend=backend
+                ),
+            )
+
+            self.assertEqual(parse_template.cache_info().misses, misses + 1)
+            self.assertEqual(
+                clear_locations(second),
+                ast.SelectQuery(
+                    select=[ast.Field(chain=["event"]), ast.Constant(value=2)],
+                    select_from=ast.JoinExpr(table=ast.Field(chain=["events"])),
+                    where=ast.CompareOperation(
+                        op=ast.CompareOperationOp.Gt,
+                        left=ast.Field(chain=["timestamp"]),
+                        right=ast.Constant(value=3),
+                    ),
+                ),
+            )
+            self.assertEqual(
+                self._select(query),
+                ast.SelectQuery(
+                    select=[ast.Field(chain=["event"]), ast.Placeholder(field="count")],
+                    select_from=ast.JoinExpr(table=ast.Field(chain=["events"])),
+                    where=ast.CompareOperation(
+                        op=ast.CompareOperationOp.Gt,
+                        left=ast.Field(chain=["timestamp"]),
+                        right=ast.Placeholder(field="date_from"),
+                    ),
+                ),
+            )
+
         def test_select_union_all(self):
             self.assertEqual(
                 self._select("select 1 union all select 2 union all select 3"),
@@ -1,5 +1,5 @@
 from typing import Optional
-from posthog.hogql.autocomplete import get_hogql_autocomplete
+from posthog.hogql.autocomplete import AUTOCOMPLETE_SCHEMA_TTL, get_autocomplete_schema, get_hogql_autocomplete
 from posthog.hogql.database.database import Database, create_hogql_database
 from posthog.hogql.database.models import StringDatabaseField
 from posthog.hogql.database.schema.events import EventsTable
@@ -241,3 +241,32 @@ class TestAutocomplete(ClickhouseTestMixin, APIBaseTest):
 
         for suggestion in results.suggestions:
             assert suggestion.label != "event"
+
+    def test_autocomplete_reuses_the_schema_of_the_team(self):
+        schema = get_autocomplete_schema(self.team)
+        assert get_autocomplete_schema(self.team) is schema
+
+        schema.created_at -= AUTOCOMPLETE_SCHEMA_TTL
+        assert get_autocomplete_schema(self.team) is not schema
+
+    def test_autocomplete_schema_parses_copies(self):
+        schema = get_autocomplete_schema(self.team)
+
+        first = schema.parse_select("select event from events")
+        second = schema.parse_select("select event from events")
+
+        assert first == second
+        assert first is not second
+
+    def test_autocomplete_same_suggestions_when_cached(self):
+        self._create_properties()
+
+        for query, start, end in [
+            ("select  from events", 7, 7),
+            ("select properties. from events", 18, 18),
+            ("select pdi.person.properties. from events", 29, 29),
+            ("select p from (select event as potato from events)", 7, 8),
+        ]:
+            first = self._query_response(query=query, start=start, end=end)
+            second = self._query_response(query=query, start=start, end=end)
+            assert first.suggestions == second.suggestions
@@ -256,6 +256,20 @@ class TestPrinter(BaseTest):
             {"hogql_val_0": "nomat", "hogql_val_1": "json", "hogql_val_2": "yet"},
         )
 
+    def test_hogql_properties_log_unmaterialized_properties(self):
+        context = HogQLContext(team_id=self.team.pk)
+        self._expr("properties.nomat.json.yet", context)
+        self._expr("properties['$nomat']", context)
+        self.assertEqual(
+            context.unmaterialized_properties,
+            {("events", "properties", "nomat"), ("events", "properties", "$nomat")},
+        )
+
+        # only ClickHouse queries are logged
+        context = HogQLContext(team_id=self.team.pk)
+        self._expr("properties.nomat", context, "hogql")
+        self.assertEqual(context.unmaterialized_properties, set())
+
     def test_hogql_properties_materialized_json_access(self):
         try:
             from ee.clickhouse.materialized_columns.analyze import materialize
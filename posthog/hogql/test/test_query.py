@@ -10,7 +10,8 @@ from posthog import datetime
 from posthog.hogql import ast
 from posthog.hogql.errors import SyntaxError, QueryError
 from posthog.hogql.property import property_to_expr
-from posthog.hogql.query import execute_hogql_query
+from posthog.hogql.query import execute_hogql_query, prepare_hogql_query
+from posthog.hogql.timings import HogQLTimings
 from posthog.hogql.test.utils import pretty_print_in_tests, pretty_print_response_in_tests
 from posthog.models import Cohort
 from posthog.models.cohort.util import recalculate_cohortpeople
@@ -135,6 +136,44 @@ class TestQuery(ClickhouseTestMixin, APIBaseTest):
             self.assertTrue(isinstance(response.timings[0], QueryTiming))
             self.assertEqual(response.timings[-1].k, ".")
 
+    def test_query_without_hogql(self):
+        with freeze_time("2020-01-10"):
+            random_uuid = self._create_random_events()
+            response = execute_hogql_query(
+                "select count() as total, event as name from events where properties.random_uuid = {random_uuid} group by event",
+                placeholders={"random_uuid": ast.Constant(value=random_uuid)},
+                team=self.team,
+                include_hogql=False,
+            )
+            self.assertIsNone(response.hogql)
+            self.assertEqual(response.columns, ["total", "name"])
+            self.assertEqual(response.results, [(2, "random event")])
+            self.assertFalse(any(timing.k.startswith("./hogql/prepare_ast") for timing in response.timings or []))
+
+            response = execute_hogql_query(
+                "select count(), event from events where properties.random_uuid = {random_uuid} group by event",
+                placeholders={"random_uuid": ast.Constant(value=random_uuid)},
+                team=self.team,
+                include_hogql=False,
+            )
+            self.assertIsNone(response.hogql)
+            self.assertEqual(response.columns, ["count()", "event"])
+
+    def test_prepared_query_prints_hogql_only_when_asked(self):
+        prepared = prepare_hogql_query(
+            "select event as name, count() as total from events group by name",
+            team=self.team,
+            timings=HogQLTimings(),
+        )
+        self.assertEqual(prepared.columns, ["name", "total"])
+        self.assertNotIn("hogql", prepared.__dict__)
+
+        self.assertEqual(
+            prepared.hogql,
+            "SELECT\n    event AS name,\n    count() AS total\nFROM\n    events\nGROUP BY\n    name\nLIMIT 100",
+        )
+        self.assertIs(prepared.hogql, prepared.hogql)
+
     @pytest.mark.usefixtures("unittest_snapshot")
     def test_query_joins_simple(self):
         with freeze_time("2020-01-10"):
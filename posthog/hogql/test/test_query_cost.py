@@ -0,0 +1,163 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from django.test import override_settings
+
+from posthog.clickhouse.client.connection import Workload
+from posthog.hogql.context import HogQLContext
+from posthog.hogql.errors import QueryRejectedError
+from posthog.hogql.modifiers import create_default_modifiers_for_team
+from posthog.hogql.parser import parse_select
+from posthog.hogql.printer import prepare_ast_for_printing
+from posthog.hogql.query import execute_hogql_query
+from posthog.hogql.query_cost import (
+    DownsampleQuery,
+    QueryCost,
+    admit_query,
+    allow_downsampling,
+    estimate_query_cost,
+)
+from posthog.schema import HogQLQueryModifiers, PersonsOnEventsMode
+from posthog.test.base import APIBaseTest, BaseTest, ClickhouseTestMixin
+
+NOW = datetime(2024, 1, 31, tzinfo=ZoneInfo("UTC"))
+
+
+class TestQueryCost(BaseTest):
+    def _estimate(self, query: str) -> QueryCost:
+        modifiers = create_default_modifiers_for_team(
+            self.team, HogQLQueryModifiers(personsOnEventsMode=PersonsOnEventsMode.disabled)
+        )
+        context = HogQLContext(team_id=self.team.pk, team=self.team, enable_select_queries=True, modifiers=modifiers)
+        node = prepare_ast_for_printing(parse_select(query), context=context, dialect="clickhouse")
+        return estimate_query_cost(node, context, self.team, daily_events=1000, now=NOW)
+
+    def test_estimates_rows_from_the_date_range(self):
+        cost = self._estimate("SELECT count() FROM events WHERE timestamp >= '2024-01-01' AND timestamp < '2024-01-11'")
+
+        assert cost.days == 10
+        assert cost.estimated_rows == 10_000
+        assert cost.cost == 10_000
+
+    def test_evaluates_relative_dates(self):
+        cost = self._estimate("SELECT count() FROM events WHERE now() - INTERVAL 7 DAY < timestamp")
+
+        assert cost.days == 7
+
+    def test_unbounded_queries_read_everything_since_the_team_was_created(self):
+        self.team.created_at = datetime(2024, 1, 1, tzinfo=ZoneInfo("UTC"))
+
+        cost = self._estimate("SELECT count() FROM events")
+
+        assert cost.days == 30
+
+    def test_sampling(self):
+        cost = self._estimate("SELECT count() FROM events SAMPLE 0.1 WHERE timestamp >= '2024-01-21'")
+
+        assert cost.sample_rate == 0.1
+        assert cost.estimated_rows == 1000
+
+    def test_joins_and_breakdowns_add_to_the_cost(self):
+        cost = self._estimate(
+            "SELECT person.properties.email, count() FROM events WHERE timestamp >= '2024-01-30' GROUP BY person.properties.email"
+        )
+
+        assert cost.estimated_rows == 1000
+        assert sorted(cost.joined_tables) == ["person", "person_distinct_id2"]
+        assert cost.breakdowns == 1
+        assert cost.cost == 1000 * 2 * 1.5
+
+    def test_every_read_of_events_counts(self):
+        cost = self._estimate(
+            "SELECT count() FROM events WHERE timestamp >= '2024-01-30' AND event IN (SELECT event FROM events WHERE timestamp >= '2024-01-30')"
+        )
+
+        assert cost.estimated_rows == 2000
+
+    def test_queries_without_events_are_free(self):
+        assert self._estimate("SELECT 1").cost == 0
+
+
+class TestAdmission(BaseTest):
+    RULES = [
+        {"min_cost": 1e10, "action": "reject"},
+        {"min_cost": 1e8, "action": "sample", "sample_rate": 0.1, "workloads": ["ONLINE"]},
+        {"min_cost": 1e8, "action": "queue"},
+    ]
+
+    def _cost(self, rows: float, sample_rate: float = 1) -> QueryCost:
+        return QueryCost(estimated_rows=rows, days=30, sample_rate=sample_rate, joined_tables=[], breakdowns=0)
+
+    @override_settings(HOGQL_ADMISSION_RULES=RULES)
+    def test_cheap_queries_run(self):
+        cost = self._cost(1000)
+        with admit_query(cost, self.team.pk, Workload.ONLINE):
+            pass
+        assert cost.admission == "run"
+
+    @override_settings(HOGQL_ADMISSION_RULES=RULES)
+    def test_rejects(self):
+        cost = self._cost(1e11)
+        with self.assertRaises(QueryRejectedError):
+            with admit_query(cost, self.team.pk, Workload.ONLINE):
+                pass
+        assert cost.admission == "reject"
+
+    @override_settings(HOGQL_ADMISSION_RULES=RULES)
+    def test_samples_when_allowed(self):
+        with self.assertRaises(DownsampleQuery) as e:
+            with allow_downsampling():
+                with admit_query(self._cost(1e9), self.team.pk, Workload.ONLINE):
+                    pass
+        assert e.exception.sample_rate == 0.1
+
+        # Already sampled enough
+        cost = self._cost(1e9, sample_rate=0.1)
+        with allow_downsampling():
+            with admit_query(cost, self.team.pk, Workload.ONLINE):
+                pass
+        assert cost.admission == "run"
+
+    @override_settings(HOGQL_ADMISSION_RULES=RULES)
+    def test_queues_what_cant_be_sampled(self):
+        cost = self._cost(1e9)
+        with admit_query(cost, self.team.pk, Workload.ONLINE):
+            pass
+        assert cost.admission == "queue"
+
+        cost = self._cost(1e9)
+        with allow_downsampling():
+            with admit_query(cost, self.team.pk, Workload.OFFLINE):
+                pass
+        assert cost.admission == "queue"
+
+    @override_settings(HOGQL_ADMISSION_RULES=RULES, HOGQL_ADMISSION_QUEUE_SIZE=1, HOGQL_ADMISSION_QUEUE_TIMEOUT=0.01)
+    def test_rejects_when_the_queue_is_full(self):
+        with admit_query(self._cost(1e9), self.team.pk, Workload.OFFLINE):
+            cost = self._cost(1e9)
+            with self.assertRaises(QueryRejectedError):
+                with admit_query(cost, self.team.pk, Workload.OFFLINE):
+                    pass
+            assert cost.admission == "reject"
+
+    @override_settings(HOGQL_ADMISSION_RULES=[{"min_cost": 1e8, "action": "queue", "team_ids": [-1]}])
+    def test_rules_for_other_teams_do_not_apply(self):
+        cost = self._cost(1e9)
+        with admit_query(cost, self.team.pk, Workload.ONLINE):
+            pass
+        assert cost.admission == "run"
+
+
+class TestQueryCostExecution(ClickhouseTestMixin, APIBaseTest):
+    @override_settings(HOGQL_ADMISSION_RULES=[{"min_cost": 0, "action": "reject"}])
+    def test_execute_rejects(self):
+        with self.assertRaises(QueryRejectedError):
+            execute_hogql_query("SELECT count() FROM events", self.team)
+
+    @override_settings(HOGQL_ADMISSION_RULES=[{"min_cost": 1e12, "action": "reject"}])
+    def test_execute_returns_the_cost(self):
+        response = execute_hogql_query("SELECT count() FROM events WHERE timestamp > now() - INTERVAL 1 DAY", self.team)
+
+        assert response.cost is not None
+        assert response.cost.days == 1
+        assert response.cost.admission == "run"
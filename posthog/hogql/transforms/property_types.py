@@ -15,6 +15,7 @@ from posthog.hogql.database.s3_table import S3Table
 
 def resolve_property_types(node: ast.Expr, context: HogQLContext) -> ast.Expr:
     from posthog.models import PropertyDefinition
+    from posthog.models.property_definition import get_property_type_map
 
     if not context or not context.team_id:
         return node
@@ -23,42 +24,24 @@ def resolve_property_types(node: ast.Expr, context: HogQLContext) -> ast.Expr:
     property_finder = PropertyFinder(context)
     property_finder.visit(node)
 
-    # fetch them
-    event_property_values = (
-        PropertyDefinition.objects.filter(
-            name__in=property_finder.event_properties,
-            team_id=context.team_id,
-            type__in=[None, PropertyDefinition.Type.EVENT],
-        ).values_list("name", "property_type")
-        if property_finder.event_properties
-        else []
-    )
-    event_properties = {name: property_type for name, property_type in event_property_values if property_type}
-
-    person_property_values = (
-        PropertyDefinition.objects.filter(
-            name__in=property_finder.person_properties,
-            team_id=context.team_id,
-            type=PropertyDefinition.Type.PERSON,
-        ).values_list("name", "property_type")
-        if property_finder.person_properties
-        else []
-    )
-    person_properties = {name: property_type for name, property_type in person_property_values if property_type}
+    event_properties: dict[str, str] = {}
+    person_properties: dict[str, str] = {}
+    group_properties: dict[str, str] = {}
+    if property_finder.event_properties or property_finder.person_properties or property_finder.group_properties:
+        with context.timings.measure("property_type_map"):
+            property_type_map = get_property_type_map(context.team_id)
 
-    group_properties = {}
-    for group_id, properties in property_finder.group_properties.items():
-        if not properties:
-            continue
-        group_property_values = PropertyDefinition.objects.filter(
-            name__in=properties,
-            team_id=context.team_id,
-            type=PropertyDefinition.Type.GROUP,
-            group_type_index=group_id,
-        ).values_list("name", "property_type")
-        group_properties.update(
-            {f"{group_id}_{name}": property_type for name, property_type in group_property_values if property_type}
+        event_properties = property_type_map.types_of(PropertyDefinition.Type.EVENT, property_finder.event_properties)
+        person_properties = property_type_map.types_of(
+            PropertyDefinition.Type.PERSON, property_finder.person_properties
         )
+        for group_id, properties in property_finder.group_properties.items():
+            group_property_values = property_type_map.types_of(
+                PropertyDefinition.Type.GROUP, properties, group_type_index=group_id
+            )
+            group_properties.update(
+                {f"{group_id}_{name}": property_type for name, property_type in group_property_values.items()}
+            )
 
     timezone = context.database.get_timezone() if context and context.database else "UTC"
     property_swapper = PropertySwapper(
@@ -1,7 +1,9 @@
 import pytest
 from typing import Any
 
+from django.db import connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 
 from posthog.hogql.context import HogQLContext
 from posthog.hogql.parser import parse_select
@@ -9,6 +11,7 @@ from posthog.hogql.printer import print_ast
 from posthog.hogql.test.utils import pretty_print_in_tests
 from posthog.models import PropertyDefinition, GroupTypeMapping
 from posthog.models.group.util import create_group
+from posthog.models.property_definition import invalidate_property_type_map
 from posthog.test.base import BaseTest
 
 from posthog.warehouse.models import DataWarehouseTable, DataWarehouseJoin, DataWarehouseCredential
@@ -148,6 +151,22 @@ class TestPropertyTypes(BaseTest):
 
         assert printed == self.snapshot
 
+    def test_property_definitions_are_loaded_once(self):
+        select = "select properties.$screen_width, person.properties.tickets, organization.properties.inty from events"
+        assert "accurateCastOrNull" in self._print_select("select properties.$screen_width from events")
+        invalidate_property_type_map(self.team.pk)
+
+        with CaptureQueriesContext(connection) as queries:
+            self._print_select(select)
+            self._print_select(select)
+        assert len([query for query in queries if "posthog_propertydefinition" in query["sql"]]) == 1
+
+        PropertyDefinition.objects.filter(team=self.team, name="$screen_width").delete()
+        PropertyDefinition.objects.create(
+            team=self.team, type=PropertyDefinition.Type.EVENT, name="$screen_width", property_type="String"
+        )
+        assert "accurateCastOrNull" not in self._print_select("select properties.$screen_width from events")
+
     def _print_select(self, select: str):
         expr = parse_select(select)
         query = print_ast(
@@ -7,7 +7,7 @@ from posthog.hogql.parser import parse_expr, parse_order_expr
 from posthog.hogql.property import has_aggregation
 from posthog.hogql_queries.actor_strategies import ActorStrategy, PersonStrategy, GroupStrategy
 from posthog.hogql_queries.insights.insight_actors_query_runner import InsightActorsQueryRunner
-from posthog.hogql_queries.insights.paginators import HogQLHasMorePaginator
+from posthog.hogql_queries.insights.paginators import HogQLCursorPaginator
 from posthog.hogql_queries.query_runner import QueryRunner, get_query_runner
 from posthog.schema import ActorsQuery, ActorsQueryResponse, CachedActorsQueryResponse
 
@@ -19,8 +19,11 @@ class ActorsQueryRunner(QueryRunner):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.paginator = HogQLHasMorePaginator.from_limit_context(
-            limit_context=self.limit_context, limit=self.query.limit, offset=self.query.offset
+        self.paginator = HogQLCursorPaginator.from_limit_context(
+            limit_context=self.limit_context,
+            limit=self.query.limit,
+            offset=self.query.offset,
+            cursor=self.query.cursor,
         )
         self.source_query_runner: Optional[QueryRunner] = None
 
@@ -217,6 +220,22 @@ class ActorsQueryRunner(QueryRunner):
             else:
                 order_by = []
 
+            # Actors ordered by non-nullable columns are paginated by the sort key, with the id to break ties
+            cursor_fields = [["created_at"], [self.strategy.origin_id]]
+            if (
+                not has_any_aggregation
+                and len(order_by) > 0
+                and all(isinstance(order.expr, ast.Field) and order.expr.chain in cursor_fields for order in order_by)
+            ):
+                last_expr = order_by[-1].expr
+                if not (isinstance(last_expr, ast.Field) and last_expr.chain == [self.strategy.origin_id]):
+                    order_by.append(
+                        ast.OrderExpr(expr=ast.Field(chain=[self.strategy.origin_id]), order=order_by[-1].order)
+                    )
+                self.paginator.keys = order_by
+            else:
+                self.paginator.keys = []
+
         with self.timings.measure("select"):
             if self.query.source:
                 join_expr = self.source_table_join()
@@ -13,7 +13,7 @@ from posthog.hogql import ast
 from posthog.hogql.parser import parse_expr, parse_order_expr
 from posthog.hogql.property import action_to_expr, has_aggregation, property_to_expr
 from posthog.hogql.timings import HogQLTimings
-from posthog.hogql_queries.insights.paginators import HogQLHasMorePaginator
+from posthog.hogql_queries.insights.paginators import HogQLCursorPaginator
 from posthog.hogql_queries.query_runner import QueryRunner
 from posthog.models import Action, Person
 from posthog.models.element import chain_to_elements
@@ -42,8 +42,11 @@ class EventsQueryRunner(QueryRunner):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.paginator = HogQLHasMorePaginator.from_limit_context(
-            limit_context=self.limit_context, limit=self.query.limit, offset=self.query.offset
+        self.paginator = HogQLCursorPaginator.from_limit_context(
+            limit_context=self.limit_context,
+            limit=self.query.limit,
+            offset=self.query.offset,
+            cursor=self.query.cursor,
         )
 
     def to_query(self) -> ast.SelectQuery:
@@ -99,7 +102,7 @@ class EventsQueryRunner(QueryRunner):
                 if self.query.actionId:
                     with self.timings.measure("action_id"):
                         try:
-                            action = Action.objects.get(pk=self.query.actionId, team_id=self.team.pk)
+                            action = self.action_matcher.get_action(self.query.actionId)
                         except Action.DoesNotExist:
                             raise Exception("Action does not exist")
                         if not action.steps:
@@ -174,6 +177,18 @@ class EventsQueryRunner(QueryRunner):
                 else:
                     order_by = []
 
+                # Events ordered by time are paginated by (timestamp, uuid), which needs uuid to break ties
+                if (
+                    not has_any_aggregation
+                    and len(order_by) == 1
+                    and isinstance(order_by[0].expr, ast.Field)
+                    and order_by[0].expr.chain == ["timestamp"]
+                ):
+                    order_by.append(ast.OrderExpr(expr=ast.Field(chain=["uuid"]), order=order_by[0].order))
+                    self.paginator.keys = order_by
+                else:
+                    self.paginator.keys = []
+
             with self.timings.measure("select"):
                 stmt = ast.SelectQuery(
                     select=select,
@@ -15,7 +15,6 @@ from posthog.hogql_queries.insights.funnels.utils import (
     get_breakdown_expr,
 )
 from posthog.hogql_queries.insights.utils.entities import is_equal, is_superset
-from posthog.models.action.action import Action
 from posthog.models.cohort.cohort import Cohort
 from posthog.models.property.property import PropertyName
 from posthog.queries.util import correct_result_for_sampling
@@ -204,7 +203,7 @@ class FunnelBase(ABC):
                 )
 
             # execute query
-            results = execute_hogql_query(values_query, self.context.team).results
+            results = execute_hogql_query(values_query, self.context.team, include_hogql=False).results
             if results is None:
                 raise ValidationError("Apologies, there has been an error computing breakdown values.")
             return [row[0] for row in results[0:breakdown_limit_or_default]]
@@ -398,7 +397,7 @@ class FunnelBase(ABC):
         elif isinstance(step, DataWarehouseNode):
             raise NotImplementedError("DataWarehouseNode is not supported in funnels")
         else:
-            action = Action.objects.get(pk=step.id)
+            action = self.context.action_matcher.get_action(int(step.id))
             name = action.name
             action_id = step.id
             type = "actions"
@@ -608,7 +607,7 @@ class FunnelBase(ABC):
     ) -> ast.Expr:
         if isinstance(entity, ActionsNode) or isinstance(entity, FunnelExclusionActionsNode):
             # action
-            action = Action.objects.get(pk=int(entity.id), team=self.context.team)
+            action = self.context.action_matcher.get_action(int(entity.id))
             event_expr = action_to_expr(action)
         elif isinstance(entity, DataWarehouseNode):
             raise NotImplementedError("DataWarehouseNode is not supported in funnels")
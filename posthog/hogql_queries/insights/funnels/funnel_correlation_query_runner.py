@@ -9,7 +9,6 @@ from posthog.hogql_queries.insights.funnels.funnel_event_query import FunnelEven
 from posthog.hogql_queries.insights.funnels.funnel_persons import FunnelActors
 from posthog.hogql_queries.insights.funnels.funnel_strict_persons import FunnelStrictActors
 from posthog.hogql_queries.insights.funnels.funnel_unordered_persons import FunnelUnorderedActors
-from posthog.models.action.action import Action
 from posthog.models.element.element import chain_to_elements
 from posthog.models.event.util import ElementSerializer
 from rest_framework.exceptions import ValidationError
@@ -243,27 +242,16 @@ class FunnelCorrelationQueryRunner(QueryRunner):
             timings=self.timings,
             modifiers=self.modifiers,
             limit_context=self.limit_context,
+            include_hogql=False,
         )
         assert response.results
 
         # Get the total success/failure counts from the results
         results = [result for result in response.results if result[0] != self.TOTAL_IDENTIFIER]
-        _, success_total, failure_total = next(
+        _, success_total, failure_total, _, _ = next(
             result for result in response.results if result[0] == self.TOTAL_IDENTIFIER
         )
 
-        # Add a little structure, and keep it close to the query definition so it's
-        # obvious what's going on with result indices.
-        event_contingency_tables = [
-            EventContingencyTable(
-                event=result[0],
-                visited=EventStats(success_count=result[1], failure_count=result[2]),
-                success_total=success_total,
-                failure_total=failure_total,
-            )
-            for result in results
-        ]
-
         success_total = int(correct_result_for_sampling(success_total, self.funnels_query.samplingFactor))
         failure_total = int(correct_result_for_sampling(failure_total, self.funnels_query.samplingFactor))
 
@@ -277,26 +265,24 @@ class FunnelCorrelationQueryRunner(QueryRunner):
         if success_total / failure_total > 10 or failure_total / success_total > 10:
             skewed_totals = True
 
+        # Add a little structure, and keep it close to the query definition so it's
+        # obvious what's going on with result indices.
         odds_ratios = [
-            get_entity_odds_ratio(event_stats, PRIOR_COUNT)
-            for event_stats in event_contingency_tables
-            if not self.are_results_insignificant(event_stats)
+            EventOddsRatio(
+                event=result[0],
+                success_count=result[1],
+                failure_count=result[2],
+                odds_ratio=result[3],
+                correlation_type=result[4],
+            )
+            for result in results
         ]
 
-        positively_correlated_events = sorted(
-            [odds_ratio for odds_ratio in odds_ratios if odds_ratio["correlation_type"] == "success"],
-            key=lambda x: x["odds_ratio"],
-            reverse=True,
-        )
-
-        negatively_correlated_events = sorted(
-            [odds_ratio for odds_ratio in odds_ratios if odds_ratio["correlation_type"] == "failure"],
-            key=lambda x: x["odds_ratio"],
-            reverse=False,
-        )
-
-        # Return the top ten positively correlated events, and top then negatively correlated events
-        events = positively_correlated_events[:10] + negatively_correlated_events[:10]
+        # Return the top ten positively correlated events, and top then negatively correlated events,
+        # already ranked by the query
+        events = [odds_ratio for odds_ratio in odds_ratios if odds_ratio["correlation_type"] == "success"] + [
+            odds_ratio for odds_ratio in odds_ratios if odds_ratio["correlation_type"] == "failure"
+        ]
         return events, skewed_totals, hogql, response
 
     def serialize_event_odds_ratio(self, odds_ratio: EventOddsRatio) -> EventOddsRatioSerialized:
@@ -334,16 +320,16 @@ class FunnelCorrelationQueryRunner(QueryRunner):
 
     def to_query(self) -> ast.SelectQuery | ast.SelectUnionQuery:
         """
-        Returns a query string and params, which are used to generate the contingency table.
-        The query returns success and failure count for event / property values, along with total success and failure counts.
+        Returns the query for the top correlated event / property values, with their success and failure counts
+        and odds ratios, along with total success and failure counts.
         """
         if self.query.funnelCorrelationType == FunnelCorrelationResultsType.properties:
-            return self.get_properties_query()
+            return self.get_odds_ratios_query(self.get_properties_query())
 
         if self.query.funnelCorrelationType == FunnelCorrelationResultsType.event_with_properties:
-            return self.get_event_property_query()
+            return self.get_odds_ratios_query(self.get_event_property_query())
 
-        return self.get_event_query()
+        return self.get_odds_ratios_query(self.get_event_query())
 
     def to_actors_query(self) -> ast.SelectQuery | ast.SelectUnionQuery:
         assert self.correlation_actors_query is not None
@@ -470,6 +456,59 @@ class FunnelCorrelationQueryRunner(QueryRunner):
 
         return query
 
+    def get_odds_ratios_query(
+        self, contingency_query: ast.SelectQuery | ast.SelectUnionQuery
+    ) -> ast.SelectQuery | ast.SelectUnionQuery:
+        """
+        Ranks the rows of a contingency table query by their odds ratios, within ClickHouse, so that only the
+        rows we show come back: however many event names or property values there are, this returns at most
+        ten positively and ten negatively correlated rows, and the totals row.
+
+        This is the same math as `get_entity_odds_ratio` and `are_results_insignificant`, which stay as the
+        reference implementation.
+        """
+        return parse_select(
+            f"""
+            SELECT
+                name,
+                success_count,
+                failure_count,
+                odds_ratio,
+                if(name = '{self.TOTAL_IDENTIFIER}', 'total', if(odds_ratio > 1, 'success', 'failure')) AS correlation_type
+            FROM (
+                SELECT
+                    name,
+                    success_count,
+                    failure_count,
+                    success_total,
+                    failure_total,
+                    -- Add 1 to all values to prevent divide by zero errors, and introduce a prior
+                    ((success_count + {PRIOR_COUNT}) * (failure_total - failure_count + {PRIOR_COUNT}))
+                        / ((success_total - success_count + {PRIOR_COUNT}) * (failure_count + {PRIOR_COUNT})) AS odds_ratio
+                FROM (
+                    SELECT
+                        name,
+                        success_count,
+                        failure_count,
+                        -- Every row gets the totals, from the totals row
+                        max(if(name = '{self.TOTAL_IDENTIFIER}', success_count, 0)) OVER () AS success_total,
+                        max(if(name = '{self.TOTAL_IDENTIFIER}', failure_count, 0)) OVER () AS failure_total
+                    FROM {{contingency_query}}
+                )
+            )
+            -- Discard insignificant results
+            WHERE name = '{self.TOTAL_IDENTIFIER}'
+                OR (success_count + failure_count) >= least(
+                    {self.MIN_PERSON_COUNT},
+                    {self.MIN_PERSON_PERCENTAGE} * (success_total + failure_total)
+                )
+            -- Most positively correlated first, most negatively correlated first
+            ORDER BY correlation_type, if(correlation_type = 'success', -odds_ratio, odds_ratio), name
+            LIMIT 10 BY correlation_type
+        """,
+            placeholders={"contingency_query": contingency_query},
+        )
+
     def get_event_query(self) -> ast.SelectQuery | ast.SelectUnionQuery:
         funnel_persons_query = self.get_funnel_actors_cte()
         event_join_query = self._get_events_join_query()
@@ -830,7 +869,7 @@ class FunnelCorrelationQueryRunner(QueryRunner):
         events: set[str] = set()
         for entity in self.funnels_query.series:
             if isinstance(entity, ActionsNode):
-                action = Action.objects.get(pk=int(entity.id), team=self.context.team)
+                action = self.context.action_matcher.get_action(int(entity.id))
                 events.update([x for x in action.get_step_events() if x])
             elif isinstance(entity, EventsNode):
                 if entity.event is not None:
@@ -126,7 +126,7 @@ class FunnelEventQuery:
         )
 
     def _entity_expr(self, skip_entity_filter: bool) -> ast.Expr | None:
-        team, query, funnelsFilter = self.context.team, self.context.query, self.context.funnelsFilter
+        query, funnelsFilter = self.context.query, self.context.funnelsFilter
         exclusions = funnelsFilter.exclusions or []
 
         if skip_entity_filter is True:
@@ -139,7 +139,7 @@ class FunnelEventQuery:
                 events.add(node.event)
             elif isinstance(node, ActionsNode) or isinstance(node, FunnelExclusionActionsNode):
                 try:
-                    action = Action.objects.get(pk=int(node.id), team=team)
+                    action = self.context.action_matcher.get_action(int(node.id))
                     events.update(action.get_step_events())
                 except Action.DoesNotExist:
                     raise ValidationError(f"Action ID {node.id} does not exist!")
@@ -95,6 +95,7 @@ class FunnelsQueryRunner(QueryRunner):
             timings=self.timings,
             modifiers=self.modifiers,
             limit_context=self.limit_context,
+            include_hogql=False,
         )
 
         results = self.funnel_class._format_results(response.results)
@@ -1,13 +1,17 @@
 from typing import Any, cast
+import random
 import unittest
 
 from rest_framework.exceptions import ValidationError
 
 from posthog.constants import INSIGHT_FUNNELS
+from posthog.hogql.query import execute_hogql_query
 from posthog.hogql_queries.insights.funnels.funnel_correlation_query_runner import (
+    PRIOR_COUNT,
     EventContingencyTable,
     EventStats,
     FunnelCorrelationQueryRunner,
+    get_entity_odds_ratio,
 )
 from posthog.hogql_queries.insights.funnels.test.test_funnel_correlations_persons import get_actors
 from posthog.hogql_queries.legacy_compatibility.filter_to_query import filter_to_query
@@ -1433,6 +1437,110 @@ class TestClickhouseFunnelCorrelation(ClickhouseTestMixin, APIBaseTest):
             5,
         )
 
+    def test_odds_ratios_in_query_match_python_reference(self):
+        filters = {
+            "events": [
+                {"id": "user signed up", "type": "events", "order": 0},
+                {"id": "paid", "type": "events", "order": 1},
+            ],
+            "insight": INSIGHT_FUNNELS,
+            "date_from": "2020-01-01",
+            "date_to": "2020-01-14",
+        }
+
+        # 40 people, half of them paying, with more correlated events either way than are returned
+        rng = random.Random(0)
+        for i in range(40):
+            _create_person(distinct_ids=[f"user_{i}"], team_id=self.team.pk, properties={"$browser": f"b_{i % 7}"})
+            _create_event(
+                team=self.team,
+                event="user signed up",
+                distinct_id=f"user_{i}",
+                timestamp="2020-01-02T14:00:00Z",
+            )
+            for j in range(30):
+                probability = 0.1 + 0.2 * (j % 5) if i % 2 == 0 else 0.1 + 0.2 * ((j * 3) % 5)
+                if rng.random() < probability:
+                    _create_event(
+                        team=self.team,
+                        event=f"event_{j}",
+                        distinct_id=f"user_{i}",
+                        timestamp="2020-01-03T14:00:00Z",
+                    )
+            if i % 2 == 0:
+                _create_event(
+                    team=self.team,
+                    event="paid",
+                    distinct_id=f"user_{i}",
+                    timestamp="2020-01-04T14:00:00Z",
+                )
+
+        FunnelCorrelationQueryRunner.MIN_PERSON_PERCENTAGE = 0.1
+        FunnelCorrelationQueryRunner.MIN_PERSON_COUNT = 25
+
+        for correlation_type, correlation_names in [
+            (FunnelCorrelationResultsType.events, None),
+            (FunnelCorrelationResultsType.properties, ["$browser"]),
+        ]:
+            funnels_query = cast(FunnelsQuery, filter_to_query(filters))
+            runner = FunnelCorrelationQueryRunner(
+                query=FunnelCorrelationQuery(
+                    source=FunnelsActorsQuery(source=funnels_query),
+                    funnelCorrelationType=correlation_type,
+                    funnelCorrelationNames=correlation_names,
+                ),
+                team=self.team,
+            )
+            contingency_query = (
+                runner.get_event_query()
+                if correlation_type == FunnelCorrelationResultsType.events
+                else runner.get_properties_query()
+            )
+            rows = execute_hogql_query(query=contingency_query, team=self.team).results
+            _, success_total, failure_total = next(row for row in rows if row[0] == runner.TOTAL_IDENTIFIER)
+            contingency_tables = [
+                EventContingencyTable(
+                    event=row[0],
+                    visited=EventStats(success_count=row[1], failure_count=row[2]),
+                    success_total=success_total,
+                    failure_total=failure_total,
+                )
+                for row in rows
+                if row[0] != runner.TOTAL_IDENTIFIER
+            ]
+            odds_ratios = [
+                get_entity_odds_ratio(contingency_table, PRIOR_COUNT)
+                for contingency_table in contingency_tables
+                if not FunnelCorrelationQueryRunner.are_results_insignificant(contingency_table)
+            ]
+            expected = (
+                sorted(
+                    [odds_ratio for odds_ratio in odds_ratios if odds_ratio["correlation_type"] == "success"],
+                    key=lambda x: (-x["odds_ratio"], x["event"]),
+                )[:10]
+                + sorted(
+                    [odds_ratio for odds_ratio in odds_ratios if odds_ratio["correlation_type"] == "failure"],
+                    key=lambda x: (x["odds_ratio"], x["event"]),
+                )[:10]
+            )
+
+            result, _, _, _ = runner._calculate()
+
+            if correlation_type == FunnelCorrelationResultsType.events:
+                self.assertEqual(len(expected), 20)
+            self.assertEqual(
+                [
+                    (item["event"], item["success_count"], item["failure_count"], item["correlation_type"])
+                    for item in result
+                ],
+                [
+                    (item["event"], item["success_count"], item["failure_count"], item["correlation_type"])
+                    for item in expected
+                ],
+            )
+            for item, expected_item in zip(result, expected):
+                self.assertAlmostEqual(item["odds_ratio"], expected_item["odds_ratio"])
+
     def test_discarding_insignificant_events(self):
         filters = {
             "events": [
@@ -15,7 +15,6 @@ from posthog.hogql.printer import to_printed_hogql
 from posthog.hogql.property import property_to_expr, action_to_expr
 from posthog.hogql.query import execute_hogql_query
 from posthog.hogql_queries.query_runner import QueryRunner
-from posthog.models import Action
 from posthog.hogql_queries.utils.query_date_range import QueryDateRange
 from posthog.models.filters.mixins.utils import cached_property
 from posthog.schema import (
@@ -160,6 +159,7 @@ class LifecycleQueryRunner(QueryRunner):
             timings=self.timings,
             modifiers=self.modifiers,
             limit_context=self.limit_context,
+            include_hogql=False,
         )
 
         # TODO: can we move the data conversion part into the query as well? It would make it easier to swap
@@ -182,7 +182,7 @@ class LifecycleQueryRunner(QueryRunner):
             action_object = {}
             label = "{} - {}".format("", val[2])
             if isinstance(self.query.series[0], ActionsNode):
-                action = Action.objects.get(pk=int(self.query.series[0].id), team=self.team)
+                action = self.action_matcher.get_action(int(self.query.series[0].id))
                 label = "{} - {}".format(action.name, val[2])
                 action_object = {
                     "id": str(action.pk),
@@ -249,7 +249,7 @@ class LifecycleQueryRunner(QueryRunner):
         with self.timings.measure("series_filters"):
             for serie in self.query.series or []:
                 if isinstance(serie, ActionsNode):
-                    action = Action.objects.get(pk=int(serie.id), team=self.team)
+                    action = self.action_matcher.get_action(int(serie.id))
                     event_filters.append(action_to_expr(action))
                 elif isinstance(serie, EventsNode):
                     if serie.event is not None:
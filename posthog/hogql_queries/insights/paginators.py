@@ -1,4 +1,10 @@
+import base64
+import json
+from datetime import datetime
 from typing import Any, Optional, cast
+from uuid import UUID
+
+from dateutil.parser import isoparse
 
 from posthog.hogql import ast
 from posthog.hogql.constants import (
@@ -7,7 +13,9 @@ from posthog.hogql.constants import (
     LimitContext,
     DEFAULT_RETURNED_ROWS,
 )
+from posthog.hogql.errors import QueryError
 from posthog.hogql.query import execute_hogql_query
+from posthog.hogql.visitor import clear_locations, clone_expr
 from posthog.schema import HogQLQueryResponse
 
 
@@ -76,3 +84,170 @@ class HogQLHasMorePaginator:
             "limit": self.limit,
             "offset": self.offset,
         }
+
+
+class HogQLCursorPaginator(HogQLHasMorePaginator):
+    """
+    Keyset paginator: instead of skipping `offset` rows, continues right after the sort key of the last row on the
+    previous page. ClickHouse can prune parts and granules with these predicates, so deep pages cost as much as the
+    first one.
+
+    Only used when `keys` are set. They must be the full ORDER BY of the query, end in a unique column, and contain
+    no nullable or aggregated expressions. Otherwise falls back to limit/offset and `next_cursor` stays empty.
+    """
+
+    CURSOR_COLUMN_PREFIX = "_cursor_"
+
+    def __init__(self, *, limit: Optional[int] = None, offset: Optional[int] = None, cursor: Optional[str] = None):
+        super().__init__(limit=limit, offset=offset)
+        self.cursor = cursor
+        self.keys: list[ast.OrderExpr] = []
+        self.next_cursor: Optional[str] = None
+        self._visible_columns: Optional[int] = None
+        self._key_columns: list[int] = []
+
+    @classmethod
+    def from_limit_context(
+        cls,
+        *,
+        limit_context: LimitContext,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> "HogQLCursorPaginator":
+        paginator = cast(HogQLCursorPaginator, super().from_limit_context(limit_context=limit_context, limit=limit))
+        paginator.offset = offset if offset and offset > 0 else 0
+        paginator.cursor = cursor
+        return paginator
+
+    def paginate(self, query: ast.SelectQuery) -> ast.SelectQuery:
+        if not self.keys:
+            if self.cursor:
+                raise QueryError("This query can't be paginated with a cursor")
+            return super().paginate(query)
+
+        # The next cursor is built from the last row, so select the sort key columns that aren't already selected
+        self._visible_columns = len(query.select)
+        selected = [
+            clear_locations(column.expr if isinstance(column, ast.Alias) else column) for column in query.select
+        ]
+        extra_columns: list[ast.Expr] = []
+        self._key_columns = []
+        for index, key in enumerate(self.keys):
+            key_expr = clear_locations(key.expr)
+            if key_expr in selected:
+                self._key_columns.append(selected.index(key_expr))
+            else:
+                self._key_columns.append(self._visible_columns + len(extra_columns))
+                extra_columns.append(ast.Alias(alias=f"{self.CURSOR_COLUMN_PREFIX}{index}", expr=clone_expr(key.expr)))
+        query.select = [*query.select, *extra_columns]
+
+        query = super().paginate(query)
+        if self.cursor:
+            predicate = self._keyset_predicate(decode_cursor(self.cursor, len(self.keys)))
+            query.where = ast.And(exprs=[query.where, predicate]) if query.where else predicate
+            query.offset = None
+        return query
+
+    def _keyset_predicate(self, values: list[Any]) -> ast.Expr:
+        """
+        Rows that sort after `values`, e.g. for `timestamp DESC, uuid DESC`:
+        `timestamp <= t AND (timestamp < t OR (timestamp = t AND uuid < u))`.
+        The leading range on the first key is redundant, but it's what ClickHouse uses for index analysis.
+        """
+
+        def after(key: ast.OrderExpr, inclusive: bool) -> ast.CompareOperationOp:
+            if key.order == "DESC":
+                return ast.CompareOperationOp.LtEq if inclusive else ast.CompareOperationOp.Lt
+            return ast.CompareOperationOp.GtEq if inclusive else ast.CompareOperationOp.Gt
+
+        alternatives: list[ast.Expr] = []
+        for index, key in enumerate(self.keys):
+            equal_prefix: list[ast.Expr] = [
+                ast.CompareOperation(
+                    op=ast.CompareOperationOp.Eq,
+                    left=clone_expr(previous.expr),
+                    right=ast.Constant(value=values[previous_index]),
+                )
+                for previous_index, previous in enumerate(self.keys[:index])
+            ]
+            comparison = ast.CompareOperation(
+                op=after(key, inclusive=False), left=clone_expr(key.expr), right=ast.Constant(value=values[index])
+            )
+            alternatives.append(ast.And(exprs=[*equal_prefix, comparison]) if equal_prefix else comparison)
+
+        first_key = self.keys[0]
+        return ast.And(
+            exprs=[
+                ast.CompareOperation(
+                    op=after(first_key, inclusive=True),
+                    left=clone_expr(first_key.expr),
+                    right=ast.Constant(value=values[0]),
+                ),
+                ast.Or(exprs=alternatives) if len(alternatives) > 1 else alternatives[0],
+            ]
+        )
+
+    def trim_results(self) -> list[Any]:
+        results = super().trim_results()
+        if self._visible_columns is None:
+            return results
+
+        if self.has_more():
+            self.next_cursor = encode_cursor([results[-1][index] for index in self._key_columns])
+        if max(self._key_columns) < self._visible_columns:
+            # All of the sort key was already selected
+            return results
+        return [row[: self._visible_columns] for row in results]
+
+    def execute_hogql_query(
+        self,
+        query: ast.SelectQuery,
+        *,
+        query_type: str,
+        **kwargs,
+    ) -> HogQLQueryResponse:
+        response = super().execute_hogql_query(query, query_type=query_type, **kwargs)
+        if self._visible_columns is not None and len(query.select) > self._visible_columns:
+            # Hide the sort key columns that were only selected for the cursor
+            self.response = response = response.model_copy(
+                update={
+                    "columns": response.columns[: self._visible_columns] if response.columns else response.columns,
+                    "types": response.types[: self._visible_columns] if response.types else response.types,
+                }
+            )
+        return response
+
+    def response_params(self):
+        return {
+            **super().response_params(),
+            "next_cursor": self.next_cursor,
+        }
+
+
+def encode_cursor(values: list[Any]) -> str:
+    """Opaque cursor for the sort key `values` of a row"""
+
+    def encode_value(value: Any) -> Any:
+        if isinstance(value, datetime):
+            return {"dt": value.isoformat()}
+        if isinstance(value, UUID):
+            return {"uuid": str(value)}
+        return value
+
+    return base64.urlsafe_b64encode(json.dumps([encode_value(value) for value in values]).encode()).decode()
+
+
+def decode_cursor(cursor: str, key_count: int) -> list[Any]:
+    def decode_value(value: Any) -> Any:
+        if isinstance(value, dict):
+            return isoparse(value["dt"]) if "dt" in value else UUID(value["uuid"])
+        return value
+
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != key_count or any(value is None for value in values):
+            raise ValueError
+        return [decode_value(value) for value in values]
+    except (ValueError, TypeError, KeyError):
+        raise QueryError("Invalid cursor")
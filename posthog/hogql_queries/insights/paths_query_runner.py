@@ -856,6 +856,7 @@ class PathsQueryRunner(QueryRunner):
             timings=self.timings,
             modifiers=self.modifiers,
             limit_context=self.limit_context,
+            include_hogql=False,
         )
 
         response.results = self.validate_results(response.results)
@@ -5,6 +5,8 @@ from posthog.hogql.constants import LimitContext
 from posthog.hogql.context import HogQLContext
 from posthog.hogql.modifiers import create_default_modifiers_for_team
 from posthog.hogql.timings import HogQLTimings
+from posthog.models.action.matching import ActionMatcher, get_action_matcher
+from posthog.models.filters.mixins.utils import cached_property
 from posthog.models.team.team import Team
 from posthog.schema import (
     HogQLQueryModifiers,
@@ -43,3 +45,8 @@ class QueryContext(ABC):
             modifiers=self.modifiers,
         )
         self.now = now or datetime.now()
+
+    @cached_property
+    def action_matcher(self) -> ActionMatcher:
+        """The team's actions, loaded once for the lifetime of the context."""
+        return get_action_matcher(self.team)
@@ -77,7 +77,7 @@ class RetentionQueryRunner(QueryRunner):
             event_date_expr = start_of_interval_sql
 
         event_filters = [
-            entity_to_expr(entity=self.get_applicable_entity(event_query_type)),
+            entity_to_expr(entity=self.get_applicable_entity(event_query_type), team=self.team),
         ]
 
         target_field = "person_id"
@@ -316,6 +316,7 @@ class RetentionQueryRunner(QueryRunner):
             timings=self.timings,
             modifiers=self.modifiers,
             limit_context=self.limit_context,
+            include_hogql=False,
         )
 
         result_dict = {
@@ -215,6 +215,7 @@ class StickinessQueryRunner(QueryRunner):
                 timings=self.timings,
                 modifiers=self.modifiers,
                 limit_context=self.limit_context,
+                include_hogql=False,
             )
 
             if response.timings is not None:
@@ -281,7 +282,7 @@ class StickinessQueryRunner(QueryRunner):
             )
         elif isinstance(series, ActionsNode):
             try:
-                action = Action.objects.get(pk=int(series.id), team=self.team)
+                action = self.action_matcher.get_action(int(series.id))
                 filters.append(action_to_expr(action))
             except Action.DoesNotExist:
                 # If an action doesn't exist, we want to return no events
@@ -335,8 +336,7 @@ class StickinessQueryRunner(QueryRunner):
             return series.table_name
 
         if isinstance(series, ActionsNode):
-            # TODO: Can we load the Action in more efficiently?
-            action = Action.objects.get(pk=int(series.id), team=self.team)
+            action = self.action_matcher.get_action(int(series.id))
             return action.name
 
     def intervals_num(self):
@@ -6,8 +6,16 @@ from posthog.hogql.constants import (
     get_max_limit_for_context,
     MAX_SELECT_RETURNED_ROWS,
 )
-from posthog.hogql.parser import parse_select
-from posthog.hogql_queries.insights.paginators import HogQLHasMorePaginator
+from posthog.hogql import ast
+from posthog.hogql.errors import QueryError
+from posthog.hogql.parser import parse_expr, parse_select
+from posthog.hogql.visitor import clear_locations
+from posthog.hogql_queries.insights.paginators import (
+    HogQLCursorPaginator,
+    HogQLHasMorePaginator,
+    decode_cursor,
+    encode_cursor,
+)
 from posthog.hogql_queries.actors_query_runner import ActorsQueryRunner
 from posthog.models.utils import UUIDT
 from posthog.schema import (
@@ -209,3 +217,65 @@ class TestHogQLHasMorePaginator(ClickhouseTestMixin, APIBaseTest):
                 )
                 self.assertEqual(paginator.limit, case["expected_limit"])
                 self.assertEqual(paginator.offset, case["expected_offset"])
+
+
+class TestHogQLCursorPaginator(ClickhouseTestMixin, APIBaseTest):
+    def setUp(self):
+        super().setUp()
+        for index in range(7):
+            _create_person(
+                properties={"email": f"jacob{index}@posthog.com"},
+                team=self.team,
+                distinct_ids=[f"id-{index}"],
+            )
+        flush_persons_and_events()
+
+    def test_actors_query_pages_with_cursor(self):
+        seen: list[str] = []
+        cursor = None
+        for _ in range(10):
+            runner = ActorsQueryRunner(team=self.team, query=ActorsQuery(limit=3, cursor=cursor))
+            response = runner.calculate()
+            self.assertEqual(response.columns, ["person", "id", "created_at", "person.$delete"])
+            seen.extend(str(row[1]) for row in response.results)
+            cursor = response.next_cursor
+            if cursor is None:
+                break
+
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(len(set(seen)), 7)
+
+    def test_cursor_is_not_used_with_offset_only(self):
+        runner = ActorsQueryRunner(team=self.team, query=ActorsQuery(limit=3, offset=3))
+        response = runner.calculate()
+        self.assertEqual(len(response.results), 3)
+        self.assertIsNotNone(response.next_cursor)
+        self.assertTrue(response.hasMore)
+
+    def test_keyset_predicate(self):
+        paginator = HogQLCursorPaginator(limit=10, cursor=encode_cursor([1, "b"]))
+        paginator.keys = [
+            ast.OrderExpr(expr=ast.Field(chain=["timestamp"]), order="DESC"),
+            ast.OrderExpr(expr=ast.Field(chain=["uuid"]), order="DESC"),
+        ]
+        query = paginator.paginate(cast(SelectQuery, parse_select("SELECT event FROM events WHERE event = 'a'")))
+
+        expected = ast.And(
+            exprs=[
+                parse_expr("event = 'a'"),
+                parse_expr("timestamp <= 1 and (timestamp < 1 or (timestamp = 1 and uuid < 'b'))"),
+            ]
+        )
+        self.assertEqual(clear_locations(cast(ast.Expr, query.where)), clear_locations(expected))
+        self.assertIsNone(query.offset)
+        self.assertEqual(cast(ast.Alias, query.select[-1]).alias, "_cursor_1")
+
+    def test_cursor_without_keys(self):
+        paginator = HogQLCursorPaginator(limit=10, cursor=encode_cursor([1]))
+        with self.assertRaises(QueryError):
+            paginator.paginate(cast(SelectQuery, parse_select("SELECT event FROM events")))
+
+    def test_invalid_cursor(self):
+        for cursor in ["not a cursor", encode_cursor([1]), encode_cursor([None, 1])]:
+            with self.assertRaises(QueryError):
+                decode_cursor(cursor, 2)
@@ -1,4 +1,4 @@
-from typing import Optional, Union, cast
+from typing import TYPE_CHECKING, Optional, Union, cast
 from posthog.hogql import ast
 from posthog.hogql.constants import LimitContext
 from posthog.hogql.parser import parse_expr
@@ -17,6 +17,9 @@ from posthog.models.filters.mixins.utils import cached_property
 from posthog.models.team.team import Team
 from posthog.schema import ActionsNode, EventsNode, DataWarehouseNode, HogQLQueryModifiers, InCohortVia, TrendsQuery
 
+if TYPE_CHECKING:
+    from posthog.hogql_queries.insights.trends.events_rollup import EventsRollup
+
 
 def hogql_to_string(expr: ast.Expr) -> ast.Call:
     return ast.Call(name="toString", args=[expr])
@@ -32,6 +35,7 @@ class Breakdown:
     events_filter: ast.Expr
     breakdown_values_override: Optional[list[str]]
     limit_context: LimitContext
+    events_rollup: Optional["EventsRollup"]
 
     def __init__(
         self,
@@ -44,6 +48,7 @@ class Breakdown:
         events_filter: ast.Expr,
         breakdown_values_override: Optional[list[str]] = None,
         limit_context: LimitContext = LimitContext.QUERY,
+        events_rollup: Optional["EventsRollup"] = None,
     ):
         self.team = team
         self.query = query
@@ -54,6 +59,7 @@ class Breakdown:
         self.events_filter = events_filter
         self.breakdown_values_override = breakdown_values_override
         self.limit_context = limit_context
+        self.events_rollup = events_rollup
 
     @cached_property
     def enabled(self) -> bool:
@@ -244,6 +250,7 @@ class Breakdown:
                 query_date_range=self.query_date_range,
                 modifiers=self.modifiers,
                 limit_context=self.limit_context,
+                events_rollup=self.events_rollup,
             )
             return cast(list[str | int | None], breakdown.get_breakdown_values())
 
@@ -1,4 +1,4 @@
-from typing import Optional, Union, Any
+from typing import TYPE_CHECKING, Optional, Union, Any, cast
 from posthog.hogql import ast
 from posthog.hogql.constants import LimitContext, get_breakdown_limit_for_context, BREAKDOWN_VALUES_LIMIT_FOR_COUNTRIES
 from posthog.hogql.parser import parse_expr, parse_select
@@ -19,6 +19,9 @@ from posthog.schema import (
 )
 from functools import cached_property
 
+if TYPE_CHECKING:
+    from posthog.hogql_queries.insights.trends.events_rollup import EventsRollup
+
 BREAKDOWN_OTHER_STRING_LABEL = "$$_posthog_breakdown_other_$$"
 BREAKDOWN_OTHER_NUMERIC_LABEL = 9007199254740991  # pow(2, 53) - 1, for JS compatibility
 BREAKDOWN_OTHER_DISPLAY = "Other (i.e. all remaining values)"
@@ -42,6 +45,7 @@ class BreakdownValues:
     query_date_range: QueryDateRange
     modifiers: HogQLQueryModifiers
     limit_context: LimitContext
+    events_rollup: Optional["EventsRollup"]
 
     def __init__(
         self,
@@ -53,6 +57,7 @@ class BreakdownValues:
         query_date_range: QueryDateRange,
         modifiers: HogQLQueryModifiers,
         limit_context: LimitContext = LimitContext.QUERY,
+        events_rollup: Optional["EventsRollup"] = None,
     ):
         self.team = team
         self.series = series
@@ -76,6 +81,7 @@ class BreakdownValues:
         self.query_date_range = query_date_range
         self.modifiers = modifiers
         self.limit_context = limit_context
+        self.events_rollup = events_rollup
 
     def get_breakdown_values(self) -> list[str | int]:
         if self.breakdown_type == "cohort":
@@ -153,6 +159,16 @@ class BreakdownValues:
             ]
         )
 
+        table: ast.Expr = self._table
+        events_where = self.events_filter
+        if self.events_rollup is not None and self.events_rollup.enabled:
+            # Both counting events and daily users order values by the number of events
+            table = ast.Field(chain=["raw_events_rollup"])
+            select_field = cast(ast.Alias, self.events_rollup.rewrite(select_field))
+            aggregation_expression = parse_expr("sum(count)")
+            date_filter = cast(ast.And, self.events_rollup.rewrite(date_filter))
+            events_where = self.events_rollup.where(self.events_filter)
+
         inner_events_query = parse_select(
             """
                 SELECT
@@ -171,9 +187,9 @@ class BreakdownValues:
             placeholders={
                 "select_field": select_field,
                 "aggregation_expression": aggregation_expression,
-                "table": self._table,
+                "table": table,
                 "date_filter": date_filter,
-                "events_where": self.events_filter,
+                "events_where": events_where,
                 "breakdown_limit_plus_one": ast.Constant(value=breakdown_limit + 1),
             },
         )
@@ -204,6 +220,7 @@ class BreakdownValues:
                 team=self.team,
                 modifiers=self.modifiers,
                 limit_context=self.limit_context,
+                include_hogql=False,
             )
             if response.results and len(response.results) > 0:
                 values = response.results[0][0]
@@ -218,6 +235,7 @@ class BreakdownValues:
                 team=self.team,
                 modifiers=self.modifiers,
                 limit_context=self.limit_context,
+                include_hogql=False,
             )
             value_index = (response.columns or []).index("value")
             values = [row[value_index] for row in response.results or []]
@@ -0,0 +1,195 @@
+from datetime import datetime
+
+from posthog.hogql import ast
+from posthog.hogql.parser import parse_expr
+from posthog.hogql.visitor import CloningVisitor
+from posthog.hogql_queries.insights.trends.breakdown import Breakdown
+from posthog.hogql_queries.utils.query_date_range import QueryDateRange
+from posthog.models.events_rollup.sql import EVENTS_ROLLUP_PROPERTIES
+from posthog.models.filters.mixins.utils import cached_property
+from posthog.models.team.team import Team
+from posthog.schema import (
+    ActionsNode,
+    ChartDisplayType,
+    DataWarehouseNode,
+    EventsNode,
+    HogQLQueryModifiers,
+    PersonsOnEventsMode,
+    TrendsQuery,
+)
+
+# How HogQL prints `properties.<name>` on events, for the raw value that the rollup keeps
+PROPERTY_VALUE_EXPR = "replaceRegexpAll(nullIf(nullIf(property_value, ''), 'null'), '^\"|\"$', '')"
+
+
+class EventsRollup:
+    """
+    Reads a trends series from the events rollup, see posthog/models/events_rollup/sql.py, instead of from events.
+
+    The rollup has the count and the unique persons of every event per hour, in total and by each of a few properties.
+    So it only answers series that count events or daily users, without filters, broken down by at most one of those
+    properties, and with dates that start and end on whole hours in the team's timezone. Everything else reads events.
+    """
+
+    team: Team
+    query: TrendsQuery
+    series: EventsNode | ActionsNode | DataWarehouseNode
+    query_date_range: QueryDateRange
+    modifiers: HogQLQueryModifiers
+
+    def __init__(
+        self,
+        team: Team,
+        query: TrendsQuery,
+        series: EventsNode | ActionsNode | DataWarehouseNode,
+        query_date_range: QueryDateRange,
+        modifiers: HogQLQueryModifiers,
+    ):
+        self.team = team
+        self.query = query
+        self.series = series
+        self.query_date_range = query_date_range
+        self.modifiers = modifiers
+
+    @cached_property
+    def enabled(self) -> bool:
+        return (
+            bool(self.modifiers.useEventsRollups)
+            and isinstance(self.series, EventsNode)
+            and self._is_supported_math()
+            and not self.series.properties
+            and not self.query.properties
+            and not self._filters_test_accounts()
+            and self.query.samplingFactor in (None, 1)
+            and self._is_supported_breakdown()
+            and self._is_supported_date_range()
+        )
+
+    @cached_property
+    def property_name(self) -> str:
+        """The property the rows to read are broken down by, empty for the rows with all events."""
+        breakdown_filter = self.query.breakdownFilter
+        if breakdown_filter is None or breakdown_filter.breakdown is None:
+            return ""
+        return str(breakdown_filter.breakdown)
+
+    def events_subquery(self, events_filter: ast.Expr, breakdown: Breakdown, group_by_day: bool) -> ast.SelectQuery:
+        """Replaces the events subquery of `TrendsQueryBuilder`, with the same columns."""
+        query = ast.SelectQuery(
+            select=[ast.Alias(alias="total", expr=self._aggregation())],
+            select_from=ast.JoinExpr(table=ast.Field(chain=["raw_events_rollup"])),
+            where=self.where(events_filter),
+            group_by=[],
+        )
+        assert query.group_by is not None
+
+        if group_by_day:
+            query.select.append(
+                ast.Alias(
+                    alias="day_start",
+                    expr=ast.Call(
+                        name=f"toStartOf{self.query_date_range.interval_name.title()}",
+                        args=[ast.Field(chain=["hour"])],
+                    ),
+                )
+            )
+            query.group_by.append(ast.Field(chain=["day_start"]))
+
+        if breakdown.enabled:
+            query.select.append(self.rewrite(breakdown.column_expr()))
+            query.group_by.append(ast.Field(chain=["breakdown_value"]))
+
+        return query
+
+    def where(self, events_filter: ast.Expr) -> ast.Expr:
+        return ast.And(
+            exprs=[
+                ast.CompareOperation(
+                    left=ast.Field(chain=["property_name"]),
+                    op=ast.CompareOperationOp.Eq,
+                    right=ast.Constant(value=self.property_name),
+                ),
+                self.rewrite(events_filter),
+            ]
+        )
+
+    def rewrite(self, expr: ast.Expr) -> ast.Expr:
+        """Turns an expression on events into the same expression on the rollup."""
+        return _EventsToRollupFields(self.property_name).visit(expr)
+
+    def _aggregation(self) -> ast.Expr:
+        if self.series.math == "dau":
+            return ast.Call(name="uniqExactMerge", args=[ast.Field(chain=["person_ids"])])
+        return ast.Call(name="sum", args=[ast.Field(chain=["count"])])
+
+    def _is_supported_math(self) -> bool:
+        if self.series.math in (None, "total"):
+            return True
+        if self.series.math == "dau":
+            # The rollup has the person_id of events as they were ingested, and no distinct_ids
+            return (
+                self.modifiers.personsOnEventsMode == PersonsOnEventsMode.person_id_no_override_properties_on_events
+                and not self.team.aggregate_users_by_distinct_id
+                # Cumulative users are counted on the first day they are seen, which needs every person_id
+                and not (
+                    self.query.trendsFilter is not None
+                    and self.query.trendsFilter.display == ChartDisplayType.ActionsLineGraphCumulative
+                )
+            )
+        return False
+
+    def _filters_test_accounts(self) -> bool:
+        return bool(
+            self.query.filterTestAccounts
+            and isinstance(self.team.test_account_filters, list)
+            and len(self.team.test_account_filters) > 0
+        )
+
+    def _is_supported_breakdown(self) -> bool:
+        breakdown_filter = self.query.breakdownFilter
+        if breakdown_filter is None:
+            return True
+        if breakdown_filter.breakdowns:
+            return False
+        if breakdown_filter.breakdown is None:
+            return True
+        return (
+            breakdown_filter.breakdown_type in (None, "event")
+            and isinstance(breakdown_filter.breakdown, str)
+            and breakdown_filter.breakdown in EVENTS_ROLLUP_PROPERTIES
+            and breakdown_filter.breakdown_histogram_bin_count is None
+        )
+
+    def _is_supported_date_range(self) -> bool:
+        # Events are read from the start of the interval of `date_from`, or from `date_from`, to `date_to`, inclusive
+        date_from = self.query_date_range.date_from()
+        date_to = self.query_date_range.date_to()
+        return (
+            (self.query_date_range.use_start_of_interval() or _is_start_of_hour(date_from))
+            and (date_to.minute, date_to.second, date_to.microsecond) == (59, 59, 999999)
+            # Hours are in UTC, so they only fall into the same intervals as events in timezones that are whole hours apart
+            and _is_whole_hours_from_utc(date_from)
+            and _is_whole_hours_from_utc(date_to)
+        )
+
+
+def _is_start_of_hour(value: datetime) -> bool:
+    return (value.minute, value.second, value.microsecond) == (0, 0, 0)
+
+
+def _is_whole_hours_from_utc(value: datetime) -> bool:
+    offset = value.utcoffset()
+    return offset is None or offset.total_seconds() % 3600 == 0
+
+
+class _EventsToRollupFields(CloningVisitor):
+    def __init__(self, property_name: str):
+        super().__init__()
+        self.property_name = property_name
+
+    def visit_field(self, node: ast.Field):
+        if node.chain == ["timestamp"]:
+            return ast.Field(chain=["hour"])
+        if node.chain == ["properties", self.property_name]:
+            return parse_expr(PROPERTY_VALUE_EXPR)
+        return super().visit_field(node)
@@ -11,6 +11,7 @@ from posthog.hogql.constants import MAX_SELECT_RETURNED_ROWS, LimitContext
 from posthog.hogql.modifiers import create_default_modifiers_for_team
 from posthog.hogql.query import INCREASED_MAX_EXECUTION_TIME
 from posthog.hogql_queries.insights.trends.breakdown_values import BREAKDOWN_OTHER_DISPLAY
+from posthog.hogql_queries.insights.trends.events_rollup import EventsRollup
 from posthog.hogql_queries.insights.trends.trends_query_runner import TrendsQueryRunner
 from posthog.models.cohort.cohort import Cohort
 from posthog.models.property_definition import PropertyDefinition
@@ -26,11 +27,14 @@ from posthog.schema import (
     CountPerActorMathType,
     DateRange,
     DayItem,
+    EventPropertyFilter,
     EventsNode,
     HogQLQueryModifiers,
     InCohortVia,
     IntervalType,
+    PersonsOnEventsMode,
     PropertyMathType,
+    PropertyOperator,
     TrendsFilter,
     TrendsQuery,
 )
@@ -1995,3 +1999,125 @@ class TestTrendsQueryRunner(ClickhouseTestMixin, APIBaseTest):
         assert response.select_from.table.where.exprs[1].right.value == datetime(  # type: ignore
             2020, 1, 20, 12, 37, 42, tzinfo=zoneinfo.ZoneInfo(key="UTC")
         )
+
+    @override_settings(INCREMENTAL_TRENDS_REFRESH=True, INCREMENTAL_TRENDS_LATE_DATA_HOURS=24)
+    def test_incremental_refresh(self):
+        self._create_test_events()
+        flush_persons_and_events()
+
+        def run(now: str):
+            with freeze_time(now):
+                response = self._create_query_runner("-7d", None, IntervalType.day, None).run()
+            return dict(zip(response.results[0]["days"], response.results[0]["data"]))
+
+        assert run("2020-01-19T12:00:00Z")["2020-01-15"] == 2
+
+        # One event arrives days late, one only a few hours late
+        _create_event(team=self.team, event="$pageview", distinct_id="p1", timestamp="2020-01-15T12:00:00Z")
+        _create_event(team=self.team, event="$pageview", distinct_id="p1", timestamp="2020-01-18T13:00:00Z")
+        flush_persons_and_events()
+
+        # Only the intervals from 24 hours before the last refresh on are queried again
+        data = run("2020-01-20T10:00:00Z")
+        assert list(data) == [f"2020-01-{day}" for day in range(13, 21)]
+        assert data["2020-01-15"] == 2
+        assert data["2020-01-18"] == 1
+
+        # A day after the last full refresh everything is calculated again
+        data = run("2020-01-21T13:00:00Z")
+        assert data["2020-01-15"] == 3
+        assert data["2020-01-18"] == 1
+
+    def test_incremental_refresh_only_for_independent_intervals(self):
+        assert self._create_query_runner("-7d", None, IntervalType.day, None)._can_calculate_incrementally()
+        assert not self._create_query_runner(
+            "-7d", None, IntervalType.day, None, breakdown=BreakdownFilter(breakdown="$browser")
+        )._can_calculate_incrementally()
+        assert not self._create_query_runner(
+            "-7d", None, IntervalType.day, None, TrendsFilter(display=ChartDisplayType.ActionsLineGraphCumulative)
+        )._can_calculate_incrementally()
+        assert not self._create_query_runner(
+            "-7d", None, IntervalType.day, None, TrendsFilter(smoothingIntervals=7)
+        )._can_calculate_incrementally()
+
+    def test_events_rollup(self):
+        self._create_test_events()
+        flush_persons_and_events()
+
+        poe_mode = PersonsOnEventsMode.person_id_no_override_properties_on_events
+        for series, breakdown in [
+            ([EventsNode(event="$pageview")], None),
+            ([EventsNode(event="$pageview", math=BaseMathType.dau)], None),
+            ([EventsNode(event="$pageview")], BreakdownFilter(breakdown="$browser")),
+            ([EventsNode(event="$pageview", math=BaseMathType.dau)], BreakdownFilter(breakdown="$browser")),
+            ([EventsNode(event=None)], None),
+        ]:
+            from_events = self._run_trends_query(
+                "2020-01-09",
+                "2020-01-20",
+                IntervalType.day,
+                series,
+                breakdown=breakdown,
+                hogql_modifiers=HogQLQueryModifiers(personsOnEventsMode=poe_mode),
+            )
+            from_rollup = self._run_trends_query(
+                "2020-01-09",
+                "2020-01-20",
+                IntervalType.day,
+                series,
+                breakdown=breakdown,
+                hogql_modifiers=HogQLQueryModifiers(personsOnEventsMode=poe_mode, useEventsRollups=True),
+            )
+
+            assert "raw_events_rollup" not in (from_events.hogql or "")
+            assert "raw_events_rollup" in (from_rollup.hogql or "")
+            assert [(result.get("breakdown_value"), result["data"]) for result in from_rollup.results] == [
+                (result.get("breakdown_value"), result["data"]) for result in from_events.results
+            ]
+
+    def test_events_rollup_only_for_supported_queries(self):
+        def uses_rollup(
+            series: Optional[list[EventsNode | ActionsNode]] = None,
+            breakdown: Optional[BreakdownFilter] = None,
+            modifiers: Optional[HogQLQueryModifiers] = None,
+            date_range: tuple[str, Optional[str]] = ("-7d", None),
+        ) -> bool:
+            runner = self._create_query_runner(
+                *date_range,
+                IntervalType.hour,
+                series,
+                breakdown=breakdown,
+                hogql_modifiers=modifiers or HogQLQueryModifiers(useEventsRollups=True),
+                explicit_date=date_range[1] is not None,
+            )
+            return EventsRollup(
+                team=self.team,
+                query=runner.query,
+                series=runner.query.series[0],
+                query_date_range=runner.query_date_range,
+                modifiers=runner.modifiers,
+            ).enabled
+
+        assert uses_rollup()
+        assert uses_rollup(breakdown=BreakdownFilter(breakdown="$browser"))
+        assert not uses_rollup(modifiers=HogQLQueryModifiers())
+        assert not uses_rollup(breakdown=BreakdownFilter(breakdown="$current_url"))
+        assert not uses_rollup(breakdown=BreakdownFilter(breakdown="$browser", breakdown_type=BreakdownType.person))
+        assert not uses_rollup([EventsNode(event="$pageview", math=BaseMathType.weekly_active)])
+        assert not uses_rollup(
+            [
+                EventsNode(
+                    event="$pageview",
+                    properties=[EventPropertyFilter(key="a", value="b", operator=PropertyOperator.exact)],
+                )
+            ]
+        )
+        assert not uses_rollup([ActionsNode(id=1)])
+        # Only counting the person_id of events gives the same persons as events
+        assert not uses_rollup(
+            [EventsNode(event="$pageview", math=BaseMathType.dau)],
+            modifiers=HogQLQueryModifiers(useEventsRollups=True, personsOnEventsMode=PersonsOnEventsMode.disabled),
+        )
+        # The rollup is by hour
+        assert uses_rollup(date_range=("2020-01-19T10:00:00", "2020-01-19T12:59:59.999999"))
+        assert not uses_rollup(date_range=("2020-01-19T10:00:00", "2020-01-19T12:30:00"))
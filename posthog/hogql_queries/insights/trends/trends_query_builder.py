@@ -11,9 +11,11 @@ from posthog.hogql_queries.insights.trends.aggregation_operations import (
 from posthog.hogql_queries.insights.trends.breakdown import Breakdown
 from posthog.hogql_queries.insights.trends.breakdown_values import BREAKDOWN_OTHER_STRING_LABEL
 from posthog.hogql_queries.insights.trends.display import TrendsDisplay
+from posthog.hogql_queries.insights.trends.events_rollup import EventsRollup
 from posthog.hogql_queries.insights.trends.utils import series_event_name
 from posthog.hogql_queries.utils.query_date_range import QueryDateRange
 from posthog.models.action.action import Action
+from posthog.models.action.matching import get_action_matcher
 from posthog.models.filters.mixins.utils import cached_property
 from posthog.models.team.team import Team
 from posthog.queries.trends.breakdown import BREAKDOWN_NULL_STRING_LABEL
@@ -192,6 +194,13 @@ class TrendsQueryBuilder(DataWarehouseInsightQueryMixin):
             actors_query_time_frame=actors_query_time_frame,
         )
 
+        if not is_actors_query and not no_modifications and self._events_rollup.enabled:
+            return self._events_rollup.events_subquery(
+                events_filter,
+                breakdown=breakdown,
+                group_by_day=not self._trends_display.should_aggregate_values(),
+            )
+
         default_query = ast.SelectQuery(
             select=[ast.Alias(alias="total", expr=self._aggregation_operation.select_aggregation())],
             select_from=ast.JoinExpr(table=self._table_expr, alias="e"),
@@ -541,7 +550,7 @@ class TrendsQueryBuilder(DataWarehouseInsightQueryMixin):
         # Actions
         if isinstance(series, ActionsNode):
             try:
-                action = Action.objects.get(pk=int(series.id), team=self.team)
+                action = get_action_matcher(self.team).get_action(int(series.id))
                 filters.append(action_to_expr(action))
             except Action.DoesNotExist:
                 # If an action doesn't exist, we want to return no events
@@ -609,6 +618,7 @@ class TrendsQueryBuilder(DataWarehouseInsightQueryMixin):
             ),
             breakdown_values_override=[breakdown_values_override] if breakdown_values_override is not None else None,
             limit_context=self.limit_context,
+            events_rollup=self._events_rollup if not is_actors_query else None,
         )
 
     @cached_property
@@ -621,6 +631,16 @@ class TrendsQueryBuilder(DataWarehouseInsightQueryMixin):
             self._trends_display.should_aggregate_values(),
         )
 
+    @cached_property
+    def _events_rollup(self) -> EventsRollup:
+        return EventsRollup(
+            team=self.team,
+            query=self.query,
+            series=self.series,
+            query_date_range=self.query_date_range,
+            modifiers=self.modifiers,
+        )
+
     @cached_property
     def _trends_display(self) -> TrendsDisplay:
         display = (
@@ -1,12 +1,15 @@
 from natsort import natsorted, ns
 from typing import Union
 from copy import deepcopy
+from contextvars import copy_context
 from datetime import timedelta
 from math import ceil
 from operator import itemgetter
 import threading
 from typing import Optional, Any
+from zoneinfo import ZoneInfo
 from dateutil import parser
+from dateutil.parser import isoparse
 from dateutil.relativedelta import relativedelta
 from django.conf import settings
 
@@ -15,6 +18,7 @@ from posthog.caching.insights_api import (
     BASE_MINIMUM_INSIGHT_REFRESH_INTERVAL,
     REDUCED_MINIMUM_INSIGHT_REFRESH_INTERVAL,
 )
+from posthog.caching.results_cache import get_cached_result, set_cached_result
 from posthog.caching.utils import is_stale
 
 from posthog.hogql import ast
@@ -33,7 +37,7 @@ from posthog.hogql_queries.insights.trends.trends_query_builder import TrendsQue
 from posthog.hogql_queries.insights.trends.series_with_extras import SeriesWithExtras
 from posthog.hogql_queries.query_runner import QueryRunner
 from posthog.hogql_queries.utils.formula_ast import FormulaAST
-from posthog.hogql_queries.utils.query_date_range import QueryDateRange
+from posthog.hogql_queries.utils.query_date_range import QueryDateRange, QueryDateRangeFrom
 from posthog.hogql_queries.utils.query_previous_period_date_range import (
     QueryPreviousPeriodDateRange,
 )
@@ -116,12 +120,12 @@ class TrendsQueryRunner(QueryRunner):
                 queries.extend(query.select_queries)
         return ast.SelectUnionQuery(select_queries=queries)
 
-    def to_queries(self) -> list[ast.SelectQuery | ast.SelectUnionQuery]:
+    def to_queries(self, date_range: Optional[QueryDateRange] = None) -> list[ast.SelectQuery | ast.SelectUnionQuery]:
         queries = []
         with self.timings.measure("trends_to_query"):
             for series in self.series:
                 if not series.is_previous_period_series:
-                    query_date_range = self.query_date_range
+                    query_date_range = date_range or self.query_date_range
                 else:
                     query_date_range = self.query_previous_date_range
 
@@ -275,8 +279,49 @@ class TrendsQueryRunner(QueryRunner):
         )
 
     def calculate(self):
+        incremental_response = self.calculate_incrementally()
+        if incremental_response is not None:
+            return incremental_response
+
         queries = self.to_queries()
+        response_hogql = self._response_hogql(queries)
+        returned_results, timings, debug_errors = self._execute_queries(queries)
 
+        if (
+            self.query.trendsFilter is not None
+            and self.query.trendsFilter.formula is not None
+            and self.query.trendsFilter.formula != ""
+        ):
+            with self.timings.measure("apply_formula"):
+                has_compare = bool(self.query.trendsFilter and self.query.trendsFilter.compare)
+                if has_compare:
+                    current_results = returned_results[: len(returned_results) // 2]
+                    previous_results = returned_results[len(returned_results) // 2 :]
+
+                    final_result = self.apply_formula(
+                        self.query.trendsFilter.formula, current_results
+                    ) + self.apply_formula(self.query.trendsFilter.formula, previous_results)
+                else:
+                    final_result = self.apply_formula(self.query.trendsFilter.formula, returned_results)
+        else:
+            final_result = []
+            for result in returned_results:
+                if isinstance(result, list):
+                    final_result.extend(result)
+                elif isinstance(result, dict):
+                    raise ValueError("This should not happen")
+
+        response = TrendsQueryResponse(
+            results=final_result,
+            timings=timings,
+            hogql=response_hogql,
+            modifiers=self.modifiers,
+            error=". ".join(debug_errors),
+        )
+        self._record_full_refresh()
+        return response
+
+    def _response_hogql(self, queries: list[ast.SelectQuery | ast.SelectUnionQuery]) -> str:
         if len(queries) == 1:
             response_hogql_query = queries[0]
         else:
@@ -288,8 +333,12 @@ class TrendsQueryRunner(QueryRunner):
                     response_hogql_query.select_queries.extend(query.select_queries)
 
         with self.timings.measure("printing_hogql_for_response"):
-            response_hogql = to_printed_hogql(response_hogql_query, self.team, self.modifiers)
+            return to_printed_hogql(response_hogql_query, self.team, self.modifiers)
 
+    def _execute_queries(
+        self, queries: list[ast.SelectQuery | ast.SelectUnionQuery]
+    ) -> tuple[list[list[dict[str, Any]]], list[QueryTiming], list[str]]:
+        """Run the query of every series, returning the series built from their results, their timings and errors."""
         res_matrix: list[list[Any] | Any | None] = [None] * len(queries)
         timings_matrix: list[list[QueryTiming] | None] = [None] * len(queries)
         errors: list[Exception] = []
@@ -306,6 +355,7 @@ class TrendsQueryRunner(QueryRunner):
                     timings=self.timings,
                     modifiers=self.modifiers,
                     limit_context=self.limit_context,
+                    include_hogql=False,
                 )
 
                 timings_matrix[index] = response.timings
@@ -329,7 +379,11 @@ class TrendsQueryRunner(QueryRunner):
         elif len(queries) == 1:
             run(0, queries[0], False)
         else:
-            jobs = [threading.Thread(target=run, args=(index, query, True)) for index, query in enumerate(queries)]
+            # Each thread runs in a copy of the current context, so context variables like `allow_downsampling` carry over
+            jobs = [
+                threading.Thread(target=copy_context().run, args=(run, index, query, True))
+                for index, query in enumerate(queries)
+            ]
 
             # Start the threads
             for j in jobs:
@@ -356,38 +410,123 @@ class TrendsQueryRunner(QueryRunner):
             if isinstance(timing, list):
                 timings.extend(timing)
 
+        return returned_results, timings, debug_errors
+
+    def calculate_incrementally(self) -> Optional[TrendsQueryResponse]:
+        """
+        Refresh the stale cached response by only querying the intervals that can still change.
+
+        Events can arrive late, so intervals from the team's late data horizon before the last refresh on are queried
+        again, while older intervals keep their cached values. Returns None if the trend should be calculated fully.
+        """
+        cached_response = self.stale_cached_response
         if (
-            self.query.trendsFilter is not None
-            and self.query.trendsFilter.formula is not None
-            and self.query.trendsFilter.formula != ""
+            not settings.INCREMENTAL_TRENDS_REFRESH
+            or cached_response is None
+            or not self._can_calculate_incrementally()
         ):
-            with self.timings.measure("apply_formula"):
-                has_compare = bool(self.query.trendsFilter and self.query.trendsFilter.compare)
-                if has_compare:
-                    current_results = returned_results[: len(returned_results) // 2]
-                    previous_results = returned_results[len(returned_results) // 2 :]
+            return None
 
-                    final_result = self.apply_formula(
-                        self.query.trendsFilter.formula, current_results
-                    ) + self.apply_formula(self.query.trendsFilter.formula, previous_results)
-                else:
-                    final_result = self.apply_formula(self.query.trendsFilter.formula, returned_results)
-        else:
-            final_result = []
-            for result in returned_results:
-                if isinstance(result, list):
-                    final_result.extend(result)
-                elif isinstance(result, dict):
-                    raise ValueError("This should not happen")
+        # Calculate fully every now and then, in case events arrived even later
+        last_full_refresh = get_cached_result(self._full_refresh_cache_key())
+        if last_full_refresh is None or isoparse(last_full_refresh) < datetime.now(tz=ZoneInfo("UTC")) - timedelta(
+            hours=settings.INCREMENTAL_TRENDS_FULL_REFRESH_HOURS
+        ):
+            return None
+
+        late_data_hours = (self.team.extra_settings or {}).get(
+            "late_data_horizon_hours", settings.INCREMENTAL_TRENDS_LATE_DATA_HOURS
+        )
+        start = isoparse(cached_response.last_refresh) - timedelta(hours=late_data_hours)
+        date_range = QueryDateRangeFrom(
+            date_range=self.query.dateRange,
+            start=start,
+            team=self.team,
+            interval=self.query.interval,
+            now=self.query_date_range.now_with_timezone,
+        )
+        if date_range.date_from() <= self.query_date_range.align_with_interval(self.query_date_range.date_from()):
+            # There's nothing to keep
+            return None
+
+        with self.timings.measure("incremental_refresh"):
+            returned_results, timings, debug_errors = self._execute_queries(self.to_queries(date_range))
+            results = self._merge_incremental_results(
+                cached_response.results,
+                [series for result in returned_results for series in result],
+                date_range.date_from(),
+            )
+        if results is None:
+            return None
 
         return TrendsQueryResponse(
-            results=final_result,
+            results=results,
             timings=timings,
-            hogql=response_hogql,
+            hogql=self._response_hogql(self.to_queries()),
             modifiers=self.modifiers,
             error=". ".join(debug_errors),
         )
 
+    def _can_calculate_incrementally(self) -> bool:
+        # Only trends whose intervals are calculated independently of each other and of the rest of the date range
+        trends_filter = self.query.trendsFilter
+        return not (
+            self._trends_display.should_aggregate_values()
+            or self._trends_display.display_type == ChartDisplayType.ActionsLineGraphCumulative
+            # Breakdown values are the top values of the whole date range
+            or (self.query.breakdownFilter is not None and self.query.breakdownFilter.breakdown is not None)
+            or (
+                trends_filter is not None
+                and (
+                    bool(trends_filter.compare)
+                    or bool(trends_filter.formula)
+                    or (trends_filter.smoothingIntervals or 1) > 1
+                )
+            )
+        )
+
+    def _merge_incremental_results(
+        self, cached_results: list[dict[str, Any]], fresh_results: list[dict[str, Any]], start: datetime
+    ) -> Optional[list[dict[str, Any]]]:
+        """Replace the values of intervals from `start` on in the cached series, or None if the series don't match."""
+        if len(cached_results) != len(fresh_results):
+            return None
+
+        date_format = "%Y-%m-%d %H:%M:%S" if self.query_date_range.is_hourly else "%Y-%m-%d"
+        days = [value.strftime(date_format) for value in self.query_date_range.all_values()]
+        start_day = start.strftime(date_format)
+
+        results = []
+        for cached, fresh in zip(cached_results, fresh_results):
+            if cached.get("label") != fresh["label"]:
+                return None
+            cached_values = dict(zip(cached["days"], zip(cached["data"], cached["labels"])))
+            fresh_values = dict(zip(fresh["days"], zip(fresh["data"], fresh["labels"])))
+            try:
+                values = [(fresh_values if day >= start_day else cached_values)[day] for day in days]
+            except KeyError:
+                # The intervals don't line up
+                return None
+
+            data = [value for value, _ in values]
+            results.append(
+                {
+                    **fresh,
+                    "data": data,
+                    "labels": [label for _, label in values],
+                    "days": days,
+                    "count": float(sum(data)),
+                }
+            )
+        return results
+
+    def _full_refresh_cache_key(self) -> str:
+        return f"{self.get_results_cache_key()}_full_refresh"
+
+    def _record_full_refresh(self) -> None:
+        if settings.INCREMENTAL_TRENDS_REFRESH and self._can_calculate_incrementally():
+            set_cached_result(self._full_refresh_cache_key(), datetime.now(tz=ZoneInfo("UTC")).isoformat())
+
     def build_series_response(self, response: HogQLQueryResponse, series: SeriesWithExtras, series_count: int):
         def get_value(name: str, val: Any):
             if name not in ["date", "total", "breakdown_value"]:
@@ -562,8 +701,7 @@ class TrendsQueryRunner(QueryRunner):
         if isinstance(series, EventsNode):
             return series.event
         if isinstance(series, ActionsNode):
-            # TODO: Can we load the Action in more efficiently?
-            action = Action.objects.get(pk=int(series.id), team=self.team)
+            action = self.action_matcher.get_action(int(series.id))
             return action.name
 
         if isinstance(series, DataWarehouseNode):
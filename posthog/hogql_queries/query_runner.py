@@ -3,23 +3,25 @@ from datetime import datetime
 from enum import IntEnum
 from typing import Any, Generic, Optional, TypeVar, Union, cast, TypeGuard
 
-from django.conf import settings
-from django.core.cache import cache
 from prometheus_client import Counter
 from pydantic import BaseModel, ConfigDict
 from sentry_sdk import capture_exception, push_scope
 import structlog
 
-from posthog.cache_utils import OrjsonJsonSerializer
+from posthog.caching.cached_response_encoding import decode_cached_response, encode_cached_response
+from posthog.caching.results_cache import get_cached_result, set_cached_result
 from posthog.clickhouse.query_tagging import tag_queries
 from posthog.hogql import ast
 from posthog.hogql.constants import LimitContext
 from posthog.hogql.context import HogQLContext
 from posthog.hogql.printer import print_ast
 from posthog.hogql.query import create_default_modifiers_for_team
+from posthog.hogql.query_cost import DownsampleQuery, allow_downsampling
 from posthog.hogql.timings import HogQLTimings
 from posthog.metrics import LABEL_TEAM_ID
 from posthog.models import Team
+from posthog.models.action.matching import ActionMatcher, get_action_matcher
+from posthog.models.filters.mixins.utils import cached_property
 from posthog.schema import (
     CacheMissResponse,
     DateRange,
@@ -49,7 +51,7 @@ from posthog.schema import (
     HogQLQueryModifiers,
     InsightActorsQueryOptions,
 )
-from posthog.utils import generate_cache_key, get_safe_cache, get_from_dict_or_attr
+from posthog.utils import generate_cache_key, get_from_dict_or_attr
 
 logger = structlog.get_logger(__name__)
 
@@ -285,6 +287,9 @@ class QueryRunner(ABC, Generic[Q, R, CR]):
     modifiers: HogQLQueryModifiers
     limit_context: LimitContext
 
+    stale_cached_response: Optional[CR] = None
+    """The cached response that's being recalculated because it's stale, if any. Runners can refresh it partially."""
+
     def __init__(
         self,
         query: Q | BaseModel | dict[str, Any],
@@ -315,6 +320,11 @@ class QueryRunner(ABC, Generic[Q, R, CR]):
     def is_query_node(self, data) -> TypeGuard[Q]:
         return isinstance(data, self.query_type)
 
+    @cached_property
+    def action_matcher(self) -> ActionMatcher:
+        """The team's actions, loaded once for the lifetime of the runner."""
+        return get_action_matcher(self.team)
+
     def is_cached_response(self, data) -> TypeGuard[dict]:
         return (
             hasattr(data, "is_cached")  # Duck typing for backwards compatibility with `CachedQueryResponse`
@@ -328,53 +338,67 @@ class QueryRunner(ABC, Generic[Q, R, CR]):
     def run(
         self, execution_mode: ExecutionMode = ExecutionMode.RECENT_CACHE_CALCULATE_IF_STALE
     ) -> CR | CacheMissResponse:
-        # TODO: `self.limit_context` should probably just be in get_cache_key()
-        cache_key = f"{self.get_cache_key()}_{self.limit_context or LimitContext.QUERY}_v2"
+        cache_key = self.get_results_cache_key()
         tag_queries(cache_key=cache_key)
-        CachedResponse: type[CR] = self.cached_response_type
 
         if execution_mode != ExecutionMode.CALCULATION_ALWAYS:
             # Let's look in the cache first
-            cached_response: CR | CacheMissResponse
-            cached_response_candidate_bytes: Optional[bytes] = get_safe_cache(cache_key)
-            cached_response_candidate: Optional[dict] = (
-                OrjsonJsonSerializer({}).loads(cached_response_candidate_bytes)
-                if cached_response_candidate_bytes
-                else None
-            )
-            if self.is_cached_response(cached_response_candidate):
-                cached_response_candidate["is_cached"] = True
-                cached_response = CachedResponse(**cached_response_candidate)
-            elif cached_response_candidate is None:
-                cached_response = CacheMissResponse(cache_key=cache_key)
-            else:
-                # Whatever's in cache is malformed, so let's treat is as non-existent
-                cached_response = CacheMissResponse(cache_key=cache_key)
-                with push_scope() as scope:
-                    scope.set_tag("cache_key", cache_key)
-                    capture_exception(
-                        ValueError(f"Cached response is of unexpected type {type(cached_response)}, ignoring it")
-                    )
+            cached_response = self.handle_cached_response(get_cached_result(cache_key), cache_key, execution_mode)
+            if cached_response is not None:
+                return cached_response
 
-            if self.is_cached_response(cached_response_candidate):
-                if not self._is_stale(cached_response):
-                    QUERY_CACHE_HIT_COUNTER.labels(team_id=self.team.pk, cache_hit="hit").inc()
-                    # We have a valid result that's fresh enough, let's return it
-                    return cached_response
-                else:
-                    QUERY_CACHE_HIT_COUNTER.labels(team_id=self.team.pk, cache_hit="stale").inc()
-                    # We have a stale result. If we aren't allowed to calculate, let's still return it
-                    # – otherwise let's proceed to calculation
-                    if execution_mode == ExecutionMode.CACHE_ONLY_NEVER_CALCULATE:
-                        return cached_response
+        return self.calculate_and_cache(cache_key)
+
+    def get_results_cache_key(self) -> str:
+        # TODO: `self.limit_context` should probably just be in get_cache_key()
+        return f"{self.get_cache_key()}_{self.limit_context or LimitContext.QUERY}_v2"
+
+    def handle_cached_response(
+        self, cached_response_candidate_bytes: Optional[bytes], cache_key: str, execution_mode: ExecutionMode
+    ) -> Optional[CR | CacheMissResponse]:
+        """Return the response to use given what was found in the cache, or None if the query should be calculated."""
+        CachedResponse: type[CR] = self.cached_response_type
+        cached_response: CR | CacheMissResponse
+        cached_response_candidate: Optional[dict] = (
+            decode_cached_response(cached_response_candidate_bytes) if cached_response_candidate_bytes else None
+        )
+        if self.is_cached_response(cached_response_candidate):
+            cached_response_candidate["is_cached"] = True
+            cached_response = CachedResponse(**cached_response_candidate)
+        elif cached_response_candidate is None:
+            cached_response = CacheMissResponse(cache_key=cache_key)
+        else:
+            # Whatever's in cache is malformed, so let's treat is as non-existent
+            cached_response = CacheMissResponse(cache_key=cache_key)
+            with push_scope() as scope:
+                scope.set_tag("cache_key", cache_key)
+                capture_exception(
+                    ValueError(f"Cached response is of unexpected type {type(cached_response)}, ignoring it")
+                )
+
+        if self.is_cached_response(cached_response_candidate):
+            if not self._is_stale(cached_response):
+                QUERY_CACHE_HIT_COUNTER.labels(team_id=self.team.pk, cache_hit="hit").inc()
+                # We have a valid result that's fresh enough, let's return it
+                return cached_response
             else:
-                QUERY_CACHE_HIT_COUNTER.labels(team_id=self.team.pk, cache_hit="miss").inc()
-                # We have no cached result. If we aren't allowed to calculate, let's return the cache miss
+                QUERY_CACHE_HIT_COUNTER.labels(team_id=self.team.pk, cache_hit="stale").inc()
+                # We have a stale result. If we aren't allowed to calculate, let's still return it
                 # – otherwise let's proceed to calculation
                 if execution_mode == ExecutionMode.CACHE_ONLY_NEVER_CALCULATE:
                     return cached_response
-
-        fresh_response_dict = self.calculate().model_dump()
+                self.stale_cached_response = cached_response
+        else:
+            QUERY_CACHE_HIT_COUNTER.labels(team_id=self.team.pk, cache_hit="miss").inc()
+            # We have no cached result. If we aren't allowed to calculate, let's return the cache miss
+            # – otherwise let's proceed to calculation
+            if execution_mode == ExecutionMode.CACHE_ONLY_NEVER_CALCULATE:
+                return cached_response
+        return None
+
+    def calculate_and_cache(self, cache_key: str) -> CR:
+        CachedResponse: type[CR] = self.cached_response_type
+        fresh_response_dict = self._calculate_admitted().model_dump()
         fresh_response_dict["is_cached"] = False
         fresh_response_dict["last_refresh"] = datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ")
         fresh_response_dict["next_allowed_client_refresh"] = (datetime.now() + self._refresh_frequency()).strftime(
@@ -387,13 +411,25 @@ class QueryRunner(ABC, Generic[Q, R, CR]):
         # Dont cache debug queries with errors
         has_error: Optional[list] = fresh_response_dict.get("error", None)
         if has_error is None or len(has_error) == 0:
-            # TODO: Use JSON serializer in general for redis cache
-            fresh_response_serialized = OrjsonJsonSerializer({}).dumps(fresh_response.model_dump())
-            cache.set(cache_key, fresh_response_serialized, settings.CACHED_RESULTS_TTL)
+            fresh_response_serialized = encode_cached_response(fresh_response.model_dump())
+            set_cached_result(cache_key, fresh_response_serialized)
 
         QUERY_CACHE_WRITE_COUNTER.labels(team_id=self.team.pk).inc()
         return fresh_response
 
+    def _calculate_admitted(self) -> R:
+        """Calculates the query, sampled if admission rules say it's too expensive to run in full."""
+        if getattr(self.query, "samplingFactor", 1) is not None:
+            # Either queries that can't be sampled, or that already are
+            return self.calculate()
+        try:
+            with allow_downsampling():
+                return self.calculate()
+        except DownsampleQuery as e:
+            logger.info("query_downsampled", team_id=self.team.pk, sampling_factor=e.sample_rate)
+            self.query.samplingFactor = e.sample_rate  # type: ignore
+            return self.calculate()
+
     @abstractmethod
     def to_query(self) -> ast.SelectQuery | ast.SelectUnionQuery:
         raise NotImplementedError()
@@ -0,0 +1,98 @@
+"""
+Running many query runners as one batch, e.g. all query-based tiles of a dashboard.
+"""
+
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextvars import copy_context
+from typing import Any, Optional
+
+from django.conf import settings
+from django.db import connections
+from pydantic import BaseModel
+
+from posthog.caching.results_cache import get_cached_results
+from posthog.clickhouse.query_tagging import get_query_tags, reset_query_tags, tag_queries
+from posthog.hogql.database.database import shared_hogql_databases
+from posthog.hogql_queries.query_runner import ExecutionMode, QueryRunner
+
+
+def run_query_runners(
+    query_runners: Sequence[QueryRunner],
+    *,
+    execution_mode: ExecutionMode = ExecutionMode.RECENT_CACHE_CALCULATE_IF_STALE,
+    query_tags: Optional[Sequence[dict[str, Any]]] = None,
+    max_concurrency: Optional[int] = None,
+) -> Iterator[tuple[int, BaseModel | Exception]]:
+    """
+    Run the query runners as one batch, yielding the index of each runner with its response as soon as it's available.
+
+    Runners with the same results cache key run only once. Cached responses are read in one round trip and
+    yielded first. The rest are calculated at most `max_concurrency` at a time, sharing the HogQL database of the team,
+    and yielded as they finish. A runner that fails yields its exception instead, so it doesn't fail the whole batch.
+    """
+    max_concurrency = max_concurrency or settings.DASHBOARD_QUERY_CONCURRENCY
+    parent_query_tags = dict(get_query_tags())
+
+    indices_by_cache_key: dict[str, list[int]] = {}
+    for index, query_runner in enumerate(query_runners):
+        indices_by_cache_key.setdefault(query_runner.get_results_cache_key(), []).append(index)
+
+    cached_responses: dict[str, Any] = {}
+    if execution_mode != ExecutionMode.CALCULATION_ALWAYS:
+        cached_responses = get_cached_results(indices_by_cache_key)
+
+    cache_keys_to_calculate: list[str] = []
+    for cache_key, indices in indices_by_cache_key.items():
+        try:
+            response = query_runners[indices[0]].handle_cached_response(
+                cached_responses.get(cache_key), cache_key, execution_mode
+            )
+        except Exception as e:
+            response = e
+        if response is None:
+            cache_keys_to_calculate.append(cache_key)
+            continue
+        for index in indices:
+            yield index, response
+
+    if not cache_keys_to_calculate:
+        return
+
+    def calculate(cache_key: str) -> BaseModel | Exception:
+        index = indices_by_cache_key[cache_key][0]
+        reset_query_tags()
+        tag_queries(**{**parent_query_tags, **(query_tags[index] if query_tags else {}), "cache_key": cache_key})
+        try:
+            return query_runners[index].calculate_and_cache(cache_key)
+        except Exception as e:
+            return e
+        finally:
+            reset_query_tags()
+            tag_queries(**parent_query_tags)
+
+    with shared_hogql_databases():
+        if max_concurrency <= 1 or len(cache_keys_to_calculate) == 1:
+            for cache_key in cache_keys_to_calculate:
+                response = calculate(cache_key)
+                for index in indices_by_cache_key[cache_key]:
+                    yield index, response
+            return
+
+        def calculate_in_thread(cache_key: str) -> BaseModel | Exception:
+            try:
+                return calculate(cache_key)
+            finally:
+                # Each thread has its own database connections, which would otherwise stay open
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(cache_keys_to_calculate))) as executor:
+            # Copying the context per task passes on the shared databases
+            futures = {
+                executor.submit(copy_context().run, calculate_in_thread, cache_key): cache_key
+                for cache_key in cache_keys_to_calculate
+            }
+            for future in as_completed(futures):
+                response = future.result()
+                for index in indices_by_cache_key[futures[future]]:
+                    yield index, response
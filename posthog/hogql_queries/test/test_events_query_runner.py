@@ -156,3 +156,42 @@ class TestEventsQueryRunner(ClickhouseTestMixin, APIBaseTest):
         right_expr = cast(ast.Constant, where_expr.right)
         self.assertEqual(right_expr.value, "%posthog.com%")
         self.assertEqual(where_expr.op, CompareOperationOp.NotILike)
+
+    def test_cursor_pagination_splits_events_with_the_same_timestamp(self):
+        self._create_events(
+            data=[(f"p{index}", "2020-01-11T12:00:01Z", {"index": index}) for index in range(5)]
+            + [("p5", "2020-01-11T12:00:02Z", {"index": 5}), ("p6", "2020-01-11T12:00:00Z", {"index": 6})]
+        )
+        flush_persons_and_events()
+
+        seen: list[int] = []
+        cursor = None
+        with freeze_time("2020-01-11T12:01:00"):
+            for _ in range(10):
+                query = EventsQuery(
+                    kind="EventsQuery",
+                    select=["properties.index", "timestamp"],
+                    orderBy=["timestamp DESC"],
+                    limit=2,
+                    cursor=cursor,
+                )
+                response = EventsQueryRunner(query=query, team=self.team).calculate()
+                # The uuid is only selected to build the cursor
+                self.assertEqual(response.columns, ["properties.index", "timestamp"])
+                self.assertTrue(all(len(row) == 2 for row in response.results))
+                seen.extend(int(row[0]) for row in response.results)
+                cursor = response.next_cursor
+                if cursor is None:
+                    break
+
+        self.assertEqual(seen[0], 5)
+        self.assertEqual(sorted(seen[1:6]), [0, 1, 2, 3, 4])
+        self.assertEqual(seen[6], 6)
+        self.assertEqual(len(seen), 7)
+
+    def test_cursor_pagination_not_available_for_aggregations(self):
+        query = EventsQuery(kind="EventsQuery", select=["event", "count()"])
+        runner = EventsQueryRunner(query=query, team=self.team)
+        response = runner.calculate()
+        self.assertIsNone(response.next_cursor)
+        self.assertEqual(runner.paginator.keys, [])
@@ -0,0 +1,88 @@
+import threading
+from datetime import datetime, timedelta
+from typing import Literal, Optional
+from zoneinfo import ZoneInfo
+
+from dateutil.parser import isoparse
+from pydantic import BaseModel
+
+from posthog.hogql.database.database import create_hogql_database, shared_hogql_databases
+from posthog.hogql_queries.query_runner import ExecutionMode, QueryRunner
+from posthog.hogql_queries.query_runner_batch import run_query_runners
+from posthog.schema import CacheMissResponse, TestBasicQueryResponse, TestCachedBasicQueryResponse
+from posthog.test.base import BaseTest
+
+
+class BatchTestQuery(BaseModel):
+    kind: Literal["BatchTestQuery"] = "BatchTestQuery"
+    value: int
+
+
+class TestRunQueryRunners(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.calculated: list[int] = []
+        self.barrier: Optional[threading.Barrier] = None
+        test = self
+
+        class BatchTestQueryRunner(QueryRunner):
+            query: BatchTestQuery
+            response: TestBasicQueryResponse
+            cached_response: TestCachedBasicQueryResponse
+
+            def calculate(self):
+                if test.barrier:
+                    test.barrier.wait()
+                if self.query.value < 0:
+                    raise ValueError("Negative value")
+                test.calculated.append(self.query.value)
+                return TestBasicQueryResponse(results=[self.query.value])
+
+            def _refresh_frequency(self) -> timedelta:
+                return timedelta(minutes=4)
+
+            def _is_stale(self, cached_result_package) -> bool:
+                return isoparse(cached_result_package.last_refresh) + timedelta(minutes=10) <= datetime.now(
+                    tz=ZoneInfo("UTC")
+                )
+
+        BatchTestQueryRunner.__abstractmethods__ = frozenset()
+        self.runner_class = BatchTestQueryRunner
+
+    def runners(self, *values: int) -> list[QueryRunner]:
+        return [self.runner_class(query=BatchTestQuery(value=value), team=self.team) for value in values]
+
+    def test_runs_identical_queries_once(self):
+        responses = dict(run_query_runners(self.runners(1, 2, 1)))
+
+        assert sorted(self.calculated) == [1, 2]
+        assert [responses[index].results for index in range(3)] == [[1], [2], [1]]
+
+    def test_returns_cached_responses_and_cache_misses(self):
+        list(run_query_runners(self.runners(1)))
+
+        responses = dict(run_query_runners(self.runners(1, 2), execution_mode=ExecutionMode.CACHE_ONLY_NEVER_CALCULATE))
+
+        assert self.calculated == [1]
+        assert responses[0].is_cached
+        assert responses[0].results == [1]
+        assert isinstance(responses[1], CacheMissResponse)
+
+    def test_calculates_concurrently(self):
+        # Each query waits for the others, so this only passes if they run at the same time
+        self.barrier = threading.Barrier(3, timeout=5)
+        responses = dict(run_query_runners(self.runners(1, 2, 3), max_concurrency=3))
+
+        assert [responses[index].results for index in range(3)] == [[1], [2], [3]]
+
+    def test_failing_query_does_not_fail_the_batch(self):
+        responses = dict(run_query_runners(self.runners(1, -1), max_concurrency=2))
+
+        assert responses[0].results == [1]
+        assert isinstance(responses[1], ValueError)
+
+    def test_shares_databases_within_block(self):
+        assert create_hogql_database(self.team.pk) is not create_hogql_database(self.team.pk)
+
+        with shared_hogql_databases():
+            assert create_hogql_database(self.team.pk) is create_hogql_database(self.team.pk)
@@ -329,3 +329,21 @@ class QueryDateRangeWithIntervals(QueryDateRange):
                 ast.Constant(value=int((WeekStartDay(self._team.week_start_day or 0)).clickhouse_mode))
             )
         return ast.Call(name=trunc_func, args=trunc_func_args)
+
+
+class QueryDateRangeFrom(QueryDateRange):
+    """The end of a date range, from the interval starting at `start`. Used to only query the newest intervals."""
+
+    def __init__(
+        self,
+        date_range: Optional[DateRange],
+        start: datetime,
+        team: Team,
+        interval: Optional[IntervalType],
+        now: datetime,
+    ) -> None:
+        self.start = start
+        super().__init__(date_range, team, interval, now)
+
+    def date_from(self) -> datetime:
+        return self.align_with_interval(self.start.astimezone(self.now_with_timezone.tzinfo))
@@ -23,6 +23,7 @@ class RecordingsHelper:
             query,
             placeholders={"session_ids": ast.Array(exprs=[ast.Constant(value=s) for s in session_ids])},
             team=self.team,
+            include_hogql=False,
         )
         if not response.results:
             return set()
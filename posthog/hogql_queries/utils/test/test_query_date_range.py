@@ -3,7 +3,11 @@ from datetime import timedelta
 from dateutil import parser
 
 from posthog.hogql import ast
-from posthog.hogql_queries.utils.query_date_range import QueryDateRange, QueryDateRangeWithIntervals
+from posthog.hogql_queries.utils.query_date_range import (
+    QueryDateRange,
+    QueryDateRangeFrom,
+    QueryDateRangeWithIntervals,
+)
 from posthog.models.team import WeekStartDay
 from posthog.schema import DateRange, IntervalType
 from posthog.test.base import APIBaseTest
@@ -128,6 +132,29 @@ class TestQueryDateRange(APIBaseTest):
         self.assertEqual(query_date_range.date_from(), parser.isoparse("2021-08-24T00:00:00.000000Z"))
         self.assertEqual(query_date_range.date_to(), parser.isoparse("2021-08-24T23:59:59.999999Z"))
 
+    def test_date_range_from(self):
+        now = parser.isoparse("2021-08-25T12:00:00.000Z")
+        date_range = DateRange(date_from="-7d")
+
+        query_date_range = QueryDateRangeFrom(
+            team=self.team,
+            date_range=date_range,
+            start=parser.isoparse("2021-08-23T15:30:00Z"),
+            interval=IntervalType.day,
+            now=now,
+        )
+        self.assertEqual(query_date_range.date_from(), parser.isoparse("2021-08-23T00:00:00Z"))
+        self.assertEqual(query_date_range.date_to(), parser.isoparse("2021-08-25T23:59:59.999999Z"))
+
+        query_date_range = QueryDateRangeFrom(
+            team=self.team,
+            date_range=date_range,
+            start=parser.isoparse("2021-08-23T15:30:00Z"),
+            interval=IntervalType.hour,
+            now=now,
+        )
+        self.assertEqual(query_date_range.date_from(), parser.isoparse("2021-08-23T15:00:00Z"))
+
 
 class TestQueryDateRangeWithIntervals(APIBaseTest):
     def setUp(self):
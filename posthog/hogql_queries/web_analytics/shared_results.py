@@ -0,0 +1,51 @@
+"""
+Intermediate results shared between the tiles of a web analytics dashboard.
+
+A dashboard load runs many queries over the same sessions, date range and filters, and they only differ in how they
+group the sessions. The runners put the aggregate they have in common under a key made of what it depends on, so the
+other tiles of the same load read it instead of aggregating the sessions again.
+"""
+
+import time
+from collections.abc import Callable
+from typing import TypeVar
+
+from django.core.cache import cache
+
+from posthog.utils import get_safe_cache
+
+T = TypeVar("T")
+
+# Long enough for all tiles of a dashboard load, short enough to not need invalidation
+SHARED_RESULT_TTL = 60
+# How long to wait for another request that is already calculating the same result
+SHARED_RESULT_WAIT = 30
+SHARED_RESULT_POLL_INTERVAL = 0.1
+
+
+def get_or_calculate_shared_result(key: str, calculate: Callable[[], T], ttl: int = SHARED_RESULT_TTL) -> T:
+    """
+    Return the result cached under `key`, or calculate and cache it. Tiles load in parallel, so callers that find
+    another request already calculating the result wait for it instead of running the same query.
+    """
+    result = get_safe_cache(key)
+    if result is not None:
+        return result
+
+    lock_key = f"{key}_calculating"
+    locked = cache.add(lock_key, True, SHARED_RESULT_WAIT)
+    if not locked:
+        deadline = time.monotonic() + SHARED_RESULT_WAIT
+        while time.monotonic() < deadline and cache.get(lock_key) is not None:
+            time.sleep(SHARED_RESULT_POLL_INTERVAL)
+        result = get_safe_cache(key)
+        if result is not None:
+            return result
+
+    try:
+        result = calculate()
+        cache.set(key, result, ttl)
+    finally:
+        if locked:
+            cache.delete(lock_key)
+    return result
@@ -1,4 +1,4 @@
-from typing import Union
+from typing import Optional, Union
 
 from posthog.hogql import ast
 from posthog.hogql.constants import LimitContext
@@ -10,7 +10,9 @@ from posthog.hogql.property import (
     get_property_type,
     get_property_key,
 )
+from posthog.hogql.query import execute_hogql_query
 from posthog.hogql_queries.insights.paginators import HogQLHasMorePaginator
+from posthog.hogql_queries.web_analytics.shared_results import get_or_calculate_shared_result
 from posthog.hogql_queries.web_analytics.web_analytics_query_runner import (
     WebAnalyticsQueryRunner,
     map_columns,
@@ -21,10 +23,27 @@ from posthog.schema import (
     WebStatsBreakdown,
     WebStatsTableQueryResponse,
     EventPropertyFilter,
+    HogQLQueryResponse,
     PersonPropertyFilter,
 )
 
 
+# Breakdowns by a property of the session, and the sessions table field they read
+SESSION_BREAKDOWNS: dict[WebStatsBreakdown, str] = {
+    WebStatsBreakdown.InitialPage: "$entry_pathname",
+    WebStatsBreakdown.ExitPage: "$exit_pathname",
+    WebStatsBreakdown.InitialReferringDomain: "$entry_referring_domain",
+    WebStatsBreakdown.InitialUTMSource: "$entry_utm_source",
+    WebStatsBreakdown.InitialUTMCampaign: "$entry_utm_campaign",
+    WebStatsBreakdown.InitialUTMMedium: "$entry_utm_medium",
+    WebStatsBreakdown.InitialUTMTerm: "$entry_utm_term",
+    WebStatsBreakdown.InitialUTMContent: "$entry_utm_content",
+    WebStatsBreakdown.InitialChannelType: "$channel_type",
+}
+# Rows kept per session breakdown, tiles paging further than this run their own query
+SESSION_BREAKDOWNS_LIMIT = 1000
+
+
 class WebStatsTableQueryRunner(WebAnalyticsQueryRunner):
     query: WebStatsTableQuery
     response: WebStatsTableQueryResponse
@@ -420,7 +439,126 @@ ORDER BY "context.columns.visitors" DESC,
     def _date_from(self) -> ast.Expr:
         return self.query_date_range.date_from_as_hogql()
 
+    def to_session_breakdowns_query(self) -> ast.SelectQuery:
+        """
+        Visitors, views and bounce rate for every session breakdown at once. Sessions have one value per breakdown, so
+        each session is aggregated once and then counted towards each of its values.
+        """
+        with self.timings.measure("session_breakdowns_query"):
+            query = parse_select(
+                """
+SELECT
+    tupleElement(breakdown, 1) AS breakdown_by,
+    tupleElement(breakdown, 2) AS breakdown_value,
+    count() AS visitors,
+    sum(filtered_pageview_count) AS views,
+    avg(is_bounce) AS bounce_rate
+FROM (
+    SELECT
+        count() AS filtered_pageview_count,
+        any(sessions.$is_bounce) AS is_bounce,
+        {breakdowns} AS breakdowns
+    FROM events
+    JOIN sessions
+    ON events.`$session_id` = sessions.session_id
+    WHERE and(
+        timestamp >= {date_from},
+        timestamp < {date_to},
+        events.event == '$pageview',
+        {event_properties},
+        {session_properties}
+    )
+    GROUP BY events.`$session_id`
+)
+ARRAY JOIN breakdowns AS breakdown
+GROUP BY breakdown_by, breakdown_value
+ORDER BY visitors DESC, breakdown_value ASC
+LIMIT {limit} BY breakdown_by
+""",
+                timings=self.timings,
+                placeholders={
+                    "breakdowns": ast.Array(
+                        exprs=[
+                            ast.Tuple(
+                                exprs=[
+                                    ast.Constant(value=breakdown.value),
+                                    ast.Call(name="any", args=[self._session_breakdown_value(breakdown)]),
+                                ]
+                            )
+                            for breakdown in SESSION_BREAKDOWNS
+                        ]
+                    ),
+                    "event_properties": self._event_properties(),
+                    "session_properties": self._session_properties(),
+                    "date_from": self._date_from(),
+                    "date_to": self._date_to(),
+                    "limit": ast.Constant(value=SESSION_BREAKDOWNS_LIMIT),
+                },
+            )
+        assert isinstance(query, ast.SelectQuery)
+        return query
+
+    def _calculate_session_breakdowns(self) -> dict:
+        response = execute_hogql_query(
+            query_type="stats_table_session_breakdowns_query",
+            query=self.to_session_breakdowns_query(),
+            team=self.team,
+            timings=self.timings,
+            modifiers=self.modifiers,
+        )
+        breakdowns: dict[str, list] = {breakdown.value: [] for breakdown in SESSION_BREAKDOWNS}
+        for breakdown_by, *row in response.results:
+            breakdowns[breakdown_by].append(row)
+        return {"breakdowns": breakdowns, "types": (response.types or [])[1:], "hogql": response.hogql}
+
+    def _calculate_from_session_breakdowns(self) -> Optional[WebStatsTableQueryResponse]:
+        """Read the rows of this breakdown from the session breakdowns shared with the other tiles of the dashboard."""
+        if self.query.breakdownBy not in SESSION_BREAKDOWNS:
+            return None
+        if self.paginator.offset + self.paginator.limit >= SESSION_BREAKDOWNS_LIMIT:
+            return None
+
+        session_breakdowns = get_or_calculate_shared_result(
+            self._shared_result_key(
+                "session_breakdowns",
+                path_cleaning=self.team.path_cleaning_filters if self.query.doPathCleaning else None,
+            ),
+            self._calculate_session_breakdowns,
+        )
+        rows = session_breakdowns["breakdowns"][self.query.breakdownBy.value]
+        if self.query.breakdownBy in {
+            WebStatsBreakdown.InitialPage,
+            WebStatsBreakdown.ExitPage,
+            WebStatsBreakdown.InitialReferringDomain,
+        }:
+            rows = [row for row in rows if row[0] is not None]
+        # Keep the bounce rate only where the tile's own query would have it
+        width = 4 if self.query.breakdownBy == WebStatsBreakdown.InitialPage and self.query.includeBounceRate else 3
+        rows = [row[:width] for row in rows[self.paginator.offset : self.paginator.offset + self.paginator.limit + 1]]
+
+        self.paginator.response = HogQLQueryResponse(results=rows)
+        self.paginator.results = self.paginator.trim_results()
+
+        return WebStatsTableQueryResponse(
+            columns=[
+                "context.columns.breakdown_value",
+                "context.columns.visitors",
+                "context.columns.views",
+                "context.columns.bounce_rate",
+            ][:width],
+            results=map_columns(self.paginator.results, {1: self._unsample, 2: self._unsample}),
+            timings=self.timings.to_list(),
+            types=session_breakdowns["types"][:width],
+            hogql=session_breakdowns["hogql"],
+            modifiers=self.modifiers,
+            **self.paginator.response_params(),
+        )
+
     def calculate(self):
+        shared_response = self._calculate_from_session_breakdowns()
+        if shared_response is not None:
+            return shared_response
+
         response = self.paginator.execute_hogql_query(
             query_type="stats_table_query",
             query=self.to_query(),
@@ -489,6 +627,12 @@ ORDER BY "context.columns.visitors" DESC,
             case _:
                 raise NotImplementedError("Breakdown not implemented")
 
+    def _session_breakdown_value(self, breakdown: WebStatsBreakdown) -> ast.Expr:
+        field = ast.Field(chain=["sessions", SESSION_BREAKDOWNS[breakdown]])
+        if breakdown in (WebStatsBreakdown.InitialPage, WebStatsBreakdown.ExitPage):
+            return self._apply_path_cleaning(field)
+        return field
+
     def where_breakdown(self):
         match self.query.breakdownBy:
             case WebStatsBreakdown.Region:
@@ -0,0 +1,82 @@
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+from django.test import SimpleTestCase
+from freezegun import freeze_time
+
+from posthog.hogql_queries.web_analytics.traffic_volume import (
+    TRAFFIC_VOLUME_COVERAGE_KEY,
+    adaptive_sample_rate,
+    estimate_pageviews,
+    get_traffic_volume_coverage,
+    traffic_volume_key,
+    update_traffic_volume,
+)
+from posthog.redis import get_client
+from posthog.schema import SamplingRate
+from posthog.test.base import APIBaseTest, ClickhouseTestMixin, _create_event, flush_persons_and_events
+
+UTC_ZONE = ZoneInfo("UTC")
+
+
+class TestAdaptiveSampleRate(SimpleTestCase):
+    def test_small_counts_are_not_sampled(self):
+        assert adaptive_sample_rate(1_000, 0.01) == SamplingRate(numerator=1)
+        assert adaptive_sample_rate(0, 0.01) == SamplingRate(numerator=1)
+
+    def test_picks_coarsest_rate_within_error_bound(self):
+        # 1.96 * sqrt(0.999 / 10_000) is just under 2%
+        assert adaptive_sample_rate(10_000_000, 0.02) == SamplingRate(numerator=1, denominator=1_000)
+        assert adaptive_sample_rate(10_000_000, 0.01) == SamplingRate(numerator=1, denominator=100)
+        assert adaptive_sample_rate(100_000, 0.02) == SamplingRate(numerator=1, denominator=10)
+        assert adaptive_sample_rate(100_000, 0.001) == SamplingRate(numerator=1)
+
+
+class TestEstimatePageviews(SimpleTestCase):
+    def tearDown(self):
+        get_client().delete(TRAFFIC_VOLUME_COVERAGE_KEY, traffic_volume_key(1))
+        super().tearDown()
+
+    def test_no_estimate_before_first_update(self):
+        assert (
+            estimate_pageviews(1, datetime(2024, 1, 1, tzinfo=UTC_ZONE), datetime(2024, 1, 7, tzinfo=UTC_ZONE)) is None
+        )
+
+    def test_sums_counted_days_and_extrapolates_the_rest(self):
+        get_client().hset(TRAFFIC_VOLUME_COVERAGE_KEY, mapping={"from": "2024-01-05", "to": "2024-01-08"})
+        get_client().hset(traffic_volume_key(1), mapping={"2024-01-05": 100, "2024-01-06": 300, "2024-01-08": 200})
+
+        assert (
+            estimate_pageviews(1, datetime(2024, 1, 5, tzinfo=UTC_ZONE), datetime(2024, 1, 6, 12, tzinfo=UTC_ZONE))
+            == 400
+        )
+        # 2024-01-07 had no pageviews, 2024-01-03 and 2024-01-04 are extrapolated from the average of counted days
+        assert (
+            estimate_pageviews(1, datetime(2024, 1, 3, tzinfo=UTC_ZONE), datetime(2024, 1, 8, tzinfo=UTC_ZONE)) == 900
+        )
+        assert (
+            estimate_pageviews(1, datetime(2023, 12, 1, tzinfo=UTC_ZONE), datetime(2023, 12, 2, tzinfo=UTC_ZONE)) == 300
+        )
+        assert estimate_pageviews(2, datetime(2024, 1, 5, tzinfo=UTC_ZONE), datetime(2024, 1, 8, tzinfo=UTC_ZONE)) == 0
+
+
+class TestUpdateTrafficVolume(ClickhouseTestMixin, APIBaseTest):
+    def tearDown(self):
+        get_client().delete(TRAFFIC_VOLUME_COVERAGE_KEY, traffic_volume_key(self.team.pk))
+        super().tearDown()
+
+    def test_counts_daily_pageviews_and_backfills(self):
+        for timestamp in ["2024-01-01T10:00:00Z", "2024-01-09T10:00:00Z", "2024-01-10T10:00:00Z"]:
+            _create_event(team=self.team, event="$pageview", distinct_id="a", timestamp=timestamp)
+        _create_event(team=self.team, event="$pageleave", distinct_id="a", timestamp="2024-01-10T11:00:00Z")
+        flush_persons_and_events()
+
+        with freeze_time("2024-01-10T12:00:00Z"):
+            update_traffic_volume()
+        assert get_traffic_volume_coverage() == (date(2024, 1, 2), date(2024, 1, 10))
+        assert get_client().hgetall(traffic_volume_key(self.team.pk)) == {b"2024-01-09": b"1", b"2024-01-10": b"1"}
+
+        with freeze_time("2024-01-10T13:00:00Z"):
+            update_traffic_volume()
+        assert get_traffic_volume_coverage() == (date(2023, 12, 26), date(2024, 1, 10))
+        assert get_client().hget(traffic_volume_key(self.team.pk), "2024-01-01") == b"1"
@@ -3,6 +3,7 @@ from typing import Union
 from freezegun import freeze_time
 
 from posthog.hogql_queries.web_analytics.stats_table import WebStatsTableQueryRunner
+from posthog.hogql_queries.web_analytics.traffic_volume import TRAFFIC_VOLUME_COVERAGE_KEY, traffic_volume_key
 from posthog.hogql_queries.web_analytics.web_analytics_query_runner import _sample_rate_from_count
 from posthog.hogql_queries.web_analytics.web_overview import WebOverviewQueryRunner
 from posthog.schema import (
@@ -13,8 +14,10 @@ from posthog.schema import (
     EventPropertyFilter,
     PersonPropertyFilter,
     PropertyOperator,
+    Sampling,
     SamplingRate,
 )
+from posthog.redis import get_client
 from posthog.test.base import (
     APIBaseTest,
     ClickhouseTestMixin,
@@ -112,3 +115,22 @@ class TestWebStatsTableQueryRunner(ClickhouseTestMixin, APIBaseTest):
         self.assertEqual(SamplingRate(numerator=1, denominator=100), _sample_rate_from_count(9_999_999))
         self.assertEqual(SamplingRate(numerator=1, denominator=1000), _sample_rate_from_count(10_000_000))
         self.assertEqual(SamplingRate(numerator=1, denominator=1000), _sample_rate_from_count(99_999_999))
+
+    def test_sample_rate_from_traffic_volume(self):
+        get_client().hset(TRAFFIC_VOLUME_COVERAGE_KEY, mapping={"from": "2023-12-01", "to": "2023-12-15"})
+        get_client().hset(
+            traffic_volume_key(self.team.pk),
+            mapping={f"2023-12-{day:02}": 200_000 for day in range(8, 16)},
+        )
+        self.addCleanup(get_client().delete, TRAFFIC_VOLUME_COVERAGE_KEY, traffic_volume_key(self.team.pk))
+
+        with freeze_time("2023-12-15T12:00:00Z"):
+            runner = self._create__web_overview_query("2023-12-08", "2023-12-15", [])
+            runner.query.sampling = Sampling(enabled=True)
+            assert runner._sample_rate == SamplingRate(numerator=1, denominator=100)
+
+            adaptive_runner = self._create__web_overview_query("2023-12-08", "2023-12-15", [])
+            adaptive_runner.query.sampling = Sampling(enabled=True, adaptive=True)
+            assert adaptive_runner._sample_rate == SamplingRate(numerator=1, denominator=10)
+
+        assert "./event_count_query_execute" not in runner.timings.to_dict()
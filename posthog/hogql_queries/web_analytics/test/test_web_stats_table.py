@@ -1,9 +1,11 @@
 import uuid
 from typing import Union
+from unittest.mock import patch
 
 from freezegun import freeze_time
 from parameterized import parameterized
 
+from posthog.hogql.query import execute_hogql_query
 from posthog.hogql_queries.web_analytics.stats_table import WebStatsTableQueryRunner
 from posthog.hogql_queries.web_analytics.stats_table_legacy import LegacyWebStatsTableQueryRunner
 from posthog.schema import DateRange, WebStatsTableQuery, WebStatsBreakdown, EventPropertyFilter, PropertyOperator
@@ -688,3 +690,38 @@ class TestWebStatsTableQueryRunner(ClickhouseTestMixin, APIBaseTest):
             ],
             results,
         )
+
+    def test_session_breakdowns_are_shared_between_tiles(self):
+        self._create_pageviews(
+            "p1",
+            [
+                ("/a", "2023-12-02T12:00:00", 0.1),
+                ("/b", "2023-12-02T12:00:01", 0.2),
+            ],
+        )
+        self._create_pageviews("p2", [("/b", "2023-12-02T12:00:00", 0.1)])
+
+        with (
+            patch(
+                "posthog.hogql_queries.web_analytics.stats_table.execute_hogql_query", wraps=execute_hogql_query
+            ) as execute,
+            patch(
+                "posthog.hogql_queries.insights.paginators.execute_hogql_query", wraps=execute_hogql_query
+            ) as execute_tile_query,
+        ):
+            entry_pages = self._run_web_stats_table_query(
+                "all", "2023-12-15", breakdown_by=WebStatsBreakdown.InitialPage, include_bounce_rate=True
+            )
+            exit_pages = self._run_web_stats_table_query("all", "2023-12-15", breakdown_by=WebStatsBreakdown.ExitPage)
+            channels = self._run_web_stats_table_query(
+                "all", "2023-12-15", breakdown_by=WebStatsBreakdown.InitialChannelType
+            )
+
+        assert execute.call_count == 1
+        assert execute_tile_query.call_count == 0
+        self.assertEqual([["/a", 1, 2, 0], ["/b", 1, 1, 1]], entry_pages.results)
+        self.assertEqual([["/b", 2, 3]], exit_pages.results)
+        self.assertEqual(
+            ["context.columns.breakdown_value", "context.columns.visitors", "context.columns.views"], channels.columns
+        )
+        self.assertEqual(2, channels.results[0][1])
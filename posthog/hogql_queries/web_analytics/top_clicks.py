@@ -53,6 +53,7 @@ LIMIT 10
             timings=self.timings,
             modifiers=self.modifiers,
             limit_context=self.limit_context,
+            include_hogql=False,
         )
 
         return WebTopClicksQueryResponse(
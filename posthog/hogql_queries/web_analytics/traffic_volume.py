@@ -0,0 +1,145 @@
+"""
+Daily pageview counts per team, kept up to date by a periodic task, so that web analytics queries can pick a sampling
+rate without first running a count query against ClickHouse.
+"""
+
+from datetime import date, datetime, timedelta
+from math import sqrt
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from django.utils.timezone import now
+
+from posthog.clickhouse.client import sync_execute
+from posthog.clickhouse.client.connection import Workload
+from posthog.redis import get_client
+from posthog.schema import SamplingRate
+
+TRAFFIC_VOLUME_KEY_PREFIX = "web_analytics_traffic_volume"
+TRAFFIC_VOLUME_COVERAGE_KEY = f"{TRAFFIC_VOLUME_KEY_PREFIX}_coverage"
+
+TRAFFIC_VOLUME_RETENTION_DAYS = 90
+# Events keep arriving for a while, so every update recounts the most recent days
+TRAFFIC_VOLUME_RECOUNT_DAYS = 2
+# How far back each update extends the counted history, until the retention period is covered
+TRAFFIC_VOLUME_BACKFILL_DAYS = 7
+# Days averaged to extrapolate days outside the counted history
+TRAFFIC_VOLUME_EXTRAPOLATION_DAYS = 7
+
+SAMPLE_RATE_STEPS = [1_000, 100, 10]
+# z-score of a two-sided 95% confidence interval
+CONFIDENCE_Z_SCORE = 1.96
+
+DAILY_PAGEVIEWS_SQL = """
+SELECT team_id, toDate(timestamp) AS day, count() AS pageviews
+FROM events
+WHERE event = '$pageview'
+  AND ((timestamp >= %(recount_from)s AND timestamp < %(recount_to)s)
+       OR (timestamp >= %(backfill_from)s AND timestamp < %(backfill_to)s))
+GROUP BY team_id, day
+"""
+
+
+def update_traffic_volume(today: Optional[date] = None) -> None:
+    """Recount the most recent days for all teams, and extend the counted history a week further back."""
+    today = today or now().date()
+    recount_from = today - timedelta(days=TRAFFIC_VOLUME_RECOUNT_DAYS - 1)
+    retention_start = today - timedelta(days=TRAFFIC_VOLUME_RETENTION_DAYS - 1)
+
+    coverage = get_traffic_volume_coverage()
+    if coverage is None or coverage[1] < recount_from - timedelta(days=1):
+        # Nothing counted yet, or a gap since the last update: start over
+        covered_from = recount_from
+    else:
+        covered_from = coverage[0]
+    backfill_to = covered_from
+    backfill_from = max(covered_from - timedelta(days=TRAFFIC_VOLUME_BACKFILL_DAYS), retention_start)
+
+    rows = sync_execute(
+        DAILY_PAGEVIEWS_SQL,
+        {
+            "recount_from": _day_start(recount_from),
+            "recount_to": _day_start(today + timedelta(days=1)),
+            "backfill_from": _day_start(backfill_from),
+            "backfill_to": _day_start(max(backfill_to, backfill_from)),
+        },
+        workload=Workload.OFFLINE,
+    )
+
+    counts: dict[int, dict[str, int]] = {}
+    for team_id, day, pageviews in rows:
+        counts.setdefault(team_id, {})[day.isoformat()] = pageviews
+
+    client = get_client()
+    pipeline = client.pipeline(transaction=False)
+    for team_id, days in counts.items():
+        pipeline.hset(traffic_volume_key(team_id), mapping=days)
+        pipeline.expire(traffic_volume_key(team_id), timedelta(days=TRAFFIC_VOLUME_RETENTION_DAYS))
+    pipeline.hset(
+        TRAFFIC_VOLUME_COVERAGE_KEY,
+        mapping={"from": max(min(backfill_from, covered_from), retention_start).isoformat(), "to": today.isoformat()},
+    )
+    pipeline.execute()
+
+
+def get_traffic_volume_coverage() -> Optional[tuple[date, date]]:
+    coverage = get_client().hgetall(TRAFFIC_VOLUME_COVERAGE_KEY)
+    if not coverage or b"from" not in coverage or b"to" not in coverage:
+        return None
+    return date.fromisoformat(coverage[b"from"].decode()), date.fromisoformat(coverage[b"to"].decode())
+
+
+def estimate_pageviews(team_id: int, date_from: datetime, date_to: datetime) -> Optional[int]:
+    """
+    Estimate the number of pageviews between the two dates from the counted history.
+
+    Days outside the history are extrapolated from the average of the counted days. Returns None if nothing has been
+    counted yet.
+    """
+    coverage = get_traffic_volume_coverage()
+    if coverage is None:
+        return None
+    covered_from, covered_to = coverage
+
+    first_day = date_from.astimezone(ZoneInfo("UTC")).date()
+    last_day = date_to.astimezone(ZoneInfo("UTC")).date()
+    days = [first_day + timedelta(days=offset) for offset in range((last_day - first_day).days + 1)]
+    covered_days = [day for day in days if covered_from <= day <= covered_to]
+    reference_days = covered_days or [
+        covered_to - timedelta(days=offset)
+        for offset in range(min(TRAFFIC_VOLUME_EXTRAPOLATION_DAYS, (covered_to - covered_from).days + 1))
+    ]
+
+    counts = [
+        int(count) if count else 0
+        for count in get_client().hmget(traffic_volume_key(team_id), [day.isoformat() for day in reference_days])
+    ]
+    average = sum(counts) / len(counts)
+    if covered_days:
+        return round(sum(counts) + average * (len(days) - len(covered_days)))
+    return round(average * len(days))
+
+
+def adaptive_sample_rate(count: int, max_relative_error: float) -> SamplingRate:
+    """
+    Pick the coarsest sample rate for which the 95% confidence interval of the unsampled `count` stays within
+    `max_relative_error`.
+
+    Each event is kept with probability p, so the count estimated from the sample has a relative standard error of
+    sqrt((1 - p) / (count * p)). The bound holds for the total; breakdown rows have wider intervals.
+    """
+    for step in SAMPLE_RATE_STEPS:
+        probability = 1 / step
+        if count * probability >= 1:
+            relative_error = CONFIDENCE_Z_SCORE * sqrt((1 - probability) / (count * probability))
+            if relative_error <= max_relative_error:
+                return SamplingRate(numerator=1, denominator=step)
+    return SamplingRate(numerator=1)
+
+
+def traffic_volume_key(team_id: int) -> str:
+    return f"{TRAFFIC_VOLUME_KEY_PREFIX}:{team_id}"
+
+
+def _day_start(day: date) -> str:
+    return f"{day.isoformat()} 00:00:00"
@@ -16,6 +16,7 @@ from posthog.hogql.property import property_to_expr
 from posthog.hogql.query import execute_hogql_query
 from posthog.hogql_queries.query_runner import QueryRunner
 from posthog.hogql_queries.utils.query_date_range import QueryDateRange
+from posthog.hogql_queries.web_analytics.traffic_volume import adaptive_sample_rate, estimate_pageviews
 from posthog.models.filters.mixins.utils import cached_property
 from posthog.schema import (
     EventPropertyFilter,
@@ -181,14 +182,29 @@ class WebAnalyticsQueryRunner(QueryRunner, ABC):
         if self.query.sampling.forceSamplingRate:
             return self.query.sampling.forceSamplingRate
 
+        count = self._get_or_estimate_event_count()
+        if not count:
+            return SamplingRate(numerator=1)
+
+        if self.query.sampling.adaptive:
+            return adaptive_sample_rate(count, settings.WEB_ANALYTICS_SAMPLING_MAX_RELATIVE_ERROR)
+        return _sample_rate_from_count(count)
+
+    def _get_or_estimate_event_count(self) -> Optional[int]:
+        with self.timings.measure("traffic_volume"):
+            pageviews = estimate_pageviews(
+                self.team.pk, self.query_date_range.date_from(), self.query_date_range.date_to()
+            )
+        if pageviews is not None:
+            return pageviews
+
+        # The traffic volume hasn't been counted yet, fall back to counting the events of this date range
         cache_key = self._sample_rate_cache_key()
         cached_response = get_safe_cache(cache_key)
-        if cached_response:
-            return SamplingRate(**cached_response)
+        if cached_response and "count" in cached_response:
+            return cached_response["count"]
 
-        # To get the sample rate, we need to count how many page view events there were over the time period.
         # This would be quite slow if there were a lot of events, so use sampling to calculate this!
-
         with self.timings.measure("event_count_query"):
             event_count = parse_select(
                 """
@@ -213,17 +229,16 @@ WHERE
                 team=self.team,
                 timings=self.timings,
                 limit_context=self.limit_context,
+                include_hogql=False,
             )
 
         if not response.results or not response.results[0] or not response.results[0][0]:
-            return SamplingRate(numerator=1)
+            return None
 
         count = response.results[0][0] * 1000
-        fresh_sample_rate = _sample_rate_from_count(count)
-
-        cache.set(cache_key, fresh_sample_rate, settings.CACHED_RESULTS_TTL)
+        cache.set(cache_key, {"count": count}, settings.CACHED_RESULTS_TTL)
 
-        return fresh_sample_rate
+        return count
 
     @cached_property
     def _sample_rate(self) -> SamplingRate:
@@ -247,6 +262,15 @@ WHERE
             else n / self._sample_rate.numerator
         )
 
+    def _shared_result_key(self, name: str, **kwargs) -> str:
+        """Key for a result shared between the runners of a dashboard, made of everything their queries have in common."""
+        return generate_cache_key(
+            f"web_analytics_shared_{name}_{self.team.pk}_{self.team.timezone}"
+            f"_{self.query.dateRange.model_dump_json() if self.query.dateRange else None}"
+            f"_{[p.model_dump_json() for p in self.query.properties]}_{self._test_account_filters}"
+            f"_{self._sample_rate.model_dump_json()}_{self.modifiers.model_dump_json()}_{kwargs}"
+        )
+
     def get_cache_key(self) -> str:
         original = super().get_cache_key()
         return f"{original}_{self.team.path_cleaning_filters}"
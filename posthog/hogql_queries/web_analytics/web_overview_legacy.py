@@ -177,6 +177,7 @@ CROSS JOIN sessions_query
             timings=self.timings,
             modifiers=self.modifiers,
             limit_context=self.limit_context,
+            include_hogql=False,
         )
         assert response.results
 
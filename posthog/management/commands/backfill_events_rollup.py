@@ -0,0 +1,100 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+import structlog
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posthog.clickhouse.client.connection import Workload
+from posthog.clickhouse.client.execute import sync_execute
+from posthog.models.events_rollup.sql import EVENTS_ROLLUP_SELECT_SQL, TABLE_BASE_NAME
+
+logger = structlog.get_logger(__name__)
+
+SETTINGS = {
+    "max_execution_time": 3600  # 1 hour
+}
+
+
+def backfill_events_rollup(
+    start_date: datetime,
+    end_date: datetime,
+    team_id: Optional[int] = None,
+    dry_run: bool = True,
+    use_offline_workload: bool = False,
+) -> None:
+    # Events ingested since the materialized view was created are already rolled up
+    [(rolled_up_since,)] = sync_execute(
+        "SELECT min(metadata_modification_time) FROM system.tables WHERE database = %(database)s AND name = %(name)s",
+        {"database": settings.CLICKHOUSE_DATABASE, "name": f"{TABLE_BASE_NAME}_mv"},
+    )
+    where = "WHERE timestamp >= %(date_from)s AND timestamp < %(date_to)s AND _timestamp < %(rolled_up_since)s"
+    if team_id is not None:
+        where += " AND team_id = %(team_id)s"
+    select_query = EVENTS_ROLLUP_SELECT_SQL(source_table="events", where=where)
+
+    num_days = (end_date - start_date).days + 1
+    logger.info(
+        f"Backfilling {TABLE_BASE_NAME} from {start_date:%Y-%m-%d} to {end_date:%Y-%m-%d} for events ingested before {rolled_up_since}, total number of days to insert: {num_days}"
+    )
+
+    for i in range(num_days):
+        date_from = start_date + timedelta(days=i)
+        args = {
+            "date_from": date_from,
+            "date_to": date_from + timedelta(days=1),
+            "rolled_up_since": rolled_up_since,
+            "team_id": team_id,
+        }
+        if dry_run:
+            [(row_count,)] = sync_execute(f"SELECT count() FROM ({select_query})", args, settings=SETTINGS)
+            logger.info(f"Would write {row_count} rows for day {date_from:%Y-%m-%d}")
+            continue
+
+        logger.info(f"Writing the rollup for day {date_from:%Y-%m-%d}")
+        sync_execute(
+            f"INSERT INTO writable_{TABLE_BASE_NAME} {select_query}",
+            args,
+            workload=Workload.OFFLINE if use_offline_workload else Workload.DEFAULT,
+            settings=SETTINGS,
+        )
+
+
+class Command(BaseCommand):
+    help = "Backfill the events rollup with events ingested before its materialized view was created."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--start-date", required=True, type=str, help="first day to run backfill on (format YYYY-MM-DD)"
+        )
+        parser.add_argument(
+            "--end-date", required=True, type=str, help="last day to run backfill, inclusive, on (format YYYY-MM-DD)"
+        )
+        parser.add_argument("--team-id", type=int, help="only backfill the events of this team")
+        parser.add_argument(
+            "--live-run", action="store_true", help="actually execute INSERT queries (default is dry-run)"
+        )
+        parser.add_argument(
+            "--use-offline-workload", action="store_true", help="run the INSERT queries on the offline cluster"
+        )
+
+    def handle(
+        self,
+        *,
+        live_run: bool,
+        start_date: str,
+        end_date: str,
+        team_id: Optional[int],
+        use_offline_workload: bool,
+        **options,
+    ):
+        logger.setLevel(logging.INFO)
+
+        backfill_events_rollup(
+            datetime.strptime(start_date, "%Y-%m-%d"),
+            datetime.strptime(end_date, "%Y-%m-%d"),
+            team_id=team_id,
+            dry_run=not live_run,
+            use_offline_workload=use_offline_workload,
+        )
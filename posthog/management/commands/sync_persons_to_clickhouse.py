@@ -1,6 +1,5 @@
 import json
 import logging
-from uuid import UUID
 
 import structlog
 from django.core.management.base import BaseCommand
@@ -10,14 +9,15 @@ from posthog.client import sync_execute
 from posthog.kafka_client.client import KafkaProducer
 from posthog.models.group.group import Group
 from posthog.models.group.util import raw_create_group_ch
-from posthog.models.person import PersonDistinctId
-from posthog.models.person.person import Person, PersonOverride
-from posthog.models.person.util import (
-    _delete_ch_distinct_id,
-    create_person,
-    create_person_distinct_id,
-    create_person_override,
+from posthog.models.person.person import PersonOverride
+from posthog.models.person.reconciliation import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_LEAF_SIZE,
+    PersonDistinctIdReconciler,
+    PersonReconciler,
 )
+from posthog.models.person.util import create_person_override
 
 logger = structlog.get_logger(__name__)
 logger.setLevel(logging.INFO)
@@ -27,6 +27,8 @@ class Command(BaseCommand):
     help = """Sync person or distinct id tables from postgres to ClickHouse.
         Lookup from Postgres and with a lower version in ClickHouse will be updated.
         Note higher versions in ClickHouse will be ignored.
+        Persons and distinct ids are compared by checksums of person uuid ranges, so only ranges that differ are loaded.
+        Use `--resume` to continue an interrupted live run from its last checkpoint.
         Recommended: run first without `--live-run` and first for person table, then distinct_id table
         """
 
@@ -42,6 +44,18 @@ class Command(BaseCommand):
             help="process deletes for data in ClickHouse but not Postgres",
         )
         parser.add_argument("--live-run", action="store_true", help="Run changes, default is dry-run")
+        parser.add_argument(
+            "--resume", action="store_true", help="Resume person and distinct id syncs from the last checkpoint"
+        )
+        parser.add_argument(
+            "--leaf-size",
+            default=DEFAULT_LEAF_SIZE,
+            type=int,
+            help="Compare rows one by one once a differing range has at most this many rows",
+        )
+        parser.add_argument(
+            "--batch-size", default=DEFAULT_BATCH_SIZE, type=int, help="Number of corrections sent per Kafka flush"
+        )
 
     def handle(self, *args, **options):
         run(options)
@@ -56,12 +70,17 @@ def run(options, sync: bool = False):  # sync used for unittests
         exit(1)
 
     team_id = options["team_id"]
+    reconciliation_options = {
+        "resume": options.get("resume", False),
+        "leaf_size": options.get("leaf_size", DEFAULT_LEAF_SIZE),
+        "batch_size": options.get("batch_size", DEFAULT_BATCH_SIZE),
+    }
 
     if options["person"]:
-        run_person_sync(team_id, live_run, deletes, sync)
+        run_person_sync(team_id, live_run, deletes, sync, **reconciliation_options)
 
     if options["person_distinct_id"]:
-        run_distinct_id_sync(team_id, live_run, deletes, sync)
+        run_distinct_id_sync(team_id, live_run, deletes, sync, **reconciliation_options)
 
     if options["person_override"]:
         run_person_override_sync(team_id, live_run, deletes, sync)
@@ -74,113 +93,48 @@ def run(options, sync: bool = False):  # sync used for unittests
     logger.info("Kafka producer queue flushed.")
 
 
-def run_person_sync(team_id: int, live_run: bool, deletes: bool, sync: bool):
+def run_person_sync(
+    team_id: int,
+    live_run: bool,
+    deletes: bool,
+    sync: bool,
+    resume: bool = False,
+    leaf_size: int = DEFAULT_LEAF_SIZE,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+):
     logger.info("Running person table sync")
-    # lookup what needs to be updated in ClickHouse and send kafka messages for only those
-    persons = Person.objects.filter(team_id=team_id)
-    rows = sync_execute(
-        """
-            SELECT id, max(version) FROM person WHERE team_id = %(team_id)s GROUP BY id HAVING max(is_deleted) = 0
-        """,
-        {
-            "team_id": team_id,
-        },
-    )
-    ch_persons_to_version = {row[0]: row[1] for row in rows}
-    total_pg = len(persons)
-    logger.info(f"Got ${total_pg} in PG and ${len(ch_persons_to_version)} in CH")
-
-    for i, person in enumerate(persons):
-        if i % (max(total_pg // 10, 1)) == 0 and i > 0:
-            logger.info(f"Processed {i / total_pg * 100}%")
-        ch_version = ch_persons_to_version.get(person.uuid, None)
-        pg_version = person.version or 0
-        if ch_version is None or ch_version < pg_version:
-            logger.info(f"Updating {person.uuid} to version {pg_version}")
-            if live_run:
-                # Update ClickHouse via Kafka message
-                create_person(
-                    team_id=team_id,
-                    version=pg_version,
-                    uuid=str(person.uuid),
-                    properties=person.properties,
-                    is_identified=person.is_identified,
-                    created_at=person.created_at,
-                    sync=sync,
-                )
-        elif ch_version > pg_version:
-            logger.info(
-                f"Clickhouse version ({ch_version}) for '{person.uuid}' is higher than in Postgres ({pg_version}). Ignoring."
-            )
-
-    if deletes:
-        logger.info("Processing person deletions")
-        postgres_uuids = {person.uuid for person in persons}
-        for uuid, version in ch_persons_to_version.items():
-            if uuid not in postgres_uuids:
-                logger.info(f"Deleting person with uuid={uuid}")
-                if live_run:
-                    create_person(
-                        uuid=str(uuid),
-                        team_id=team_id,
-                        properties={},
-                        version=int(version or 0)
-                        + 100,  # keep in sync with deletePerson in plugin-server/src/utils/db/db.ts
-                        is_deleted=True,
-                        sync=sync,
-                    )
-
-
-def run_distinct_id_sync(team_id: int, live_run: bool, deletes: bool, sync: bool):
+    # compare checksums of person uuid ranges and only send kafka messages for rows in ranges that differ
+    PersonReconciler(
+        team_id,
+        live_run=live_run,
+        deletes=deletes,
+        sync=sync,
+        resume=resume,
+        leaf_size=leaf_size,
+        batch_size=batch_size,
+    ).run()
+
+
+def run_distinct_id_sync(
+    team_id: int,
+    live_run: bool,
+    deletes: bool,
+    sync: bool,
+    resume: bool = False,
+    leaf_size: int = DEFAULT_LEAF_SIZE,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+):
     logger.info("Running person distinct id table sync")
-    # lookup what needs to be updated in ClickHouse and send kafka messages for only those
-    person_distinct_ids = PersonDistinctId.objects.filter(team_id=team_id)
-    rows = sync_execute(
-        """
-            SELECT distinct_id, max(version) FROM person_distinct_id2 WHERE team_id = %(team_id)s GROUP BY distinct_id HAVING max(is_deleted) = 0
-        """,
-        {
-            "team_id": team_id,
-        },
-    )
-    ch_distinct_id_to_version = {row[0]: row[1] for row in rows}
-
-    total_pg = len(person_distinct_ids)
-    logger.info(f"Got ${total_pg} in PG and ${len(ch_distinct_id_to_version)} in CH")
-
-    for i, person_distinct_id in enumerate(person_distinct_ids):
-        if i % (max(total_pg // 10, 1)) == 0 and i > 0:
-            logger.info(f"Processed {i / total_pg * 100}%")
-        ch_version = ch_distinct_id_to_version.get(person_distinct_id.distinct_id, None)
-        pg_version = person_distinct_id.version or 0
-        if ch_version is None or ch_version < pg_version:
-            logger.info(f"Updating {person_distinct_id.distinct_id} to version {pg_version}")
-            if live_run:
-                # Update ClickHouse via Kafka message
-                create_person_distinct_id(
-                    team_id=team_id,
-                    distinct_id=person_distinct_id.distinct_id,
-                    person_id=str(person_distinct_id.person.uuid),
-                    version=pg_version,
-                    is_deleted=False,
-                    sync=sync,
-                )
-        elif ch_version > pg_version:
-            # This could be happening due to person deletions - check out fix_person_distinct_ids_after_delete management cmd.
-            # Ignoring here to be safe.
-            logger.info(
-                f"Clickhouse version ({ch_version}) for '{person_distinct_id.distinct_id}' is higher than in Postgres ({pg_version}). Ignoring."
-            )
-            continue
-
-    if deletes:
-        logger.info("Processing distinct id deletions")
-        postgres_distinct_ids = {person_distinct_id.distinct_id for person_distinct_id in person_distinct_ids}
-        for distinct_id, version in ch_distinct_id_to_version.items():
-            if distinct_id not in postgres_distinct_ids:
-                logger.info(f"Deleting distinct ID {distinct_id}")
-                if live_run:
-                    _delete_ch_distinct_id(team_id, UUID(int=0), distinct_id, version, sync=sync)
+    # compare checksums of distinct ids bucketed by person uuid and only send kafka messages for rows that differ
+    PersonDistinctIdReconciler(
+        team_id,
+        live_run=live_run,
+        deletes=deletes,
+        sync=sync,
+        resume=resume,
+        leaf_size=leaf_size,
+        batch_size=batch_size,
+    ).run()
 
 
 def run_person_override_sync(team_id: int, live_run: bool, deletes: bool, sync: bool):
@@ -223,28 +177,43 @@ def run_person_override_sync(team_id: int, live_run: bool, deletes: bool, sync:
         logger.info("Override deletes aren't supported at this point")
 
 
-def run_group_sync(team_id: int, live_run: bool, sync: bool):
+def run_group_sync(team_id: int, live_run: bool, sync: bool, chunk_size: int = DEFAULT_CHUNK_SIZE):
     logger.info("Running group table sync")
-    # lookup what needs to be updated in ClickHouse and send kafka messages for only those
-    pg_groups = Group.objects.filter(team_id=team_id).values(
-        "group_type_index", "group_key", "group_properties", "created_at"
+    # stream groups from postgres and look up only the matching chunk in ClickHouse
+    pg_groups = (
+        Group.objects.filter(team_id=team_id)
+        .order_by("id")
+        .values("group_type_index", "group_key", "group_properties", "created_at")
     )
+    processed = 0
+    chunk: list[dict] = []
+    for pg_group in pg_groups.iterator(chunk_size=chunk_size):
+        chunk.append(pg_group)
+        if len(chunk) >= chunk_size:
+            _sync_group_chunk(team_id, chunk, live_run, sync)
+            processed += len(chunk)
+            logger.info(f"Processed {processed} groups")
+            chunk = []
+    if chunk:
+        _sync_group_chunk(team_id, chunk, live_run, sync)
+
+
+def _sync_group_chunk(team_id: int, pg_groups: list[dict], live_run: bool, sync: bool):
     # unfortunately we don't have version column for groups table
     rows = sync_execute(
         """
-            SELECT group_type_index, group_key, group_properties, created_at FROM groups WHERE team_id = %(team_id)s ORDER BY _timestamp DESC LIMIT 1 BY group_type_index, group_key
+            SELECT group_type_index, group_key, group_properties, created_at FROM groups
+            WHERE team_id = %(team_id)s AND (group_type_index, group_key) IN %(keys)s
+            ORDER BY _timestamp DESC LIMIT 1 BY group_type_index, group_key
         """,
         {
             "team_id": team_id,
+            "keys": [(pg_group["group_type_index"], pg_group["group_key"]) for pg_group in pg_groups],
         },
     )
     ch_groups = {(row[0], row[1]): {"properties": row[2], "created_at": row[3]} for row in rows}
-    total_pg = len(pg_groups)
-    logger.info(f"Got ${total_pg} in PG and ${len(ch_groups)} in CH")
 
-    for i, pg_group in enumerate(pg_groups):
-        if i % (max(total_pg // 10, 1)) == 0 and i > 0:
-            logger.info(f"Processed {i / total_pg * 100}%")
+    for pg_group in pg_groups:
         ch_group = ch_groups.get((pg_group["group_type_index"], pg_group["group_key"]), None)
         if ch_group is None or should_update_group(ch_group, pg_group):
             logger.info(
@@ -261,6 +230,9 @@ def run_group_sync(team_id: int, live_run: bool, sync: bool):
                     sync=sync,
                 )
 
+    if live_run and not sync:
+        KafkaProducer().flush()
+
 
 def should_update_group(ch_group, pg_group) -> bool:
     return json.dumps(pg_group["group_properties"]) != ch_group["properties"] or pg_group["created_at"].strftime(
@@ -16,6 +16,7 @@ from posthog.management.commands.sync_persons_to_clickhouse import (
 from posthog.models.group.group import Group
 from posthog.models.group.util import create_group
 from posthog.models.person.person import Person, PersonDistinctId
+from posthog.models.person.reconciliation import PersonReconciler, UUIDRange
 from posthog.models.person.sql import PERSON_DISTINCT_ID2_TABLE
 from posthog.models.person.util import create_person, create_person_distinct_id
 from posthog.models.signals import mute_selected_signals
@@ -662,6 +663,70 @@ class TestSyncPersonsToClickHouse(BaseTest, ClickhouseTestMixin):
             )
             self.assertEqual(ch_groups, [(2, "group-key", '{"a": 1234}')])
 
+    def test_persons_sync_descends_only_into_differing_ranges(self):
+        in_sync = [
+            Person.objects.create(
+                team_id=self.team.pk, version=1, uuid=UUID(f"{digit}0000000-0000-0000-0000-000000000000")
+            )
+            for digit in "0123"
+        ]
+        with mute_selected_signals():  # without creating/updating in clickhouse
+            missing = [
+                Person.objects.create(
+                    team_id=self.team.pk, version=2, uuid=UUID(f"f{digit}000000-0000-0000-0000-000000000000")
+                )
+                for digit in "01"
+            ]
+
+        stats = PersonReconciler(self.team.pk, live_run=True, deletes=False, sync=True, leaf_size=1).run()
+
+        # root and the `f` range are compared, every other range matches straight away
+        self.assertEqual(stats.ranges_compared, 2)
+        self.assertEqual(stats.leaves_compared, 2)
+        self.assertEqual(stats.rows_compared, 2)
+        self.assertEqual(stats.updates, 2)
+
+        ch_persons = sync_execute(
+            "SELECT id, version FROM person FINAL WHERE team_id = %(team_id)s ORDER BY id",
+            {"team_id": self.team.pk},
+        )
+        self.assertEqual(sorted(ch_persons), sorted([(p.uuid, 1) for p in in_sync] + [(p.uuid, 2) for p in missing]))
+
+        # second time it's a no-op
+        stats = PersonReconciler(self.team.pk, live_run=True, deletes=False, sync=True, leaf_size=1).run()
+        self.assertEqual(stats.ranges_compared, 1)
+        self.assertEqual(stats.updates, 0)
+
+    def test_persons_sync_resumes_from_checkpoint(self):
+        with mute_selected_signals():  # without creating/updating in clickhouse
+            Person.objects.create(team_id=self.team.pk, version=1, uuid=UUID("10000000-0000-0000-0000-000000000000"))
+            after_checkpoint = Person.objects.create(
+                team_id=self.team.pk, version=1, uuid=UUID("a0000000-0000-0000-0000-000000000000")
+            )
+
+        reconciler = PersonReconciler(self.team.pk, live_run=True, deletes=False, sync=True)
+        reconciler.save_checkpoint(UUIDRange("8").lower)
+
+        stats = PersonReconciler(self.team.pk, live_run=True, deletes=False, sync=True, resume=True).run()
+        self.assertEqual(stats.updates, 1)
+
+        ch_persons = sync_execute("SELECT id FROM person FINAL WHERE team_id = %(team_id)s", {"team_id": self.team.pk})
+        self.assertEqual(ch_persons, [(after_checkpoint.uuid,)])
+        # finished runs clear their checkpoint
+        self.assertEqual(reconciler.get_checkpoint(), 0)
+
+    def test_uuid_range(self):
+        root = UUIDRange()
+        self.assertEqual(root.lower_uuid, UUID(int=0))
+        self.assertIsNone(root.upper_uuid)
+
+        children = root.split()
+        self.assertEqual(len(children), 16)
+        self.assertEqual(children[0].upper_uuid, UUID("10000000-0000-0000-0000-000000000000"))
+        self.assertEqual(children[-1].lower_uuid, UUID("f0000000-0000-0000-0000-000000000000"))
+        self.assertIsNone(children[-1].upper_uuid)
+        self.assertEqual(UUIDRange("ab").split()[3].lower_uuid, UUID("ab300000-0000-0000-0000-000000000000"))
+
 
 @pytest.fixture(autouse=True)
 def set_log_level(caplog):
@@ -0,0 +1,141 @@
+"""
+Matching events against all actions of a team in-process.
+
+Every step of every action is compiled once into HogVM bytecode, and the steps are indexed by the event they're
+for, so that an event is only tested against the steps that can match it. Compiled matchers are cached per team,
+keyed by the number of actions and the last time one was updated, so editing, adding or deleting an action in any
+process gives the team a new matcher. Changes in this process also clear the cache right away.
+
+The matcher also holds the loaded actions, so that query generation can look up any number of actions with a single
+query.
+"""
+
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Optional
+
+import structlog
+from django.db.models import Count, Max
+from django.db.models.signals import post_delete, post_save
+from django.dispatch.dispatcher import receiver
+
+from hogvm.python.execute import HogVMException, execute_bytecode
+from posthog.hogql.errors import BaseHogQLError
+from posthog.models.action.action import Action
+from posthog.models.signals import mutable_receiver
+
+if TYPE_CHECKING:
+    from posthog.models.team import Team
+
+logger = structlog.get_logger(__name__)
+
+ACTION_MATCHER_CACHE_SIZE = 256
+
+
+@dataclass(frozen=True)
+class CompiledActionStep:
+    action_id: int
+    bytecode: list[Any]
+
+
+@dataclass
+class ActionMatcher:
+    actions: dict[int, Action]
+    # Steps of non-deleted actions by the event they match, steps matching any event are under None
+    steps_by_event: dict[Optional[str], list[CompiledActionStep]] = field(default_factory=dict)
+    # Actions with a step that can't be compiled, e.g. because it filters by cohort, are never matched in-process
+    uncompilable_action_ids: set[int] = field(default_factory=set)
+
+    @classmethod
+    def compile(cls, actions: list[Action]) -> "ActionMatcher":
+        from posthog.hogql.bytecode import create_bytecode
+        from posthog.hogql.property import action_step_to_expr
+
+        matcher = cls(actions={action.pk: action for action in actions})
+        for action in actions:
+            if action.deleted:
+                continue
+            try:
+                compiled = [
+                    (
+                        step.event or None,
+                        CompiledActionStep(action.pk, create_bytecode(action_step_to_expr(step, action.team))),
+                    )
+                    for step in action.steps
+                ]
+            except BaseHogQLError as e:
+                logger.info("action_matcher_uncompilable_action", action_id=action.pk, error=str(e))
+                matcher.uncompilable_action_ids.add(action.pk)
+                continue
+            for event, step in compiled:
+                matcher.steps_by_event.setdefault(event, []).append(step)
+        return matcher
+
+    def get_action(self, action_id: int) -> Action:
+        """The action with the given ID, including deleted actions. The instance is shared, so don't modify it."""
+        try:
+            return self.actions[action_id]
+        except KeyError:
+            raise Action.DoesNotExist(f"Action {action_id} does not exist")
+
+    def match_actions(self, events: list[dict[str, Any]]) -> list[list[int]]:
+        """
+        The IDs of the actions each of the events matches, in order.
+
+        Events are dicts of the HogQL fields actions filter on: `event`, `properties`, `elements_chain` and
+        `person.properties`.
+        """
+        any_event_steps = self.steps_by_event.get(None, [])
+        matches: list[list[int]] = []
+        for event in events:
+            fields = _event_fields(event)
+            matched: set[int] = set()
+            for step in (*self.steps_by_event.get(fields["event"], []), *any_event_steps):
+                if step.action_id not in matched and _step_matches(step, fields):
+                    matched.add(step.action_id)
+            matches.append(sorted(matched))
+        return matches
+
+
+def get_action_matcher(team: "Team") -> ActionMatcher:
+    version = Action.objects.filter(team_id=team.pk).aggregate(count=Count("id"), updated_at=Max("updated_at"))
+    return _get_action_matcher(team.pk, version["count"], version["updated_at"])
+
+
+@lru_cache(maxsize=ACTION_MATCHER_CACHE_SIZE)
+def _get_action_matcher(team_id: int, action_count: int, last_updated_at: Optional[datetime]) -> ActionMatcher:
+    return ActionMatcher.compile(
+        list(Action.objects.filter(team_id=team_id).select_related("team").prefetch_related("action_steps"))
+    )
+
+
+@receiver(post_save, sender=Action)
+def action_saved_clear_matchers(sender, instance: Action, **kwargs):
+    _get_action_matcher.cache_clear()
+
+
+@mutable_receiver(post_delete, sender=Action)
+def action_deleted_clear_matchers(sender, instance: Action, **kwargs):
+    _get_action_matcher.cache_clear()
+
+
+def _event_fields(event: dict[str, Any]) -> dict[str, Any]:
+    # Fields missing from the event read as empty, like they do in ClickHouse
+    person = event.get("person") or {}
+    return {
+        **event,
+        "event": event.get("event"),
+        "properties": event.get("properties") or {},
+        "elements_chain": event.get("elements_chain") or "",
+        "person": {**person, "properties": person.get("properties") or {}},
+    }
+
+
+def _step_matches(step: CompiledActionStep, fields: dict[str, Any]) -> bool:
+    try:
+        return bool(execute_bytecode(step.bytecode, fields))
+    except (HogVMException, TypeError, ValueError, AttributeError, re.error):
+        # E.g. a regex over a property that isn't a string, which doesn't match in ClickHouse either
+        return False
@@ -196,7 +196,7 @@ class Cohort(models.Model):
 
     def calculate_people_ch(self, pending_version: int, *, initiating_user_id: Optional[int] = None):
         from posthog.models.cohort.util import recalculate_cohortpeople
-        from posthog.tasks.calculate_cohort import clear_stale_cohort
+        from posthog.tasks.calculate_cohort import clear_stale_cohort, index_cohort_membership
 
         logger.warn(
             "cohort_calculation_started",
@@ -240,6 +240,7 @@ class Cohort(models.Model):
         )
 
         clear_stale_cohort.delay(self.pk, before_version=pending_version)
+        index_cohort_membership.delay(self.pk)
 
     def insert_users_by_list(self, items: list[str]) -> None:
         """
@@ -251,6 +252,7 @@ class Cohort(models.Model):
             insert_static_cohort,
             get_static_cohort_size,
         )
+        from posthog.tasks.calculate_cohort import index_cohort_membership
 
         if TEST:
             from posthog.test.base import flush_persons_and_events
@@ -295,6 +297,8 @@ class Cohort(models.Model):
             self.last_calculation = timezone.now()
             self.errors_calculating = 0
             self.save()
+
+            index_cohort_membership.delay(self.pk)
         except Exception as err:
             if settings.DEBUG:
                 raise err
@@ -305,6 +309,7 @@ class Cohort(models.Model):
 
     def insert_users_list_by_uuid(self, items: list[str], insert_in_clickhouse: bool = False, batchsize=1000) -> None:
         from posthog.models.cohort.util import get_static_cohort_size, insert_static_cohort
+        from posthog.tasks.calculate_cohort import index_cohort_membership
 
         try:
             cursor = connection.cursor()
@@ -337,6 +342,8 @@ class Cohort(models.Model):
             self.last_calculation = timezone.now()
             self.errors_calculating = 0
             self.save()
+
+            index_cohort_membership.delay(self.pk)
         except Exception as err:
             if settings.DEBUG:
                 raise err
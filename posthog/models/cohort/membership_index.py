@@ -0,0 +1,152 @@
+"""
+An index of the members of precalculated cohorts, so that checking which cohorts a person is in doesn't need to query
+ClickHouse.
+
+The members of each cohort at its current version are mirrored into a Redis set of person UUIDs (as 16 bytes each). The
+set is rebuilt whenever the cohort is recalculated or people are added to a static cohort, and a per-team hash points
+at the set of each cohort together with the version it was built for. Checking any number of persons against all
+cohorts of a team is then a single pipeline of set lookups. Cohorts that aren't indexed at their current version, for
+example because they're too large, are left to the ClickHouse queries.
+"""
+
+from datetime import timedelta
+from uuid import UUID, uuid4
+
+import structlog
+
+from posthog.client import sync_execute
+from posthog.models.cohort.cohort import Cohort
+from posthog.models.cohort.sql import GET_COHORTPEOPLE_BY_COHORT_ID, GET_STATIC_COHORTPEOPLE_BY_COHORT_ID
+from posthog.redis import get_client
+
+logger = structlog.get_logger(__name__)
+
+COHORT_MEMBERSHIP_KEY_PREFIX = "cohort_membership"
+# Cohorts are recalculated daily, so indexes of deleted or forgotten cohorts don't linger for long
+COHORT_MEMBERSHIP_INDEX_TTL = timedelta(days=7)
+# Larger cohorts would take too much memory, at roughly 30 bytes per member
+COHORT_MEMBERSHIP_INDEX_MAX_SIZE = 200_000
+COHORT_MEMBERSHIP_INDEX_BATCH_SIZE = 10_000
+# How long to wait before trying to build the index of a cohort that wasn't found again
+COHORT_MEMBERSHIP_INDEXING_LOCK_TTL = timedelta(minutes=10)
+
+
+def build_cohort_membership_index(cohort: Cohort) -> bool:
+    """Mirror the members of the cohort at its current version. Returns False if the cohort is too large to index."""
+    if not cohort.is_static and cohort.version is None:
+        return False
+
+    rows = sync_execute(
+        f"{GET_STATIC_COHORTPEOPLE_BY_COHORT_ID if cohort.is_static else GET_COHORTPEOPLE_BY_COHORT_ID} LIMIT %(limit)s",
+        {
+            "team_id": cohort.team_id,
+            "cohort_id": cohort.pk,
+            "version": cohort.version,
+            "limit": COHORT_MEMBERSHIP_INDEX_MAX_SIZE + 1,
+        },
+    )
+
+    client = get_client()
+    index_key = cohort_membership_index_key(cohort.team_id)
+    previous_entry = client.hget(index_key, str(cohort.pk))
+    if len(rows) > COHORT_MEMBERSHIP_INDEX_MAX_SIZE:
+        # Recorded, so that lookups don't keep trying to index the cohort until its next version
+        token = ""
+    else:
+        token = uuid4().hex
+        members_key = cohort_membership_key(cohort.pk, token)
+        pipeline = client.pipeline(transaction=False)
+        for start in range(0, len(rows), COHORT_MEMBERSHIP_INDEX_BATCH_SIZE):
+            pipeline.sadd(
+                members_key,
+                *(_person_uuid_bytes(row[0]) for row in rows[start : start + COHORT_MEMBERSHIP_INDEX_BATCH_SIZE]),
+            )
+        # An empty cohort has no set, so an empty marker keeps it apart from one that has expired
+        pipeline.sadd(members_key, b"")
+        pipeline.expire(members_key, COHORT_MEMBERSHIP_INDEX_TTL)
+        pipeline.execute()
+
+    pipeline = client.pipeline(transaction=False)
+    pipeline.hset(index_key, str(cohort.pk), f"{cohort.version}:{token}")
+    pipeline.expire(index_key, COHORT_MEMBERSHIP_INDEX_TTL)
+    if previous_entry:
+        _, _, previous_token = previous_entry.decode().partition(":")
+        if previous_token:
+            pipeline.delete(cohort_membership_key(cohort.pk, previous_token))
+    pipeline.execute()
+
+    logger.info(
+        "cohort_membership_indexed", cohort_id=cohort.pk, version=cohort.version, size=len(rows), indexed=bool(token)
+    )
+    return bool(token)
+
+
+def lookup_cohort_memberships(
+    team_id: int, person_uuids: list[str], cohorts: list[Cohort]
+) -> tuple[dict[str, list[int]], list[Cohort]]:
+    """
+    Which of the cohorts each person is in, as far as the index knows.
+
+    Also returns the cohorts that aren't indexed at their current version, which need to be looked up elsewhere.
+    """
+    memberships: dict[str, list[int]] = {person_uuid: [] for person_uuid in person_uuids}
+    client = get_client()
+    index = client.hgetall(cohort_membership_index_key(team_id))
+
+    unindexed: list[Cohort] = []
+    indexed: list[tuple[Cohort, str]] = []
+    for cohort in cohorts:
+        version, _, token = (index.get(str(cohort.pk).encode()) or b"").decode().partition(":")
+        if token and version == str(cohort.version):
+            indexed.append((cohort, cohort_membership_key(cohort.pk, token)))
+        else:
+            unindexed.append(cohort)
+    if not indexed or not person_uuids:
+        return memberships, unindexed
+
+    members = [_person_uuid_bytes(person_uuid) for person_uuid in person_uuids]
+    pipeline = client.pipeline(transaction=False)
+    for _, members_key in indexed:
+        pipeline.exists(members_key)
+        pipeline.smismember(members_key, members)
+    results = pipeline.execute()
+
+    for (cohort, _), exists, is_member in zip(indexed, results[::2], results[1::2]):
+        if not exists:
+            unindexed.append(cohort)
+            continue
+        for person_uuid, member in zip(person_uuids, is_member):
+            if member:
+                memberships[person_uuid].append(cohort.pk)
+    return memberships, unindexed
+
+
+def schedule_cohort_membership_indexing(cohorts: list[Cohort]) -> None:
+    """Build the indexes of cohorts that weren't found in the background, at most once per cohort in a while."""
+    from posthog.tasks.calculate_cohort import index_cohort_membership
+
+    client = get_client()
+    index = client.hgetall(cohort_membership_index_key(cohorts[0].team_id)) if cohorts else {}
+    for cohort in cohorts:
+        if not cohort.is_static and cohort.version is None:
+            continue
+        version, _, token = (index.get(str(cohort.pk).encode()) or b"").decode().partition(":")
+        if version == str(cohort.version) and not token:
+            # Too large to index at this version
+            continue
+        if client.set(
+            f"{COHORT_MEMBERSHIP_KEY_PREFIX}_indexing:{cohort.pk}", 1, nx=True, ex=COHORT_MEMBERSHIP_INDEXING_LOCK_TTL
+        ):
+            index_cohort_membership.delay(cohort.pk)
+
+
+def cohort_membership_index_key(team_id: int) -> str:
+    return f"{COHORT_MEMBERSHIP_KEY_PREFIX}_index:{team_id}"
+
+
+def cohort_membership_key(cohort_id: int, token: str) -> str:
+    return f"{COHORT_MEMBERSHIP_KEY_PREFIX}:{cohort_id}:{token}"
+
+
+def _person_uuid_bytes(person_uuid: UUID | str) -> bytes:
+    return (person_uuid if isinstance(person_uuid, UUID) else UUID(str(person_uuid))).bytes
@@ -54,18 +54,18 @@ GET_PERSON_ID_BY_PRECALCULATED_COHORT_ID = """
 SELECT DISTINCT person_id FROM cohortpeople WHERE team_id = %(team_id)s AND cohort_id = %({prepend}_cohort_id_{index})s AND version = %({prepend}_version_{index})s
 """
 
-GET_COHORTS_BY_PERSON_UUID = """
-SELECT DISTINCT cohort_id
+GET_COHORTS_BY_PERSON_UUIDS = """
+SELECT DISTINCT person_id, cohort_id
 FROM cohortpeople
-WHERE team_id = %(team_id)s AND person_id = %(person_id)s
+WHERE team_id = %(team_id)s AND person_id IN %(person_ids)s AND cohort_id IN %(cohort_ids)s
 GROUP BY person_id, cohort_id, team_id, version
 HAVING sum(sign) > 0
 """
 
-GET_STATIC_COHORTPEOPLE_BY_PERSON_UUID = f"""
-SELECT DISTINCT cohort_id
+GET_STATIC_COHORTPEOPLE_BY_PERSON_UUIDS = f"""
+SELECT DISTINCT person_id, cohort_id
 FROM {PERSON_STATIC_COHORT_TABLE}
-WHERE team_id = %(team_id)s AND person_id = %(person_id)s
+WHERE team_id = %(team_id)s AND person_id IN %(person_ids)s AND cohort_id IN %(cohort_ids)s
 """
 
 GET_COHORTPEOPLE_BY_COHORT_ID = """
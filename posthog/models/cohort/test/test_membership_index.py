@@ -0,0 +1,114 @@
+from unittest.mock import patch
+from uuid import UUID
+
+from django.test import SimpleTestCase
+
+from posthog.models.cohort import Cohort
+from posthog.models.cohort.membership_index import (
+    build_cohort_membership_index,
+    cohort_membership_index_key,
+    lookup_cohort_memberships,
+)
+from posthog.models.cohort.util import get_all_cohort_ids_by_person_uuids
+from posthog.redis import get_client
+from posthog.test.base import BaseTest, ClickhouseTestMixin, _create_person, flush_persons_and_events
+
+PERSON_1 = "00000000-0000-0000-0000-000000000001"
+PERSON_2 = "00000000-0000-0000-0000-000000000002"
+PERSON_3 = "00000000-0000-0000-0000-000000000003"
+
+
+class TestCohortMembershipIndex(SimpleTestCase):
+    def tearDown(self):
+        client = get_client()
+        client.delete(cohort_membership_index_key(1), *client.keys("cohort_membership:*"))
+        super().tearDown()
+
+    def _build(self, cohort: Cohort, members: list[str]) -> bool:
+        with patch(
+            "posthog.models.cohort.membership_index.sync_execute",
+            return_value=[(UUID(member),) for member in members],
+        ):
+            return build_cohort_membership_index(cohort)
+
+    def test_lookup_of_many_persons_against_many_cohorts(self):
+        dynamic_cohort = Cohort(id=1, team_id=1, version=3)
+        static_cohort = Cohort(id=2, team_id=1, is_static=True)
+        empty_cohort = Cohort(id=3, team_id=1, version=1)
+        assert self._build(dynamic_cohort, [PERSON_1, PERSON_2])
+        assert self._build(static_cohort, [PERSON_2])
+        assert self._build(empty_cohort, [])
+
+        memberships, unindexed = lookup_cohort_memberships(
+            1, [PERSON_1, PERSON_2, PERSON_3], [dynamic_cohort, static_cohort, empty_cohort]
+        )
+
+        assert memberships == {PERSON_1: [1], PERSON_2: [1, 2], PERSON_3: []}
+        assert unindexed == []
+
+    def test_cohorts_not_indexed_at_their_current_version_are_left_out(self):
+        cohort = Cohort(id=1, team_id=1, version=3)
+        assert self._build(cohort, [PERSON_1])
+
+        recalculated_cohort = Cohort(id=1, team_id=1, version=4)
+        never_indexed_cohort = Cohort(id=2, team_id=1, version=1)
+        memberships, unindexed = lookup_cohort_memberships(1, [PERSON_1], [recalculated_cohort, never_indexed_cohort])
+
+        assert memberships == {PERSON_1: []}
+        assert unindexed == [recalculated_cohort, never_indexed_cohort]
+
+    def test_rebuilding_replaces_previous_members(self):
+        cohort = Cohort(id=1, team_id=1, version=3)
+        assert self._build(cohort, [PERSON_1])
+        cohort.version = 4
+        assert self._build(cohort, [PERSON_2])
+
+        memberships, unindexed = lookup_cohort_memberships(1, [PERSON_1, PERSON_2], [cohort])
+
+        assert memberships == {PERSON_1: [], PERSON_2: [1]}
+        assert unindexed == []
+        assert len(get_client().keys("cohort_membership:1:*")) == 1
+
+    @patch("posthog.models.cohort.membership_index.COHORT_MEMBERSHIP_INDEX_MAX_SIZE", 1)
+    def test_large_cohorts_are_not_indexed(self):
+        cohort = Cohort(id=1, team_id=1, version=3)
+
+        assert not self._build(cohort, [PERSON_1, PERSON_2])
+
+        memberships, unindexed = lookup_cohort_memberships(1, [PERSON_1], [cohort])
+        assert memberships == {PERSON_1: []}
+        assert unindexed == [cohort]
+
+
+class TestCohortIdsByPersonUuids(ClickhouseTestMixin, BaseTest):
+    CLASS_DATA_LEVEL_SETUP = False
+
+    def test_cohort_ids_are_the_same_with_and_without_index(self):
+        person_1 = _create_person(team_id=self.team.pk, distinct_ids=["p1"], properties={"plan": "free"})
+        person_2 = _create_person(team_id=self.team.pk, distinct_ids=["p2"], properties={"plan": "paid"})
+        flush_persons_and_events()
+        free_cohort = Cohort.objects.create(
+            team=self.team, groups=[{"properties": [{"key": "plan", "value": "free", "type": "person"}]}]
+        )
+        everyone_cohort = Cohort.objects.create(
+            team=self.team, groups=[{"properties": [{"key": "plan", "operator": "is_set", "type": "person"}]}]
+        )
+        static_cohort = Cohort.objects.create(team=self.team, groups=[], is_static=True)
+        # Building the indexes is left to the cohorts calculating
+        get_client().delete(cohort_membership_index_key(self.team.pk))
+        free_cohort.calculate_people_ch(pending_version=0)
+        everyone_cohort.calculate_people_ch(pending_version=0)
+        static_cohort.insert_users_by_list(["p2"])
+        person_uuids = [str(person_1.uuid), str(person_2.uuid)]
+        expected = {
+            str(person_1.uuid): sorted([free_cohort.pk, everyone_cohort.pk]),
+            str(person_2.uuid): sorted([everyone_cohort.pk, static_cohort.pk]),
+        }
+
+        with patch("posthog.models.cohort.util.sync_execute") as sync_execute:
+            assert get_all_cohort_ids_by_person_uuids(person_uuids, self.team.pk) == expected
+        sync_execute.assert_not_called()
+
+        get_client().delete(cohort_membership_index_key(self.team.pk))
+        with patch("posthog.models.cohort.membership_index.schedule_cohort_membership_indexing"):
+            assert get_all_cohort_ids_by_person_uuids(person_uuids, self.team.pk) == expected
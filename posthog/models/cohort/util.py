@@ -21,10 +21,10 @@ from posthog.models.cohort.cohort import Cohort, CohortOrEmpty
 from posthog.models.cohort.sql import (
     CALCULATE_COHORT_PEOPLE_SQL,
     GET_COHORT_SIZE_SQL,
-    GET_COHORTS_BY_PERSON_UUID,
+    GET_COHORTS_BY_PERSON_UUIDS,
     GET_PERSON_ID_BY_PRECALCULATED_COHORT_ID,
     GET_STATIC_COHORT_SIZE_SQL,
-    GET_STATIC_COHORTPEOPLE_BY_PERSON_UUID,
+    GET_STATIC_COHORTPEOPLE_BY_PERSON_UUIDS,
     RECALCULATE_COHORT_BY_ID,
     STALE_COHORTPEOPLE,
 )
@@ -442,20 +442,31 @@ def simplified_cohort_filter_properties(cohort: Cohort, team: Team, is_negated=F
         return cohort.properties
 
 
-def _get_cohort_ids_by_person_uuid(uuid: str, team_id: int) -> list[int]:
-    res = sync_execute(GET_COHORTS_BY_PERSON_UUID, {"person_id": uuid, "team_id": team_id})
-    return [row[0] for row in res]
+def get_all_cohort_ids_by_person_uuid(uuid: Union[str, uuid.UUID], team_id: int) -> list[int]:
+    return get_all_cohort_ids_by_person_uuids([str(uuid)], team_id)[str(uuid)]
 
 
-def _get_static_cohort_ids_by_person_uuid(uuid: str, team_id: int) -> list[int]:
-    res = sync_execute(GET_STATIC_COHORTPEOPLE_BY_PERSON_UUID, {"person_id": uuid, "team_id": team_id})
-    return [row[0] for row in res]
+def get_all_cohort_ids_by_person_uuids(uuids: list[str], team_id: int) -> dict[str, list[int]]:
+    """
+    Cohort ids of many persons of a team at once. Memberships come from the membership index, and only cohorts that
+    aren't indexed at their current version are looked up in ClickHouse.
+    """
+    from posthog.models.cohort.membership_index import (
+        lookup_cohort_memberships,
+        schedule_cohort_membership_indexing,
+    )
+
+    cohorts = list(Cohort.objects.filter(team_id=team_id, deleted=False).only("id", "team_id", "is_static", "version"))
+    cohort_ids, unindexed_cohorts = lookup_cohort_memberships(team_id, uuids, cohorts)
 
+    if uuids and unindexed_cohorts:
+        schedule_cohort_membership_indexing(unindexed_cohorts)
+        params = {"person_ids": uuids, "team_id": team_id, "cohort_ids": [cohort.pk for cohort in unindexed_cohorts]}
+        for query in (GET_COHORTS_BY_PERSON_UUIDS, GET_STATIC_COHORTPEOPLE_BY_PERSON_UUIDS):
+            for person_id, cohort_id in sync_execute(query, params):
+                cohort_ids.setdefault(str(person_id), []).append(cohort_id)
 
-def get_all_cohort_ids_by_person_uuid(uuid: str, team_id: int) -> list[int]:
-    cohort_ids = _get_cohort_ids_by_person_uuid(uuid, team_id)
-    static_cohort_ids = _get_static_cohort_ids_by_person_uuid(uuid, team_id)
-    return [*cohort_ids, *static_cohort_ids]
+    return {person_uuid: sorted(set(ids)) for person_uuid, ids in cohort_ids.items()}
 
 
 def get_dependent_cohorts(
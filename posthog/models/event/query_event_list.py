@@ -1,5 +1,6 @@
 from datetime import timedelta, datetime, time
 from typing import Optional, Union
+from uuid import UUID
 from zoneinfo import ZoneInfo
 
 from dateutil.parser import isoparse
@@ -64,6 +65,7 @@ def query_events_list(
     unbounded_date_from: bool = False,
     limit: int = DEFAULT_RETURNED_ROWS,
     offset: int = 0,
+    cursor: Optional[tuple[datetime, UUID]] = None,
 ) -> list:
     # Note: This code is inefficient and problematic, see https://github.com/PostHog/posthog/issues/13485 for details.
     # To isolate its impact from rest of the queries its queries are run on different nodes as part of "offline" workloads.
@@ -85,6 +87,30 @@ def query_events_list(
     if request_get_query_dict.get("after"):
         request_get_query_dict["after"] = parse_timestamp(request_get_query_dict["after"], team.timezone_info)
 
+    cursor_condition = ""
+    cursor_params: dict = {}
+    if cursor is not None:
+        # Continue right after the (timestamp, uuid) of the last event on the previous page. That page already respected
+        # `before` and `after`, so the cursor replaces them. Timestamps have microsecond precision, so moving the bound by
+        # a microsecond makes it inclusive, and events sharing the cursor's timestamp are split by uuid.
+        cursor_timestamp, cursor_uuid = cursor[0].astimezone(ZoneInfo("UTC")), cursor[1]
+        if order == "DESC":
+            request_get_query_dict["before"] = cursor_timestamp + timedelta(microseconds=1)
+            cursor_condition = (
+                "AND (timestamp < %(cursor_timestamp)s "
+                "OR (timestamp = %(cursor_timestamp)s AND uuid < toUUID(%(cursor_uuid)s))) "
+            )
+        else:
+            request_get_query_dict["after"] = cursor_timestamp - timedelta(microseconds=1)
+            cursor_condition = (
+                "AND (timestamp > %(cursor_timestamp)s "
+                "OR (timestamp = %(cursor_timestamp)s AND uuid > toUUID(%(cursor_uuid)s))) "
+            )
+        cursor_params = {
+            "cursor_timestamp": cursor_timestamp.strftime("%Y-%m-%d %H:%M:%S.%f"),
+            "cursor_uuid": str(cursor_uuid),
+        }
+
     if (
         not unbounded_date_from
         and order == "DESC"
@@ -105,6 +131,8 @@ def query_events_list(
         team,
         tzinfo=team.timezone_info,
     )
+    conditions += cursor_condition
+    condition_params.update(cursor_params)
 
     prop_filters, prop_filter_params = parse_prop_grouped_clauses(
         team_id=team.pk,
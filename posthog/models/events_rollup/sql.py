@@ -0,0 +1,127 @@
+from django.conf import settings
+
+from posthog.clickhouse.table_engines import (
+    Distributed,
+    ReplicationScheme,
+    AggregatingMergeTree,
+)
+
+TABLE_BASE_NAME = "events_rollup"
+EVENTS_ROLLUP_DATA_TABLE = lambda: f"sharded_{TABLE_BASE_NAME}"
+
+# Properties that trends can be broken down by when answered from the rollup. Every event is counted once for each
+# of these properties, plus once with an empty property_name for queries without a breakdown.
+# Adding a property here only rolls up events ingested after the materialized view is updated, so it needs a backfill.
+EVENTS_ROLLUP_PROPERTIES = [
+    "$browser",
+    "$os",
+    "$device_type",
+    "$geoip_country_code",
+    "$referring_domain",
+]
+
+TRUNCATE_EVENTS_ROLLUP_TABLE_SQL = (
+    lambda: f"TRUNCATE TABLE IF EXISTS {EVENTS_ROLLUP_DATA_TABLE()} ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}'"
+)
+DROP_EVENTS_ROLLUP_TABLE_SQL = (
+    lambda: f"DROP TABLE IF EXISTS {EVENTS_ROLLUP_DATA_TABLE()} ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}'"
+)
+DROP_EVENTS_ROLLUP_MATERIALIZED_VIEW_SQL = (
+    lambda: f"DROP MATERIALISED VIEW IF EXISTS {TABLE_BASE_NAME}_mv ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}'"
+)
+
+# if updating these column definitions
+# you'll need to update the explicit column definitions in the materialized view creation statement below
+EVENTS_ROLLUP_TABLE_BASE_SQL = """
+CREATE TABLE IF NOT EXISTS {table_name} ON CLUSTER '{cluster}'
+(
+    -- part of order by so will aggregate correctly
+    team_id Int64,
+    event VARCHAR,
+    hour DateTime('UTC'),
+    -- empty for the row counting all of the hour's events
+    property_name VARCHAR,
+    -- the raw JSON value, so that it reads the same as JSONExtractRaw(properties, property_name) on events
+    property_value VARCHAR,
+
+    count SimpleAggregateFunction(sum, UInt64),
+    person_ids AggregateFunction(uniqExact, UUID)
+) ENGINE = {engine}
+"""
+
+EVENTS_ROLLUP_DATA_TABLE_ENGINE = lambda: AggregatingMergeTree(
+    TABLE_BASE_NAME, replication_scheme=ReplicationScheme.SHARDED
+)
+
+EVENTS_ROLLUP_TABLE_SQL = lambda: (
+    EVENTS_ROLLUP_TABLE_BASE_SQL
+    + """
+    PARTITION BY toYYYYMM(hour)
+    -- queries are for one team and event at a time, and either without a breakdown or broken down by one property
+    ORDER BY (team_id, event, property_name, hour, property_value)
+"""
+).format(
+    table_name=EVENTS_ROLLUP_DATA_TABLE(),
+    cluster=settings.CLICKHOUSE_CLUSTER,
+    engine=EVENTS_ROLLUP_DATA_TABLE_ENGINE(),
+)
+
+EVENTS_ROLLUP_SELECT_SQL = (
+    lambda source_table="sharded_events", where="": """
+SELECT
+    team_id,
+    event,
+    toStartOfHour(timestamp) AS hour,
+    property.1 AS property_name,
+    property.2 AS property_value,
+    count() AS count,
+    uniqExactState(person_id) AS person_ids
+FROM {database}.{source_table}
+ARRAY JOIN arrayConcat([('', '')], arrayMap(name -> (name, JSONExtractRaw(properties, name)), {properties})) AS property
+{where}
+GROUP BY team_id, event, hour, property_name, property_value
+""".format(
+        database=settings.CLICKHOUSE_DATABASE,
+        source_table=source_table,
+        properties="[{}]".format(", ".join(f"'{name}'" for name in EVENTS_ROLLUP_PROPERTIES)),
+        where=where,
+    )
+)
+
+EVENTS_ROLLUP_TABLE_MV_SQL = (
+    lambda: """
+CREATE MATERIALIZED VIEW IF NOT EXISTS {table_name} ON CLUSTER '{cluster}'
+TO {database}.{target_table}
+AS
+{select_sql}
+""".format(
+        table_name=f"{TABLE_BASE_NAME}_mv",
+        target_table=f"writable_{TABLE_BASE_NAME}",
+        cluster=settings.CLICKHOUSE_CLUSTER,
+        database=settings.CLICKHOUSE_DATABASE,
+        select_sql=EVENTS_ROLLUP_SELECT_SQL(),
+    )
+)
+
+# Distributed engine tables are only created if CLICKHOUSE_REPLICATED
+
+# This table is responsible for writing to sharded_events_rollup based on a sharding key.
+WRITABLE_EVENTS_ROLLUP_TABLE_SQL = lambda: EVENTS_ROLLUP_TABLE_BASE_SQL.format(
+    table_name=f"writable_{TABLE_BASE_NAME}",
+    cluster=settings.CLICKHOUSE_CLUSTER,
+    engine=Distributed(
+        data_table=EVENTS_ROLLUP_DATA_TABLE(),
+        # shard via team and event so that all rows of a query's series are on the same shard
+        sharding_key="sipHash64(team_id, event)",
+    ),
+)
+
+# This table is responsible for reading from events_rollup on a cluster setting
+DISTRIBUTED_EVENTS_ROLLUP_TABLE_SQL = lambda: EVENTS_ROLLUP_TABLE_BASE_SQL.format(
+    table_name=TABLE_BASE_NAME,
+    cluster=settings.CLICKHOUSE_CLUSTER,
+    engine=Distributed(
+        data_table=EVENTS_ROLLUP_DATA_TABLE(),
+        sharding_key="sipHash64(team_id, event)",
+    ),
+)
@@ -1,7 +1,9 @@
 import hashlib
 from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache
 import time
+import orjson
 import structlog
 from typing import Literal, Optional, Union, cast
 
@@ -63,6 +65,9 @@ FLAG_CACHE_HIT_COUNTER = Counter(
     labelnames=[LABEL_TEAM_ID, "cache_hit"],
 )
 
+# Distinct flag conditions parsed and kept around, across flags, teams and requests
+FLAG_CONDITION_CACHE_SIZE = 10_000
+
 ENTITY_EXISTS_PREFIX = "flag_entity_exists_"
 PERSON_KEY = "person"
 
@@ -324,7 +329,7 @@ class FeatureFlagMatcher:
     ) -> tuple[bool, FeatureFlagMatchReason]:
         rollout_percentage = condition.get("rollout_percentage")
         if len(condition.get("properties", [])) > 0:
-            properties = Filter(data=condition).property_groups.flat
+            properties = flag_condition_properties(condition)
             if self.can_compute_locally(properties, feature_flag.aggregation_group_type_index):
                 # :TRICKY: If overrides are enough to determine if a condition is a match,
                 # we can skip checking the query.
@@ -453,7 +458,7 @@ class FeatureFlagMatcher:
                     annotate_query = True
                     nonlocal person_query
 
-                    property_list = Filter(data=condition).property_groups.flat
+                    property_list = flag_condition_properties(condition)
                     properties_with_math_operators = get_all_properties_with_math_operators(
                         property_list, self.cohorts_cache, team_id
                     )
@@ -1006,6 +1011,23 @@ def parse_exception_for_error_message(err: Exception):
     return reason
 
 
+@lru_cache(maxsize=FLAG_CONDITION_CACHE_SIZE)
+def _parse_flag_condition(serialized_condition: bytes) -> list[Property]:
+    return Filter(data=orjson.loads(serialized_condition)).property_groups.flat
+
+
+def flag_condition_properties(condition: dict) -> list[Property]:
+    """
+    Properties of a flag condition. Identical conditions share one parsed filter,
+    as every flag is matched again on every request. The result must not be mutated.
+    """
+    try:
+        serialized_condition = orjson.dumps(condition, option=orjson.OPT_SORT_KEYS)
+    except orjson.JSONEncodeError:
+        return Filter(data=condition).property_groups.flat
+    return _parse_flag_condition(serialized_condition)
+
+
 def key_and_field_for_property(property: Property) -> tuple[str, str]:
     column = "group_properties" if property.type == "group" else "properties"
     key = property.key
@@ -1089,7 +1111,7 @@ def check_flag_evaluation_query_is_ok(feature_flag: FeatureFlag, team_id: int) -
 
     for index, condition in enumerate(feature_flag.conditions):
         key = f"flag_0_condition_{index}"
-        property_list = Filter(data=condition).property_groups.flat
+        property_list = flag_condition_properties(condition)
         expr = properties_to_Q(
             team_id,
             property_list,
@@ -1,4 +1,3 @@
-import inspect
 import json
 from typing import TYPE_CHECKING, Any, Optional
 
@@ -6,6 +5,7 @@ from rest_framework import request
 
 from posthog.hogql.context import HogQLContext
 from .mixins.common import BaseParamMixin
+from .mixins.utils import marked_methods
 from posthog.models.utils import sane_repr
 from posthog.utils import encode_get_request_params
 from rest_framework.exceptions import ValidationError
@@ -18,6 +18,8 @@ if TYPE_CHECKING:
 
 class BaseFilter(BaseParamMixin):
     _data: dict
+    _dict: Optional[dict[str, Any]] = None
+    _json: Optional[str] = None
     team: Optional["Team"]
     kwargs: dict
     hogql_context: HogQLContext
@@ -70,19 +72,25 @@ class BaseFilter(BaseParamMixin):
             self._data = simplified_filter._data
 
     def to_dict(self) -> dict[str, Any]:
-        ret = {}
+        # Filters don't change once created, so this is only built once. Copied, as callers add to it
+        if self._dict is None:
+            ret = {}
 
-        for _, func in inspect.getmembers(self, inspect.ismethod):
-            if hasattr(func, "include_dict"):  # provided by @include_dict decorator
-                ret.update(func())
+            for name in marked_methods(type(self), "include_dict"):  # provided by @include_dict decorator
+                ret.update(getattr(self, name)())
 
-        return ret
+            self._dict = ret
+
+        return {**self._dict}
 
     def to_params(self) -> dict[str, str]:
         return encode_get_request_params(data=self.to_dict())
 
     def toJSON(self):
-        return json.dumps(self.to_dict(), default=lambda o: o.__dict__, sort_keys=True, indent=4)
+        # Cache keys are built from this, often many times over for the same filter
+        if self._json is None:
+            self._json = json.dumps(self.to_dict(), default=lambda o: o.__dict__, sort_keys=True, indent=4)
+        return self._json
 
     def shallow_clone(self, overrides: dict[str, Any]):
         "Clone the filter's data while sharing the HogQL context"
@@ -94,9 +102,8 @@ class BaseFilter(BaseParamMixin):
     def query_tags(self) -> dict[str, Any]:
         ret = {}
 
-        for _, func in inspect.getmembers(self, inspect.ismethod):
-            if hasattr(func, "include_query_tags"):  # provided by @include_query_tags decorator
-                ret.update(func())
+        for name in marked_methods(type(self), "include_query_tags"):  # provided by @include_query_tags decorator
+            ret.update(getattr(self, name)())
 
         return ret
 
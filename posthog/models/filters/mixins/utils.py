@@ -1,4 +1,6 @@
-from functools import lru_cache
+import inspect
+from functools import cache, lru_cache
+from types import FunctionType
 from typing import Optional, TypeVar, Union
 from collections.abc import Callable
 
@@ -28,6 +30,20 @@ def include_query_tags(f):
     return f
 
 
+@cache
+def marked_methods(cls: type, marker: str) -> tuple[str, ...]:
+    """
+    Names of the methods of a class marked by a decorator like @include_dict, sorted like `inspect.getmembers`.
+    Found once per class, rather than by inspecting (and evaluating the properties of) every instance.
+    """
+    return tuple(
+        name
+        for name in sorted(dir(cls))
+        if isinstance(inspect.getattr_static(cls, name), FunctionType)
+        and getattr(inspect.getattr_static(cls, name), marker, False)
+    )
+
+
 def process_bool(bool_to_test: Optional[Union[str, bool]]) -> bool:
     if isinstance(bool_to_test, bool):
         return bool_to_test
@@ -61,6 +61,18 @@ class TestFilter(BaseTest):
             ],
         )
 
+    def test_to_dict_is_computed_once_and_returns_copies(self):
+        filter = Filter(data={"events": [{"id": "$pageview"}], "date_from": "-7d", "interval": "day"})
+
+        first = filter.to_dict()
+        first["date_from"] = "-14d"
+        first["some_other_key"] = True
+
+        self.assertEqual(filter.to_dict()["date_from"], "-7d")
+        self.assertNotIn("some_other_key", filter.to_dict())
+        self.assertEqual(filter.toJSON(), filter.toJSON())
+        self.assertEqual(Filter(data=filter.to_dict()).to_dict(), filter.to_dict())
+
     def test_simplify_test_accounts(self):
         self.team.test_account_filters = [
             {
@@ -0,0 +1,469 @@
+"""
+Checksum-based reconciliation of person data between Postgres and ClickHouse.
+
+Rather than loading every row for a team into memory, the person UUID space is split into ranges and each range is
+summarised on both sides as `(row count, sum of per-row hashes)`. Ranges whose summaries match are skipped, ranges that
+differ are split further (Merkle-style) until they are small enough to compare row by row. Corrections are emitted in
+batches and progress is checkpointed in Redis so that an interrupted run can be resumed.
+"""
+
+import dataclasses
+from collections.abc import Iterator
+from typing import Optional
+from uuid import UUID
+
+import structlog
+from django.db import connection
+
+from posthog.client import sync_execute
+from posthog.kafka_client.client import KafkaProducer
+from posthog.models.person.person import Person, PersonDistinctId
+from posthog.models.person.util import (
+    _delete_ch_distinct_id,
+    create_person,
+    create_person_distinct_id,
+)
+from posthog.redis import get_client
+
+logger = structlog.get_logger(__name__)
+
+UUID_HEX_LENGTH = 32
+UUID_SPACE_END = 1 << 128
+
+DEFAULT_LEAF_SIZE = 10_000
+DEFAULT_BATCH_SIZE = 1_000
+DEFAULT_CHUNK_SIZE = 2_000
+
+CHECKPOINT_TTL_SECONDS = 7 * 24 * 60 * 60
+
+# Per-row hash: the first 32 bits of md5(key || ':' || version), read as an unsigned big-endian integer.
+# Both expressions must produce identical values for identical input strings.
+PG_ROW_HASH = "('x' || substr(md5({value}), 1, 8))::bit(32)::bigint"
+CH_ROW_HASH = "reinterpretAsUInt32(reverse(substring(MD5({value}), 1, 4)))"
+
+
+@dataclasses.dataclass(frozen=True)
+class UUIDRange:
+    """A range of UUIDs sharing the same hex prefix, i.e. `[lower, upper)` aligned to a hex digit boundary."""
+
+    prefix: str = ""
+
+    @property
+    def _step(self) -> int:
+        return 1 << (4 * (UUID_HEX_LENGTH - len(self.prefix)))
+
+    @property
+    def lower(self) -> int:
+        return int(self.prefix, 16) * self._step if self.prefix else 0
+
+    @property
+    def upper(self) -> int:
+        return self.lower + self._step
+
+    @property
+    def lower_uuid(self) -> UUID:
+        return UUID(int=self.lower)
+
+    @property
+    def upper_uuid(self) -> Optional[UUID]:
+        # The last range of the UUID space has no upper bound
+        return UUID(int=self.upper) if self.upper < UUID_SPACE_END else None
+
+    @property
+    def is_leaf(self) -> bool:
+        return len(self.prefix) >= UUID_HEX_LENGTH
+
+    def split(self) -> list["UUIDRange"]:
+        # Ranges are split by one hex digit at a time
+        return [UUIDRange(self.prefix + digit) for digit in "0123456789abcdef"]
+
+
+@dataclasses.dataclass
+class ReconciliationStats:
+    ranges_compared: int = 0
+    ranges_matched: int = 0
+    leaves_compared: int = 0
+    rows_compared: int = 0
+    updates: int = 0
+    deletes: int = 0
+
+
+RangeChecksums = dict[str, tuple[int, int]]
+
+
+class RangeReconciler:
+    """
+    Walks the UUID space depth-first in ascending order. Subclasses provide checksums for the children of a range on
+    both sides, and the row-level comparison for ranges that are small enough to be loaded.
+    """
+
+    kind: str
+
+    def __init__(
+        self,
+        team_id: int,
+        *,
+        live_run: bool,
+        deletes: bool,
+        sync: bool = False,
+        leaf_size: int = DEFAULT_LEAF_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        resume: bool = False,
+    ):
+        self.team_id = team_id
+        self.live_run = live_run
+        self.deletes = deletes
+        self.sync = sync
+        self.leaf_size = leaf_size
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self.stats = ReconciliationStats()
+        self.resume_from = self.get_checkpoint() if resume else 0
+        self._pending_corrections: list[dict] = []
+
+    # Checkpointing
+
+    @property
+    def checkpoint_key(self) -> str:
+        return f"@posthog/person-reconciliation/{self.kind}/{self.team_id}"
+
+    def get_checkpoint(self) -> int:
+        value = get_client().get(self.checkpoint_key)
+        return int(value) if value else 0
+
+    def save_checkpoint(self, position: int) -> None:
+        get_client().set(self.checkpoint_key, str(position), ex=CHECKPOINT_TTL_SECONDS)
+
+    def clear_checkpoint(self) -> None:
+        get_client().delete(self.checkpoint_key)
+
+    # Traversal
+
+    def run(self) -> ReconciliationStats:
+        if self.resume_from:
+            logger.info(f"Resuming {self.kind} reconciliation from {UUID(int=self.resume_from)}")
+
+        # Depth-first, ascending order, so that everything below a finished range's upper bound is reconciled
+        stack = [UUIDRange()]
+        while stack:
+            uuid_range = stack.pop()
+            depth = len(uuid_range.prefix) + 1
+            pg_checksums = self.pg_checksums(uuid_range, depth)
+            ch_checksums = self.ch_checksums(uuid_range, depth)
+            self.stats.ranges_compared += 1
+
+            to_descend: list[UUIDRange] = []
+            for child in uuid_range.split():
+                if child.upper <= self.resume_from:
+                    continue
+                pg_checksum = pg_checksums.get(child.prefix, (0, 0))
+                ch_checksum = ch_checksums.get(child.prefix, (0, 0))
+                if pg_checksum == ch_checksum:
+                    self.stats.ranges_matched += 1
+                elif child.is_leaf or max(pg_checksum[0], ch_checksum[0]) <= self.leaf_size:
+                    self.reconcile_leaf(child)
+                    self.stats.leaves_compared += 1
+                else:
+                    to_descend.append(child)
+                    continue
+
+                if not to_descend:
+                    # Everything below this child's upper bound has been reconciled
+                    self._flush_corrections()
+                    if self.live_run:
+                        self.save_checkpoint(child.upper)
+
+            stack.extend(reversed(to_descend))
+
+        self._flush_corrections()
+        if self.live_run:
+            self.clear_checkpoint()
+        logger.info(f"Finished {self.kind} reconciliation", **dataclasses.asdict(self.stats))
+        return self.stats
+
+    # Corrections
+
+    def queue_correction(self, correction: dict) -> None:
+        self._pending_corrections.append(correction)
+        if len(self._pending_corrections) >= self.batch_size:
+            self._flush_corrections()
+
+    def _flush_corrections(self) -> None:
+        if not self._pending_corrections:
+            return
+        corrections, self._pending_corrections = self._pending_corrections, []
+        if self.live_run:
+            for correction in corrections:
+                self.apply_correction(correction)
+            if not self.sync:
+                KafkaProducer().flush()
+
+    # To be implemented by subclasses
+
+    def pg_checksums(self, uuid_range: UUIDRange, depth: int) -> RangeChecksums:
+        raise NotImplementedError()
+
+    def ch_checksums(self, uuid_range: UUIDRange, depth: int) -> RangeChecksums:
+        raise NotImplementedError()
+
+    def reconcile_leaf(self, uuid_range: UUIDRange) -> None:
+        raise NotImplementedError()
+
+    def apply_correction(self, correction: dict) -> None:
+        raise NotImplementedError()
+
+
+def _pg_range_condition(column: str, uuid_range: UUIDRange) -> tuple[str, list]:
+    upper_uuid = uuid_range.upper_uuid
+    if upper_uuid is None:
+        return f"{column} >= %s::uuid", [str(uuid_range.lower_uuid)]
+    return f"{column} >= %s::uuid AND {column} < %s::uuid", [str(uuid_range.lower_uuid), str(upper_uuid)]
+
+
+def _ch_range_condition(column: str, uuid_range: UUIDRange) -> tuple[str, dict]:
+    # Compare as strings, as the textual order of UUIDs matches the order used by Postgres
+    upper_uuid = uuid_range.upper_uuid
+    if upper_uuid is None:
+        return f"toString({column}) >= %(lower)s", {"lower": str(uuid_range.lower_uuid)}
+    return (
+        f"toString({column}) >= %(lower)s AND toString({column}) < %(upper)s",
+        {"lower": str(uuid_range.lower_uuid), "upper": str(upper_uuid)},
+    )
+
+
+def _fetch_pg_checksums(query: str, params: list) -> RangeChecksums:
+    with connection.cursor() as cursor:
+        cursor.execute(query, params)
+        return {bucket: (int(count), int(checksum or 0)) for bucket, count, checksum in cursor.fetchall()}
+
+
+def _fetch_ch_checksums(query: str, params: dict) -> RangeChecksums:
+    rows = sync_execute(query, params)
+    return {bucket: (int(count), int(checksum)) for bucket, count, checksum in rows}
+
+
+def _chunks(items: list, size: int) -> Iterator[list]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+class PersonReconciler(RangeReconciler):
+    kind = "person"
+
+    def pg_checksums(self, uuid_range: UUIDRange, depth: int) -> RangeChecksums:
+        condition, params = _pg_range_condition("uuid", uuid_range)
+        row_hash = PG_ROW_HASH.format(value="uuid::text || ':' || coalesce(version, 0)::text")
+        return _fetch_pg_checksums(
+            f"""
+            SELECT substr(replace(uuid::text, '-', ''), 1, %s) AS bucket, count(*), sum({row_hash})
+            FROM {Person._meta.db_table}
+            WHERE team_id = %s AND {condition}
+            GROUP BY bucket
+            """,
+            [depth, self.team_id, *params],
+        )
+
+    def ch_checksums(self, uuid_range: UUIDRange, depth: int) -> RangeChecksums:
+        condition, params = _ch_range_condition("id", uuid_range)
+        row_hash = CH_ROW_HASH.format(value="concat(toString(id), ':', toString(version))")
+        return _fetch_ch_checksums(
+            f"""
+            SELECT substring(replaceAll(toString(id), '-', ''), 1, %(depth)s) AS bucket, count(), sum({row_hash})
+            FROM (
+                SELECT id, max(version) AS version FROM person
+                WHERE team_id = %(team_id)s AND {condition}
+                GROUP BY id HAVING max(is_deleted) = 0
+            )
+            GROUP BY bucket
+            """,
+            {"depth": depth, "team_id": self.team_id, **params},
+        )
+
+    def reconcile_leaf(self, uuid_range: UUIDRange) -> None:
+        condition, params = _ch_range_condition("id", uuid_range)
+        rows = sync_execute(
+            f"""
+            SELECT id, max(version) FROM person
+            WHERE team_id = %(team_id)s AND {condition}
+            GROUP BY id HAVING max(is_deleted) = 0
+            """,
+            {"team_id": self.team_id, **params},
+        )
+        ch_persons_to_version = {row[0]: row[1] for row in rows}
+
+        persons = Person.objects.filter(team_id=self.team_id, uuid__gte=uuid_range.lower_uuid)
+        if uuid_range.upper_uuid is not None:
+            persons = persons.filter(uuid__lt=uuid_range.upper_uuid)
+        persons = persons.only("uuid", "version", "properties", "is_identified", "created_at")
+
+        for person in persons.iterator(chunk_size=self.chunk_size):
+            self.stats.rows_compared += 1
+            ch_version = ch_persons_to_version.pop(person.uuid, None)
+            pg_version = person.version or 0
+            if ch_version is None or ch_version < pg_version:
+                logger.info(f"Updating {person.uuid} to version {pg_version}")
+                self.stats.updates += 1
+                self.queue_correction(
+                    {
+                        "team_id": self.team_id,
+                        "version": pg_version,
+                        "uuid": str(person.uuid),
+                        "properties": person.properties,
+                        "is_identified": person.is_identified,
+                        "created_at": person.created_at,
+                    }
+                )
+            elif ch_version > pg_version:
+                logger.info(
+                    f"Clickhouse version ({ch_version}) for '{person.uuid}' is higher than in Postgres ({pg_version}). Ignoring."
+                )
+
+        if self.deletes:
+            # Whatever is left only exists in ClickHouse
+            for uuid, version in ch_persons_to_version.items():
+                logger.info(f"Deleting person with uuid={uuid}")
+                self.stats.deletes += 1
+                self.queue_correction(
+                    {
+                        "uuid": str(uuid),
+                        "team_id": self.team_id,
+                        "properties": {},
+                        # keep in sync with deletePerson in plugin-server/src/utils/db/db.ts
+                        "version": int(version or 0) + 100,
+                        "is_deleted": True,
+                    }
+                )
+
+    def apply_correction(self, correction: dict) -> None:
+        create_person(**correction, sync=self.sync)
+
+
+class PersonDistinctIdReconciler(RangeReconciler):
+    """Distinct IDs are bucketed by the UUID of the person they point to."""
+
+    kind = "person_distinct_id"
+
+    CH_DISTINCT_IDS = """
+        SELECT distinct_id, argMax(person_id, version) AS person_id, max(version) AS version
+        FROM person_distinct_id2
+        WHERE team_id = %(team_id)s {distinct_id_condition}
+        GROUP BY distinct_id HAVING max(is_deleted) = 0
+    """
+
+    def pg_checksums(self, uuid_range: UUIDRange, depth: int) -> RangeChecksums:
+        condition, params = _pg_range_condition("p.uuid", uuid_range)
+        row_hash = PG_ROW_HASH.format(value="d.distinct_id || ':' || coalesce(d.version, 0)::text")
+        return _fetch_pg_checksums(
+            f"""
+            SELECT substr(replace(p.uuid::text, '-', ''), 1, %s) AS bucket, count(*), sum({row_hash})
+            FROM {PersonDistinctId._meta.db_table} d
+            JOIN {Person._meta.db_table} p ON p.id = d.person_id
+            WHERE d.team_id = %s AND {condition}
+            GROUP BY bucket
+            """,
+            [depth, self.team_id, *params],
+        )
+
+    def ch_checksums(self, uuid_range: UUIDRange, depth: int) -> RangeChecksums:
+        condition, params = _ch_range_condition("person_id", uuid_range)
+        row_hash = CH_ROW_HASH.format(value="concat(distinct_id, ':', toString(version))")
+        return _fetch_ch_checksums(
+            f"""
+            SELECT substring(replaceAll(toString(person_id), '-', ''), 1, %(depth)s) AS bucket, count(), sum({row_hash})
+            FROM ({self.CH_DISTINCT_IDS.format(distinct_id_condition="")})
+            WHERE {condition}
+            GROUP BY bucket
+            """,
+            {"depth": depth, "team_id": self.team_id, **params},
+        )
+
+    def _ch_versions(self, distinct_ids: list[str]) -> dict[str, int]:
+        versions: dict[str, int] = {}
+        for chunk in _chunks(distinct_ids, self.chunk_size):
+            rows = sync_execute(
+                f"SELECT distinct_id, version FROM ({self.CH_DISTINCT_IDS.format(distinct_id_condition='AND distinct_id IN %(distinct_ids)s')})",
+                {"team_id": self.team_id, "distinct_ids": chunk},
+            )
+            versions.update({row[0]: row[1] for row in rows})
+        return versions
+
+    def reconcile_leaf(self, uuid_range: UUIDRange) -> None:
+        condition, params = _ch_range_condition("person_id", uuid_range)
+        rows = sync_execute(
+            f"""
+            SELECT distinct_id, version FROM ({self.CH_DISTINCT_IDS.format(distinct_id_condition="")})
+            WHERE {condition}
+            """,
+            {"team_id": self.team_id, **params},
+        )
+        ch_distinct_id_to_version = {row[0]: row[1] for row in rows}
+
+        person_distinct_ids = PersonDistinctId.objects.filter(
+            team_id=self.team_id, person__uuid__gte=uuid_range.lower_uuid
+        )
+        if uuid_range.upper_uuid is not None:
+            person_distinct_ids = person_distinct_ids.filter(person__uuid__lt=uuid_range.upper_uuid)
+        person_distinct_ids = person_distinct_ids.values_list("distinct_id", "version", "person__uuid")
+
+        # The distinct ID may point to a person in another range in ClickHouse, check its version there
+        missing_in_range: list[tuple[str, int, UUID]] = []
+        for distinct_id, version, person_uuid in person_distinct_ids.iterator(chunk_size=self.chunk_size):
+            self.stats.rows_compared += 1
+            if distinct_id in ch_distinct_id_to_version:
+                self._compare(distinct_id, version or 0, person_uuid, ch_distinct_id_to_version.pop(distinct_id))
+            else:
+                missing_in_range.append((distinct_id, version or 0, person_uuid))
+
+        for chunk in _chunks(missing_in_range, self.chunk_size):
+            ch_versions = self._ch_versions([distinct_id for distinct_id, _, _ in chunk])
+            for distinct_id, pg_version, person_uuid in chunk:
+                self._compare(distinct_id, pg_version, person_uuid, ch_versions.get(distinct_id))
+
+        if self.deletes and ch_distinct_id_to_version:
+            # The distinct ID may have moved to a person in another range in Postgres, only delete if it's gone
+            remaining = list(ch_distinct_id_to_version.keys())
+            for chunk in _chunks(remaining, self.chunk_size):
+                in_postgres = set(
+                    PersonDistinctId.objects.filter(team_id=self.team_id, distinct_id__in=chunk).values_list(
+                        "distinct_id", flat=True
+                    )
+                )
+                for distinct_id in chunk:
+                    if distinct_id not in in_postgres:
+                        logger.info(f"Deleting distinct ID {distinct_id}")
+                        self.stats.deletes += 1
+                        self.queue_correction(
+                            {
+                                "delete": True,
+                                "distinct_id": distinct_id,
+                                "version": ch_distinct_id_to_version[distinct_id],
+                            }
+                        )
+
+    def _compare(self, distinct_id: str, pg_version: int, person_uuid: UUID, ch_version: Optional[int]) -> None:
+        if ch_version is None or ch_version < pg_version:
+            logger.info(f"Updating {distinct_id} to version {pg_version}")
+            self.stats.updates += 1
+            self.queue_correction({"distinct_id": distinct_id, "person_id": str(person_uuid), "version": pg_version})
+        elif ch_version > pg_version:
+            # This could be happening due to person deletions - check out fix_person_distinct_ids_after_delete management cmd.
+            # Ignoring here to be safe.
+            logger.info(
+                f"Clickhouse version ({ch_version}) for '{distinct_id}' is higher than in Postgres ({pg_version}). Ignoring."
+            )
+
+    def apply_correction(self, correction: dict) -> None:
+        if correction.get("delete"):
+            _delete_ch_distinct_id(
+                self.team_id, UUID(int=0), correction["distinct_id"], correction["version"], sync=self.sync
+            )
+        else:
+            create_person_distinct_id(
+                team_id=self.team_id,
+                distinct_id=correction["distinct_id"],
+                person_id=correction["person_id"],
+                version=correction["version"],
+                is_deleted=False,
+                sync=self.sync,
+            )
@@ -1,5 +1,15 @@
+from collections.abc import Iterable
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from itertools import islice
+from typing import Optional
+from uuid import uuid4
+
 from django.contrib.postgres.indexes import GinIndex
-from django.db import models
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.db.models.expressions import F
 from django.db.models.functions import Coalesce
 
@@ -109,3 +119,108 @@ class PropertyDefinition(UUIDModel):
     # This is a dynamically calculated field in api/property_definition.py. Defaults to `True` here to help serializers.
     def is_seen_on_filtered_events(self) -> None:
         return None
+
+
+# The plugin server creates definitions straight in Postgres without going through Django signals, so cached maps also
+# expire on their own. New definitions of an existing name are rare, so a few minutes of staleness is fine.
+PROPERTY_TYPE_MAP_TTL = 5 * 60
+
+
+@dataclass(frozen=True)
+class PropertyTypeMap:
+    """All property definitions of a team, keyed by (definition type, group type index) and then by property name."""
+
+    definitions: dict[tuple[int, Optional[int]], dict[str, Optional[str]]]
+
+    def get(self, type: int, name: str, group_type_index: Optional[int] = None) -> Optional[str]:
+        return self.definitions.get((type, group_type_index), {}).get(name)
+
+    def types_of(self, type: int, names: Iterable[str], group_type_index: Optional[int] = None) -> dict[str, str]:
+        """Property types of those of `names` that have a known type."""
+        definitions = self.definitions.get((type, group_type_index), {})
+        return {name: property_type for name in names if (property_type := definitions.get(name))}
+
+    def search(self, type: int, term: str, limit: Optional[int] = None) -> list[tuple[str, Optional[str]]]:
+        """Definitions of `type` (across all group types) whose name contains `term`, sorted by name."""
+        definitions = self._sorted_definitions.get(type, [])
+        if not term:
+            return definitions[:limit]
+        return list(islice((definition for definition in definitions if term in definition[0]), limit))
+
+    @cached_property
+    def _sorted_definitions(self) -> dict[int, list[tuple[str, Optional[str]]]]:
+        # Sorted once per map, as autocomplete searches the same map on every keystroke
+        sorted_definitions: dict[int, list[tuple[str, Optional[str]]]] = {}
+        for (definition_type, _), definitions in self.definitions.items():
+            sorted_definitions.setdefault(definition_type, []).extend(definitions.items())
+        for definitions in sorted_definitions.values():
+            definitions.sort(key=lambda definition: definition[0])
+        return sorted_definitions
+
+
+def get_property_type_map(team_id: int) -> PropertyTypeMap:
+    """
+    Return every property definition of the team, loaded with a single query and shared through the cache.
+
+    The map is stored under a per-team version, which is bumped whenever a definition is saved or deleted through Django.
+    """
+    try:
+        version = cache.get(_property_type_map_version_key(team_id))
+        if version is None:
+            cache.add(_property_type_map_version_key(team_id), uuid4().hex, PROPERTY_TYPE_MAP_TTL)
+            version = cache.get(_property_type_map_version_key(team_id))
+    except Exception:
+        # redis is unavailable
+        return _load_property_type_map(team_id)
+    if version is None:
+        return _load_property_type_map(team_id)
+    return _get_versioned_property_type_map(team_id, version)
+
+
+@lru_cache(maxsize=256)
+def _get_versioned_property_type_map(team_id: int, version: str) -> PropertyTypeMap:
+    key = f"property_type_map:{team_id}:{version}"
+    try:
+        definitions = cache.get(key)
+    except Exception:
+        definitions = None
+    if definitions is not None:
+        return PropertyTypeMap(definitions=definitions)
+
+    property_type_map = _load_property_type_map(team_id)
+    try:
+        cache.set(key, property_type_map.definitions, PROPERTY_TYPE_MAP_TTL)
+    except Exception:
+        pass
+    return property_type_map
+
+
+def _load_property_type_map(team_id: int) -> PropertyTypeMap:
+    definitions: dict[tuple[int, Optional[int]], dict[str, Optional[str]]] = {}
+    for type, group_type_index, name, property_type in PropertyDefinition.objects.filter(team_id=team_id).values_list(
+        "type", "group_type_index", "name", "property_type"
+    ):
+        # :TRICKY: Historical event definitions may have no type
+        type = type if type is not None else PropertyDefinition.Type.EVENT
+        names = definitions.setdefault((type, group_type_index), {})
+        names[name] = names.get(name) or property_type
+    return PropertyTypeMap(definitions=definitions)
+
+
+def invalidate_property_type_map(team_id: int) -> None:
+    try:
+        cache.set(_property_type_map_version_key(team_id), uuid4().hex, PROPERTY_TYPE_MAP_TTL)
+    except Exception:
+        # redis is unavailable, cached maps expire on their own
+        pass
+
+
+def _property_type_map_version_key(team_id: int) -> str:
+    return f"property_type_map_version:{team_id}"
+
+
+@receiver([post_save, post_delete], sender=PropertyDefinition)
+def property_definition_changed(sender, instance: PropertyDefinition, **kwargs):
+    invalidate_property_type_map(instance.team_id)
+    # Readers running alongside this transaction may have cached the old definitions under the new version
+    transaction.on_commit(lambda: invalidate_property_type_map(instance.team_id))
@@ -0,0 +1,110 @@
+import dataclasses
+from typing import Any
+from uuid import uuid4
+
+from posthog.models.action import Action
+from posthog.models.action.matching import get_action_matcher
+from posthog.models.element import elements_to_string
+from posthog.models.test.test_event_model import filter_by_actions_factory
+from posthog.test.base import BaseTest
+
+# Events and persons of the current test, matched in-process instead of being written to ClickHouse
+_events: list[dict[str, Any]] = []
+_person_properties: dict[tuple[int, str], dict[str, Any]] = {}
+
+
+@dataclasses.dataclass
+class MockEvent:
+    uuid: str
+    distinct_id: str
+
+
+def _create_event(**kwargs) -> str:
+    event_uuid = str(uuid4())
+    _events.append(
+        {
+            "uuid": event_uuid,
+            "team_id": kwargs["team"].pk,
+            "distinct_id": kwargs["distinct_id"],
+            "event": kwargs["event"],
+            "properties": kwargs.get("properties") or {},
+            "elements_chain": elements_to_string(kwargs["elements"]) if kwargs.get("elements") else "",
+        }
+    )
+    return event_uuid
+
+
+def _create_person(**kwargs) -> None:
+    for distinct_id in kwargs["distinct_ids"]:
+        _person_properties[(kwargs["team"].pk, distinct_id)] = kwargs.get("properties") or {}
+
+
+def _get_events_for_action(action: Action) -> list[MockEvent]:
+    team_events = [
+        {**event, "person": {"properties": _person_properties.get((event["team_id"], event["distinct_id"]), {})}}
+        for event in reversed(_events)  # Latest first, like the query
+        if event["team_id"] == action.team_id
+    ]
+    matches = get_action_matcher(action.team).match_actions(team_events)
+    return [
+        MockEvent(event["uuid"], event["distinct_id"])
+        for event, action_ids in zip(team_events, matches)
+        if action.pk in action_ids
+    ]
+
+
+class TestActionMatching(filter_by_actions_factory(_create_event, _create_person, _get_events_for_action)):  # type: ignore
+    def setUp(self):
+        super().setUp()
+        _events.clear()
+        _person_properties.clear()
+
+
+class TestActionMatcher(BaseTest):
+    def test_events_are_matched_against_all_actions(self):
+        pageview = Action.objects.create(team=self.team, steps_json=[{"event": "$pageview", "url": "/pricing"}])
+        signup = Action.objects.create(
+            team=self.team,
+            steps_json=[
+                {"event": "signed up", "properties": [{"key": "plan", "value": "paid", "type": "event"}]},
+                {"event": "$pageview", "url": "^https://example.com/welcome$", "url_matching": "regex"},
+            ],
+        )
+        any_event = Action.objects.create(
+            team=self.team, steps_json=[{"properties": [{"key": "$browser", "value": "Chrome", "type": "event"}]}]
+        )
+        Action.objects.create(team=self.team, steps_json=[{"event": "$pageview"}], deleted=True)
+
+        matches = get_action_matcher(self.team).match_actions(
+            [
+                {"event": "$pageview", "properties": {"$current_url": "https://example.com/pricing"}},
+                {"event": "$pageview", "properties": {"$current_url": "https://example.com/welcome"}},
+                {"event": "signed up", "properties": {"plan": "paid", "$browser": "Chrome"}},
+                {"event": "signed up", "properties": {"plan": "free"}},
+                {"event": "$pageleave"},
+            ]
+        )
+
+        assert matches == [[pageview.pk], [signup.pk], sorted([signup.pk, any_event.pk]), [], []]
+
+    def test_matcher_is_reloaded_when_actions_change(self):
+        action = Action.objects.create(team=self.team, steps_json=[{"event": "$pageview"}])
+        matcher = get_action_matcher(self.team)
+        assert get_action_matcher(self.team) is matcher
+
+        action.steps = [{"event": "$pageleave"}]
+        action.save()
+
+        updated_matcher = get_action_matcher(self.team)
+        assert updated_matcher is not matcher
+        assert updated_matcher.match_actions([{"event": "$pageview"}, {"event": "$pageleave"}]) == [[], [action.pk]]
+
+    def test_get_action(self):
+        action = Action.objects.create(team=self.team, name="Deleted", deleted=True)
+        other_team_action = Action.objects.create(team=self.organization.teams.create(), name="Other team")
+
+        matcher = get_action_matcher(self.team)
+
+        assert matcher.get_action(action.pk).name == "Deleted"
+        with self.assertRaises(Action.DoesNotExist):
+            matcher.get_action(other_team_action.pk)
@@ -0,0 +1,390 @@
+"""
+Compact per-person activity summaries, kept up to date by a periodic task, so that the person page doesn't have to scan
+months of a highly active person's events every time it's opened.
+
+A summary covers a bounded window of the person's events. It holds their first and last seen timestamps, the cohorts
+they're in, and their events as segments: consecutive events within one hour that share the same person properties.
+Segments store only the properties that changed since the previous segment. Hourly segments are enough to answer a
+properties timeline for any date range aligned to whole hours, by merging segments whose relevant properties are equal.
+
+Only persons whose page has been opened recently are summarised. The first time a page is opened, it falls back to the
+raw queries and the person starts being tracked. Reads add the events since the last update with a query over that
+short tail, and requests reaching before the summarised window still use the raw queries.
+"""
+
+import json
+from collections.abc import Iterator
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from typing import Any, Optional
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+from django.utils.timezone import now
+
+from posthog.clickhouse.client import sync_execute
+from posthog.clickhouse.client.connection import Workload
+from posthog.models.cohort.util import get_all_cohort_ids_by_person_uuids
+from posthog.models.filters.properties_timeline_filter import PropertiesTimelineFilter
+from posthog.models.team.team import Team
+from posthog.queries.properties_timeline.properties_timeline import (
+    PropertiesTimeline,
+    PropertiesTimelinePoint,
+    PropertiesTimelineResult,
+)
+from posthog.queries.query_date_range import QueryDateRange
+from posthog.redis import get_client
+
+PERSON_ACTIVITY_KEY_PREFIX = "person_activity_summary"
+PERSON_ACTIVITY_TRACKED_KEY = f"{PERSON_ACTIVITY_KEY_PREFIX}_tracked"
+
+# How far back a summary reaches
+PERSON_ACTIVITY_HISTORY = timedelta(days=90)
+# Persons whose page hasn't been opened for this long stop being summarised
+PERSON_ACTIVITY_TRACKING_PERIOD = timedelta(days=7)
+PERSON_ACTIVITY_MAX_TRACKED_PERSONS = 20_000
+# Bounds the size of a summary: the oldest hours are dropped beyond this many segments
+PERSON_ACTIVITY_MAX_SEGMENTS = 2_000
+
+PERSON_ACTIVITY_SEGMENTS_SQL = """
+SELECT
+    person_id,
+    min(timestamp) AS first_timestamp,
+    max(timestamp) AS last_timestamp,
+    argMin(actor_properties, timestamp) AS segment_properties,
+    count() AS event_count
+FROM (
+    SELECT
+        person_id,
+        timestamp,
+        actor_properties,
+        sum(is_segment_start) OVER (PARTITION BY person_id ORDER BY timestamp ASC ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW) AS segment
+    FROM (
+        SELECT
+            person_id,
+            timestamp,
+            person_properties AS actor_properties,
+            (row_number() OVER w) = 1
+                OR actor_properties != (lagInFrame(actor_properties) OVER w)
+                OR toStartOfHour(timestamp) != (lagInFrame(toStartOfHour(timestamp)) OVER w) AS is_segment_start
+        FROM events
+        WHERE team_id = %(team_id)s
+          AND person_id IN %(person_ids)s
+          AND timestamp >= %(date_from)s
+          AND timestamp < %(date_to)s
+        WINDOW w AS (PARTITION BY person_id ORDER BY timestamp ASC ROWS BETWEEN 1 PRECEDING AND CURRENT ROW)
+    )
+)
+GROUP BY person_id, segment
+ORDER BY person_id, first_timestamp
+"""
+
+
+@dataclass
+class ActivitySegment:
+    """Consecutive events of a person within one hour that share the same person properties."""
+
+    first_timestamp: datetime
+    last_timestamp: datetime
+    event_count: int
+    # Properties that changed since the previous segment, which for the first segment is all of them
+    changed: dict[str, Any] = field(default_factory=dict)
+    removed: list[str] = field(default_factory=list)
+
+
+@dataclass
+class PersonActivitySummary:
+    # Events in [covered_from, covered_to) are summarised, both are whole hours
+    covered_from: datetime
+    covered_to: datetime
+    first_seen: Optional[datetime] = None
+    last_seen: Optional[datetime] = None
+    segments: list[ActivitySegment] = field(default_factory=list)
+    cohort_ids: list[int] = field(default_factory=list)
+
+    @property
+    def event_count(self) -> int:
+        return sum(segment.event_count for segment in self.segments)
+
+    def replay(self) -> Iterator[tuple[ActivitySegment, dict[str, Any]]]:
+        """Each segment with the person properties of its events. Segments without changes share the same dict."""
+        properties: dict[str, Any] = {}
+        for segment in self.segments:
+            if segment.changed or segment.removed:
+                properties = {**properties, **segment.changed}
+                for key in segment.removed:
+                    properties.pop(key, None)
+            yield segment, properties
+
+    def extend(self, rows: list[tuple[datetime, datetime, str, int]], covered_to: datetime) -> None:
+        """Append segments of events from `covered_to` of the summary onwards, ordered by time."""
+        states = list(self.replay())
+        properties = states[-1][1] if states else {}
+
+        for first_timestamp, last_timestamp, raw_properties, event_count in rows:
+            if first_timestamp < self.covered_to:
+                continue
+            segment_properties = json.loads(raw_properties) if raw_properties else {}
+            changed, removed = _diff(properties, segment_properties)
+            self.segments.append(
+                ActivitySegment(
+                    first_timestamp=first_timestamp,
+                    last_timestamp=last_timestamp,
+                    event_count=event_count,
+                    changed=changed,
+                    removed=removed,
+                )
+            )
+            properties = segment_properties
+            self.first_seen = min(self.first_seen or first_timestamp, first_timestamp)
+            self.last_seen = max(self.last_seen or last_timestamp, last_timestamp)
+
+        self.covered_to = max(self.covered_to, covered_to)
+
+    def trim(self, covered_from: datetime, max_segments: int = PERSON_ACTIVITY_MAX_SEGMENTS) -> None:
+        """Drop the hours before `covered_from`, and then the oldest hours until at most `max_segments` are left."""
+        states = list(self.replay())
+        start = 0
+        while start < len(states) and states[start][0].first_timestamp < covered_from:
+            start += 1
+        while len(states) - start > max_segments:
+            # Whole hours at a time, so that every hour in the window stays complete
+            covered_from = _start_of_hour(states[start][0].first_timestamp) + timedelta(hours=1)
+            while start < len(states) and states[start][0].first_timestamp < covered_from:
+                start += 1
+        if start == 0:
+            self.covered_from = max(self.covered_from, covered_from)
+            return
+
+        self.segments = [segment for segment, _ in states[start:]]
+        if self.segments:
+            first_segment, properties = states[start]
+            first_segment.changed, first_segment.removed = dict(properties), []
+        self.covered_from = max(self.covered_from, covered_from)
+
+    def with_recent_activity(self, team_id: int, person_uuid: str) -> "PersonActivitySummary":
+        """A copy of the summary that also covers the events since its last update."""
+        recent = replace(self, segments=list(self.segments))
+        covered_to = _start_of_hour(now()) + timedelta(hours=1)
+        rows = _segment_rows(team_id, [person_uuid], self.covered_to, covered_to)
+        recent.extend(rows.get(person_uuid, []), covered_to)
+        return recent
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "covered_from": self.covered_from.isoformat(),
+                "covered_to": self.covered_to.isoformat(),
+                "first_seen": self.first_seen.isoformat() if self.first_seen else None,
+                "last_seen": self.last_seen.isoformat() if self.last_seen else None,
+                "segments": [
+                    [
+                        segment.first_timestamp.isoformat(),
+                        segment.last_timestamp.isoformat(),
+                        segment.event_count,
+                        segment.changed,
+                        segment.removed,
+                    ]
+                    for segment in self.segments
+                ],
+                "cohort_ids": self.cohort_ids,
+            },
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def from_json(cls, data: str | bytes) -> "PersonActivitySummary":
+        summary = json.loads(data)
+        return cls(
+            covered_from=datetime.fromisoformat(summary["covered_from"]),
+            covered_to=datetime.fromisoformat(summary["covered_to"]),
+            first_seen=datetime.fromisoformat(summary["first_seen"]) if summary["first_seen"] else None,
+            last_seen=datetime.fromisoformat(summary["last_seen"]) if summary["last_seen"] else None,
+            segments=[
+                ActivitySegment(
+                    first_timestamp=datetime.fromisoformat(first_timestamp),
+                    last_timestamp=datetime.fromisoformat(last_timestamp),
+                    event_count=event_count,
+                    changed=changed,
+                    removed=removed,
+                )
+                for first_timestamp, last_timestamp, event_count, changed, removed in summary["segments"]
+            ],
+            cohort_ids=summary["cohort_ids"],
+        )
+
+
+def load_person_activity_summary(team_id: int, person_uuid: UUID | str) -> Optional[PersonActivitySummary]:
+    """The stored summary of the person, if there's one yet. Either way, the person is kept summarised from now on."""
+    client = get_client()
+    client.zadd(PERSON_ACTIVITY_TRACKED_KEY, {_tracked_member(team_id, str(person_uuid)): now().timestamp()})
+    data = client.get(person_activity_key(team_id, str(person_uuid)))
+    return PersonActivitySummary.from_json(data) if data else None
+
+
+def build_person_activity_summary(team_id: int, person_uuid: UUID | str) -> PersonActivitySummary:
+    """Summarise the person from their raw events and store it, for when there's no summary yet."""
+    summaries = _build_summaries(team_id, [str(person_uuid)], _start_of_hour(now()))
+    get_client().set(
+        person_activity_key(team_id, str(person_uuid)),
+        summaries[str(person_uuid)].to_json(),
+        ex=PERSON_ACTIVITY_TRACKING_PERIOD,
+    )
+    return summaries[str(person_uuid)]
+
+
+def update_person_activity_summaries() -> None:
+    """Extend the summaries of all recently viewed persons up to the start of the current hour."""
+    current_time = now()
+    covered_to = _start_of_hour(current_time)
+
+    client = get_client()
+    client.zremrangebyscore(
+        PERSON_ACTIVITY_TRACKED_KEY, "-inf", (current_time - PERSON_ACTIVITY_TRACKING_PERIOD).timestamp()
+    )
+    client.zremrangebyrank(PERSON_ACTIVITY_TRACKED_KEY, 0, -PERSON_ACTIVITY_MAX_TRACKED_PERSONS - 1)
+
+    person_uuids_by_team: dict[int, list[str]] = {}
+    for member in client.zrange(PERSON_ACTIVITY_TRACKED_KEY, 0, -1):
+        team_id, person_uuid = member.decode().split(":")
+        person_uuids_by_team.setdefault(int(team_id), []).append(person_uuid)
+
+    for team_id, person_uuids in person_uuids_by_team.items():
+        summaries = _build_summaries(team_id, person_uuids, covered_to)
+        pipeline = client.pipeline(transaction=False)
+        for person_uuid, summary in summaries.items():
+            pipeline.set(
+                person_activity_key(team_id, person_uuid), summary.to_json(), ex=PERSON_ACTIVITY_TRACKING_PERIOD
+            )
+        pipeline.execute()
+
+
+def properties_timeline_from_activity_summary(
+    filter: PropertiesTimelineFilter, team: Team, person_uuid: UUID | str
+) -> Optional[PropertiesTimelineResult]:
+    """
+    The properties timeline of the person, built from their activity summary.
+
+    Returns None when the summary can't answer the same as `PropertiesTimeline`: if there's no summary yet, if only some
+    events are relevant, or if the date range reaches before the summary or doesn't consist of whole hours.
+    """
+    if filter.entities or filter.aggregation_group_type_index is not None or filter._date_from == "all":
+        return None
+
+    timeline = PropertiesTimeline()
+    filter = timeline.adjust_filter(filter, team)
+    query_date_range = QueryDateRange(filter, team)
+    team_timezone = ZoneInfo(team.timezone)
+    effective_date_from = query_date_range.date_from_param.replace(tzinfo=team_timezone)
+    effective_date_to = query_date_range.date_to_param.replace(tzinfo=team_timezone)
+    # The timeline query compares timestamps with `date_to` truncated to the second
+    date_to = effective_date_to.replace(microsecond=0) + timedelta(seconds=1)
+    if _start_of_hour(effective_date_from) != effective_date_from or _start_of_hour(date_to) != date_to:
+        return None
+
+    summary = load_person_activity_summary(team.pk, person_uuid)
+    if summary is None or effective_date_from < summary.covered_from:
+        return None
+    if date_to > summary.covered_to:
+        summary = summary.with_recent_activity(team.pk, str(person_uuid))
+
+    crucial_property_keys = sorted(timeline.extract_crucial_property_keys(filter))
+    points: list[PropertiesTimelinePoint] = []
+    previous_values: Optional[list[str]] = None
+    for segment, properties in summary.replay():
+        if not effective_date_from <= segment.first_timestamp < date_to:
+            continue
+        values = [_comparable_value(properties.get(key)) for key in crucial_property_keys]
+        if points and values == previous_values:
+            points[-1]["relevant_event_count"] += segment.event_count
+        else:
+            points.append(
+                PropertiesTimelinePoint(
+                    timestamp=segment.first_timestamp,
+                    properties=properties,
+                    relevant_event_count=segment.event_count,
+                )
+            )
+            previous_values = values
+
+    return PropertiesTimelineResult(
+        points=points,
+        crucial_property_keys=crucial_property_keys,
+        effective_date_from=effective_date_from.isoformat(),
+        effective_date_to=effective_date_to.isoformat(),
+    )
+
+
+def person_activity_key(team_id: int, person_uuid: str) -> str:
+    return f"{PERSON_ACTIVITY_KEY_PREFIX}:{team_id}:{person_uuid}"
+
+
+def _build_summaries(team_id: int, person_uuids: list[str], covered_to: datetime) -> dict[str, PersonActivitySummary]:
+    """Bring the stored summaries of the persons up to `covered_to`, starting new ones for persons without one."""
+    client = get_client()
+    covered_from = covered_to - PERSON_ACTIVITY_HISTORY
+    summaries: dict[str, PersonActivitySummary] = {}
+    for person_uuid, data in zip(
+        person_uuids, client.mget([person_activity_key(team_id, person_uuid) for person_uuid in person_uuids])
+    ):
+        summary = PersonActivitySummary.from_json(data) if data else None
+        if summary is None or summary.covered_to <= covered_from:
+            summary = PersonActivitySummary(covered_from=covered_from, covered_to=covered_from)
+        summaries[person_uuid] = summary
+
+    # New summaries need the whole history, others only what happened since their last update
+    new_person_uuids = [uuid for uuid, summary in summaries.items() if summary.covered_to == covered_from]
+    stale_summaries = {
+        uuid: summary for uuid, summary in summaries.items() if covered_from < summary.covered_to < covered_to
+    }
+    rows: dict[str, list[tuple[datetime, datetime, str, int]]] = {}
+    if new_person_uuids:
+        rows.update(_segment_rows(team_id, new_person_uuids, covered_from, covered_to))
+    if stale_summaries:
+        since = max(min(summary.covered_to for summary in stale_summaries.values()), covered_from)
+        rows.update(_segment_rows(team_id, list(stale_summaries.keys()), since, covered_to))
+
+    cohort_ids = get_all_cohort_ids_by_person_uuids(person_uuids, team_id)
+    for person_uuid, summary in summaries.items():
+        summary.extend(rows.get(person_uuid, []), covered_to)
+        summary.trim(covered_from)
+        summary.cohort_ids = cohort_ids.get(person_uuid, [])
+    return summaries
+
+
+def _segment_rows(
+    team_id: int, person_uuids: list[str], date_from: datetime, date_to: datetime
+) -> dict[str, list[tuple[datetime, datetime, str, int]]]:
+    rows = sync_execute(
+        PERSON_ACTIVITY_SEGMENTS_SQL,
+        {
+            "team_id": team_id,
+            "person_ids": person_uuids,
+            "date_from": date_from.strftime("%Y-%m-%d %H:%M:%S"),
+            "date_to": date_to.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        workload=Workload.OFFLINE,
+    )
+    rows_by_person: dict[str, list[tuple[datetime, datetime, str, int]]] = {}
+    for person_id, first_timestamp, last_timestamp, properties, event_count in rows:
+        rows_by_person.setdefault(str(person_id), []).append((first_timestamp, last_timestamp, properties, event_count))
+    return rows_by_person
+
+
+def _diff(previous: dict[str, Any], current: dict[str, Any]) -> tuple[dict[str, Any], list[str]]:
+    changed = {key: value for key, value in current.items() if key not in previous or previous[key] != value}
+    removed = [key for key in previous if key not in current]
+    return changed, removed
+
+
+def _comparable_value(value: Any) -> str:
+    # Like the timeline query, which compares JSON values with the quotes of strings trimmed
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def _start_of_hour(timestamp: datetime) -> datetime:
+    return timestamp.astimezone(ZoneInfo("UTC")).replace(minute=0, second=0, microsecond=0)
+
+
+def _tracked_member(team_id: int, person_uuid: str) -> str:
+    return f"{team_id}:{person_uuid}"
@@ -17,7 +17,7 @@ from .properties_timeline_event_query import PropertiesTimelineEventQuery
 
 
 class PropertiesTimelinePoint(TypedDict):
-    timestamp: str
+    timestamp: datetime.datetime
     properties: dict[str, Any]
     relevant_event_count: int
 
@@ -82,9 +82,7 @@ class PropertiesTimeline:
 
         return crucial_property_keys
 
-    def run(
-        self, filter: PropertiesTimelineFilter, team: Team, actor: Union[Person, Group]
-    ) -> PropertiesTimelineResult:
+    def adjust_filter(self, filter: PropertiesTimelineFilter, team: Team) -> PropertiesTimelineFilter:
         if filter._date_from is not None and filter._date_to is not None and filter._date_from == filter._date_to:
             # Search for `offset_time_series_date_by_interval` in the `TrendsActors` class for context on this handling
             filter = filter.shallow_clone(
@@ -96,6 +94,12 @@ class PropertiesTimeline:
                     )
                 }
             )
+        return filter
+
+    def run(
+        self, filter: PropertiesTimelineFilter, team: Team, actor: Union[Person, Group]
+    ) -> PropertiesTimelineResult:
+        filter = self.adjust_filter(filter, team)
 
         event_query = PropertiesTimelineEventQuery(
             filter=filter,
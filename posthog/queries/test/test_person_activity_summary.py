@@ -0,0 +1,172 @@
+import json
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from django.test import SimpleTestCase
+from freezegun import freeze_time
+
+from posthog.models.cohort.util import get_all_cohort_ids_by_person_uuid
+from posthog.models.filters.properties_timeline_filter import PropertiesTimelineFilter
+from posthog.queries.person_activity_summary import (
+    PERSON_ACTIVITY_TRACKED_KEY,
+    PersonActivitySummary,
+    load_person_activity_summary,
+    person_activity_key,
+    properties_timeline_from_activity_summary,
+    update_person_activity_summaries,
+)
+from posthog.queries.properties_timeline import PropertiesTimeline
+from posthog.redis import get_client
+from posthog.test.base import APIBaseTest, ClickhouseTestMixin, _create_event, _create_person, flush_persons_and_events
+
+UTC_ZONE = ZoneInfo("UTC")
+
+
+def _hour(day: int, hour: int, minute: int = 0) -> datetime:
+    return datetime(2024, 1, day, hour, minute, tzinfo=UTC_ZONE)
+
+
+class TestPersonActivitySummary(SimpleTestCase):
+    def _summary(self) -> PersonActivitySummary:
+        summary = PersonActivitySummary(covered_from=_hour(1, 0), covered_to=_hour(1, 0))
+        summary.extend(
+            [
+                (_hour(1, 0, 5), _hour(1, 0, 10), json.dumps({"plan": "free", "email": "a@b.c"}), 3),
+                (_hour(1, 0, 20), _hour(1, 0, 30), json.dumps({"plan": "paid", "email": "a@b.c"}), 2),
+                (_hour(1, 1, 5), _hour(1, 1, 6), json.dumps({"plan": "paid", "email": "a@b.c"}), 4),
+                (_hour(1, 3, 0), _hour(1, 3, 1), json.dumps({"plan": "paid"}), 1),
+            ],
+            _hour(1, 5),
+        )
+        return summary
+
+    def test_segments_store_only_changed_properties(self):
+        summary = self._summary()
+
+        assert [(segment.changed, segment.removed) for segment in summary.segments] == [
+            ({"plan": "free", "email": "a@b.c"}, []),
+            ({"plan": "paid"}, []),
+            ({}, []),
+            ({}, ["email"]),
+        ]
+        assert [properties for _, properties in summary.replay()] == [
+            {"plan": "free", "email": "a@b.c"},
+            {"plan": "paid", "email": "a@b.c"},
+            {"plan": "paid", "email": "a@b.c"},
+            {"plan": "paid"},
+        ]
+        assert (summary.first_seen, summary.last_seen, summary.event_count) == (_hour(1, 0, 5), _hour(1, 3, 1), 10)
+        assert summary.covered_to == _hour(1, 5)
+        assert PersonActivitySummary.from_json(summary.to_json()) == summary
+
+    def test_extending_skips_segments_already_covered(self):
+        summary = self._summary()
+
+        summary.extend(
+            [
+                (_hour(1, 4, 0), _hour(1, 4, 1), json.dumps({"plan": "paid"}), 7),
+                (_hour(1, 5, 0), _hour(1, 5, 1), json.dumps({"plan": "free"}), 1),
+            ],
+            _hour(1, 6),
+        )
+
+        assert len(summary.segments) == 5
+        assert summary.segments[-1].changed == {"plan": "free"}
+        assert summary.covered_to == _hour(1, 6)
+
+    def test_trimming_drops_whole_hours_and_keeps_properties(self):
+        summary = self._summary()
+
+        summary.trim(_hour(1, 0), max_segments=2)
+
+        assert summary.covered_from == _hour(1, 1)
+        assert [(segment.changed, segment.removed) for segment in summary.segments] == [
+            ({"plan": "paid", "email": "a@b.c"}, []),
+            ({}, ["email"]),
+        ]
+        assert summary.first_seen == _hour(1, 0, 5)
+
+
+class TestPersonActivitySummaryQueries(ClickhouseTestMixin, APIBaseTest):
+    def setUp(self):
+        super().setUp()
+        self.person = _create_person(team=self.team, distinct_ids=["abcd"], properties={"plan": "paid"})
+        for timestamp, properties in [
+            ("2024-01-01T10:05:00Z", {"plan": "free", "email": "a@b.c"}),
+            ("2024-01-01T10:20:00Z", {"plan": "free", "email": "a@b.c"}),
+            ("2024-01-01T10:40:00Z", {"plan": "paid", "email": "a@b.c"}),
+            ("2024-01-01T13:00:00Z", {"plan": "paid", "email": "a@b.c"}),
+            ("2024-01-02T09:00:00Z", {"plan": "paid"}),
+            ("2024-01-03T08:30:00Z", {"plan": "enterprise"}),
+        ]:
+            _create_event(
+                team=self.team,
+                event="$pageview",
+                distinct_id="abcd",
+                timestamp=timestamp,
+                person_id=self.person.uuid,
+                person_properties=properties,
+            )
+        flush_persons_and_events()
+
+    def tearDown(self):
+        get_client().delete(PERSON_ACTIVITY_TRACKED_KEY, person_activity_key(self.team.pk, str(self.person.uuid)))
+        super().tearDown()
+
+    def _timelines(self, data: dict) -> tuple:
+        filter = PropertiesTimelineFilter(data=data, team=self.team)
+        return (
+            properties_timeline_from_activity_summary(filter, self.team, self.person.uuid),
+            PropertiesTimeline().run(filter, self.team, self.person),
+        )
+
+    @freeze_time("2024-01-03T08:45:00Z")
+    def test_timeline_from_summary_matches_timeline_query(self):
+        assert load_person_activity_summary(self.team.pk, self.person.uuid) is None
+
+        update_person_activity_summaries()
+
+        summary = load_person_activity_summary(self.team.pk, self.person.uuid)
+        assert summary is not None
+        assert summary.event_count == 5  # The last event is after the start of the current hour
+        for data in [
+            {"date_from": "2024-01-01", "date_to": "2024-01-03"},
+            {"date_from": "2024-01-01", "date_to": "2024-01-02", "properties": [{"key": "plan", "type": "person"}]},
+            {"date_from": "2024-01-02", "date_to": "2024-01-03", "properties": [{"key": "email", "type": "person"}]},
+            {"date_from": "-2d", "properties": [{"key": "plan", "type": "person"}]},
+        ]:
+            from_summary, from_events = self._timelines(data)
+            assert from_summary == from_events
+
+    @freeze_time("2024-01-03T08:45:00Z")
+    def test_timeline_falls_back_to_query_when_summary_cant_answer(self):
+        load_person_activity_summary(self.team.pk, self.person.uuid)
+        update_person_activity_summaries()
+
+        for data in [
+            {"date_from": "2024-01-01", "events": [{"id": "$pageview"}]},
+            {"date_from": "2023-01-01"},
+            {"date_from": "all"},
+            {"date_from": "2024-01-01T10:30:00", "date_to": "2024-01-02", "explicit_date": True},
+        ]:
+            from_summary, _ = self._timelines(data)
+            assert from_summary is None
+
+    @freeze_time("2024-01-03T08:45:00Z")
+    def test_summary_holds_cohorts_and_recent_activity(self):
+        load_person_activity_summary(self.team.pk, self.person.uuid)
+        update_person_activity_summaries()
+
+        summary = load_person_activity_summary(self.team.pk, self.person.uuid)
+        assert summary is not None
+        assert summary.cohort_ids == get_all_cohort_ids_by_person_uuid(self.person.uuid, self.team.pk)
+
+        response = self.client.get(f"/api/person/{self.person.uuid}/activity_summary/").json()
+        assert response["first_seen"] == "2024-01-01T10:05:00Z"
+        assert response["last_seen"] == "2024-01-03T08:30:00Z"
+        assert response["event_count"] == 6
+        assert [change["changed"] for change in response["property_changes"]] == [
+            {"plan": "paid"},
+            {},
+            {"plan": "enterprise"},
+        ]
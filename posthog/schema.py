@@ -452,6 +452,28 @@ class HogQLNotice(BaseModel):
     start: Optional[int] = None
 
 
+class Admission(str, Enum):
+    run = "run"
+    queue = "queue"
+    sample = "sample"
+    reject = "reject"
+
+
+class HogQLQueryCost(BaseModel):
+    model_config = ConfigDict(
+        extra="forbid",
+    )
+    admission: Optional[Admission] = Field(default=None, description="What admission control did with the query")
+    breakdowns: int = Field(..., description="Number of properties the query groups by")
+    cost: float = Field(
+        ..., description="Estimated rows adjusted for joins and breakdowns, what admission rules compare against"
+    )
+    days: float = Field(..., description="Days of events the query reads")
+    estimatedRows: float = Field(..., description="Rows of events the query is estimated to read")
+    joinedTables: list[str] = Field(..., description="Tables the query joins events with")
+    sampleRate: float
+
+
 class InCohortVia(str, Enum):
     auto = "auto"
     leftjoin = "leftjoin"
@@ -489,6 +511,10 @@ class HogQLQueryModifiers(BaseModel):
     materializationMode: Optional[MaterializationMode] = None
     personsArgMaxVersion: Optional[PersonsArgMaxVersion] = None
     personsOnEventsMode: Optional[PersonsOnEventsMode] = None
+    useEventsRollups: Optional[bool] = Field(
+        default=None,
+        description="Answer eligible trends queries from the pre-aggregated events rollup instead of the events table",
+    )
 
 
 class Compare(str, Enum):
@@ -1069,6 +1095,10 @@ class Sampling(BaseModel):
     model_config = ConfigDict(
         extra="forbid",
     )
+    adaptive: Optional[bool] = Field(
+        default=None,
+        description="Pick the coarsest sample rate that keeps the error of the total within the configured bound",
+    )
     enabled: Optional[bool] = None
     forceSamplingRate: Optional[SamplingRate] = None
 
@@ -1172,6 +1202,9 @@ class ActorsQueryResponse(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    next_cursor: Optional[str] = Field(
+        default=None, description="Cursor for the next page, pass it as `cursor` to continue after the last row"
+    )
     offset: int
     results: list[list]
     timings: Optional[list[QueryTiming]] = Field(
@@ -1223,6 +1256,9 @@ class CachedActorsQueryResponse(BaseModel):
         default=None, description="Modifiers used when performing the query"
     )
     next_allowed_client_refresh: str
+    next_cursor: Optional[str] = Field(
+        default=None, description="Cursor for the next page, pass it as `cursor` to continue after the last row"
+    )
     offset: int
     results: list[list]
     timezone: str
@@ -1251,6 +1287,9 @@ class CachedEventsQueryResponse(BaseModel):
         default=None, description="Modifiers used when performing the query"
     )
     next_allowed_client_refresh: str
+    next_cursor: Optional[str] = Field(
+        default=None, description="Cursor for the next page, pass it as `cursor` to continue after the last row"
+    )
     offset: Optional[int] = None
     results: list[list]
     timezone: str
@@ -1538,6 +1577,9 @@ class Response(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    next_cursor: Optional[str] = Field(
+        default=None, description="Cursor for the next page, pass it as `cursor` to continue after the last row"
+    )
     offset: Optional[int] = None
     results: list[list]
     timings: Optional[list[QueryTiming]] = Field(
@@ -1562,6 +1604,9 @@ class Response1(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    next_cursor: Optional[str] = Field(
+        default=None, description="Cursor for the next page, pass it as `cursor` to continue after the last row"
+    )
     offset: int
     results: list[list]
     timings: Optional[list[QueryTiming]] = Field(
@@ -1713,6 +1758,9 @@ class EventsQueryResponse(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    next_cursor: Optional[str] = Field(
+        default=None, description="Cursor for the next page, pass it as `cursor` to continue after the last row"
+    )
     offset: Optional[int] = None
     results: list[list]
     timings: Optional[list[QueryTiming]] = Field(
@@ -1820,6 +1868,7 @@ class HogQLMetadataResponse(BaseModel):
     model_config = ConfigDict(
         extra="forbid",
     )
+    cost: Optional[HogQLQueryCost] = Field(default=None, description="Estimated cost of the select query")
     errors: list[HogQLNotice]
     inputExpr: Optional[str] = None
     inputSelect: Optional[str] = None
@@ -1845,6 +1894,9 @@ class HogQLQueryResponse(BaseModel):
     )
     clickhouse: Optional[str] = Field(default=None, description="Executed ClickHouse query")
     columns: Optional[list] = Field(default=None, description="Returned columns")
+    cost: Optional[HogQLQueryCost] = Field(
+        default=None, description="Estimated cost of the query, when admission rules apply or in debug mode"
+    )
     error: Optional[str] = Field(
         default=None,
         description="Query error. Returned only if 'explain' or `modifiers.debug` is true. Throws an error otherwise.",
@@ -1958,6 +2010,9 @@ class QueryResponseAlternative2(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    next_cursor: Optional[str] = Field(
+        default=None, description="Cursor for the next page, pass it as `cursor` to continue after the last row"
+    )
     offset: Optional[int] = None
     results: list[list]
     timings: Optional[list[QueryTiming]] = Field(
@@ -1982,6 +2037,9 @@ class QueryResponseAlternative3(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    next_cursor: Optional[str] = Field(
+        default=None, description="Cursor for the next page, pass it as `cursor` to continue after the last row"
+    )
     offset: int
     results: list[list]
     timings: Optional[list[QueryTiming]] = Field(
@@ -2015,6 +2073,9 @@ class QueryResponseAlternative6(BaseModel):
     )
     clickhouse: Optional[str] = Field(default=None, description="Executed ClickHouse query")
     columns: Optional[list] = Field(default=None, description="Returned columns")
+    cost: Optional[HogQLQueryCost] = Field(
+        default=None, description="Estimated cost of the query, when admission rules apply or in debug mode"
+    )
     error: Optional[str] = Field(
         default=None,
         description="Query error. Returned only if 'explain' or `modifiers.debug` is true. Throws an error otherwise.",
@@ -2126,6 +2187,9 @@ class QueryResponseAlternative12(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    next_cursor: Optional[str] = Field(
+        default=None, description="Cursor for the next page, pass it as `cursor` to continue after the last row"
+    )
     offset: Optional[int] = None
     results: list[list]
     timings: Optional[list[QueryTiming]] = Field(
@@ -2150,6 +2214,9 @@ class QueryResponseAlternative13(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    next_cursor: Optional[str] = Field(
+        default=None, description="Cursor for the next page, pass it as `cursor` to continue after the last row"
+    )
     offset: int
     results: list[list]
     timings: Optional[list[QueryTiming]] = Field(
@@ -2164,6 +2231,9 @@ class QueryResponseAlternative14(BaseModel):
     )
     clickhouse: Optional[str] = Field(default=None, description="Executed ClickHouse query")
     columns: Optional[list] = Field(default=None, description="Returned columns")
+    cost: Optional[HogQLQueryCost] = Field(
+        default=None, description="Estimated cost of the query, when admission rules apply or in debug mode"
+    )
     error: Optional[str] = Field(
         default=None,
         description="Query error. Returned only if 'explain' or `modifiers.debug` is true. Throws an error otherwise.",
@@ -2531,6 +2601,9 @@ class CachedHogQLQueryResponse(BaseModel):
     cache_key: str
     clickhouse: Optional[str] = Field(default=None, description="Executed ClickHouse query")
     columns: Optional[list] = Field(default=None, description="Returned columns")
+    cost: Optional[HogQLQueryCost] = Field(
+        default=None, description="Estimated cost of the query, when admission rules apply or in debug mode"
+    )
     error: Optional[str] = Field(
         default=None,
         description="Query error. Returned only if 'explain' or `modifiers.debug` is true. Throws an error otherwise.",
@@ -2611,6 +2684,9 @@ class Response2(BaseModel):
     )
     clickhouse: Optional[str] = Field(default=None, description="Executed ClickHouse query")
     columns: Optional[list] = Field(default=None, description="Returned columns")
+    cost: Optional[HogQLQueryCost] = Field(
+        default=None, description="Estimated cost of the query, when admission rules apply or in debug mode"
+    )
     error: Optional[str] = Field(
         default=None,
         description="Query error. Returned only if 'explain' or `modifiers.debug` is true. Throws an error otherwise.",
@@ -2812,6 +2888,10 @@ class EventsQuery(BaseModel):
     actionId: Optional[int] = Field(default=None, description="Show events matching a given action")
     after: Optional[str] = Field(default=None, description="Only fetch events that happened after this timestamp")
     before: Optional[str] = Field(default=None, description="Only fetch events that happened before this timestamp")
+    cursor: Optional[str] = Field(
+        default=None,
+        description="Cursor returned as `next_cursor` by the previous page. Continues after its last row instead of skipping `offset` rows",
+    )
     event: Optional[str] = Field(default=None, description="Limit to events matching this string")
     filterTestAccounts: Optional[bool] = Field(default=None, description="Filter test accounts")
     fixedProperties: Optional[
@@ -4019,6 +4099,10 @@ class ActorsQuery(BaseModel):
     model_config = ConfigDict(
         extra="forbid",
     )
+    cursor: Optional[str] = Field(
+        default=None,
+        description="Cursor returned as `next_cursor` by the previous page. Continues after its last row instead of skipping `offset` rows",
+    )
     fixedProperties: Optional[
         list[
             Union[
@@ -108,6 +108,7 @@ class SessionRecordingListFromFilters:
             team=self._team,
             # TODO - should we have our own query type 🤷
             query_type="hogql_query",
+            include_hogql=False,
         )
 
         return SessionRecordingQueryResult(
@@ -265,7 +266,7 @@ class EventsSubQuery:
                     event_names.add(entity.id)
 
             # TODO: we're not passing the "right" type in here - should we change the signature or do something else?
-            entity_exprs = [entity_to_expr(entity=entity)]  # type: ignore
+            entity_exprs = [entity_to_expr(entity=entity, team=self._team)]  # type: ignore
 
             if entity.property_groups:
                 entity_exprs.append(property_to_expr(entity.property_groups, team=self._team, scope="replay"))
@@ -140,6 +140,10 @@ CLICKHOUSE_ENABLE_STORAGE_POLICY: bool = get_from_env("CLICKHOUSE_ENABLE_STORAGE
 
 CLICKHOUSE_CONN_POOL_MIN: int = get_from_env("CLICKHOUSE_CONN_POOL_MIN", 20, type_cast=int)
 CLICKHOUSE_CONN_POOL_MAX: int = get_from_env("CLICKHOUSE_CONN_POOL_MAX", 1000, type_cast=int)
+# How long a query waits for a free connection once the pool is saturated, in seconds
+CLICKHOUSE_CONN_POOL_ACQUIRE_TIMEOUT: float = get_from_env(
+    "CLICKHOUSE_CONN_POOL_ACQUIRE_TIMEOUT", 30.0, type_cast=float
+)
 
 CLICKHOUSE_STABLE_HOST: str = get_from_env("CLICKHOUSE_STABLE_HOST", CLICKHOUSE_HOST)
 # If enabled, some queries will use system.cluster table to query each shard
@@ -152,6 +156,16 @@ try:
 except Exception:
     CLICKHOUSE_PER_TEAM_SETTINGS = {}
 
+# What to do with HogQL queries that are estimated to be expensive, see posthog/hogql/query_cost.py. A list like
+# [{"min_cost": 1e9, "action": "queue", "workloads": ["ONLINE"], "team_ids": [2]}], the first matching rule applies.
+try:
+    HOGQL_ADMISSION_RULES: list = json.loads(os.getenv("HOGQL_ADMISSION_RULES", "[]"))
+except Exception:
+    HOGQL_ADMISSION_RULES = []
+# How many queued queries can run at once per process, and how long the others wait for a turn, in seconds
+HOGQL_ADMISSION_QUEUE_SIZE: int = get_from_env("HOGQL_ADMISSION_QUEUE_SIZE", 4, type_cast=int)
+HOGQL_ADMISSION_QUEUE_TIMEOUT: float = get_from_env("HOGQL_ADMISSION_QUEUE_TIMEOUT", 60.0, type_cast=float)
+
 _clickhouse_http_protocol = "http://"
 _clickhouse_http_port = "8123"
 if CLICKHOUSE_SECURE:
@@ -272,6 +286,10 @@ if not REDIS_URL:
 # The TolerantZlibCompressor is a drop-in replacement for the standard Django ZlibCompressor that
 # can cope with compressed and uncompressed reading at the same time
 USE_REDIS_COMPRESSION = get_from_env("USE_REDIS_COMPRESSION", False, type_cast=str_to_bool)
+# Values up to this many bytes aren't worth compressing
+REDIS_COMPRESSION_MIN_LENGTH = get_from_env("REDIS_COMPRESSION_MIN_LENGTH", 1024, type_cast=int)
+# zlib compression level, from 1 (fastest) to 9 (smallest)
+REDIS_COMPRESSION_LEVEL = get_from_env("REDIS_COMPRESSION_LEVEL", 6, type_cast=int)
 
 # AWS ElastiCache supports "reader" endpoints.
 # See "Finding a Redis (Cluster Mode Disabled) Cluster's Endpoints (Console)"
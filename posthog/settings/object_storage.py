@@ -30,3 +30,6 @@ OBJECT_STORAGE_SESSION_RECORDING_LTS_FOLDER = os.getenv(
 )
 OBJECT_STORAGE_EXPORTS_FOLDER = os.getenv("OBJECT_STORAGE_EXPORTS_FOLDER", "exports")
 OBJECT_STORAGE_MEDIA_UPLOADS_FOLDER = os.getenv("OBJECT_STORAGE_MEDIA_UPLOADS_FOLDER", "media_uploads")
+OBJECT_STORAGE_REPLAY_EMBEDDINGS_INDEX_FOLDER = os.getenv(
+    "OBJECT_STORAGE_REPLAY_EMBEDDINGS_INDEX_FOLDER", "replay_embeddings_index"
+)
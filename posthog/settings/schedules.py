@@ -1,5 +1,5 @@
 from posthog.settings.base_variables import TEST
-from posthog.settings.utils import get_from_env
+from posthog.settings.utils import get_from_env, str_to_bool
 
 USE_PRECALCULATED_CH_COHORT_PEOPLE = not TEST
 CALCULATE_X_COHORTS_PARALLEL = get_from_env("CALCULATE_X_COHORTS_PARALLEL", 5, type_cast=int)
@@ -25,6 +25,23 @@ COUNT_TILES_WITH_NO_FILTERS_HASH_INTERVAL_SECONDS = get_from_env(
 
 CACHED_RESULTS_TTL = 7 * 24 * 60 * 60  # how long to keep cached results for
 
+# How many seconds to also keep recently used results in process memory, 0 turns it off. Other processes don't see
+# refreshes of results this process has in memory, so this needs to stay short
+RESULTS_CACHE_LOCAL_TTL = get_from_env("RESULTS_CACHE_LOCAL_TTL", 0, type_cast=int)
+RESULTS_CACHE_LOCAL_MAX_ENTRIES = get_from_env("RESULTS_CACHE_LOCAL_MAX_ENTRIES", 1000, type_cast=int)
+
+# How many queries of one dashboard to calculate at the same time. Tests run inside a transaction that other threads
+# can't see, so there they're calculated one by one
+DASHBOARD_QUERY_CONCURRENCY = get_from_env("DASHBOARD_QUERY_CONCURRENCY", 1 if TEST else 4, type_cast=int)
+
+# Whether stale trends are refreshed by only querying the buckets that can still change. Events can arrive late, so
+# that's the buckets newer than INCREMENTAL_TRENDS_LATE_DATA_HOURS before the last refresh, which teams can override
+# with `late_data_horizon_hours` in their extra settings. Trends are still calculated fully at least every
+# INCREMENTAL_TRENDS_FULL_REFRESH_HOURS, in case events arrived even later
+INCREMENTAL_TRENDS_REFRESH = get_from_env("INCREMENTAL_TRENDS_REFRESH", False, type_cast=str_to_bool)
+INCREMENTAL_TRENDS_LATE_DATA_HOURS = get_from_env("INCREMENTAL_TRENDS_LATE_DATA_HOURS", 24, type_cast=int)
+INCREMENTAL_TRENDS_FULL_REFRESH_HOURS = get_from_env("INCREMENTAL_TRENDS_FULL_REFRESH_HOURS", 24, type_cast=int)
+
 # Schedule to run asynchronous data deletion on. Follows crontab syntax.
 # Use empty string to prevent this
 CLEAR_CLICKHOUSE_REMOVED_DATA_SCHEDULE_CRON = get_from_env(
@@ -26,3 +26,8 @@ REPLAY_EMBEDDINGS_CLUSTERING_DBSCAN_EPS = get_from_env("REPLAY_EMBEDDINGS_CLUSTE
 REPLAY_EMBEDDINGS_CLUSTERING_DBSCAN_MIN_SAMPLES = get_from_env(
     "REPLAY_EMBEDDINGS_CLUSTERING_DBSCAN_MIN_SAMPLES", 10, type_cast=int
 )
+# how many of the nearest lists of the approximate nearest neighbour index are searched for similar recordings
+REPLAY_EMBEDDINGS_INDEX_PROBES = get_from_env("REPLAY_EMBEDDINGS_INDEX_PROBES", 8, type_cast=int)
+# embedding requests in flight at once per task, each packing many inputs
+REPLAY_EMBEDDINGS_MAX_CONCURRENT_REQUESTS = get_from_env("REPLAY_EMBEDDINGS_MAX_CONCURRENT_REQUESTS", 4, type_cast=int)
+REPLAY_EMBEDDINGS_REQUEST_MAX_RETRIES = get_from_env("REPLAY_EMBEDDINGS_REQUEST_MAX_RETRIES", 5, type_cast=int)
@@ -361,3 +361,10 @@ IMPERSONATION_EXPIRE_AFTER_LAST_ACTIVITY = get_from_env(
 )
 
 IMPERSONATION_SESSION_KEY = get_from_env("IMPERSONATION_SESSION_KEY", "loginas_started_at")
+
+# Web analytics sampling
+
+# Adaptive sampling picks the coarsest sample rate that keeps the 95% confidence interval of the total within this bound
+WEB_ANALYTICS_SAMPLING_MAX_RELATIVE_ERROR = get_from_env(
+    "WEB_ANALYTICS_SAMPLING_MAX_RELATIVE_ERROR", 0.01, type_cast=float
+)
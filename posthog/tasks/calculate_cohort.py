@@ -46,6 +46,15 @@ def clear_stale_cohort(cohort_id: int, before_version: int) -> None:
     clear_stale_cohortpeople(cohort, before_version)
 
 
+@shared_task(ignore_result=True)
+def index_cohort_membership(cohort_id: int) -> None:
+    from posthog.models.cohort.membership_index import build_cohort_membership_index
+
+    cohort = Cohort.objects.filter(pk=cohort_id, deleted=False).first()
+    if cohort:
+        build_cohort_membership_index(cohort)
+
+
 @shared_task(ignore_result=True, max_retries=2)
 def calculate_cohort_ch(cohort_id: int, pending_version: int, initiating_user_id: Optional[int] = None) -> None:
     cohort: Cohort = Cohort.objects.get(pk=cohort_id)
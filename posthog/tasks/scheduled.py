@@ -44,7 +44,9 @@ from posthog.tasks.tasks import (
     sync_all_organization_available_features,
     sync_insight_cache_states_task,
     update_event_partitions,
+    update_person_activity_summaries,
     update_quota_limiting,
+    update_web_analytics_traffic_volume,
     verify_persons_data_in_sync,
     stop_surveys_reached_target,
 )
@@ -126,6 +128,20 @@ def setup_periodic_tasks(sender: Celery, **kwargs: Any) -> None:
         name="calculate decide usage",
     )
 
+    # Hourly, recount recent daily pageviews used to pick web analytics sampling rates
+    sender.add_periodic_task(
+        crontab(minute="15", hour="*"),
+        update_web_analytics_traffic_volume.s(),
+        name="update web analytics traffic volume",
+    )
+
+    # Hourly, extend the activity summaries of persons whose page was opened recently
+    sender.add_periodic_task(
+        crontab(minute="30", hour="*"),
+        update_person_activity_summaries.s(),
+        name="update person activity summaries",
+    )
+
     # Reset master project data every Monday at Thursday at 5 AM UTC. Mon and Thu because doing this every day
     # would be too hard on ClickHouse, and those days ensure most users will have data at most 3 days old.
     sender.add_periodic_task(crontab(day_of_week="mon,thu", hour="5", minute="0"), demo_reset_master_team.s())
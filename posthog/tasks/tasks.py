@@ -614,6 +614,20 @@ def find_flags_with_enriched_analytics() -> None:
     find_flags_with_enriched_analytics(begin, end)
 
 
+@shared_task(ignore_result=True, queue=CeleryQueue.ANALYTICS_QUERIES.value)
+def update_web_analytics_traffic_volume() -> None:
+    from posthog.hogql_queries.web_analytics.traffic_volume import update_traffic_volume
+
+    update_traffic_volume()
+
+
+@shared_task(ignore_result=True, queue=CeleryQueue.ANALYTICS_QUERIES.value)
+def update_person_activity_summaries() -> None:
+    from posthog.queries.person_activity_summary import update_person_activity_summaries
+
+    update_person_activity_summaries()
+
+
 @shared_task(ignore_result=True)
 def demo_reset_master_team() -> None:
     from posthog.tasks.demo_reset_master_team import demo_reset_master_team
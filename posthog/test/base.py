@@ -62,6 +62,13 @@ from posthog.models.person.sql import (
 )
 from posthog.models.person.util import bulk_create_persons, create_person
 from posthog.models.project import Project
+from posthog.models.events_rollup.sql import (
+    DISTRIBUTED_EVENTS_ROLLUP_TABLE_SQL,
+    DROP_EVENTS_ROLLUP_MATERIALIZED_VIEW_SQL,
+    DROP_EVENTS_ROLLUP_TABLE_SQL,
+    EVENTS_ROLLUP_TABLE_MV_SQL,
+    EVENTS_ROLLUP_TABLE_SQL,
+)
 from posthog.models.sessions.sql import (
     DROP_SESSION_TABLE_SQL,
     DROP_SESSION_MATERIALIZED_VIEW_SQL,
@@ -864,8 +871,8 @@ class ClickhouseTestMixin(QueryMatchingTest):
         # a roundabout way to handle this, but it seems tricky to spy on the
         # unbound class method `Client.execute` directly easily
         @contextmanager
-        def get_client():
-            with original_get_client() as client:
+        def get_client(*args, **kwargs):
+            with original_get_client(*args, **kwargs) as client:
                 original_client_execute = client.execute
 
                 def execute_wrapper(query, *args, **kwargs):
@@ -940,6 +947,8 @@ class ClickhouseDestroyTablesMixin(BaseTest):
                 DROP_SESSION_TABLE_SQL(),
                 DROP_SESSION_MATERIALIZED_VIEW_SQL(),
                 DROP_SESSION_VIEW_SQL(),
+                DROP_EVENTS_ROLLUP_TABLE_SQL(),
+                DROP_EVENTS_ROLLUP_MATERIALIZED_VIEW_SQL(),
             ]
         )
         run_clickhouse_statement_in_parallel(
@@ -951,6 +960,7 @@ class ClickhouseDestroyTablesMixin(BaseTest):
                 CHANNEL_DEFINITION_TABLE_SQL(),
                 CHANNEL_DEFINITION_DICTIONARY_SQL,
                 SESSIONS_TABLE_SQL(),
+                EVENTS_ROLLUP_TABLE_SQL(),
             ]
         )
         run_clickhouse_statement_in_parallel(
@@ -962,6 +972,8 @@ class ClickhouseDestroyTablesMixin(BaseTest):
                 SESSIONS_TABLE_MV_SQL(),
                 SESSIONS_VIEW_SQL(),
                 DISTRIBUTED_SESSIONS_TABLE_SQL(),
+                EVENTS_ROLLUP_TABLE_MV_SQL(),
+                DISTRIBUTED_EVENTS_ROLLUP_TABLE_SQL(),
             ]
         )
 
@@ -980,6 +992,8 @@ class ClickhouseDestroyTablesMixin(BaseTest):
                 DROP_SESSION_TABLE_SQL(),
                 DROP_SESSION_MATERIALIZED_VIEW_SQL(),
                 DROP_SESSION_VIEW_SQL(),
+                DROP_EVENTS_ROLLUP_TABLE_SQL(),
+                DROP_EVENTS_ROLLUP_MATERIALIZED_VIEW_SQL(),
             ]
         )
 
@@ -992,6 +1006,7 @@ class ClickhouseDestroyTablesMixin(BaseTest):
                 CHANNEL_DEFINITION_TABLE_SQL(),
                 CHANNEL_DEFINITION_DICTIONARY_SQL,
                 SESSIONS_TABLE_SQL(),
+                EVENTS_ROLLUP_TABLE_SQL(),
             ]
         )
         run_clickhouse_statement_in_parallel(
@@ -1002,6 +1017,8 @@ class ClickhouseDestroyTablesMixin(BaseTest):
                 DISTRIBUTED_SESSIONS_TABLE_SQL(),
                 SESSIONS_VIEW_SQL(),
                 CHANNEL_DEFINITION_DATA_SQL,
+                EVENTS_ROLLUP_TABLE_MV_SQL(),
+                DISTRIBUTED_EVENTS_ROLLUP_TABLE_SQL(),
             ]
         )
 
@@ -1,11 +1,12 @@
 import concurrent.futures
 from datetime import datetime
+from decimal import Decimal
 from typing import cast
 from unittest.mock import patch
 
 from django.core.cache import cache
 from django.db import IntegrityError, connection
-from django.test import TransactionTestCase
+from django.test import SimpleTestCase, TransactionTestCase
 from django.utils import timezone
 from freezegun import freeze_time
 import pytest
@@ -19,10 +20,12 @@ from posthog.models.feature_flag.flag_matching import (
     FeatureFlagMatcher,
     FeatureFlagMatchReason,
     FlagsMatcherCache,
+    flag_condition_properties,
     get_all_feature_flags,
     get_feature_flag_hash_key_overrides,
     set_feature_flag_hash_key_overrides,
 )
+from posthog.models.filters import Filter
 from posthog.models.group import Group
 from posthog.models.organization import Organization
 from posthog.models.team import Team
@@ -8322,3 +8325,38 @@ class TestFeatureFlagMatcherConsistency(BaseTest):
                     feature_flag_match,
                     FeatureFlagMatch(False, None, FeatureFlagMatchReason.OUT_OF_ROLLOUT_BOUND, 0),
                 )
+
+
+class TestFlagConditionProperties(SimpleTestCase):
+    def test_identical_conditions_share_parsed_properties(self):
+        condition = {
+            "properties": [
+                {"key": "email", "value": "@posthog.com", "operator": "icontains", "type": "person"},
+                {"key": "id", "value": 1, "type": "cohort"},
+            ],
+            "rollout_percentage": 50,
+        }
+        reordered_condition = {
+            "rollout_percentage": 50,
+            "properties": [
+                {"type": "person", "operator": "icontains", "value": "@posthog.com", "key": "email"},
+                {"type": "cohort", "value": 1, "key": "id"},
+            ],
+        }
+
+        properties = flag_condition_properties(condition)
+
+        self.assertEqual(
+            [(property.key, property.type, property.value) for property in properties],
+            [("email", "person", "@posthog.com"), ("id", "cohort", 1)],
+        )
+        self.assertIs(flag_condition_properties(reordered_condition), properties)
+        self.assertEqual(
+            [property.to_dict() for property in properties],
+            [property.to_dict() for property in Filter(data=condition).property_groups.flat],
+        )
+
+    def test_conditions_that_dont_serialize_are_parsed_every_time(self):
+        condition = {"properties": [{"key": "score", "value": Decimal("1.5"), "type": "person"}]}
+
+        self.assertIsNot(flag_condition_properties(condition), flag_condition_properties(condition))